@@ -3,28 +3,88 @@ Sales Command Center - FastAPI Application
 Main application entry point for the Sales Command Center
 """
 
-from fastapi import FastAPI, Request, Form
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi import FastAPI, Request, Form, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from pathlib import Path
+import asyncio
 import logging
 import secrets
 import os
+import json
 from pydantic import BaseModel
 from typing import Optional
+from datetime import date
 
 # Import configuration
 from sales_dashboard.config import config
+from sales_dashboard.http_cache import encode_payload, payload_response
+from sales_dashboard.static_assets import CachedStaticFiles, StaticAssetCache, HTML_CACHE_CONTROL
 
 # Import LLM Fallback Service
 try:
-    from sales_dashboard.llm_service import get_llm_service, LLMProvider
+    from sales_dashboard.llm_service import (
+        get_async_llm_service,
+        close_async_llm_service,
+        LLMProvider
+    )
     LLM_SERVICE_AVAILABLE = True
 except ImportError:
     LLM_SERVICE_AVAILABLE = False
 
+# Import dashboard data layer (repository + cache)
+try:
+    from sales_dashboard.data import dashboard_service
+    from sales_dashboard.data.cache import dashboard_cache
+    from sales_dashboard.data.database import close_async_db, get_async_db_session
+    from sales_dashboard.data.repositories.order_repository import (
+        AsyncOrderRepository,
+        OrderFilters,
+        decode_cursor
+    )
+    from sales_dashboard.live import live_broadcaster, format_sse
+    DATABASE_AVAILABLE = True
+except ImportError:
+    DATABASE_AVAILABLE = False
+
+# Import the local intent router (trained from conversation history)
+try:
+    from sales_dashboard.agents.intent_router import intent_router
+    INTENT_ROUTER_AVAILABLE = True
+except ImportError:
+    INTENT_ROUTER_AVAILABLE = False
+
+# Import integration syncs
+try:
+    from sales_dashboard.integrations.salesforce_sync import salesforce_sync
+    from sales_dashboard.integrations.netsuite_sync import netsuite_sync
+    from sales_dashboard.integrations.webhooks import (
+        webhook_ingestor,
+        webhook_authorized,
+        WebhookQueueFull,
+        WEBHOOK_PARSERS,
+        WEBHOOK_SECRET_HEADER
+    )
+    SYNC_AVAILABLE = DATABASE_AVAILABLE
+except ImportError:
+    SYNC_AVAILABLE = False
+
+# Import conversation memory
+try:
+    from sales_dashboard.conversation_memory import conversation_memory
+    MEMORY_AVAILABLE = DATABASE_AVAILABLE and LLM_SERVICE_AVAILABLE
+except ImportError:
+    MEMORY_AVAILABLE = False
+
+# Import multi-agent orchestrator
+try:
+    from sales_dashboard.agents.orchestrator import agent_orchestrator
+    ORCHESTRATOR_AVAILABLE = DATABASE_AVAILABLE and LLM_SERVICE_AVAILABLE
+except ImportError:
+    ORCHESTRATOR_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -58,10 +118,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files
+# Compress JSON responses (SSE streams are excluded by the middleware)
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
+# HTML pages are held in memory (re-read on change only in debug mode)
 frontend_path = Path(__file__).parent / "frontend"
+static_assets = StaticAssetCache(frontend_path, reload=config.DEBUG)
+
+# Mount static files
 if frontend_path.exists():
-    app.mount("/static", StaticFiles(directory=str(frontend_path)), name="static")
+    app.mount("/static", CachedStaticFiles(directory=str(frontend_path), assets=static_assets), name="static")
 
 
 # ============================================
@@ -97,10 +163,9 @@ async def login_page(request: Request):
     if is_authenticated(request):
         return RedirectResponse(url="/", status_code=302)
 
-    login_path = frontend_path / "login.html"
-    if login_path.exists():
-        with open(login_path, 'r', encoding='utf-8') as f:
-            return HTMLResponse(content=f.read())
+    page = static_assets.page("login.html")
+    if page is not None:
+        return payload_response(request, page, cache_control=HTML_CACHE_CONTROL)
     return HTMLResponse(content="<h1>Login page not found</h1>")
 
 
@@ -162,33 +227,34 @@ async def root(request: Request):
     if auth_enabled() and not is_authenticated(request):
         return RedirectResponse(url="/login", status_code=302)
 
-    dashboard_path = frontend_path / "sales_dashboard.html"
-    if dashboard_path.exists():
-        with open(dashboard_path, 'r', encoding='utf-8') as f:
-            return HTMLResponse(content=f.read())
+    page = static_assets.page("sales_dashboard.html")
+    if page is not None:
+        return payload_response(request, page, cache_control=HTML_CACHE_CONTROL)
     return HTMLResponse(content="<h1>Sales Command Center</h1><p>Dashboard not found</p>")
 
 
 # API endpoints
+async def _dashboard_response(request: Request, loader):
+    """
+    Serve a cached dashboard payload with ETag/304 and pre-compressed
+    bodies, or 503 if the database is unreachable
+    """
+    if not DATABASE_AVAILABLE:
+        return JSONResponse(status_code=503, content={"error": "Database not available"})
+    try:
+        return payload_response(request, await loader())
+    except Exception as e:
+        logger.error(f"Error loading dashboard data: {e}")
+        return JSONResponse(status_code=503, content={"error": "Dashboard data unavailable"})
+
+
 @app.get("/api/dashboard/metrics")
 async def get_dashboard_metrics(request: Request):
     """Get dashboard metrics"""
     if auth_enabled() and not is_authenticated(request):
         return JSONResponse(status_code=401, content={"error": "Unauthorized"})
 
-    # Mock data for now - will be replaced with real database queries
-    return {
-        "orders_fulfilled_today": 47,
-        "orders_fulfilled_change": 12,
-        "orders_pending": 23,
-        "orders_pending_value": 450000,
-        "orders_received_today": 52,
-        "orders_received_value": 2300000,
-        "pipeline_value": 12500000,
-        "pipeline_deals": 145,
-        "win_rate": 42,
-        "win_rate_change": -3
-    }
+    return await _dashboard_response(request, lambda: dashboard_service.get_section_payload("metrics"))
 
 @app.get("/api/dashboard/revenue-trend")
 async def get_revenue_trend(request: Request):
@@ -196,10 +262,7 @@ async def get_revenue_trend(request: Request):
     if auth_enabled() and not is_authenticated(request):
         return JSONResponse(status_code=401, content={"error": "Unauthorized"})
 
-    return {
-        "labels": ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"],
-        "data": [2.1, 2.3, 2.0, 2.5, 2.8, 1.9, 2.3]
-    }
+    return await _dashboard_response(request, lambda: dashboard_service.get_section_payload("revenue_trend"))
 
 @app.get("/api/dashboard/regional-performance")
 async def get_regional_performance(request: Request):
@@ -207,10 +270,7 @@ async def get_regional_performance(request: Request):
     if auth_enabled() and not is_authenticated(request):
         return JSONResponse(status_code=401, content={"error": "Unauthorized"})
 
-    return {
-        "labels": ["North America", "EMEA", "APAC", "LATAM"],
-        "data": [5.8, 3.2, 2.9, 1.4]
-    }
+    return await _dashboard_response(request, lambda: dashboard_service.get_section_payload("regional_performance"))
 
 @app.get("/api/pipeline/funnel")
 async def get_pipeline_funnel(request: Request):
@@ -218,11 +278,7 @@ async def get_pipeline_funnel(request: Request):
     if auth_enabled() and not is_authenticated(request):
         return JSONResponse(status_code=401, content={"error": "Unauthorized"})
 
-    return {
-        "stages": ["Lead", "Qualified", "Proposal", "Negotiation", "Closed Won"],
-        "deal_counts": [145, 98, 67, 42, 28],
-        "values": [18.5, 14.2, 10.8, 7.5, 5.2]
-    }
+    return await _dashboard_response(request, lambda: dashboard_service.get_section_payload("pipeline_funnel"))
 
 @app.get("/api/products/performance")
 async def get_product_performance(request: Request):
@@ -230,63 +286,286 @@ async def get_product_performance(request: Request):
     if auth_enabled() and not is_authenticated(request):
         return JSONResponse(status_code=401, content={"error": "Unauthorized"})
 
-    return {
-        "products": [
-            "Enterprise Software License",
-            "Professional Services",
-            "Cloud Subscription",
-            "Hardware - Tablets",
-            "Support & Maintenance",
-            "Training Services",
-            "Custom Development",
-            "Hardware - Servers"
-        ],
-        "revenue": [4.2, 3.8, 3.5, 2.9, 2.1, 1.8, 1.5, 1.2]
-    }
+    return await _dashboard_response(request, lambda: dashboard_service.get_section_payload("products"))
 
 @app.get("/api/orders")
-async def get_orders(request: Request):
-    """Get recent orders"""
+async def get_orders(
+    request: Request,
+    status: Optional[str] = None,
+    customer_id: Optional[int] = None,
+    rep_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    min_amount: Optional[float] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+):
+    """
+    List orders, newest first
+
+    Without parameters: the dashboard's recent orders, {"orders": [...]},
+    served from the cache with ETag/304 like the other dashboard sections.
+
+    With any filter, limit or cursor: keyset pagination,
+    {"orders": [...], "next_cursor": ...}. Pass next_cursor as ?cursor= to
+    get the following page (null on the last page). Filters combine with
+    AND; the date range is inclusive. limit defaults to 50.
+    """
     if auth_enabled() and not is_authenticated(request):
         return JSONResponse(status_code=401, content={"error": "Unauthorized"})
+    if not DATABASE_AVAILABLE:
+        return JSONResponse(status_code=503, content={"error": "Database not available"})
+
+    filters = OrderFilters(status, customer_id, rep_id, start_date, end_date, min_amount)
+    if filters == OrderFilters() and limit is None and not cursor:
+        return await _dashboard_response(request, lambda: dashboard_service.get_section_payload("orders"))
 
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            return JSONResponse(status_code=400, content={"error": str(e)})
+
+    try:
+        async with get_async_db_session() as db:
+            orders, next_cursor = await AsyncOrderRepository(db).list_orders(filters, limit or 50, cursor)
+    except Exception as e:
+        logger.error(f"Error listing orders: {e}")
+        return JSONResponse(status_code=503, content={"error": "Database not available"})
+
+    return {"orders": orders, "next_cursor": next_cursor}
+
+
+@app.get("/api/orders/export")
+async def export_orders(
+    request: Request,
+    status: Optional[str] = None,
+    customer_id: Optional[int] = None,
+    rep_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    min_amount: Optional[float] = None
+):
+    """
+    Stream every matching order as NDJSON (one JSON object per line)
+
+    Rows are read in keyset batches and written as they arrive, so an
+    export of any size never sits in memory. Each batch uses its own
+    short-lived session, so a slow client never holds a pooled connection.
+    """
+    if auth_enabled() and not is_authenticated(request):
+        return JSONResponse(status_code=401, content={"error": "Unauthorized"})
+    if not DATABASE_AVAILABLE:
+        return JSONResponse(status_code=503, content={"error": "Database not available"})
+
+    filters = OrderFilters(status, customer_id, rep_id, start_date, end_date, min_amount)
+
+    async def rows():
+        after = None
+        while True:
+            async with get_async_db_session() as db:
+                orders, after = await AsyncOrderRepository(db).export_batch(filters, after)
+            if orders:
+                yield "\n".join(json.dumps(order, separators=(",", ":")) for order in orders) + "\n"
+            if after is None:
+                return
+
+    return StreamingResponse(
+        rows(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="orders.ndjson"'}
+    )
+
+
+@app.get("/api/dashboard/snapshot")
+async def get_dashboard_snapshot(request: Request):
+    """
+    Get every dashboard section in one response
+
+    Sections load concurrently; a slow or failing section comes back as
+    null with its name listed in "errors" instead of failing the request.
+    """
+    if auth_enabled() and not is_authenticated(request):
+        return JSONResponse(status_code=401, content={"error": "Unauthorized"})
+
+    async def load_snapshot():
+        return encode_payload(await dashboard_service.get_snapshot())
+
+    return await _dashboard_response(request, load_snapshot)
+
+
+def _live_updates_available() -> bool:
+    return DATABASE_AVAILABLE and config.LIVE_UPDATES_ENABLED
+
+
+@app.websocket("/ws/dashboard")
+async def dashboard_websocket(websocket: WebSocket):
+    """
+    Live dashboard over WebSocket
+
+    Sends {"type": "snapshot"} on connect, then {"type": "diff"} with only
+    the changed sections. The server pings every WEBSOCKET_PING_INTERVAL
+    seconds and drops clients that send nothing (e.g. "pong") for
+    WEBSOCKET_PING_INTERVAL + WEBSOCKET_PING_TIMEOUT seconds.
+    """
+    if auth_enabled() and not is_authenticated(websocket):
+        await websocket.close(code=4401)
+        return
+    if not _live_updates_available():
+        await websocket.close(code=1013)  # try again later
+        return
+
+    await websocket.accept()
+    subscription = None
+    tasks = []
+    last_seen = asyncio.get_running_loop().time()
+
+    async def receive():
+        nonlocal last_seen
+        try:
+            while True:
+                await websocket.receive_text()
+                last_seen = asyncio.get_running_loop().time()
+        except WebSocketDisconnect:
+            pass
+
+    async def send():
+        deadline = config.WEBSOCKET_PING_INTERVAL + config.WEBSOCKET_PING_TIMEOUT
+        try:
+            while True:
+                message = await subscription.get(timeout=config.WEBSOCKET_PING_INTERVAL)
+                if message is None:
+                    if asyncio.get_running_loop().time() - last_seen > deadline:
+                        await websocket.close(code=1001)
+                        return
+                    message = {"type": "ping"}
+                await websocket.send_text(json.dumps(message, default=str))
+        except (WebSocketDisconnect, RuntimeError):
+            pass  # client went away mid-send
+
+    try:
+        subscription = await live_broadcaster.subscribe()
+        tasks = [asyncio.ensure_future(receive()), asyncio.ensure_future(send())]
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        if subscription is not None:
+            subscription.close()
+
+
+@app.get("/api/dashboard/stream")
+async def dashboard_stream(request: Request):
+    """
+    Live dashboard over server-sent events (fallback for /ws/dashboard)
+
+    Same snapshot/diff messages as the WebSocket, plus a comment line every
+    WEBSOCKET_PING_INTERVAL seconds to keep proxies from closing the stream.
+    """
+    if auth_enabled() and not is_authenticated(request):
+        return JSONResponse(status_code=401, content={"error": "Unauthorized"})
+    if not _live_updates_available():
+        return JSONResponse(status_code=503, content={"error": "Live updates not available"})
+
+    async def event_stream():
+        subscription = None
+        try:
+            subscription = await live_broadcaster.subscribe()
+            while not await request.is_disconnected():
+                message = await subscription.get(timeout=config.WEBSOCKET_PING_INTERVAL)
+                yield format_sse(message) if message is not None else ": ping\n\n"
+        finally:
+            if subscription is not None:
+                subscription.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+@app.get("/api/cache/status")
+async def get_cache_status(request: Request):
+    """Get dashboard cache statistics"""
+    if auth_enabled() and not is_authenticated(request):
+        return JSONResponse(status_code=401, content={"error": "Unauthorized"})
+
+    if not DATABASE_AVAILABLE:
+        return {"available": False}
+    return {"available": True, **dashboard_cache.stats(), "live": live_broadcaster.stats()}
+
+
+@app.get("/api/sync/status")
+async def get_sync_status(request: Request):
+    """Get integration sync statistics"""
+    if auth_enabled() and not is_authenticated(request):
+        return JSONResponse(status_code=401, content={"error": "Unauthorized"})
+
+    if not SYNC_AVAILABLE:
+        return {"available": False}
     return {
-        "orders": [
-            {
-                "order_number": "SO-2025-1001",
-                "customer": "Disney Corporation",
-                "amount": 49100.00,
-                "status": "fulfilled",
-                "date": "2025-11-05"
-            },
-            {
-                "order_number": "SO-2025-1002",
-                "customer": "Tech Giants Inc",
-                "amount": 67710.00,
-                "status": "fulfilled",
-                "date": "2025-11-05"
-            },
-            {
-                "order_number": "SO-2025-1006",
-                "customer": "Disney Corporation",
-                "amount": 136200.00,
-                "status": "pending",
-                "date": "2025-11-05"
-            }
-        ]
+        "available": True,
+        "salesforce": {"enabled": config.SALESFORCE_SYNC_ENABLED, **salesforce_sync.stats()},
+        "netsuite": {"enabled": config.NETSUITE_SYNC_ENABLED, **netsuite_sync.stats()},
+        "webhooks": webhook_ingestor.stats()
     }
 
 
+@app.post("/api/webhooks/{source}")
+async def receive_webhook(source: str, request: Request):
+    """
+    Accept Salesforce / NetSuite change events
+
+    Authenticated by the shared secret header rather than a session. Events
+    are queued and written in coalesced batches; 202 means accepted, not
+    yet written.
+    """
+    if not (SYNC_AVAILABLE and config.ENABLE_WEBHOOKS) or source not in WEBHOOK_PARSERS:
+        return JSONResponse(status_code=404, content={"error": "Not found"})
+    if not webhook_authorized(request.headers.get(WEBHOOK_SECRET_HEADER)):
+        return JSONResponse(status_code=401, content={"error": "Unauthorized"})
+
+    try:
+        events = WEBHOOK_PARSERS[source](await request.json())
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": f"Invalid payload: {e}"})
+
+    try:
+        accepted = webhook_ingestor.submit(events)
+    except WebhookQueueFull:
+        return JSONResponse(
+            status_code=503,
+            content={"error": "Webhook queue is full"},
+            headers={"Retry-After": "5"}
+        )
+    return JSONResponse(status_code=202, content={"accepted": accepted})
+
+
 # ============================================
 # LLM API Endpoints with Fallback Strategy
 # ============================================
 
+# System prompt for the natural language query endpoints
+SALES_ASSISTANT_PROMPT = """
+        You are a helpful sales assistant for the Sales Command Center.
+        You help users understand their sales data, pipeline, orders, and business metrics.
+        Be concise, professional, and provide actionable insights when relevant.
+        If you don't have specific data, provide general guidance based on the question.
+        """
+
+
 class ChatRequest(BaseModel):
     """Request model for chat endpoint"""
     message: str
     system_prompt: Optional[str] = None
     context: Optional[str] = None
     preferred_provider: Optional[str] = None
+    hedge: Optional[bool] = None  # None = use LLM_HEDGING_ENABLED; streaming endpoints don't hedge
+    session_id: Optional[str] = None  # follow-ups in a session get its conversation history
 
 
 class ChatResponse(BaseModel):
@@ -297,6 +576,32 @@ class ChatResponse(BaseModel):
     success: bool
     error: Optional[str] = None
     latency_ms: Optional[float] = None
+    hedged: bool = False
+    cached: bool = False
+
+
+async def _session_history(session_id: Optional[str]) -> list:
+    """Conversation memory for a chat session (empty without one)"""
+    if not (session_id and MEMORY_AVAILABLE):
+        return []
+    return await conversation_memory.history(session_id)
+
+
+async def _remember_turn(session_id: Optional[str], message: str, response) -> None:
+    """Keep a successful exchange in the session's conversation memory"""
+    if session_id and MEMORY_AVAILABLE and response.success:
+        await conversation_memory.add_turn(session_id, message, response.content)
+
+
+async def _remember_stream(events, session_id: Optional[str], message: str):
+    """Pass LLM stream events through, keeping the finished answer in the session's memory"""
+    parts = []
+    async for event in events:
+        if event["type"] == "token":
+            parts.append(event["content"])
+        elif event["type"] == "done" and session_id and MEMORY_AVAILABLE:
+            await conversation_memory.add_turn(session_id, message, "".join(parts))
+        yield event
 
 
 @app.get("/api/llm/status")
@@ -316,7 +621,7 @@ async def get_llm_status(request: Request):
         }
 
     try:
-        llm_service = get_llm_service()
+        llm_service = get_async_llm_service()
         status = llm_service.get_provider_status()
         return {
             "available": True,
@@ -365,7 +670,7 @@ async def chat_with_llm(request: Request, chat_request: ChatRequest):
         )
 
     try:
-        llm_service = get_llm_service()
+        llm_service = get_async_llm_service()
 
         # Convert preferred provider string to enum if provided
         preferred = None
@@ -375,12 +680,15 @@ async def chat_with_llm(request: Request, chat_request: ChatRequest):
             except ValueError:
                 pass
 
-        response = llm_service.chat(
+        response = await llm_service.chat(
             user_message=chat_request.message,
             system_prompt=chat_request.system_prompt,
             context=chat_request.context,
-            preferred_provider=preferred
+            preferred_provider=preferred,
+            hedge=chat_request.hedge,
+            history=await _session_history(chat_request.session_id)
         )
+        await _remember_turn(chat_request.session_id, chat_request.message, response)
 
         return ChatResponse(
             content=response.content,
@@ -388,7 +696,9 @@ async def chat_with_llm(request: Request, chat_request: ChatRequest):
             model=response.model,
             success=response.success,
             error=response.error,
-            latency_ms=response.latency_ms
+            latency_ms=response.latency_ms,
+            hedged=response.hedged,
+            cached=response.cached
         )
 
     except Exception as e:
@@ -419,28 +729,28 @@ async def ask_natural_language(request: Request, chat_request: ChatRequest):
         }
 
     try:
-        llm_service = get_llm_service()
+        llm_service = get_async_llm_service()
 
         # System prompt for sales assistant
-        system_prompt = chat_request.system_prompt or """
-        You are a helpful sales assistant for the Sales Command Center.
-        You help users understand their sales data, pipeline, orders, and business metrics.
-        Be concise, professional, and provide actionable insights when relevant.
-        If you don't have specific data, provide general guidance based on the question.
-        """
+        system_prompt = chat_request.system_prompt or SALES_ASSISTANT_PROMPT
 
-        response = llm_service.chat(
+        response = await llm_service.chat(
             user_message=chat_request.message,
             system_prompt=system_prompt,
-            context=chat_request.context
+            context=chat_request.context,
+            hedge=chat_request.hedge,
+            history=await _session_history(chat_request.session_id)
         )
+        await _remember_turn(chat_request.session_id, chat_request.message, response)
 
         return {
             "success": response.success,
             "response": response.content,
             "provider": response.provider.value,
             "model": response.model,
-            "latency_ms": response.latency_ms
+            "latency_ms": response.latency_ms,
+            "hedged": response.hedged,
+            "cached": response.cached
         }
 
     except Exception as e:
@@ -451,6 +761,123 @@ async def ask_natural_language(request: Request, chat_request: ChatRequest):
             "error": str(e)
         }
 
+class AssistantRequest(BaseModel):
+    """Request model for the multi-agent assistant endpoint"""
+    message: str
+    session_id: Optional[str] = None
+
+
+@app.post("/api/assistant/query")
+async def assistant_query(request: Request, assistant_request: AssistantRequest):
+    """
+    Answer a question with every relevant domain agent (orders, pipeline,
+    customers, products, forecast) and a single LLM synthesis call.
+    Pass the returned session_id back to keep follow-ups in one session.
+    """
+    if auth_enabled() and not is_authenticated(request):
+        return JSONResponse(status_code=401, content={"error": "Unauthorized"})
+
+    if not ORCHESTRATOR_AVAILABLE:
+        return JSONResponse(
+            status_code=503,
+            content={"success": False, "response": "The assistant needs the database and LLM service."}
+        )
+
+    try:
+        return await agent_orchestrator.process_query(
+            assistant_request.message,
+            {"session_id": assistant_request.session_id}
+        )
+    except Exception as e:
+        logger.error(f"Error in assistant endpoint: {e}")
+        return {
+            "success": False,
+            "response": "I apologize, but I encountered an error. Please try again.",
+            "error": str(e)
+        }
+
+
+def _sse_event(event: dict) -> str:
+    """Format a normalized LLM stream event as a server-sent event"""
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+def _sse_response(events) -> StreamingResponse:
+    """Wrap an async iterator of LLM stream events in a text/event-stream response"""
+    async def event_stream():
+        try:
+            async for event in events:
+                yield _sse_event(event)
+        except Exception as e:
+            logger.error(f"Error in LLM stream: {e}")
+            yield _sse_event({"type": "error", "error": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # disable proxy buffering (nginx)
+        }
+    )
+
+
+@app.post("/api/llm/chat/stream")
+async def chat_with_llm_stream(request: Request, chat_request: ChatRequest):
+    """
+    Streaming version of /api/llm/chat (text/event-stream).
+
+    Emits start, token, done and error events. Providers that fail before
+    the first token are skipped transparently using the same fallback order.
+    A session_id gets the same conversation memory as /api/llm/chat; the
+    answer is remembered once the stream completes. hedge is ignored: the
+    first provider to produce a token wins instead.
+    """
+    if auth_enabled() and not is_authenticated(request):
+        return JSONResponse(status_code=401, content={"error": "Unauthorized"})
+
+    if not LLM_SERVICE_AVAILABLE:
+        return JSONResponse(status_code=503, content={"error": "LLM service not available"})
+
+    preferred = None
+    if chat_request.preferred_provider:
+        try:
+            preferred = LLMProvider(chat_request.preferred_provider.lower())
+        except ValueError:
+            pass
+
+    events = get_async_llm_service().stream_chat(
+        user_message=chat_request.message,
+        system_prompt=chat_request.system_prompt,
+        context=chat_request.context,
+        preferred_provider=preferred,
+        history=await _session_history(chat_request.session_id)
+    )
+    return _sse_response(_remember_stream(events, chat_request.session_id, chat_request.message))
+
+
+@app.post("/api/query/ask/stream")
+async def ask_natural_language_stream(request: Request, chat_request: ChatRequest):
+    """
+    Streaming version of /api/query/ask (text/event-stream).
+
+    session_id and hedge behave as on /api/llm/chat/stream.
+    """
+    if auth_enabled() and not is_authenticated(request):
+        return JSONResponse(status_code=401, content={"error": "Unauthorized"})
+
+    if not LLM_SERVICE_AVAILABLE:
+        return JSONResponse(status_code=503, content={"error": "AI features are not available"})
+
+    events = get_async_llm_service().stream_chat(
+        user_message=chat_request.message,
+        system_prompt=chat_request.system_prompt or SALES_ASSISTANT_PROMPT,
+        context=chat_request.context,
+        history=await _session_history(chat_request.session_id)
+    )
+    return _sse_response(_remember_stream(events, chat_request.session_id, chat_request.message))
+
+
 # Error handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -464,6 +891,14 @@ async def global_exception_handler(request: Request, exc: Exception):
         }
     )
 
+async def train_intent_router():
+    """Fit the local intent router on labelled conversation history"""
+    try:
+        await intent_router.train_from_history()
+    except Exception as e:
+        logger.warning(f"Intent router kept its built-in examples: {e}")
+
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
@@ -475,12 +910,33 @@ async def startup_event():
         logger.info("Authentication is ENABLED")
     else:
         logger.info("Authentication is DISABLED (no credentials configured)")
+    static_assets.preload(["sales_dashboard.html", "login.html"])
+    if DATABASE_AVAILABLE and INTENT_ROUTER_AVAILABLE and config.INTENT_ROUTER_ENABLED:
+        asyncio.ensure_future(train_intent_router())
+    if SYNC_AVAILABLE and config.SALESFORCE_SYNC_ENABLED:
+        salesforce_sync.start(config.SYNC_INTERVAL_SALESFORCE)
+        logger.info(f"Salesforce sync every {config.SYNC_INTERVAL_SALESFORCE}s")
+    if SYNC_AVAILABLE and config.NETSUITE_SYNC_ENABLED:
+        netsuite_sync.start(config.SYNC_INTERVAL_NETSUITE)
+        logger.info(f"NetSuite ingestion every {config.SYNC_INTERVAL_NETSUITE}s")
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
     """Run on application shutdown"""
     logger.info(f"Shutting down {config.APP_NAME}")
+    if LLM_SERVICE_AVAILABLE:
+        await close_async_llm_service()
+    if MEMORY_AVAILABLE:
+        await conversation_memory.stop()
+    if SYNC_AVAILABLE:
+        await salesforce_sync.stop()
+        await netsuite_sync.stop()
+        await webhook_ingestor.stop()
+    if DATABASE_AVAILABLE:
+        await live_broadcaster.stop()
+        await dashboard_cache.close()
+        await close_async_db()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,273 @@
+"""
+Index Benchmark
+EXPLAIN ANALYZE for the app's base-table queries before and after
+migrations/003_query_indexes.sql, on a synthetic dataset.
+
+The data lives in a scratch schema (index_bench) cloned from the public
+table definitions, so the real tables are never touched. The "before" run
+uses the original single-column indexes; the "after" run applies the
+migration file itself to the scratch schema.
+
+Usage:
+    DATABASE_URL=postgresql://... python benchmarks/explain_indexes.py --orders 2000000
+    python benchmarks/explain_indexes.py --orders 500000 --output results/indexes.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import statistics
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+from sqlalchemy import create_engine, text
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from sales_dashboard.data.repositories.dashboard_repository import (  # noqa: E402
+    OVERVIEW_METRICS_SQL,
+    PENDING_ORDER_ALERTS_SQL,
+    STALLED_DEAL_ALERTS_SQL,
+    AT_RISK_DEALS_SQL,
+    PRODUCT_PERFORMANCE_SQL,
+    RECENT_ORDERS_SQL,
+    overview_params
+)
+from sales_dashboard.data.repositories.order_repository import OrderFilters, _page_query  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+BENCH_SCHEMA = "index_bench"
+MIGRATION = ROOT / "sales_dashboard" / "database" / "migrations" / "003_query_indexes.sql"
+
+TABLES = ["users", "customers", "products", "pipeline", "orders", "order_items",
+          "daily_order_rollup", "pipeline_stage_rollup"]
+
+# Indexes from schema.sql before migration 003
+BASELINE_INDEXES = [
+    "CREATE INDEX idx_orders_customer_id ON orders(customer_id)",
+    "CREATE INDEX idx_orders_order_date ON orders(order_date)",
+    "CREATE INDEX idx_orders_status ON orders(status)",
+    "CREATE INDEX idx_pipeline_customer_id ON pipeline(customer_id)",
+    "CREATE INDEX idx_pipeline_stage ON pipeline(stage)",
+    "CREATE INDEX idx_pipeline_owner_id ON pipeline(owner_id)",
+    "CREATE INDEX idx_order_items_order_id ON order_items(order_id)",
+    "CREATE INDEX idx_order_items_product_id ON order_items(product_id)",
+]
+
+# Skewed synthetic data: a few large customers and reps take most orders,
+# order dates crowd towards today, amounts are log-distributed.
+LOAD_SQL = [
+    """
+    INSERT INTO users (id, email, first_name, last_name, role, quota_monthly, is_active)
+    SELECT g, 'rep' || g || '@bench.local', 'Rep', g::text, 'sales_rep',
+           50000 + (g % 10) * 10000, TRUE
+    FROM generate_series(1, :users) g
+    """,
+    """
+    INSERT INTO customers (id, company_name, region_id)
+    SELECT g, 'Customer ' || g, 1 + g % 5
+    FROM generate_series(1, :customers) g
+    """,
+    """
+    INSERT INTO products (id, sku, name, unit_price)
+    SELECT g, 'SKU-' || g, 'Product ' || g, round((10 + random() * 990)::numeric, 2)
+    FROM generate_series(1, :products) g
+    """,
+    """
+    INSERT INTO orders (id, order_number, customer_id, sales_rep_id, order_date,
+                        status, subtotal, total_amount)
+    SELECT g,
+           'B-' || g,
+           1 + floor(power(random(), 3) * :customers)::int,
+           1 + floor(power(random(), 2) * :users)::int,
+           NOW() - power(random(), 2) * interval '730 days',
+           CASE WHEN r < 0.75 THEN 'fulfilled' WHEN r < 0.90 THEN 'pending'
+                WHEN r < 0.95 THEN 'processing' WHEN r < 0.98 THEN 'partial'
+                ELSE 'cancelled' END,
+           amount,
+           amount
+    FROM (
+        SELECT g, random() as r, round((30 * exp(random() * 9))::numeric, 2) as amount
+        FROM generate_series(1, :orders) g
+    ) s
+    """,
+    """
+    INSERT INTO order_items (id, order_id, product_id, quantity, unit_price, line_total)
+    SELECT g, 1 + (g - 1) / 2, 1 + floor(power(random(), 2) * :products)::int,
+           q, 100, q * 100
+    FROM (SELECT g, 1 + floor(random() * 20)::int as q FROM generate_series(1, :orders * 2) g) s
+    """,
+    """
+    INSERT INTO pipeline (id, opportunity_name, customer_id, owner_id, stage, amount,
+                          days_in_stage, is_won, actual_close_date)
+    SELECT g, 'Deal ' || g,
+           1 + floor(power(random(), 3) * :customers)::int,
+           1 + floor(random() * :users)::int,
+           (ARRAY['lead', 'qualified', 'proposal', 'negotiation'])[1 + g % 4],
+           round((1000 * exp(random() * 6))::numeric, 2),
+           floor(random() * 180)::int,
+           won,
+           CASE WHEN won IS NOT NULL THEN CURRENT_DATE - floor(random() * 365)::int END
+    FROM (
+        SELECT g, CASE WHEN r < 0.6 THEN NULL WHEN r < 0.8 THEN TRUE ELSE FALSE END as won
+        FROM (SELECT g, random() as r FROM generate_series(1, :pipeline) g) s
+    ) s
+    """,
+]
+
+
+def get_database_url(url: str) -> str:
+    """SQLAlchemy psycopg2 URL from a postgres:// or postgresql:// URL"""
+    scheme, sep, rest = url.partition("://")
+    return f"postgresql+psycopg2://{rest}" if sep else url
+
+
+def migration_statements(path: Path) -> List[str]:
+    """Statements from a plain SQL migration (no function bodies)"""
+    body = "\n".join(line for line in path.read_text().splitlines() if not line.strip().startswith("--"))
+    return [s.strip() for s in body.split(";") if s.strip()]
+
+
+def build_dataset(conn, orders: int):
+    """Create the scratch schema and fill it with synthetic rows"""
+    sizes = {
+        "orders": orders,
+        "customers": max(orders // 100, 100),
+        "users": max(orders // 5000, 20),
+        "products": 200,
+        "pipeline": max(orders // 10, 1000),
+    }
+    logger.info(f"Building {BENCH_SCHEMA} with {sizes}")
+
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {BENCH_SCHEMA}"))
+    conn.execute(text(f"SET search_path TO {BENCH_SCHEMA}"))
+    for table in TABLES:
+        # Column defaults only: no indexes, constraints or triggers
+        conn.execute(text(f"CREATE TABLE {table} (LIKE public.{table} INCLUDING DEFAULTS)"))
+
+    for sql in LOAD_SQL:
+        conn.execute(text(sql), sizes)
+    for table in ["users", "customers", "products", "pipeline", "orders", "order_items"]:
+        conn.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY (id)"))
+    for sql in BASELINE_INDEXES:
+        conn.execute(text(sql))
+    conn.execute(text("ANALYZE"))
+
+
+def bench_queries() -> Dict[str, Any]:
+    """Query name -> (sql, params), using the app's own SQL"""
+    month_ago = datetime.now() - timedelta(days=30)
+    year_ago = datetime.now() - timedelta(days=365)
+    return {
+        "overview_metrics": (OVERVIEW_METRICS_SQL, overview_params()),
+        "pending_order_alerts": (PENDING_ORDER_ALERTS_SQL, {}),
+        "stalled_deal_alerts": (STALLED_DEAL_ALERTS_SQL, {}),
+        "at_risk_deals": (AT_RISK_DEALS_SQL, {"threshold": 150}),
+        "product_performance": (PRODUCT_PERFORMANCE_SQL, {"start_date": month_ago, "limit": 8}),
+        "recent_orders": (RECENT_ORDERS_SQL, {"limit": 20}),
+        "orders_page_status": _page_query(OrderFilters(status="pending"), 51),
+        "orders_page_customer": _page_query(OrderFilters(customer_id=1), 51),
+        "orders_page_deep": _page_query(OrderFilters(), 51, after=(year_ago, 2 ** 31 - 1)),
+    }
+
+
+def _plan_nodes(plan: Dict[str, Any]) -> List[str]:
+    """Scan nodes of a plan, e.g. 'Index Only Scan idx_orders_pending_large'"""
+    nodes = []
+    if "Scan" in plan["Node Type"]:
+        name = plan.get("Index Name") or plan.get("Relation Name", "")
+        nodes.append(f"{plan['Node Type']} {name}".strip())
+    for child in plan.get("Plans", []):
+        nodes.extend(_plan_nodes(child))
+    return nodes
+
+
+def explain(conn, sql: str, params: Dict[str, Any], runs: int) -> Dict[str, Any]:
+    """Median execution time, buffers and scan nodes over several runs"""
+    timings, plan = [], None
+    conn.execute(text(sql), params).fetchall()  # warm up
+    for _ in range(runs):
+        row = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params).scalar()
+        result = row[0] if isinstance(row, list) else json.loads(row)[0]
+        timings.append(result["Execution Time"])
+        plan = result["Plan"]
+    return {
+        "execution_ms": round(statistics.median(timings), 3),
+        "shared_hit": plan.get("Shared Hit Blocks", 0),
+        "shared_read": plan.get("Shared Read Blocks", 0),
+        "scans": _plan_nodes(plan)
+    }
+
+
+def run_all(conn, runs: int) -> Dict[str, Any]:
+    return {name: explain(conn, sql, params, runs) for name, (sql, params) in bench_queries().items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--orders", type=int, default=1_000_000, help="synthetic orders to generate")
+    parser.add_argument("--runs", type=int, default=5, help="EXPLAIN ANALYZE runs per query")
+    parser.add_argument("--reuse", action="store_true", help=f"reuse an existing {BENCH_SCHEMA} dataset")
+    parser.add_argument("--keep", action="store_true", help=f"keep {BENCH_SCHEMA} afterwards")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("DATABASE_URL environment variable or --database-url is required")
+
+    engine = create_engine(get_database_url(args.database_url), isolation_level="AUTOCOMMIT")
+    with engine.connect() as conn:
+        if args.reuse:
+            conn.execute(text(f"SET search_path TO {BENCH_SCHEMA}"))
+            for index in migration_statements(MIGRATION):
+                if index.upper().startswith("CREATE INDEX"):
+                    name = re.search(r"IF NOT EXISTS (\w+)", index).group(1)
+                    conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+            for sql in BASELINE_INDEXES:
+                conn.execute(text(sql.replace("CREATE INDEX", "CREATE INDEX IF NOT EXISTS", 1)))
+            conn.execute(text("ANALYZE"))
+        else:
+            build_dataset(conn, args.orders)
+
+        logger.info("Running queries with baseline indexes")
+        before = run_all(conn, args.runs)
+
+        logger.info(f"Applying {MIGRATION.name}")
+        for statement in migration_statements(MIGRATION):
+            conn.execute(text(statement))
+
+        logger.info("Running queries with migration 003 indexes")
+        after = run_all(conn, args.runs)
+
+        if not args.keep:
+            conn.execute(text(f"DROP SCHEMA {BENCH_SCHEMA} CASCADE"))
+
+    print(f"\n{'query':<24}{'before ms':>12}{'after ms':>12}{'speedup':>10}  plan after")
+    for name in before:
+        b, a = before[name]["execution_ms"], after[name]["execution_ms"]
+        speedup = f"{b / a:.1f}x" if a else "-"
+        print(f"{name:<24}{b:>12.2f}{a:>12.2f}{speedup:>10}  {', '.join(after[name]['scans'])}")
+
+    if args.output:
+        results = {
+            "generated_at": datetime.now().isoformat(),
+            "orders": args.orders,
+            "before": before,
+            "after": after
+        }
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        logger.info(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
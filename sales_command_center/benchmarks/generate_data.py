@@ -0,0 +1,385 @@
+"""
+Synthetic Data Generator
+Fills the Sales Command Center tables with realistic volume for benchmarks
+
+Scale is set by the number of orders (1e5 to 1e8); every other table is
+sized from it. The data is skewed the way real sales data is:
+- a few large customers, reps and products take most of the orders
+- order volume grows towards today and dips at weekends
+- order values are log-normal (many small orders, a long tail of big ones)
+- recent orders are still pending/processing, older ones fulfilled
+
+Rows are streamed to Postgres with COPY in chunks, so memory stays flat at
+any scale. Row-level rollup/NOTIFY triggers are disabled during the load
+and the rollups are rebuilt once at the end.
+
+Like seed_data.sql, this REPLACES all existing data (--replace is required
+if the tables are not empty).
+
+Usage:
+    DATABASE_URL=postgresql://... python benchmarks/generate_data.py --orders 1000000
+    python benchmarks/generate_data.py --orders 100000000 --replace --seed 7
+"""
+
+import argparse
+import io
+import logging
+import math
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Iterator, List, Tuple
+
+import psycopg2
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+CHUNK_ROWS = 100_000
+
+REGIONS = [
+    ("North America - East", "NA-EAST", "United States"),
+    ("North America - West", "NA-WEST", "United States"),
+    ("North America - Central", "NA-CENTRAL", "United States"),
+    ("EMEA - UK", "EMEA-UK", "United Kingdom"),
+    ("EMEA - Germany", "EMEA-DE", "Germany"),
+    ("EMEA - France", "EMEA-FR", "France"),
+    ("APAC - Japan", "APAC-JP", "Japan"),
+    ("APAC - Australia", "APAC-AU", "Australia"),
+    ("LATAM - Brazil", "LATAM-BR", "Brazil"),
+    ("LATAM - Mexico", "LATAM-MX", "Mexico"),
+]
+
+# Share of orders per region (larger markets first)
+REGION_WEIGHTS = [0.22, 0.18, 0.12, 0.10, 0.09, 0.07, 0.07, 0.06, 0.05, 0.04]
+
+INDUSTRIES = ["Media", "Retail", "Technology", "Healthcare", "Finance", "Manufacturing", "Education"]
+CATEGORIES = ["Hardware", "Software", "Services", "Accessories", "Support"]
+OPEN_STAGES = ["lead", "qualified", "proposal", "negotiation"]
+LEAD_SOURCES = ["Inbound", "Referral", "Partner", "Outbound", "Event"]
+
+TABLES = ["regions", "users", "products", "customers", "pipeline", "orders", "order_items"]
+TRIGGER_TABLES = ["customers", "pipeline", "orders"]
+
+
+def get_database_url(url: str) -> str:
+    """psycopg2 accepts postgresql:// (Render provides postgres://)"""
+    if url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
+    return url
+
+
+def skewed(n: int, power: float) -> int:
+    """1-based id in [1, n]; higher power = more weight on low ids"""
+    return 1 + min(int(n * random.random() ** power), n - 1)
+
+
+class Scale:
+    """Table sizes derived from the order count"""
+
+    def __init__(self, orders: int, days: int):
+        self.orders = orders
+        self.days = days
+        self.regions = len(REGIONS)
+        self.users = max(orders // 20_000, 50)
+        self.customers = max(orders // 200, 500)
+        self.products = max(min(orders // 2_000, 5_000), 200)
+        self.pipeline = max(orders // 20, 2_000)
+
+    def __repr__(self):
+        return (f"orders={self.orders:,} customers={self.customers:,} users={self.users:,} "
+                f"products={self.products:,} pipeline={self.pipeline:,} days={self.days}")
+
+
+# ============================================
+# Row generators (CSV fields, None = NULL)
+# ============================================
+
+def region_rows(scale: Scale) -> Iterator[Tuple]:
+    for i, (name, code, country) in enumerate(REGIONS, start=1):
+        yield (i, name, code, country)
+
+
+def user_rows(scale: Scale) -> Iterator[Tuple]:
+    today = date.today()
+    for i in range(1, scale.users + 1):
+        role = "sales_manager" if i % 10 == 0 else "sales_rep"
+        quota = round(random.lognormvariate(11.5, 0.4), 2)
+        hire_date = today - timedelta(days=random.randint(30, 3650))
+        yield (i, f"rep{i}@example.com", "Rep", f"{i:05d}", role,
+               1 + (i - 1) % scale.regions, quota, hire_date, True)
+
+
+def product_rows(scale: Scale) -> Iterator[Tuple]:
+    for i in range(1, scale.products + 1):
+        price = round(random.lognormvariate(5.5, 1.2), 2)
+        yield (i, f"SKU-{i:06d}", f"Product {i}", CATEGORIES[i % len(CATEGORIES)],
+               price, round(price * random.uniform(0.4, 0.8), 2), random.randint(0, 5000), True)
+
+
+def customer_rows(scale: Scale) -> Iterator[Tuple]:
+    today = date.today()
+    for i in range(1, scale.customers + 1):
+        region_id = random.choices(range(1, scale.regions + 1), REGION_WEIGHTS)[0]
+        yield (i, f"Customer {i:07d}", INDUSTRIES[i % len(INDUSTRIES)], region_id,
+               skewed(scale.users, 1.5), today - timedelta(days=random.randint(0, 3650)),
+               round(random.lognormvariate(11, 1), 2), random.choice(["NET30", "NET60"]), True)
+
+
+def pipeline_rows(scale: Scale) -> Iterator[Tuple]:
+    today = date.today()
+    for i in range(1, scale.pipeline + 1):
+        amount = round(min(random.lognormvariate(10.5, 1.1), 5_000_000), 2)
+        created = today - timedelta(days=int(scale.days * random.random() ** 1.5))
+        outcome = random.random()
+        if outcome < 0.55:
+            stage, is_won, closed = random.choice(OPEN_STAGES), None, None
+            probability = {"lead": 10, "qualified": 25, "proposal": 50, "negotiation": 75}[stage]
+            days_in_stage = int(random.expovariate(1 / 25))
+        else:
+            is_won = outcome < 0.78
+            stage = "closed_won" if is_won else "closed_lost"
+            probability = 100 if is_won else 0
+            days_in_stage = 0
+            closed = min(created + timedelta(days=int(random.expovariate(1 / 60))), today)
+        yield (i, f"Opportunity {i}", skewed(scale.customers, 2.5), skewed(scale.users, 1.5),
+               stage, amount, probability, created + timedelta(days=90), closed,
+               random.choice(LEAD_SOURCES), days_in_stage, is_won, created)
+
+
+def order_date(scale: Scale, now: datetime) -> datetime:
+    """Order timestamp: volume grows towards today, fewer orders at weekends"""
+    while True:
+        moment = now - timedelta(seconds=scale.days * 86400 * random.random() ** 1.3)
+        if moment.weekday() < 5 or random.random() < 0.35:
+            return moment
+
+
+def order_status(age_days: float) -> Tuple[str, int]:
+    """Status and fulfillment percentage by order age"""
+    r = random.random()
+    if age_days < 3:
+        return ("pending", 0) if r < 0.5 else ("processing", 0) if r < 0.8 else ("fulfilled", 100)
+    if age_days < 14:
+        if r < 0.12:
+            return "pending", 0
+        if r < 0.22:
+            return "partial", random.choice([25, 50, 75])
+        return ("cancelled", 0) if r < 0.25 else ("fulfilled", 100)
+    if r < 0.01:
+        return "pending", 0
+    return ("cancelled", 0) if r < 0.04 else ("fulfilled", 100)
+
+
+def order_rows(scale: Scale, prices: List[float]) -> Iterator[Tuple[Tuple, List[Tuple]]]:
+    """(order row, its item rows); totals are the sum of the items"""
+    now = datetime.now()
+    item_id = 0
+    for i in range(1, scale.orders + 1):
+        items = []
+        subtotal = 0.0
+        for _ in range(1 + int(random.expovariate(1 / 1.5))):
+            item_id += 1
+            product_id = skewed(scale.products, 2.0)
+            quantity = 1 + int(random.lognormvariate(1.5, 1.0))
+            unit_price = prices[product_id - 1]
+            line_total = round(quantity * unit_price, 2)
+            subtotal += line_total
+            items.append((item_id, i, product_id, quantity, unit_price, line_total))
+
+        subtotal = round(subtotal, 2)
+        tax = round(subtotal * 0.08, 2)
+        shipping = 0.0 if subtotal > 1000 else 25.0
+        placed = order_date(scale, now)
+        status, fulfilled_pct = order_status((now - placed).total_seconds() / 86400)
+        fulfilled_at = placed + timedelta(hours=random.uniform(4, 72)) if status == "fulfilled" else None
+        cancelled_at = placed + timedelta(hours=random.uniform(1, 48)) if status == "cancelled" else None
+
+        order = (i, f"SO-{i:09d}", skewed(scale.customers, 3.0), skewed(scale.users, 1.5), placed,
+                 status, subtotal, tax, shipping, round(subtotal + tax + shipping, 2), fulfilled_pct,
+                 "paid" if status == "fulfilled" else "pending", fulfilled_at, cancelled_at)
+        yield order, items
+
+
+# ============================================
+# COPY
+# ============================================
+
+COLUMNS = {
+    "regions": "id, name, code, country",
+    "users": "id, email, first_name, last_name, role, region_id, quota_monthly, hire_date, is_active",
+    "products": "id, sku, name, category, unit_price, cost, inventory_qty, is_active",
+    "customers": ("id, company_name, industry, region_id, account_manager_id, customer_since, "
+                  "credit_limit, payment_terms, is_active"),
+    "pipeline": ("id, opportunity_name, customer_id, owner_id, stage, amount, probability, "
+                 "expected_close_date, actual_close_date, lead_source, days_in_stage, is_won, created_at"),
+    "orders": ("id, order_number, customer_id, sales_rep_id, order_date, status, subtotal, tax, "
+               "shipping, total_amount, fulfillment_percentage, payment_status, fulfilled_at, cancelled_at"),
+    "order_items": "id, order_id, product_id, quantity, unit_price, line_total",
+}
+
+
+def _csv_line(row: Tuple) -> str:
+    # Generated values never contain commas, quotes or newlines
+    return ",".join("" if v is None else str(v) for v in row) + "\n"
+
+
+def copy_rows(conn, table: str, rows) -> int:
+    """COPY rows into a table in CHUNK_ROWS batches, committing each"""
+    sql = f"COPY {table} ({COLUMNS[table]}) FROM STDIN WITH (FORMAT csv)"
+    total = 0
+    buffer = io.StringIO()
+    count = 0
+    with conn.cursor() as cursor:
+        for row in rows:
+            buffer.write(_csv_line(row))
+            count += 1
+            if count == CHUNK_ROWS:
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+                conn.commit()
+                total += count
+                buffer, count = io.StringIO(), 0
+        if count:
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+            conn.commit()
+            total += count
+    return total
+
+
+def copy_orders(conn, scale: Scale, prices: List[float]) -> Tuple[int, int]:
+    """COPY orders and their items together, chunk by chunk"""
+    orders_sql = f"COPY orders ({COLUMNS['orders']}) FROM STDIN WITH (FORMAT csv)"
+    items_sql = f"COPY order_items ({COLUMNS['order_items']}) FROM STDIN WITH (FORMAT csv)"
+    order_buffer, item_buffer = io.StringIO(), io.StringIO()
+    orders = items = pending = 0
+    started = time.time()
+
+    def flush():
+        with conn.cursor() as cursor:
+            order_buffer.seek(0)
+            cursor.copy_expert(orders_sql, order_buffer)
+            item_buffer.seek(0)
+            cursor.copy_expert(items_sql, item_buffer)
+        conn.commit()
+
+    for order, order_items in order_rows(scale, prices):
+        order_buffer.write(_csv_line(order))
+        for item in order_items:
+            item_buffer.write(_csv_line(item))
+        items += len(order_items)
+        pending += 1
+        if pending == CHUNK_ROWS:
+            flush()
+            orders += pending
+            order_buffer, item_buffer, pending = io.StringIO(), io.StringIO(), 0
+            rate = orders / (time.time() - started)
+            logger.info(f"  orders {orders:,}/{scale.orders:,} ({rate:,.0f}/s)")
+    if pending:
+        flush()
+        orders += pending
+    return orders, items
+
+
+# ============================================
+# Load
+# ============================================
+
+def tables_empty(conn) -> bool:
+    with conn.cursor() as cursor:
+        for table in TABLES:
+            cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {table})")
+            if cursor.fetchone()[0]:
+                return False
+    return True
+
+
+def set_triggers(conn, enabled: bool):
+    """Enable/disable user triggers (rollups, NOTIFY); FK checks stay on"""
+    action = "ENABLE" if enabled else "DISABLE"
+    with conn.cursor() as cursor:
+        for table in TRIGGER_TABLES:
+            cursor.execute(f"ALTER TABLE {table} {action} TRIGGER USER")
+    conn.commit()
+
+
+def finish(conn):
+    """Advance sequences past the generated ids, rebuild rollups, analyze"""
+    with conn.cursor() as cursor:
+        for table in TABLES:
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+            )
+        cursor.execute("SELECT to_regproc('rebuild_dashboard_rollups') IS NOT NULL")
+        if cursor.fetchone()[0]:
+            logger.info("Rebuilding dashboard rollups")
+            cursor.execute("SELECT rebuild_dashboard_rollups()")
+    conn.commit()
+
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        logger.info("Analyzing")
+        cursor.execute("ANALYZE")
+    conn.autocommit = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--orders", type=int, default=1_000_000, help="orders to generate (1e5 to 1e8)")
+    parser.add_argument("--days", type=int, default=730, help="history length in days")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (same seed, same data)")
+    parser.add_argument("--replace", action="store_true", help="truncate existing data first")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("DATABASE_URL environment variable or --database-url is required")
+    if not 100_000 <= args.orders <= 100_000_000:
+        logger.warning(f"--orders {args.orders:,} is outside the intended 1e5-1e8 range")
+
+    random.seed(args.seed)
+    scale = Scale(args.orders, args.days)
+    logger.info(f"Generating {scale}")
+
+    conn = psycopg2.connect(get_database_url(args.database_url))
+    try:
+        if not tables_empty(conn):
+            if not args.replace:
+                parser.error("tables already contain data; pass --replace to truncate them")
+            with conn.cursor() as cursor:
+                cursor.execute(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE")
+            conn.commit()
+
+        started = time.time()
+        set_triggers(conn, False)
+        try:
+            for table, rows in [
+                ("regions", region_rows(scale)),
+                ("users", user_rows(scale)),
+                ("products", product_rows(scale)),
+                ("customers", customer_rows(scale)),
+                ("pipeline", pipeline_rows(scale)),
+            ]:
+                logger.info(f"  {table} {copy_rows(conn, table, rows):,} rows")
+
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT unit_price FROM products ORDER BY id")
+                prices = [float(row[0]) for row in cursor.fetchall()]
+            orders, items = copy_orders(conn, scale, prices)
+            logger.info(f"  orders {orders:,} rows, order_items {items:,} rows")
+        finally:
+            conn.rollback()
+            set_triggers(conn, True)
+
+        finish(conn)
+        elapsed = time.time() - started
+        logger.info(f"Done in {elapsed:,.0f}s ({math.floor(orders / max(elapsed, 1)):,} orders/s)")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+NetSuite Stand-in
+Local fake of the SuiteQL REST endpoint for the order ingestion pipeline
+
+Serves N synthetic sales orders with 1-4 lines each (one result row per
+line, generated on demand), lastmodifieddate increasing by one second per
+--orders-per-second orders. Like NetSuite it pages by limit/offset,
+rejects offsets past --max-offset, and requires an OAuth Authorization
+header (the signature itself is not checked). --error-rate makes that
+fraction of requests fail with 503 to exercise retries.
+
+The only SuiteQL understood is the pipeline's own
+"lastmodifieddate >= TO_TIMESTAMP('...')" filter. Sales reps are
+rep<N>@example.com, matching benchmarks/generate_data.py.
+
+Usage:
+    python benchmarks/netsuite_standin.py --orders 1000000 --latency-ms 200
+    NETSUITE_API_URL=http://localhost:8766 NETSUITE_CONSUMER_KEY=x NETSUITE_CONSUMER_SECRET=x \\
+    NETSUITE_TOKEN_ID=x NETSUITE_TOKEN_SECRET=x python -m sales_dashboard.integrations.netsuite_sync --full
+"""
+
+import argparse
+import asyncio
+import random
+import re
+from datetime import datetime, timedelta
+
+from fastapi import Body, FastAPI, HTTPException, Request
+
+EPOCH = datetime(2024, 1, 1)
+
+# Orders cycle through 1, 2, 3, 4 lines: 10 rows per 4 orders
+_LINE_STARTS = [0, 1, 3, 6]
+_STATUSES = ["A", "B", "B", "D", "E", "F", "G", "H", "C"]
+_SINCE_RE = re.compile(r"TO_TIMESTAMP\('([^']+)'")
+
+
+def _row_start(order: int) -> int:
+    return (order // 4) * 10 + _LINE_STARTS[order % 4]
+
+
+def _order_at(row: int) -> tuple:
+    block, within = divmod(row, 10)
+    k = 3 if within >= 6 else 2 if within >= 3 else 1 if within >= 1 else 0
+    return block * 4 + k, within - _LINE_STARTS[k]
+
+
+def make_app(
+    orders: int,
+    customers: int = 5_000,
+    products: int = 500,
+    reps: int = 100,
+    orders_per_second: int = 1,
+    max_offset: int = 100_000,
+    latency_ms: float = 0,
+    error_rate: float = 0
+) -> FastAPI:
+    app = FastAPI(title="NetSuite stand-in")
+
+    def modified(i: int) -> datetime:
+        return EPOCH + timedelta(seconds=i // orders_per_second)
+
+    def row(i: int, line: int) -> dict:
+        lines = i % 4 + 1
+        rate = float(10 + (i * 31 + line * 17) % 990)
+        quantity = 1 + (i + line) % 20
+        total = sum(float(10 + (i * 31 + n * 17) % 990) * (1 + (i + n) % 20) for n in range(lines))
+        product = (i * 7 + line) % products
+        return {
+            "id": str(1_000_000 + i),
+            "tranid": f"SO{i:08d}",
+            "status": _STATUSES[i % len(_STATUSES)],
+            "trandate": (EPOCH + timedelta(days=(i // 500) % 720)).strftime("%Y-%m-%d"),
+            "lastmodified": modified(i).strftime("%Y-%m-%d %H:%M:%S"),
+            "entity": str(50_000 + i % customers),
+            "entity_name": f"NetSuite Customer {i % customers}",
+            "rep_email": f"rep{i % reps + 1}@example.com",
+            "total": round(total * 1.08, 2),
+            "tax": round(total * 0.08, 2),
+            "line": line + 1,
+            "sku": f"NS-ITEM-{product:05d}",
+            "item_name": f"NetSuite Item {product}",
+            "quantity": quantity,
+            "rate": rate,
+            "amount": rate * quantity,
+        }
+
+    @app.post("/services/rest/query/v1/suiteql")
+    async def suiteql(request: Request, limit: int = 1000, offset: int = 0, body: dict = Body(...)):
+        if not request.headers.get("authorization", "").startswith("OAuth "):
+            raise HTTPException(status_code=401, detail="Missing OAuth header")
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        if error_rate and random.random() < error_rate:
+            raise HTTPException(status_code=503, detail="Simulated outage")
+        if offset >= max_offset:
+            raise HTTPException(status_code=400, detail=f"Offset must be below {max_offset}")
+
+        first = 0
+        match = _SINCE_RE.search(body.get("q", ""))
+        if match:
+            since = datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S")
+            first = min(orders, max(0, int((since - EPOCH).total_seconds())) * orders_per_second)
+        base = _row_start(first)
+        total_rows = _row_start(orders) - base
+        start = base + offset
+        end = min(start + min(limit, 1000), base + total_rows)
+        items = [row(*_order_at(r)) for r in range(start, end)]
+        return {
+            "items": items,
+            "count": len(items),
+            "offset": offset,
+            "totalResults": total_rows,
+            "hasMore": end < base + total_rows,
+        }
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve a fake NetSuite SuiteQL API")
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--customers", type=int, default=5_000)
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--reps", type=int, default=100, help="sales reps rep1..repN@example.com")
+    parser.add_argument("--orders-per-second", type=int, default=1, help="orders sharing each lastmodifieddate")
+    parser.add_argument("--max-offset", type=int, default=100_000)
+    parser.add_argument("--latency-ms", type=float, default=0, help="simulated latency per request")
+    parser.add_argument("--error-rate", type=float, default=0, help="fraction of requests failing with 503")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+    uvicorn.run(
+        make_app(args.orders, args.customers, args.products, args.reps, args.orders_per_second,
+                 args.max_offset, args.latency_ms, args.error_rate),
+        host="127.0.0.1", port=args.port, log_level="warning"
+    )
@@ -0,0 +1,316 @@
+"""
+Dashboard Benchmark
+Times every DashboardRepository method and every GET /api/* endpoint
+
+Repository methods run on a sync session against DATABASE_URL; each call
+also reports the heap rows it read (seq_tup_read + idx_tup_fetch from
+pg_stat_xact_user_tables, i.e. this transaction only).
+
+Endpoints run in-process through the ASGI app, both warm (served from the
+dashboard cache, what clients normally see) and cold (cache invalidated
+before every request). With --base-url they are timed over HTTP against a
+running server instead (warm only).
+
+Results (p50/p95/p99 in ms) are saved as JSON; --compare flags anything
+that got slower than --threshold against an earlier run.
+
+Usage:
+    python benchmarks/generate_data.py --orders 1000000
+    python benchmarks/run_benchmarks.py --iterations 50
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/previous.json
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# Never-ending responses
+EXCLUDED_ENDPOINTS = {"/api/dashboard/stream"}
+
+# Query parameters for endpoints that need them to be meaningful
+ENDPOINT_PARAMS = {
+    "/api/orders/export": lambda: {"start_date": str(date.today() - timedelta(days=7))},
+}
+
+ROWS_READ_SQL = """
+    SELECT COALESCE(SUM(seq_tup_read + COALESCE(idx_tup_fetch, 0)), 0)
+    FROM pg_stat_xact_user_tables
+"""
+
+
+def get_database_url(url: str) -> str:
+    """SQLAlchemy psycopg2 URL from a postgres:// or postgresql:// URL"""
+    scheme, sep, rest = url.partition("://")
+    return f"postgresql+psycopg2://{rest}" if sep else url
+
+
+def summarize(timings: List[float], errors: int = 0) -> Dict[str, Any]:
+    """Latency percentiles in milliseconds"""
+    if not timings:
+        return {"iterations": 0, "errors": errors}
+    ordered = sorted(timings)
+    cuts = statistics.quantiles(ordered, n=100, method="inclusive") if len(ordered) > 1 else ordered * 99
+    return {
+        "iterations": len(timings),
+        "errors": errors,
+        "mean": round(statistics.fmean(ordered), 3),
+        "min": round(ordered[0], 3),
+        "p50": round(cuts[49], 3),
+        "p95": round(cuts[94], 3),
+        "p99": round(cuts[98], 3),
+        "max": round(ordered[-1], 3)
+    }
+
+
+# ============================================
+# Repository
+# ============================================
+
+def repository_methods(repository_class) -> List[str]:
+    """Public query methods of a repository class"""
+    return [
+        name for name, _ in inspect.getmembers(repository_class, inspect.isfunction)
+        if not name.startswith("_")
+    ]
+
+
+def bench_repository(database_url: str, iterations: int) -> Dict[str, Any]:
+    """Time each DashboardRepository method (default arguments)"""
+    from sales_dashboard.data.repositories.dashboard_repository import DashboardRepository
+
+    engine = create_engine(get_database_url(database_url), pool_size=1)
+    Session = sessionmaker(bind=engine)
+    results = {}
+
+    for name in repository_methods(DashboardRepository):
+        timings, rows_read, errors = [], [], 0
+        for i in range(iterations + 1):
+            with Session() as db:
+                try:
+                    before = db.execute(text(ROWS_READ_SQL)).scalar()
+                    started = time.perf_counter()
+                    getattr(DashboardRepository(db), name)()
+                    elapsed = (time.perf_counter() - started) * 1000
+                    after = db.execute(text(ROWS_READ_SQL)).scalar()
+                except Exception as e:
+                    errors += 1
+                    logger.warning(f"{name} failed: {e}")
+                    continue
+                finally:
+                    db.rollback()
+            if i:  # first call warms the connection and caches
+                timings.append(elapsed)
+                rows_read.append(int(after - before))
+
+        results[name] = {**summarize(timings, errors), "rows_read": max(rows_read, default=0)}
+        logger.info(f"  repository.{name}: p50 {results[name].get('p50')} ms, "
+                    f"{results[name]['rows_read']:,} rows read")
+
+    engine.dispose()
+    return results
+
+
+# ============================================
+# Endpoints
+# ============================================
+
+def api_endpoints(app) -> List[str]:
+    """GET /api/* routes without path parameters"""
+    paths = []
+    for route in app.routes:
+        methods = getattr(route, "methods", None) or set()
+        path = getattr(route, "path", "")
+        if ("GET" in methods and path.startswith("/api/") and "{" not in path
+                and path not in EXCLUDED_ENDPOINTS):
+            paths.append(path)
+    return sorted(paths)
+
+
+async def _login(client: httpx.AsyncClient):
+    """Log in when the app has credentials configured"""
+    username, password = os.getenv("APP_USERNAME"), os.getenv("APP_PASSWORD")
+    if username and password:
+        response = await client.post("/auth/login", data={"username": username, "password": password})
+        response.raise_for_status()
+
+
+async def _time_requests(
+    client: httpx.AsyncClient,
+    path: str,
+    iterations: int,
+    before_each: Optional[Callable] = None
+) -> Dict[str, Any]:
+    params = ENDPOINT_PARAMS.get(path, dict)()
+    timings, errors = [], 0
+    for i in range(iterations + 1):
+        if before_each is not None:
+            await before_each()
+        started = time.perf_counter()
+        response = await client.get(path, params=params)
+        await response.aread()
+        elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code >= 400:
+            errors += 1
+        elif i:
+            timings.append(elapsed)
+    return summarize(timings, errors)
+
+
+async def bench_endpoints(iterations: int, base_url: Optional[str]) -> Dict[str, Any]:
+    """Time each endpoint warm (and cold when running in-process)"""
+    from app import app, DATABASE_AVAILABLE
+
+    if base_url:
+        client = httpx.AsyncClient(base_url=base_url, timeout=60)
+        invalidate = None
+    else:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+        invalidate = None
+        if DATABASE_AVAILABLE:
+            from sales_dashboard.data.cache import dashboard_cache
+            invalidate = dashboard_cache.invalidate
+
+    results = {}
+    async with client:
+        await _login(client)
+        for path in api_endpoints(app):
+            results[path] = {"warm": await _time_requests(client, path, iterations)}
+            if invalidate is not None:
+                results[path]["cold"] = await _time_requests(client, path, iterations, invalidate)
+            logger.info(f"  GET {path}: " + ", ".join(
+                f"{mode} p50 {stats.get('p50')} ms" for mode, stats in results[path].items()
+            ))
+
+    if not base_url and DATABASE_AVAILABLE:
+        from sales_dashboard.data.database import close_async_db
+        await close_async_db()
+    return results
+
+
+# ============================================
+# Results
+# ============================================
+
+def metadata(database_url: str, iterations: int) -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    engine = create_engine(get_database_url(database_url))
+    with engine.connect() as conn:
+        rows = dict(conn.execute(text(
+            "SELECT relname, reltuples::bigint FROM pg_class "
+            "WHERE relname IN ('orders', 'order_items', 'pipeline', 'customers') AND relkind = 'r'"
+        )).fetchall())
+        server = conn.execute(text("SHOW server_version")).scalar()
+    engine.dispose()
+
+    from sales_dashboard.config import config
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "version": config.VERSION,
+        "commit": commit,
+        "postgres": server,
+        "iterations": iterations,
+        "table_rows": rows
+    }
+
+
+def _flatten(results: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Benchmark name -> stats, e.g. 'repository.get_revenue_trend', 'GET /api/orders (cold)'"""
+    flat = {f"repository.{name}": stats for name, stats in results.get("repository", {}).items()}
+    for path, modes in results.get("endpoints", {}).items():
+        for mode, stats in modes.items():
+            flat[f"GET {path} ({mode})"] = stats
+    return flat
+
+
+def compare(current: Dict[str, Any], previous: Dict[str, Any], threshold: float) -> List[str]:
+    """Print p50/p95 changes against a previous run; return the regressions"""
+    regressions = []
+    old = _flatten(previous)
+    print(f"\n{'benchmark':<52}{'p50':>18}{'p95':>18}")
+    for name, stats in _flatten(current).items():
+        if name not in old or "p50" not in stats or "p50" not in old[name]:
+            continue
+        cells = []
+        for key in ("p50", "p95"):
+            before, now = old[name][key], stats[key]
+            change = (now - before) / before if before else 0.0
+            cells.append(f"{now:>8.2f} ({change:+.0%})")
+            if change > threshold and now - before > 1.0:
+                regressions.append(f"{name} {key} {before:.2f} -> {now:.2f} ms")
+        print(f"{name:<52}{cells[0]:>18}{cells[1]:>18}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--iterations", type=int, default=30, help="timed calls per benchmark")
+    parser.add_argument("--base-url", help="time endpoints over HTTP against a running server")
+    parser.add_argument("--skip-repository", action="store_true")
+    parser.add_argument("--skip-endpoints", action="store_true")
+    parser.add_argument("--output", help="results JSON path (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("DATABASE_URL environment variable or --database-url is required")
+    # The app reads DATABASE_URL at import; point it at the same database
+    os.environ["DATABASE_URL"] = args.database_url
+
+    results = {"meta": metadata(args.database_url, args.iterations)}
+    logger.info(f"Benchmarking against {results['meta']['table_rows']}")
+
+    if not args.skip_repository:
+        logger.info("DashboardRepository")
+        results["repository"] = bench_repository(args.database_url, args.iterations)
+    if not args.skip_endpoints:
+        logger.info("Endpoints")
+        results["endpoints"] = asyncio.run(bench_endpoints(args.iterations, args.base_url))
+
+    output = Path(args.output) if args.output else (
+        RESULTS_DIR / f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    logger.info(f"Results written to {output}")
+
+    if args.compare:
+        regressions = compare(results, json.loads(Path(args.compare).read_text()), args.threshold)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
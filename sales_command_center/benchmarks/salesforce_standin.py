@@ -0,0 +1,120 @@
+"""
+Salesforce Stand-in
+Local fake of the Salesforce token and SOQL query endpoints for the
+pipeline sync
+
+Serves N synthetic Opportunities (generated on demand, nothing held in
+memory) with SystemModstamp increasing by one second per record, pages of
+2000 addressed by query locator offset like the real API, and an optional
+per-request latency. The only SOQL understood is the sync's own
+"WHERE SystemModstamp > <datetime>" filter.
+
+Owners are rep<N>@example.com, matching benchmarks/generate_data.py.
+
+Usage:
+    python benchmarks/salesforce_standin.py --records 1000000 --latency-ms 150
+    SALESFORCE_LOGIN_URL=http://localhost:8765 SALESFORCE_CLIENT_ID=x SALESFORCE_USERNAME=x \\
+        python -m sales_dashboard.integrations.salesforce_sync --full
+"""
+
+import argparse
+import asyncio
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+
+from fastapi import FastAPI, HTTPException, Request
+
+PAGE_SIZE = 2000
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+STAGES = [
+    ("Prospecting", 10), ("Qualification", 20), ("Needs Analysis", 30), ("Proposal/Price Quote", 60),
+    ("Negotiation/Review", 80), ("Closed Won", 100), ("Closed Lost", 0)
+]
+
+_SINCE_RE = re.compile(r"SystemModstamp\s*>\s*(\S+Z)")
+
+
+def make_app(records: int, accounts: int, owners: int, latency_ms: float) -> FastAPI:
+    app = FastAPI(title="Salesforce stand-in")
+    # locator -> first record index of the query result
+    locators: Dict[str, int] = {}
+
+    def opportunity(i: int) -> dict:
+        stage, probability = STAGES[i % len(STAGES)]
+        account = f"001SI{i % accounts:010d}"
+        return {
+            "attributes": {"type": "Opportunity"},
+            "Id": f"006SI{i:010d}",
+            "Name": f"Opportunity {i}",
+            "AccountId": account,
+            "Account": {"Name": f"Account {i % accounts}"},
+            "Owner": {"Email": f"rep{i % owners + 1}@example.com"},
+            "StageName": stage,
+            "Amount": float(1000 + (i * 7919) % 250_000),
+            "Probability": probability,
+            "CloseDate": (EPOCH.date() + timedelta(days=i % 720)).isoformat(),
+            "LeadSource": "Web" if i % 3 else "Partner",
+            "NextStep": None,
+            "IsClosed": stage.startswith("Closed"),
+            "IsWon": stage == "Closed Won",
+            "SystemModstamp": (EPOCH + timedelta(seconds=i)).strftime("%Y-%m-%dT%H:%M:%S.000+0000"),
+        }
+
+    def page(request: Request, locator: str, first: int, offset: int) -> dict:
+        start = first + offset
+        end = min(start + PAGE_SIZE, records)
+        body = {
+            "totalSize": records - first,
+            "done": end >= records,
+            "records": [opportunity(i) for i in range(start, end)],
+        }
+        if end < records:
+            version = request.path_params["version"]
+            body["nextRecordsUrl"] = f"/services/data/{version}/query/{locator}-{offset + PAGE_SIZE}"
+        return body
+
+    async def simulate_latency():
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+
+    @app.post("/services/oauth2/token")
+    async def token(request: Request):
+        return {"access_token": uuid.uuid4().hex, "instance_url": str(request.base_url).rstrip("/")}
+
+    @app.get("/services/data/{version}/query")
+    async def query(request: Request, version: str, q: str):
+        await simulate_latency()
+        first = 0
+        match = _SINCE_RE.search(q)
+        if match:
+            since = datetime.strptime(match.group(1), "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+            first = min(records, max(0, int((since - EPOCH).total_seconds()) + 1))
+        locator = f"01gSI{uuid.uuid4().hex[:13]}"
+        locators[locator] = first
+        return page(request, locator, first, 0)
+
+    @app.get("/services/data/{version}/query/{locator}-{offset}")
+    async def query_more(request: Request, version: str, locator: str, offset: int):
+        await simulate_latency()
+        if locator not in locators:
+            raise HTTPException(status_code=400, detail="INVALID_QUERY_LOCATOR")
+        return page(request, locator, locators[locator], offset)
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve a fake Salesforce query API")
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--accounts", type=int, default=5_000)
+    parser.add_argument("--owners", type=int, default=100, help="owners rep1..repN@example.com")
+    parser.add_argument("--latency-ms", type=float, default=0, help="simulated latency per query request")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    uvicorn.run(make_app(args.records, args.accounts, args.owners, args.latency_ms),
+                host="127.0.0.1", port=args.port, log_level="warning")
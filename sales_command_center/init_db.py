@@ -1,15 +1,28 @@
 """
 Database Initialization Script
-Runs schema creation and seed data for Sales Command Center
+Applies schema migrations (and seed data on a fresh database), and bulk
+loads CSV/Parquet files for Sales Command Center
+
+Usage:
+    python init_db.py                          # create or migrate the schema
+    python init_db.py --status                 # show applied / pending migrations
+    python init_db.py --load orders=backfill/orders_2023.csv \\
+                      --load order_items=backfill/items_2023.parquet
+
+Loads are resumable: re-run the same command after a failure and each
+file continues from its last committed batch.
 """
 
+import argparse
 import os
 import sys
 from pathlib import Path
 import psycopg2
-from psycopg2 import sql
 import logging
 
+from sales_dashboard.data.bulk_loader import BulkLoader, DEFAULT_BATCH_ROWS
+from sales_dashboard.data.migrations import MigrationRunner
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -27,93 +40,73 @@ def get_database_url():
     return db_url
 
 
-def run_sql_file(conn, filepath):
-    """Execute SQL from a file"""
-    logger.info(f"Running SQL file: {filepath}")
-
-    with open(filepath, 'r', encoding='utf-8') as f:
-        sql_content = f.read()
-
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute(sql_content)
-            conn.commit()
-        logger.info(f"Successfully executed: {filepath}")
-        return True
-    except Exception as e:
-        logger.error(f"Error executing {filepath}: {e}")
-        conn.rollback()
-        return False
-
-
-def check_if_database_initialized(conn):
-    """Check if database has already been initialized"""
-    try:
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables
-                    WHERE table_schema = 'public'
-                    AND table_name = 'regions'
-                );
-            """)
-            exists = cursor.fetchone()[0]
-            return exists
-    except Exception as e:
-        logger.error(f"Error checking database: {e}")
-        return False
-
-
-def init_database():
-    """Initialize the database with schema and seed data"""
+def init_database(seed: bool = True):
+    """Create the schema on a fresh database, or apply pending migrations"""
     try:
-        # Get database URL
         db_url = get_database_url()
         logger.info("Connecting to database...")
-
-        # Connect to database
         conn = psycopg2.connect(db_url)
         logger.info("Connected to database successfully")
 
-        # Check if already initialized
-        if check_if_database_initialized(conn):
-            logger.info("Database already initialized, skipping...")
+        try:
+            applied = MigrationRunner(conn).migrate(seed=seed)
+        finally:
             conn.close()
-            return True
-
-        # Get SQL file paths
-        base_path = Path(__file__).parent
-        schema_path = base_path / "sales_dashboard" / "database" / "schema.sql"
-        seed_path = base_path / "sales_dashboard" / "database" / "seed_data.sql"
 
-        # Run schema
-        if not schema_path.exists():
-            logger.error(f"Schema file not found: {schema_path}")
-            return False
+        if applied:
+            logger.info(f"Applied: {', '.join(applied)}")
+        logger.info("Database initialization completed successfully!")
+        return True
 
-        logger.info("Creating database schema...")
-        if not run_sql_file(conn, schema_path):
-            logger.error("Failed to create schema")
-            conn.close()
-            return False
+    except Exception as e:
+        logger.error(f"Database initialization failed: {e}")
+        return False
 
-        # Run seed data
-        if seed_path.exists():
-            logger.info("Loading seed data...")
-            if not run_sql_file(conn, seed_path):
-                logger.warning("Failed to load seed data (non-critical)")
-        else:
-            logger.warning(f"Seed data file not found: {seed_path}")
 
+def show_status():
+    """Print every migration version and whether it has been applied"""
+    conn = psycopg2.connect(get_database_url())
+    try:
+        for row in MigrationRunner(conn).status():
+            applied_at = row["applied_at"].strftime("%Y-%m-%d %H:%M") if row["applied_at"] else ""
+            print(f"{row['version']}  {row['name']:<24} {row['state']:<24} {applied_at}")
+    finally:
         conn.close()
-        logger.info("Database initialization completed successfully!")
-        return True
+    return True
+
 
+def load_files(specs, batch_rows: int, keep_indexes: bool):
+    """Bulk load TABLE=PATH specs in order"""
+    conn = psycopg2.connect(get_database_url())
+    loader = BulkLoader(conn, batch_rows=batch_rows, drop_indexes=not keep_indexes)
+    try:
+        for spec in specs:
+            table, sep, path = spec.partition("=")
+            if not sep:
+                raise ValueError(f"Expected TABLE=PATH, got '{spec}'")
+            loader.load(table, Path(path))
+        return True
     except Exception as e:
-        logger.error(f"Database initialization failed: {e}")
+        logger.error(f"Bulk load failed (re-run to resume): {e}")
         return False
+    finally:
+        conn.close()
 
 
 if __name__ == "__main__":
-    success = init_database()
+    parser = argparse.ArgumentParser(description="Initialize, migrate and load the Sales Command Center database")
+    parser.add_argument("--status", action="store_true", help="show migration status and exit")
+    parser.add_argument("--no-seed", action="store_true", help="don't load seed_data.sql into a fresh database")
+    parser.add_argument("--load", action="append", default=[], metavar="TABLE=PATH",
+                        help="bulk load a .csv/.parquet file after migrating (repeatable)")
+    parser.add_argument("--batch-rows", type=int, default=DEFAULT_BATCH_ROWS, help="rows per COPY batch")
+    parser.add_argument("--keep-indexes", action="store_true", help="don't drop indexes during loads")
+    args = parser.parse_args()
+
+    if args.status:
+        success = show_status()
+    else:
+        success = init_database(seed=not args.no_seed)
+        if success and args.load:
+            success = load_files(args.load, args.batch_rows, args.keep_indexes)
     sys.exit(0 if success else 1)
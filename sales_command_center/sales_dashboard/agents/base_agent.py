@@ -3,11 +3,28 @@ Base Agent Class
 Provides common functionality for all AI agents in the Sales Command Center
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable
 from abc import ABC, abstractmethod
 import logging
-from openai import OpenAI
-from anthropic import Anthropic
+
+try:
+    from openai import OpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+try:
+    from anthropic import Anthropic
+    ANTHROPIC_AVAILABLE = True
+except ImportError:
+    ANTHROPIC_AVAILABLE = False
+
+from ..data.database import get_db_session
+from ..data.repositories.dashboard_repository import DashboardRepository
+from ..llm_service import LLMProvider, get_llm_service
+from .context_packer import PackedContext, count_tokens, pack_context
+from .intent_router import intent_router
+from .query_plan import PLAN_INSTRUCTIONS, QueryPlan, parse_plan, repair_prompt
 
 logger = logging.getLogger(__name__)
 
@@ -30,12 +47,23 @@ class BaseAgent(ABC):
         self.model = config.get("model", "gpt-4-turbo-preview")
         self.temperature = config.get("temperature", 0.7)
         self.max_tokens = config.get("max_tokens", 2000)
-
-        # Initialize LLM client based on provider
-        if self.provider == "openai":
+        self.llm_calls = 0  # round trips made, for per-query accounting
+        self.prompt_tokens = 0  # prompt tokens sent, same
+        self.context_token_budget = config.get("context_token_budget", 3000)
+        self.last_context: Optional[PackedContext] = None
+
+        # Initialize LLM client based on provider. "fallback" (or any other
+        # LLMFallbackService provider) goes through the shared fallback chain.
+        self.preferred_provider = None
+        if self.provider == "openai" and OPENAI_AVAILABLE:
             self.llm_client = OpenAI(api_key=config.get("api_key"))
-        elif self.provider == "anthropic":
+        elif self.provider == "anthropic" and ANTHROPIC_AVAILABLE:
             self.llm_client = Anthropic(api_key=config.get("api_key"))
+        elif self.provider == "fallback" or self.provider in {p.value for p in LLMProvider}:
+            if self.provider != "fallback":
+                self.preferred_provider = LLMProvider(self.provider)
+                self.provider = "fallback"
+            self.llm_client = None  # get_llm_service() on first call
         else:
             raise ValueError(f"Unsupported LLM provider: {self.provider}")
 
@@ -67,11 +95,90 @@ class BaseAgent(ABC):
         """
         pass
 
+    def data_sources(self, query: str, context: Dict[str, Any]) -> Dict[str, Callable[[Any], Any]]:
+        """
+        Repository calls this agent needs to answer a query
+
+        Each value takes a DashboardRepository or AsyncDashboardRepository
+        (same method names), so the calls run synchronously here and
+        concurrently in the AgentOrchestrator. Names are shared across
+        agents: a source two agents ask for is fetched once.
+
+        Args:
+            query: The user's natural language query
+            context: Additional context
+
+        Returns:
+            Dict of source name -> callable(repository)
+        """
+        return {}
+
+    def enrich_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Add values derived from the fetched sources (no I/O)
+
+        Args:
+            data: Source name -> fetched data
+
+        Returns:
+            Dict with this agent's derived values (empty by default)
+        """
+        return {}
+
+    def fetch_data(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run this agent's data sources on one database session
+
+        Args:
+            query: The user's natural language query
+            context: Additional context
+
+        Returns:
+            Dict of source name -> data, plus derived values
+        """
+        with get_db_session() as db:
+            repo = DashboardRepository(db)
+            data = {name: source(repo) for name, source in self.data_sources(query, context).items()}
+        return {**data, **self.enrich_data(data)}
+
+    def answer_from_data(self, query: str, context: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Plan and answer a query over fetched data (one LLM call, two at most)
+
+        Args:
+            query: The user's natural language query
+            context: Additional context ("history": earlier turns, if any)
+            data: Data fetched for the query
+
+        Returns:
+            Dict containing response and data
+        """
+        calls_before, tokens_before = self.llm_calls, self.prompt_tokens
+        plan = self.plan_query(query, context_data=self.format_data_for_llm(data), history=context.get("history"))
+        response = plan.answer
+        if response is None:
+            response = self.generate_natural_language_response(query, data)
+
+        self.log_interaction(query, response, context)
+
+        return {
+            "success": True,
+            "response": response,
+            "data": data,
+            "agent": self.__class__.__name__,
+            "intent": plan.intent,
+            "entities": plan.entities.model_dump(),
+            "llm_calls": self.llm_calls - calls_before,
+            "prompt_tokens": self.prompt_tokens - tokens_before
+        }
+
     def call_llm(
         self,
         user_message: str,
         system_prompt: Optional[str] = None,
-        context_data: Optional[str] = None
+        context_data: Optional[str] = None,
+        json_mode: bool = False,
+        history: Optional[List[Dict[str, str]]] = None
     ) -> str:
         """
         Make a call to the LLM provider
@@ -80,11 +187,16 @@ class BaseAgent(ABC):
             user_message: The user's message/query
             system_prompt: Optional system prompt (uses default if not provided)
             context_data: Optional context data to include in the prompt
+            json_mode: Constrain the reply to a JSON object (OpenAI JSON mode,
+                Anthropic prefilled "{"; the fallback chain relies on the prompt)
+            history: Earlier turns ({"role", "content"}, oldest first), e.g.
+                from conversation_memory.history()
 
         Returns:
             str: The LLM's response
         """
         try:
+            self.llm_calls += 1
             if system_prompt is None:
                 system_prompt = self.get_system_prompt()
 
@@ -94,50 +206,139 @@ class BaseAgent(ABC):
             else:
                 full_user_message = user_message
 
+            history = history or []
+            prompt_tokens = sum(
+                count_tokens(part, self.model)
+                for part in [system_prompt, full_user_message] + [turn["content"] for turn in history]
+            )
+            self.prompt_tokens += prompt_tokens
+            logger.info(f"{self.__class__.__name__} LLM call: {prompt_tokens} prompt tokens")
+
             if self.provider == "openai":
+                extra = {"response_format": {"type": "json_object"}} if json_mode else {}
                 response = self.llm_client.chat.completions.create(
                     model=self.model,
                     messages=[
                         {"role": "system", "content": system_prompt},
+                        *history,
                         {"role": "user", "content": full_user_message}
                     ],
                     temperature=self.temperature,
-                    max_tokens=self.max_tokens
+                    max_tokens=self.max_tokens,
+                    **extra
                 )
                 return response.choices[0].message.content
 
             elif self.provider == "anthropic":
+                messages = [*history, {"role": "user", "content": full_user_message}]
+                if json_mode:
+                    messages.append({"role": "assistant", "content": "{"})
                 response = self.llm_client.messages.create(
                     model=self.model,
                     max_tokens=self.max_tokens,
                     temperature=self.temperature,
                     system=system_prompt,
-                    messages=[
-                        {"role": "user", "content": full_user_message}
-                    ]
+                    messages=messages
                 )
-                return response.content[0].text
+                text = response.content[0].text
+                return "{" + text if json_mode else text
+
+            else:
+                # The fallback chain has no JSON mode; PLAN_INSTRUCTIONS asks for JSON only
+                response = get_llm_service().chat(
+                    user_message,
+                    system_prompt=system_prompt,
+                    context=context_data,
+                    preferred_provider=self.preferred_provider,
+                    history=history
+                )
+                if not response.success:
+                    raise RuntimeError(response.error or "All LLM providers failed")
+                return response.content
 
         except Exception as e:
             logger.error(f"Error calling LLM: {str(e)}")
             raise
 
-    def format_data_for_llm(self, data: Any) -> str:
+    def format_data_for_llm(
+        self,
+        data: Any,
+        budget: Optional[int] = None,
+        priorities: Optional[List[str]] = None
+    ) -> str:
         """
         Format data in a way that's easy for LLM to understand
 
+        Records become CSV tables and large numbers are abbreviated. Sections
+        (top-level keys) are packed in priority order and cut to fit the
+        token budget; the result's size is kept in self.last_context.
+
         Args:
             data: Data to format (dict, list, etc.)
+            budget: Maximum tokens (defaults to the context_token_budget setting)
+            priorities: Top-level keys to keep first when cutting
 
         Returns:
             str: Formatted data string
         """
-        if isinstance(data, dict):
-            return "\n".join([f"{k}: {v}" for k, v in data.items()])
-        elif isinstance(data, list):
-            return "\n".join([str(item) for item in data])
-        else:
-            return str(data)
+        self.last_context = pack_context(data, budget or self.context_token_budget, self.model, priorities)
+        return self.last_context.text
+
+    def plan_query(
+        self,
+        query: str,
+        context_data: Optional[str] = None,
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> QueryPlan:
+        """
+        Get intent, entities and (if context_data answers the query) the
+        answer in one structured LLM call
+
+        An invalid reply gets one repair call; if that fails too, the plan
+        falls back to intent "unknown" with no answer. A confident local
+        intent router decision overrides the intent the LLM returns.
+
+        Args:
+            query: The user query
+            context_data: Data already fetched for the query
+            history: Earlier turns of the conversation, for follow-up questions
+
+        Returns:
+            QueryPlan: Validated plan
+        """
+        decision = intent_router.route(query)
+        plan = self._request_plan(query, context_data, history)
+        if decision.confident:
+            logger.debug(f"Intent {decision.intent} from {decision.source} ({decision.confidence})")
+            plan.intent = decision.intent
+        return plan
+
+    def _request_plan(
+        self,
+        query: str,
+        context_data: Optional[str],
+        history: Optional[List[Dict[str, str]]]
+    ) -> QueryPlan:
+        system_prompt = f"{self.get_system_prompt()}\n{PLAN_INSTRUCTIONS}"
+        reply = self.call_llm(
+            query, system_prompt=system_prompt, context_data=context_data, json_mode=True, history=history
+        )
+        try:
+            return parse_plan(reply)
+        except ValueError as e:
+            error = e
+        logger.warning(f"Invalid query plan, requesting repair: {error}")
+
+        try:
+            repaired = self.call_llm(
+                repair_prompt(reply, error),
+                system_prompt="You repair malformed JSON. Reply with JSON only.",
+                json_mode=True
+            )
+            return parse_plan(repaired)
+        except Exception as e:
+            logger.error(f"Query plan repair failed: {e}")
+            return QueryPlan()
 
     def extract_entities(self, query: str) -> Dict[str, Any]:
         """
@@ -173,6 +374,9 @@ class BaseAgent(ABC):
         """
         Analyze the intent of a user query
 
+        The local intent router answers when it is confident; the LLM is
+        only asked below INTENT_ROUTER_THRESHOLD.
+
         Args:
             query: The user query
 
@@ -193,6 +397,12 @@ class BaseAgent(ABC):
         Return only the intent name.
         """
 
+        # Most queries are classified locally in microseconds
+        decision = intent_router.route(query)
+        if decision.confident:
+            logger.debug(f"Intent {decision.intent} from {decision.source} ({decision.confidence})")
+            return decision.intent
+
         try:
             response = self.call_llm(query, system_prompt=intent_prompt)
             return response.strip().lower()
@@ -0,0 +1,247 @@
+"""
+Context Packer
+Compact, token-budgeted serialization of agent data for LLM prompts
+
+- Lists of records become CSV tables (one header, one line per row)
+  instead of a Python repr per row, which roughly thirds their size.
+- Large numbers are abbreviated to three significant digits (2.3M, 45.2K).
+- Sections (top-level keys) are packed in priority order. A section that
+  does not fit in what is left of the budget is cut: a table keeps its
+  first rows plus a summary line of what was dropped, anything else is
+  replaced by an "omitted" note (or dropped if even that does not fit).
+- Tokens are counted for the target model: exactly with tiktoken for
+  OpenAI models when installed, otherwise from a per-family
+  characters-per-token ratio.
+
+Usage:
+    packed = pack_context({"recent_orders": orders, "metrics": metrics}, budget=2000, model="gpt-4o")
+    packed.text, packed.tokens, packed.truncated
+"""
+
+import csv
+import io
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Model name prefix -> approximate characters per token (used without tiktoken)
+CHARS_PER_TOKEN = {
+    "gpt": 4.0,
+    "o1": 4.0,
+    "o3": 4.0,
+    "claude": 3.5,
+    "gemini": 4.0,
+    "deepseek": 3.8,
+}
+DEFAULT_CHARS_PER_TOKEN = 3.5  # conservative for unknown models
+
+# Columns summed in the summary line of a truncated table
+SUMMABLE_COLUMNS = ("amount", "revenue", "value", "total", "units", "orders", "count", "deals")
+
+
+@dataclass
+class PackedContext:
+    """Serialized context and its size"""
+    text: str
+    tokens: int
+    budget: int
+    truncated: List[str] = field(default_factory=list)  # sections cut to fit
+    omitted: List[str] = field(default_factory=list)  # sections dropped entirely
+
+
+@lru_cache(maxsize=16)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: str = "") -> int:
+    """
+    Tokens of text for a model
+
+    Exact for OpenAI models with tiktoken installed, estimated otherwise.
+    """
+    if not text:
+        return 0
+    name = (model or "").lower()
+    if TIKTOKEN_AVAILABLE and name.startswith(("gpt", "o1", "o3")):
+        return len(_encoding(name).encode(text))
+    ratio = next((r for prefix, r in CHARS_PER_TOKEN.items() if name.startswith(prefix)), DEFAULT_CHARS_PER_TOKEN)
+    return int(len(text) / ratio) + 1
+
+
+def abbreviate(value: Any) -> str:
+    """Compact string for a scalar: 1234567 -> 1.23M, 0.8751 -> 0.88"""
+    if isinstance(value, bool) or value is None:
+        return "" if value is None else str(value).lower()
+    if isinstance(value, (int, float, Decimal)):
+        number = float(value)
+        magnitude = abs(number)
+        for threshold, unit, suffix in ((1e9, 1e9, "B"), (1e6, 1e6, "M"), (1e4, 1e3, "K")):
+            if magnitude >= threshold:
+                return f"{number / unit:.3g}{suffix}"
+        if isinstance(value, int) or number.is_integer():
+            return str(int(number))
+        return f"{number:.2f}".rstrip("0").rstrip(".")
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M") if value.time() != datetime.min.time() else value.strftime("%Y-%m-%d")
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def _cell(value: Any) -> str:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=abbreviate, separators=(",", ":"))
+    return abbreviate(value)
+
+
+def _is_table(value: Any) -> bool:
+    return isinstance(value, list) and bool(value) and all(isinstance(row, dict) for row in value)
+
+
+def _table_lines(rows: List[Dict[str, Any]]) -> List[str]:
+    """CSV header + one line per row (columns: union of keys in first-seen order)"""
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_cell(row.get(column)) for column in columns])
+    return buffer.getvalue().rstrip("\n").split("\n")
+
+
+def _summary_line(dropped: List[Dict[str, Any]]) -> str:
+    """What a truncated table left out: row count and totals of money/count columns"""
+    totals: Dict[str, float] = {}
+    for row in dropped:
+        for key, value in row.items():
+            if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool) \
+                    and any(word in key.lower() for word in SUMMABLE_COLUMNS):
+                totals[key] = totals.get(key, 0.0) + float(value)
+    sums = ", ".join(f"{key} total {abbreviate(total)}" for key, total in totals.items())
+    return f"... {len(dropped)} more rows" + (f" ({sums})" if sums else "")
+
+
+def _render(value: Any, indent: str = "") -> List[str]:
+    """Lines for a value of any shape"""
+    if _is_table(value):
+        return [indent + line for line in _table_lines(value)]
+    if isinstance(value, dict):
+        lines = []
+        for key, item in value.items():
+            if isinstance(item, (dict, list)) and item and not _is_scalar_list(item):
+                lines.append(f"{indent}{key}:")
+                lines.extend(_render(item, indent + "  "))
+            else:
+                lines.append(f"{indent}{key}: {_render_scalar(item)}")
+        return lines
+    if isinstance(value, list):
+        if _is_scalar_list(value):
+            return [indent + _render_scalar(value)]
+        return [line for item in value for line in _render(item, indent + "- ")]
+    return [indent + abbreviate(value)]
+
+
+def _is_scalar_list(value: Any) -> bool:
+    return isinstance(value, list) and all(not isinstance(item, (dict, list)) for item in value)
+
+
+def _render_scalar(value: Any) -> str:
+    if isinstance(value, list):
+        return ", ".join(abbreviate(item) for item in value)
+    if isinstance(value, dict):
+        return ""  # empty dict
+    return abbreviate(value)
+
+
+def _section(name: Optional[str], value: Any, rows: Optional[int] = None) -> str:
+    """Render one section, keeping only the first `rows` rows of a table"""
+    dropped: List[Dict[str, Any]] = []
+    if rows is not None:
+        value, dropped = value[:rows], value[rows:]
+    if name is None:
+        lines = _render(value)
+    elif isinstance(value, (dict, list)) and value and not _is_scalar_list(value):
+        lines = [f"{name}:"] + _render(value, "  ")
+    else:
+        lines = [f"{name}: {_render_scalar(value)}"]
+    if dropped:
+        lines.append(("  " if name is not None else "") + _summary_line(dropped))
+    return "\n".join(lines)
+
+
+def pack_context(
+    data: Any,
+    budget: int,
+    model: str = "",
+    priorities: Optional[Iterable[str]] = None
+) -> PackedContext:
+    """
+    Serialize data compactly within a token budget
+
+    Args:
+        data: A dict of sections (packed in priority order) or any other value
+            (one unnamed section)
+        budget: Maximum tokens for the packed text
+        model: Target model name, for token counting
+        priorities: Section names to pack first; the rest follow in dict order
+
+    Returns:
+        PackedContext with the text, its token count and what was cut
+    """
+    sections = dict(data) if isinstance(data, dict) else {None: data}
+    order = [name for name in (priorities or []) if name in sections]
+    order += [name for name in sections if name not in order]
+
+    packed: Dict[Any, str] = {}
+    truncated, omitted = [], []
+    remaining = budget
+    for name in order:
+        value = sections[name]
+        text = _section(name, value)
+        tokens = count_tokens(text, model)
+        if tokens > remaining and _is_table(value):
+            # Most rows whose section (with summary line) still fits
+            low, high = 0, len(value) - 1
+            while low < high:
+                mid = (low + high + 1) // 2
+                if count_tokens(_section(name, value, mid), model) <= remaining:
+                    low = mid
+                else:
+                    high = mid - 1
+            if low:
+                text = _section(name, value, low)
+                tokens = count_tokens(text, model)
+                truncated.append(str(name))
+        if tokens > remaining:
+            text = f"{name}: [omitted to fit the context budget]" if name is not None else ""
+            tokens = count_tokens(text, model)
+            if tokens > remaining:
+                text, tokens = "", 0
+            omitted.append(str(name))
+        packed[name] = text
+        if text:
+            remaining -= tokens + 1  # joining newline
+
+    # Emit in the caller's section order, not priority order
+    text = "\n".join(packed[name] for name in sections if packed.get(name))
+    result = PackedContext(text, count_tokens(text, model), budget, truncated, omitted)
+    if truncated or omitted:
+        logger.info(f"Context packed to {result.tokens}/{budget} tokens "
+                    f"(truncated: {truncated or '-'}, omitted: {omitted or '-'})")
+    return result
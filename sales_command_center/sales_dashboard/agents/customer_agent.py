@@ -0,0 +1,52 @@
+"""
+Customer Agent
+Handles queries about customers, accounts and regional performance
+"""
+
+from typing import Dict, Any
+import logging
+from .base_agent import BaseAgent
+
+logger = logging.getLogger(__name__)
+
+
+class CustomerAgent(BaseAgent):
+    """
+    Agent responsible for customer and account queries
+    """
+
+    def get_system_prompt(self) -> str:
+        return """
+        You are a Customer Accounts expert assistant for the Sales Command Center.
+        Your role is to help sales executives understand who their biggest customers are,
+        how regions compare, and which accounts need attention.
+
+        When answering:
+        - Name the customers and give their order counts and revenue
+        - Point out accounts that have not ordered recently
+        - Compare regions by revenue and average order value
+        - Provide actionable recommendations
+        """
+
+    def process_query(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process customer-related queries
+
+        Args:
+            query: User's natural language query
+            context: Additional context
+
+        Returns:
+            Dict containing response and data
+        """
+        try:
+            return self.answer_from_data(query, context, self.fetch_data(query, context))
+        except Exception as e:
+            return self.handle_error(e, query)
+
+    def data_sources(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Top customers (90 days) and revenue by region"""
+        return {
+            "top_customers": lambda repo: repo.get_top_customers(10, 90),
+            "regional_performance": lambda repo: repo.get_regional_performance(),
+        }
@@ -0,0 +1,114 @@
+"""
+Forecast Agent
+Handles queries about revenue projections and expected pipeline outcomes
+"""
+
+from typing import Dict, Any, List
+import logging
+from datetime import date, timedelta
+from .base_agent import BaseAgent
+
+logger = logging.getLogger(__name__)
+
+# Typical close probability per open stage, for the weighted pipeline
+STAGE_WEIGHTS = {
+    "lead": 0.10,
+    "qualified": 0.25,
+    "proposal": 0.50,
+    "negotiation": 0.75,
+}
+
+# Days of history behind the trend line, and days projected
+HISTORY_DAYS = 90
+HORIZON_DAYS = 30
+
+
+def project_revenue(trend: List[Dict[str, Any]], horizon_days: int = HORIZON_DAYS) -> Dict[str, Any]:
+    """
+    Least-squares linear trend over daily revenue, summed over the horizon
+
+    Days missing from the trend (no fulfilled orders) count as zero.
+
+    Args:
+        trend: Rows from get_revenue_trend (date, revenue, orders)
+        horizon_days: Days to project past today
+
+    Returns:
+        Dict with the daily slope, average and projected revenue (empty
+        with fewer than two days of data)
+    """
+    if len(trend) < 2:
+        return {}
+    by_date = {row["date"]: row["revenue"] for row in trend}
+    start = date.fromisoformat(trend[0]["date"])
+    n = (date.today() - start).days + 1
+    ys = [by_date.get(str(start + timedelta(days=x)), 0.0) for x in range(n)]
+    mean_x = (n - 1) / 2
+    mean_y = sum(ys) / n
+    var_x = sum((x - mean_x) ** 2 for x in range(n))
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(ys)) / var_x
+    intercept = mean_y - slope * mean_x
+    projected = sum(max(0.0, intercept + slope * x) for x in range(n, n + horizon_days))
+    return {
+        "days_of_history": n,
+        "avg_daily_revenue": round(mean_y, 2),
+        "daily_trend": round(slope, 2),
+        f"projected_revenue_next_{horizon_days}_days": round(projected, 2),
+    }
+
+
+class ForecastAgent(BaseAgent):
+    """
+    Agent responsible for forecasts and projections
+    """
+
+    def get_system_prompt(self) -> str:
+        return """
+        You are a Sales Forecasting expert assistant for the Sales Command Center.
+        Your role is to help sales executives anticipate revenue from recent trends
+        and the open pipeline.
+
+        When answering:
+        - Base projections on the revenue trend and weighted pipeline provided
+        - State the assumptions behind a projection and how confident it is
+        - Relate the outlook to quarter progress against quota
+        - Provide actionable recommendations
+        """
+
+    def process_query(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process forecast-related queries
+
+        Args:
+            query: User's natural language query
+            context: Additional context
+
+        Returns:
+            Dict containing response and data
+        """
+        try:
+            return self.answer_from_data(query, context, self.fetch_data(query, context))
+        except Exception as e:
+            return self.handle_error(e, query)
+
+    def data_sources(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Daily revenue history, pipeline by stage and headline metrics"""
+        return {
+            "revenue_trend_90d": lambda repo: repo.get_revenue_trend(HISTORY_DAYS),
+            "pipeline_summary": lambda repo: repo.get_pipeline_summary(),
+            "overview_metrics": lambda repo: repo.get_overview_metrics(),
+        }
+
+    def enrich_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Revenue projection and probability-weighted open pipeline"""
+        derived = {}
+        trend = data.get("revenue_trend_90d")
+        if trend:
+            derived["revenue_projection"] = project_revenue(trend)
+        summary = data.get("pipeline_summary")
+        if summary:
+            derived["weighted_pipeline"] = round(sum(
+                stage["total_value"] * STAGE_WEIGHTS.get(stage["stage"], 0.0)
+                for stage in summary["stages"]
+            ), 2)
+        return derived
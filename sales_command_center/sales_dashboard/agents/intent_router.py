@@ -0,0 +1,229 @@
+"""
+Intent Router
+Classifies queries into the assistant's intents locally, without an LLM call
+
+Two stages, both in-process and pure Python:
+1. Rules: one compiled regex (an alternation of every intent's keyword
+   patterns) scanned once over the query. A query hitting only one
+   intent is routed with high confidence.
+2. Model: TF-IDF (unigrams + bigrams) with a nearest-centroid linear
+   classifier, trained on built-in examples plus the labelled queries in
+   conversation_history. Rule hits are added to the model scores as a
+   prior.
+
+Callers escalate to the LLM when the confidence is below
+INTENT_ROUTER_THRESHOLD.
+
+Usage:
+    decision = intent_router.route("how many orders are pending?")
+    if decision.confident:
+        intent = decision.intent
+"""
+
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import text
+
+from ..config import config
+from ..data.database import get_async_db_session
+from .query_plan import INTENTS
+
+logger = logging.getLogger(__name__)
+
+# intent -> keyword patterns (matched case-insensitively on word boundaries)
+INTENT_RULES: Dict[str, List[str]] = {
+    "create_transaction": [
+        r"(create|place|submit|enter|book|raise|make)\s+(a\s+|an\s+|new\s+)*(sales\s+|purchase\s+)?(order|po)",
+        r"new\s+(sales|purchase)\s+order", r"order\s+\d+\s+(units|cases|boxes)",
+    ],
+    "order_status": [
+        r"orders?", r"pending", r"fulfill(ed|ment)?", r"shipped", r"backorder(ed)?", r"received", r"delivery",
+    ],
+    "pipeline_query": [
+        r"pipeline", r"deals?", r"opportunit(y|ies)", r"stages?", r"win\s+rate", r"closing", r"quota",
+    ],
+    "customer_query": [
+        r"customers?", r"accounts?", r"clients?", r"churn", r"top\s+buyers?",
+    ],
+    "product_query": [
+        r"products?", r"skus?", r"inventory", r"best[\s-]sell(ing|ers?)", r"items?", r"stock",
+    ],
+    "comparison": [
+        r"compare[ds]?", r"comparison", r"vs", r"versus",
+        r"year\s+over\s+year", r"month\s+over\s+month", r"quarter\s+over\s+quarter",
+        r"yoy", r"mom", r"than\s+last", r"difference\s+between",
+    ],
+    "forecast": [
+        r"forecast(ed|ing)?", r"predict(ion|ed)?", r"projected?", r"expect(ed)?", r"outlook",
+        r"next\s+(month|quarter|year|week)", r"will\s+we",
+    ],
+}
+
+# Built-in training examples, so the model works before history exists
+SEED_EXAMPLES: List[Tuple[str, str]] = [
+    ("how many orders did we get today", "order_status"),
+    ("which orders are still pending", "order_status"),
+    ("what is our fulfillment rate this week", "order_status"),
+    ("show me orders that shipped yesterday", "order_status"),
+    ("what does the pipeline look like", "pipeline_query"),
+    ("how many deals are in negotiation", "pipeline_query"),
+    ("which opportunities are closing this month", "pipeline_query"),
+    ("what is our win rate", "pipeline_query"),
+    ("who are our top customers", "customer_query"),
+    ("which accounts have not ordered recently", "customer_query"),
+    ("tell me about the disney account", "customer_query"),
+    ("which products sell best", "product_query"),
+    ("what is the inventory level for widgets", "product_query"),
+    ("top selling items this quarter", "product_query"),
+    ("create a sales order for acme for 50 units", "create_transaction"),
+    ("place a purchase order with our supplier", "create_transaction"),
+    ("book a new order for globex", "create_transaction"),
+    ("compare this month to last month", "comparison"),
+    ("how does the west region compare with the east", "comparison"),
+    ("revenue this quarter versus last quarter", "comparison"),
+    ("what is the revenue forecast for next quarter", "forecast"),
+    ("predict sales for next month", "forecast"),
+    ("what revenue do we expect this year", "forecast"),
+]
+
+# Confidence of an unambiguous rule match
+RULE_CONFIDENCE = 0.95
+# Score added per rule hit before the softmax
+RULE_PRIOR = 0.15
+# Softmax temperature over cosine scores (0..1)
+TEMPERATURE = 0.08
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+@dataclass
+class IntentDecision:
+    """Routing result"""
+    intent: str
+    confidence: float
+    source: str  # 'rules', 'model' or 'none'
+    threshold: float
+
+    @property
+    def confident(self) -> bool:
+        return self.confidence >= self.threshold
+
+
+def _features(query: str) -> Counter:
+    tokens = _TOKEN_RE.findall(query.lower())
+    return Counter(tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])])
+
+
+def _normalize(vector: Dict[str, float]) -> Dict[str, float]:
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    return {k: v / norm for k, v in vector.items()} if norm else {}
+
+
+class IntentRouter:
+    """Rule automaton + TF-IDF nearest-centroid intent classifier"""
+
+    def __init__(self, rules: Dict[str, List[str]] = INTENT_RULES, threshold: float = 0.6, enabled: bool = True):
+        self.threshold = threshold
+        self.enabled = enabled
+        self._group_intents: Dict[str, str] = {}
+        alternatives = []
+        for intent, patterns in rules.items():
+            for pattern in patterns:
+                group = f"r{len(self._group_intents)}"
+                self._group_intents[group] = intent
+                alternatives.append(f"(?P<{group}>\\b{pattern}\\b)")
+        self._rules = re.compile("|".join(alternatives), re.IGNORECASE)
+        self._idf: Dict[str, float] = {}
+        self._centroids: Dict[str, Dict[str, float]] = {}
+        self.examples = 0
+        self.train(SEED_EXAMPLES)
+
+    # ------------------------------------------------------------------
+    # Training
+    # ------------------------------------------------------------------
+
+    def train(self, examples: Iterable[Tuple[str, str]]):
+        """Fit IDF weights and per-intent centroids (replaces the current model)"""
+        examples = [(q, i) for q, i in examples if q and i in INTENTS and i != "unknown"]
+        documents = [(_features(q), i) for q, i in examples]
+        df = Counter(term for features, _ in documents for term in features)
+        n = len(documents)
+        idf = {term: math.log((1 + n) / (1 + count)) + 1 for term, count in df.items()}
+
+        sums: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for features, intent in documents:
+            vector = _normalize({t: (1 + math.log(c)) * idf[t] for t, c in features.items()})
+            for term, weight in vector.items():
+                sums[intent][term] += weight
+
+        self._idf = idf
+        self._centroids = {intent: _normalize(terms) for intent, terms in sums.items()}
+        self.examples = n
+
+    async def train_from_history(self, limit: int = 20_000) -> int:
+        """
+        Retrain on the seed examples plus labelled conversation_history rows
+
+        Returns:
+            Number of history rows used
+        """
+        async with get_async_db_session() as db:
+            result = await db.execute(
+                text("""
+                    SELECT query, intent FROM conversation_history
+                    WHERE intent = ANY(:intents)
+                    ORDER BY created_at DESC
+                    LIMIT :limit
+                """),
+                {"intents": [i for i in INTENTS if i != "unknown"], "limit": limit}
+            )
+            rows = [(row[0], row[1]) for row in result.fetchall()]
+        self.train(SEED_EXAMPLES + rows)
+        logger.info(f"Intent router trained on {len(rows)} history rows ({self.examples} examples)")
+        return len(rows)
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+
+    def rule_hits(self, query: str) -> Counter:
+        """Rule matches per intent"""
+        return Counter(self._group_intents[m.lastgroup] for m in self._rules.finditer(query))
+
+    def scores(self, query: str) -> Dict[str, float]:
+        """Cosine similarity of the query to each intent centroid"""
+        features = _features(query)
+        vector = _normalize({t: (1 + math.log(c)) * self._idf[t] for t, c in features.items() if t in self._idf})
+        return {
+            intent: sum(weight * centroid.get(term, 0.0) for term, weight in vector.items())
+            for intent, centroid in self._centroids.items()
+        }
+
+    def route(self, query: str) -> IntentDecision:
+        """Classify a query; check .confident before skipping the LLM"""
+        if not self.enabled:
+            return IntentDecision("unknown", 0.0, "none", self.threshold)
+        hits = self.rule_hits(query)
+        if len(hits) == 1:
+            intent = next(iter(hits))
+            return IntentDecision(intent, RULE_CONFIDENCE, "rules", self.threshold)
+
+        scores = self.scores(query)
+        for intent, count in hits.items():
+            scores[intent] = scores.get(intent, 0.0) + RULE_PRIOR * count
+        if not scores or max(scores.values()) <= 0:
+            return IntentDecision("unknown", 0.0, "none", self.threshold)
+
+        top = max(scores, key=scores.get)
+        exp = {intent: math.exp((score - scores[top]) / TEMPERATURE) for intent, score in scores.items()}
+        confidence = 1.0 / sum(exp.values())
+        return IntentDecision(top, round(confidence, 3), "model", self.threshold)
+
+
+# Global router
+intent_router = IntentRouter(threshold=config.INTENT_ROUTER_THRESHOLD, enabled=config.INTENT_ROUTER_ENABLED)
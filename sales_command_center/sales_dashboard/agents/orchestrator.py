@@ -0,0 +1,274 @@
+"""
+Agent Orchestrator
+Answers a query with several domain agents and one LLM synthesis call
+
+1. Selection: every intent the router's rules hit (plus its confident
+   decision) maps to agents, so "pending orders and stalled deals" goes to
+   both OrderAgent and PipelineAgent. No LLM call.
+2. Fetch: the union of the selected agents' data sources runs concurrently,
+   each on its own pooled async session and through the dashboard cache.
+   A source two agents share is fetched once. A cross-domain question
+   costs max(source latency), not the sum.
+3. Synthesis: the per-agent data is merged into one context, packed to
+   CONTEXT_TOKEN_BUDGET, and sent with a single AsyncLLMFallbackService.chat
+   call.
+4. Follow-ups in a session get its conversation memory as chat history;
+   the exchange, agents_used and response_time_ms go to conversation
+   memory, which writes conversation_history off the request path.
+
+Usage:
+    result = await agent_orchestrator.process_query("How are orders and pipeline looking?")
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from ..config import config
+from ..conversation_memory import conversation_memory
+from ..data.cache import dashboard_cache
+from ..data.database import get_async_db_session
+from ..data.repositories.dashboard_repository import AsyncDashboardRepository
+from ..llm_service import get_async_llm_service
+from .base_agent import BaseAgent
+from .context_packer import PackedContext, count_tokens, pack_context
+from .customer_agent import CustomerAgent
+from .forecast_agent import ForecastAgent
+from .intent_router import intent_router
+from .order_agent import OrderAgent
+from .pipeline_agent import PipelineAgent
+from .product_agent import ProductAgent
+
+logger = logging.getLogger(__name__)
+
+AGENT_CLASSES = {
+    "order": OrderAgent,
+    "pipeline": PipelineAgent,
+    "customer": CustomerAgent,
+    "product": ProductAgent,
+    "forecast": ForecastAgent,
+}
+
+# intent -> agents consulted for it
+INTENT_AGENTS: Dict[str, List[str]] = {
+    "order_status": ["order"],
+    "pipeline_query": ["pipeline"],
+    "customer_query": ["customer"],
+    "product_query": ["product"],
+    "create_transaction": ["order", "customer"],
+    "comparison": ["order", "customer"],
+    "forecast": ["forecast"],
+}
+
+# Agents for queries no intent matches
+DEFAULT_AGENTS = ["order", "pipeline"]
+
+SYNTHESIS_PROMPT = """
+You are the Sales Command Center assistant. The Context holds data gathered by
+specialist agents, one section per agent. Answer the query from that data only:
+combine the sections where the question spans them, be specific with numbers,
+flag issues that need attention and give actionable recommendations. If the
+data does not cover part of the question, say so.
+
+The specialists' guidance:
+"""
+
+async def _load_source(source: Callable[[AsyncDashboardRepository], Any]) -> Any:
+    """Run a data source on its own pooled async session"""
+    async with get_async_db_session() as db:
+        return await source(AsyncDashboardRepository(db))
+
+
+def _session_id(value: Optional[str]) -> str:
+    """The given session UUID, or a new session if missing or malformed"""
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        return conversation_memory.new_session()
+
+
+class AgentOrchestrator:
+    """Fans a query out to domain agents and synthesizes one answer"""
+
+    def __init__(self, agent_config: Dict[str, Any], timeout: float = 30, record_history: bool = True):
+        """
+        Args:
+            agent_config: BaseAgent configuration for the domain agents
+            timeout: Seconds allowed per data source
+            record_history: Keep each exchange in conversation memory (and
+                conversation_history)
+        """
+        self.agent_config = agent_config
+        self.timeout = timeout
+        self.record_history = record_history
+        self._agents: Dict[str, BaseAgent] = {}
+
+    def agent(self, name: str) -> BaseAgent:
+        """Domain agent by name (created on first use)"""
+        if name not in self._agents:
+            self._agents[name] = AGENT_CLASSES[name](self.agent_config)
+        return self._agents[name]
+
+    def select_agents(self, query: str) -> Dict[str, Any]:
+        """
+        Pick the agents for a query from the local intent router
+
+        Returns:
+            Dict with the primary intent, whether the router was confident
+            in it, and the agent names, in AGENT_CLASSES order
+        """
+        decision = intent_router.route(query)
+        intents = set(intent_router.rule_hits(query))
+        if decision.confident:
+            intents.add(decision.intent)
+
+        names = {name for intent in intents for name in INTENT_AGENTS.get(intent, [])}
+        return {
+            "intent": decision.intent,
+            "confident": decision.confident,
+            "agents": [name for name in AGENT_CLASSES if name in names] or list(DEFAULT_AGENTS),
+        }
+
+    async def _fetch(self, name: str, source: Callable[[AsyncDashboardRepository], Any]) -> Any:
+        return await asyncio.wait_for(
+            dashboard_cache.get_or_load(f"agents:{name}", config.CACHE_TTL_DASHBOARD, lambda: _load_source(source)),
+            self.timeout
+        )
+
+    async def gather_data(self, agents: List[str], query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fetch every selected agent's data concurrently
+
+        Returns:
+            Dict with "data" (agent name -> its data) and "errors"
+            (source name -> message, for sources that failed)
+        """
+        sources: Dict[str, Callable] = {}
+        wanted: Dict[str, List[str]] = {}
+        for name in agents:
+            agent_sources = self.agent(name).data_sources(query, context)
+            wanted[name] = list(agent_sources)
+            for source_name, source in agent_sources.items():
+                sources.setdefault(source_name, source)
+
+        names = list(sources)
+        results = await asyncio.gather(
+            *(self._fetch(source_name, sources[source_name]) for source_name in names),
+            return_exceptions=True
+        )
+
+        fetched, errors = {}, {}
+        for source_name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                errors[source_name] = str(result) or result.__class__.__name__
+                logger.warning(f"Agent data source {source_name} failed: {errors[source_name]}")
+            else:
+                fetched[source_name] = result
+
+        data = {}
+        for name in agents:
+            agent_data = {s: fetched[s] for s in wanted[name] if s in fetched}
+            if agent_data:
+                data[name] = {**agent_data, **self.agent(name).enrich_data(agent_data)}
+        return {"data": data, "errors": errors}
+
+    def build_context(self, data: Dict[str, Any]) -> PackedContext:
+        """
+        Pack every agent's data into one budget
+
+        Sections are named "<Agent>.<source>". Each agent's first source is
+        kept before any agent's second, so cuts fall on every agent's
+        lowest-priority data rather than on whole agents.
+        """
+        sections, ranked = {}, []
+        for name, agent_data in data.items():
+            agent_name = self.agent(name).__class__.__name__
+            for rank, (source, value) in enumerate(agent_data.items()):
+                key = f"{agent_name}.{source}"
+                sections[key] = value
+                ranked.append((rank, key))
+        return pack_context(
+            sections,
+            self.agent_config.get("context_token_budget", 3000),
+            self.agent_config.get("model", ""),
+            [key for _, key in sorted(ranked)]
+        )
+
+    def build_system_prompt(self, agents: List[str]) -> str:
+        guidance = "\n".join(self.agent(name).get_system_prompt().strip() for name in agents)
+        return f"{SYNTHESIS_PROMPT}\n{guidance}"
+
+    async def process_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Answer a query from all relevant agents with a single LLM call
+
+        Args:
+            query: User's natural language query
+            context: Optional user_id / session_id (a session_id is
+                generated when missing or not a UUID) and agent context
+
+        Returns:
+            Dict with response, intent, agents_used, data, errors,
+            response_time_ms, prompt_tokens, context_truncated, provider
+            and session_id
+        """
+        started = time.perf_counter()
+        context = dict(context or {})
+        session_id = _session_id(context.get("session_id"))
+
+        selection = self.select_agents(query)
+        agents = selection["agents"]
+        gathered = await self.gather_data(agents, query, context)
+        data = gathered["data"]
+
+        prompt_tokens, truncated = 0, []
+        if data:
+            system_prompt = self.build_system_prompt(list(data))
+            packed = self.build_context(data)
+            history = await conversation_memory.history(session_id) if self.record_history else []
+            response = await get_async_llm_service().chat(
+                user_message=query,
+                system_prompt=system_prompt,
+                context=packed.text,
+                history=history
+            )
+            success, answer, provider = response.success, response.content, response.provider.value
+            parts = [system_prompt, packed.text, query] + [turn["content"] for turn in history]
+            prompt_tokens = sum(count_tokens(part, response.model) for part in parts)
+            truncated = packed.truncated + packed.omitted
+            logger.info(f"Assistant synthesis: {prompt_tokens} prompt tokens via {provider}")
+        else:
+            success, answer, provider = False, "I couldn't load any data for your question. Please try again.", "none"
+
+        response_time_ms = int((time.perf_counter() - started) * 1000)
+        agents_used = [self.agent(name).__class__.__name__ for name in data]
+
+        if success and self.record_history:
+            await conversation_memory.add_turn(
+                session_id, query, answer,
+                user_id=context.get("user_id"),
+                # Only confident labels; train_from_history learns from this column
+                intent=selection["intent"] if selection["confident"] else None,
+                agents_used=agents_used,
+                response_time_ms=response_time_ms
+            )
+
+        return {
+            "success": success,
+            "response": answer,
+            "intent": selection["intent"],
+            "agents_used": agents_used,
+            "data": data,
+            "errors": gathered["errors"],
+            "response_time_ms": response_time_ms,
+            "prompt_tokens": prompt_tokens,
+            "context_truncated": truncated,
+            "provider": provider,
+            "session_id": session_id,
+        }
+
+
+# Global orchestrator
+agent_orchestrator = AgentOrchestrator(config.get_llm_config(), timeout=config.AGENT_TIMEOUT)
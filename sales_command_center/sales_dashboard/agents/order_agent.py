@@ -5,8 +5,11 @@ Handles all queries related to sales orders, fulfillment, and order status
 
 from typing import Dict, Any, List
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from .base_agent import BaseAgent
+from .query_plan import QueryEntities
+from ..data.database import get_db_session
+from ..data.repositories.order_repository import OrderFilters, OrderRepository
 
 logger = logging.getLogger(__name__)
 
@@ -47,12 +50,11 @@ class OrderAgent(BaseAgent):
             Dict containing response and data
         """
         try:
-            # Extract intent and entities
-            intent = self.analyze_intent(query)
-            entities = self.extract_entities(query)
+            calls_before, tokens_before = self.llm_calls, self.prompt_tokens
 
-            # Fetch order data based on query
-            order_data = self.fetch_order_data(query, entities, context)
+            # Keyword routing needs no entities, so fetch first and let one
+            # structured call return intent, entities and the answer
+            order_data = self.fetch_order_data(query, {}, context)
 
             if not order_data:
                 return {
@@ -60,8 +62,16 @@ class OrderAgent(BaseAgent):
                     "message": "No order data found for your query."
                 }
 
-            # Generate natural language response
-            response = self.generate_natural_language_response(query, order_data)
+            plan = self.plan_query(
+                query, context_data=self.format_data_for_llm(order_data), history=context.get("history")
+            )
+            response = plan.answer
+
+            # Second round trip only when the plan asks for data we don't have yet
+            if plan.needs_more_data or response is None:
+                extra_data = self.fetch_entity_data(plan.entities) if plan.needs_more_data else {}
+                order_data = {**order_data, **extra_data}
+                response = self.generate_natural_language_response(query, order_data)
 
             # Log the interaction
             self.log_interaction(query, response, context)
@@ -71,12 +81,23 @@ class OrderAgent(BaseAgent):
                 "response": response,
                 "data": order_data,
                 "agent": "OrderAgent",
-                "intent": intent
+                "intent": plan.intent,
+                "entities": plan.entities.model_dump(),
+                "llm_calls": self.llm_calls - calls_before,
+                "prompt_tokens": self.prompt_tokens - tokens_before
             }
 
         except Exception as e:
             return self.handle_error(e, query)
 
+    def data_sources(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Order metrics, latest orders and at-risk alerts"""
+        return {
+            "overview_metrics": lambda repo: repo.get_overview_metrics(),
+            "recent_orders": lambda repo: repo.get_recent_orders(10),
+            "critical_alerts": lambda repo: repo.get_critical_alerts(),
+        }
+
     def fetch_order_data(
         self,
         query: str,
@@ -111,6 +132,23 @@ class OrderAgent(BaseAgent):
         else:
             return self.get_order_summary()
 
+    def fetch_entity_data(self, entities: QueryEntities) -> Dict[str, Any]:
+        """
+        Fetch data for entities the keyword route doesn't cover
+
+        Args:
+            entities: Entities from the query plan
+
+        Returns:
+            Dict of additional order data (empty if nothing applies)
+        """
+        data = {}
+        for customer in entities.customers[:3]:
+            data[f"orders_for_{customer}"] = self.get_orders_by_customer(customer)
+        if entities.amounts:
+            data["orders_over_amount"] = self.get_orders_over_amount(max(entities.amounts), limit=20)
+        return data
+
     def get_todays_orders(self) -> Dict[str, Any]:
         """Get today's order statistics"""
         # Mock data - replace with actual database query
@@ -217,40 +255,39 @@ class OrderAgent(BaseAgent):
     def get_orders_by_date_range(
         self,
         start_date: datetime,
-        end_date: datetime
+        end_date: datetime,
+        limit: int = 100
     ) -> List[Dict[str, Any]]:
         """
         Get orders within a date range
 
         Args:
             start_date: Start of date range
-            end_date: End of date range
+            end_date: End of date range (inclusive)
+            limit: Maximum number of orders (newest first)
 
         Returns:
             List of orders
         """
-        # Mock implementation - would query database
-        return []
+        filters = OrderFilters(start_date=start_date, end_date=end_date)
+        with get_db_session() as db:
+            orders, _ = OrderRepository(db).list_orders(filters, limit=limit)
+        return orders
 
-    def get_orders_over_amount(self, amount: float) -> List[Dict[str, Any]]:
+    def get_orders_over_amount(self, amount: float, limit: int = 100) -> List[Dict[str, Any]]:
         """
         Get orders over a specific amount
 
         Args:
             amount: Minimum order value
+            limit: Maximum number of orders (newest first)
 
         Returns:
             List of orders
         """
-        # Mock implementation
-        return [
-            {
-                "order_id": "SO-12345",
-                "customer": "Disney",
-                "value": 500000,
-                "status": "pending"
-            }
-        ]
+        with get_db_session() as db:
+            orders, _ = OrderRepository(db).list_orders(OrderFilters(min_amount=amount), limit=limit)
+        return orders
 
     def calculate_fulfillment_rate(self, orders: List[Dict[str, Any]]) -> float:
         """
@@ -0,0 +1,60 @@
+"""
+Pipeline Agent
+Handles queries about deals, opportunities, stages and win rates
+"""
+
+from typing import Dict, Any
+import logging
+from .base_agent import BaseAgent
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineAgent(BaseAgent):
+    """
+    Agent responsible for sales pipeline queries
+    """
+
+    def get_system_prompt(self) -> str:
+        return """
+        You are a Sales Pipeline expert assistant for the Sales Command Center.
+        Your role is to help sales executives understand pipeline value by stage,
+        win rates, stalled deals and rep performance.
+
+        When answering:
+        - Quote stage counts and values precisely
+        - Call out deals that have been stuck in a stage too long
+        - Relate the pipeline to quota and win rate where relevant
+        - Provide actionable recommendations
+        """
+
+    def process_query(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process pipeline-related queries
+
+        Args:
+            query: User's natural language query
+            context: Additional context
+
+        Returns:
+            Dict containing response and data
+        """
+        try:
+            return self.answer_from_data(query, context, self.fetch_data(query, context))
+        except Exception as e:
+            return self.handle_error(e, query)
+
+    def data_sources(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Stage summary, stalled deals and top reps"""
+        return {
+            "pipeline_summary": lambda repo: repo.get_pipeline_summary(),
+            "at_risk_deals": lambda repo: repo.get_at_risk_deals(30),
+            "top_performers": lambda repo: repo.get_top_performers(),
+        }
+
+    def enrich_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Limit at-risk deals to the largest ten, with the full count"""
+        deals = data.get("at_risk_deals")
+        if deals is None:
+            return {}
+        return {"at_risk_deals": deals[:10], "at_risk_deal_count": len(deals)}
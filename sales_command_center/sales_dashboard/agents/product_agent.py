@@ -0,0 +1,58 @@
+"""
+Product Agent
+Handles queries about product performance and best sellers
+"""
+
+from typing import Dict, Any
+import logging
+from .base_agent import BaseAgent
+
+logger = logging.getLogger(__name__)
+
+
+class ProductAgent(BaseAgent):
+    """
+    Agent responsible for product queries
+    """
+
+    def get_system_prompt(self) -> str:
+        return """
+        You are a Product Performance expert assistant for the Sales Command Center.
+        Your role is to help sales executives understand which products drive revenue
+        and volume.
+
+        When answering:
+        - Rank products by revenue and give units sold
+        - Note each top product's share of the listed revenue
+        - Provide actionable recommendations
+        """
+
+    def process_query(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process product-related queries
+
+        Args:
+            query: User's natural language query
+            context: Additional context
+
+        Returns:
+            Dict containing response and data
+        """
+        try:
+            return self.answer_from_data(query, context, self.fetch_data(query, context))
+        except Exception as e:
+            return self.handle_error(e, query)
+
+    def data_sources(self, query: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Top products over the last 30 days"""
+        return {
+            "product_performance": lambda repo: repo.get_product_performance(10, 30),
+        }
+
+    def enrich_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Revenue share of each listed product"""
+        products = data.get("product_performance") or []
+        total = sum(p["revenue"] for p in products)
+        if not total:
+            return {}
+        return {"product_revenue_share": {p["product"]: round(p["revenue"] / total * 100, 1) for p in products}}
@@ -0,0 +1,157 @@
+"""
+Query Plan
+Schema and parsing for the single-call structured planning pass
+
+One LLM request returns the intent, the entities and (when the data sent
+along answers the question) the final answer as JSON, instead of separate
+analyze_intent / extract_entities / generate_natural_language_response
+round trips.
+"""
+
+import json
+import re
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+INTENTS = (
+    "order_status",
+    "pipeline_query",
+    "customer_query",
+    "product_query",
+    "create_transaction",
+    "comparison",
+    "forecast",
+    "unknown",
+)
+
+PLAN_INSTRUCTIONS = f"""
+Reply with one JSON object only, no prose or code fences, matching:
+{{
+  "intent": one of {list(INTENTS)},
+  "entities": {{
+    "dates": [strings, e.g. "today", "this month", "Q1 2026"],
+    "customers": [company names],
+    "products": [product names],
+    "metrics": [e.g. "revenue", "orders", "pipeline"],
+    "amounts": [numbers],
+    "statuses": [e.g. "pending", "fulfilled"]
+  }},
+  "needs_more_data": true if the Context does not contain what the question asks about
+    (e.g. a specific customer or amount threshold), else false,
+  "answer": the answer to the query from the Context, or null if needs_more_data is true
+}}
+"""
+
+REPAIR_PROMPT = """
+The text below was supposed to be a JSON object matching this schema but is invalid.
+Return only the corrected JSON object.
+
+Schema:
+{schema}
+
+Validation error:
+{error}
+
+Text:
+{text}
+"""
+
+
+class QueryEntities(BaseModel):
+    """Entities mentioned in a query"""
+    dates: List[str] = Field(default_factory=list)
+    customers: List[str] = Field(default_factory=list)
+    products: List[str] = Field(default_factory=list)
+    metrics: List[str] = Field(default_factory=list)
+    amounts: List[float] = Field(default_factory=list)
+    statuses: List[str] = Field(default_factory=list)
+
+    @field_validator("dates", "customers", "products", "metrics", "statuses", mode="before")
+    @classmethod
+    def _listify(cls, value):
+        # Models often send a bare value or null for a single entity
+        if value is None:
+            return []
+        return value if isinstance(value, list) else [value]
+
+    @field_validator("amounts", mode="before")
+    @classmethod
+    def _parse_amounts(cls, value):
+        # "$500K", "1,200" -> numbers
+        amounts = []
+        for item in cls._listify(value):
+            if isinstance(item, str):
+                match = re.fullmatch(r"\$?\s*([\d,.]+)\s*([kKmMbB]?)", item.strip())
+                if not match:
+                    continue
+                number = float(match.group(1).replace(",", ""))
+                item = number * {"": 1, "k": 1e3, "m": 1e6, "b": 1e9}[match.group(2).lower()]
+            amounts.append(item)
+        return amounts
+
+
+class QueryPlan(BaseModel):
+    """Validated output of the planning call"""
+    intent: str = "unknown"
+    entities: QueryEntities = Field(default_factory=QueryEntities)
+    needs_more_data: bool = False
+    answer: Optional[str] = None
+
+    @field_validator("intent", mode="before")
+    @classmethod
+    def _normalize_intent(cls, value):
+        intent = str(value or "").strip().lower().replace(" ", "_")
+        return intent if intent in INTENTS else "unknown"
+
+    @field_validator("entities", mode="before")
+    @classmethod
+    def _default_entities(cls, value):
+        return value or {}
+
+    @field_validator("answer", mode="before")
+    @classmethod
+    def _blank_answer(cls, value):
+        return value.strip() or None if isinstance(value, str) else value
+
+
+def _extract_json(text: str) -> str:
+    """The outermost {...} of a reply, without code fences or surrounding prose"""
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip())
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError("No JSON object in response")
+    return text[start:end + 1]
+
+
+def _lenient_json(text: str) -> str:
+    """Fix the usual near-misses: trailing commas, Python literals"""
+    text = re.sub(r",\s*([}\]])", r"\1", text)
+    return re.sub(r"\b(True|False|None)\b", lambda m: {"True": "true", "False": "false", "None": "null"}[m.group(1)], text)
+
+
+def parse_plan(text: str) -> QueryPlan:
+    """
+    Parse and validate a planning reply, repairing common formatting slips
+
+    Raises:
+        ValueError: The reply is not a valid plan (pydantic's
+            ValidationError is a ValueError)
+    """
+    raw = _extract_json(text)
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError:
+        data = json.loads(_lenient_json(raw))
+    if not isinstance(data, dict):
+        raise ValueError("Plan must be a JSON object")
+    return QueryPlan.model_validate(data)
+
+
+def repair_prompt(text: str, error: Exception) -> str:
+    """Prompt asking the model to fix an invalid plan"""
+    return REPAIR_PROMPT.format(
+        schema=PLAN_INSTRUCTIONS,
+        error=str(error)[:500],
+        text=text[:4000]
+    )
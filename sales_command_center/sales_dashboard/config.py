@@ -48,6 +48,7 @@ class Config:
     LLM_PROVIDER = os.getenv("LLM_PROVIDER", "euri")  # euri, deepseek, google, openai, anthropic
     LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.7"))
     LLM_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "2000"))
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))  # max tokens of data per prompt
 
     # Database Configuration
     DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://localhost/sales_command_center")
@@ -59,6 +60,9 @@ class Config:
     CACHE_TTL_DASHBOARD = int(os.getenv("CACHE_TTL_DASHBOARD", "30"))  # seconds
     CACHE_TTL_ORDERS = int(os.getenv("CACHE_TTL_ORDERS", "300"))  # 5 minutes
     CACHE_TTL_PIPELINE = int(os.getenv("CACHE_TTL_PIPELINE", "300"))  # 5 minutes
+    CACHE_REDIS_ENABLED = os.getenv("CACHE_REDIS_ENABLED", "False") == "True"  # share cache across workers
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+    SNAPSHOT_SECTION_TIMEOUT = float(os.getenv("SNAPSHOT_SECTION_TIMEOUT", "3.0"))  # seconds per snapshot section
 
     # Salesforce Integration
     SALESFORCE_CLIENT_ID = os.getenv("SALESFORCE_CLIENT_ID")
@@ -68,6 +72,9 @@ class Config:
     SALESFORCE_SECURITY_TOKEN = os.getenv("SALESFORCE_SECURITY_TOKEN")
     SALESFORCE_DOMAIN = os.getenv("SALESFORCE_DOMAIN", "login")  # login or test
     SALESFORCE_API_VERSION = os.getenv("SALESFORCE_API_VERSION", "v58.0")
+    SALESFORCE_LOGIN_URL = os.getenv("SALESFORCE_LOGIN_URL")  # override https://{domain}.salesforce.com
+    SALESFORCE_SYNC_ENABLED = os.getenv("SALESFORCE_SYNC_ENABLED", "False") == "True"  # background pipeline sync
+    SALESFORCE_SYNC_CONCURRENCY = int(os.getenv("SALESFORCE_SYNC_CONCURRENCY", "4"))  # parallel page fetches
 
     # Netsuite Integration
     NETSUITE_ACCOUNT_ID = os.getenv("NETSUITE_ACCOUNT_ID")
@@ -76,6 +83,11 @@ class Config:
     NETSUITE_TOKEN_ID = os.getenv("NETSUITE_TOKEN_ID")
     NETSUITE_TOKEN_SECRET = os.getenv("NETSUITE_TOKEN_SECRET")
     NETSUITE_API_URL = os.getenv("NETSUITE_API_URL")
+    NETSUITE_SYNC_ENABLED = os.getenv("NETSUITE_SYNC_ENABLED", "False") == "True"  # background order ingestion
+    NETSUITE_SYNC_BATCH_SIZE = int(os.getenv("NETSUITE_SYNC_BATCH_SIZE", "500"))  # orders per upsert transaction
+    NETSUITE_SYNC_QUEUE_SIZE = int(os.getenv("NETSUITE_SYNC_QUEUE_SIZE", "8"))  # batches buffered before backpressure
+    NETSUITE_SYNC_WRITERS = int(os.getenv("NETSUITE_SYNC_WRITERS", "2"))
+    NETSUITE_SYNC_MAX_RETRIES = int(os.getenv("NETSUITE_SYNC_MAX_RETRIES", "5"))
 
     # Email Service Configuration
     EMAIL_PROVIDER = os.getenv("EMAIL_PROVIDER", "sendgrid")  # sendgrid or ses
@@ -113,6 +125,12 @@ class Config:
     WEBSOCKET_PING_INTERVAL = int(os.getenv("WEBSOCKET_PING_INTERVAL", "25"))
     WEBSOCKET_PING_TIMEOUT = int(os.getenv("WEBSOCKET_PING_TIMEOUT", "20"))
 
+    # Live Dashboard Push (WebSocket / SSE)
+    LIVE_UPDATES_ENABLED = os.getenv("LIVE_UPDATES_ENABLED", "True") == "True"
+    LIVE_POLL_INTERVAL = float(os.getenv("LIVE_POLL_INTERVAL", "30"))  # seconds, when LISTEN/NOTIFY is unavailable
+    LIVE_RESYNC_INTERVAL = float(os.getenv("LIVE_RESYNC_INTERVAL", "300"))  # seconds, safety refresh with LISTEN/NOTIFY
+    LIVE_DEBOUNCE_SECONDS = float(os.getenv("LIVE_DEBOUNCE_SECONDS", "1.0"))  # coalesce bursts of changes
+
     # Task Queue Configuration (Celery)
     CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/1")
     CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/2")
@@ -131,12 +149,23 @@ class Config:
 
     # Agent Configuration
     AGENT_TIMEOUT = int(os.getenv("AGENT_TIMEOUT", "30"))  # seconds
-    MAX_CONVERSATION_HISTORY = int(os.getenv("MAX_CONVERSATION_HISTORY", "10"))
+    MAX_CONVERSATION_HISTORY = int(os.getenv("MAX_CONVERSATION_HISTORY", "10"))  # turns kept verbatim per session
+    CONVERSATION_TOKEN_BUDGET = int(os.getenv("CONVERSATION_TOKEN_BUDGET", "1500"))  # summary + turns sent as history
+    CONVERSATION_MAX_SESSIONS = int(os.getenv("CONVERSATION_MAX_SESSIONS", "10000"))  # sessions kept in memory
+    CONVERSATION_SESSION_TTL = int(os.getenv("CONVERSATION_SESSION_TTL", "3600"))  # idle seconds before eviction
+    CONVERSATION_FLUSH_SECONDS = float(os.getenv("CONVERSATION_FLUSH_SECONDS", "1.0"))  # history write batching
+    CONVERSATION_WRITE_QUEUE_SIZE = int(os.getenv("CONVERSATION_WRITE_QUEUE_SIZE", "10000"))  # rows awaiting write (oldest dropped beyond)
+    INTENT_ROUTER_ENABLED = os.getenv("INTENT_ROUTER_ENABLED", "True") == "True"  # classify intents locally
+    INTENT_ROUTER_THRESHOLD = float(os.getenv("INTENT_ROUTER_THRESHOLD", "0.6"))  # below this, ask the LLM
 
     # Data Sync Configuration
     SYNC_INTERVAL_SALESFORCE = int(os.getenv("SYNC_INTERVAL_SALESFORCE", "300"))  # 5 minutes
     SYNC_INTERVAL_NETSUITE = int(os.getenv("SYNC_INTERVAL_NETSUITE", "900"))  # 15 minutes
     ENABLE_WEBHOOKS = os.getenv("ENABLE_WEBHOOKS", "True") == "True"
+    WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")  # X-Webhook-Secret header value; webhooks rejected if unset
+    WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE", "50000"))  # events buffered before 503
+    WEBHOOK_COALESCE_SECONDS = float(os.getenv("WEBHOOK_COALESCE_SECONDS", "1.0"))  # window per batched write
+    WEBHOOK_MAX_BATCH = int(os.getenv("WEBHOOK_MAX_BATCH", "5000"))  # events per window at most
 
     # Feature Flags
     ENABLE_VOICE_COMMANDS = os.getenv("ENABLE_VOICE_COMMANDS", "True") == "True"
@@ -209,6 +238,7 @@ class Config:
             "model": cls.MODEL_NAME,
             "temperature": cls.LLM_TEMPERATURE,
             "max_tokens": cls.LLM_MAX_TOKENS,
+            "context_token_budget": cls.CONTEXT_TOKEN_BUDGET,
             "api_key": cls.OPENAI_API_KEY if cls.LLM_PROVIDER == "openai" else cls.ANTHROPIC_API_KEY
         }
 
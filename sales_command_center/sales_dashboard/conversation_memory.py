@@ -0,0 +1,432 @@
+"""
+Conversation Memory
+Bounded, summarized per-session history for follow-up questions
+
+Each session keeps a hot in-memory buffer of its latest turns. history()
+returns them as chat messages, preceded by a running summary of older
+turns, for LLMFallbackService.chat(history=...) or BaseAgent.call_llm.
+
+- Bounded: when a session's turns exceed MAX_CONVERSATION_HISTORY or its
+  summary + turns exceed CONVERSATION_TOKEN_BUDGET, the oldest turns are
+  folded into the summary by one LLM call in the background (progressive
+  summarization: the previous summary plus the folded turns become the
+  new summary). Until that finishes, history() drops the oldest turns
+  that do not fit the budget. If the LLM is unavailable, a short
+  extractive summary is used instead.
+- No DB write on the request path: add_turn() only queues the row. A
+  background writer inserts queued rows into conversation_history every
+  CONVERSATION_FLUSH_SECONDS with one multi-row INSERT, retrying
+  transient database errors with backoff. At most
+  CONVERSATION_WRITE_QUEUE_SIZE rows wait; beyond that (database down)
+  the oldest are dropped and counted.
+- Sessions idle longer than CONVERSATION_SESSION_TTL (or beyond
+  CONVERSATION_MAX_SESSIONS) leave memory. A session not in memory is
+  reloaded from conversation_history once, on its next question.
+
+Usage:
+    history = await conversation_memory.history(session_id)
+    response = await llm_service.chat(query, history=history)
+    await conversation_memory.add_turn(session_id, query, response.content)
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+
+from .agents.context_packer import count_tokens
+from .config import config
+from .data.database import get_async_db_session
+from .data.upsert import insert_rows
+from .integrations.netsuite_sync import is_transient_db_error, retry_with_jitter
+from .llm_service import get_async_llm_service
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = """
+You maintain a running summary of a conversation between a sales executive and
+the Sales Command Center assistant. Merge the previous summary and the new
+exchanges into one updated summary of at most {words} words. Keep what a
+follow-up question could refer to: customers, products, regions, time periods,
+figures quoted and open questions. Reply with the summary only.
+"""
+
+LOAD_HISTORY_SQL = """
+    SELECT query, response, created_at
+    FROM conversation_history
+    WHERE session_id = CAST(:session_id AS UUID)
+    ORDER BY created_at DESC
+    LIMIT :limit
+"""
+
+# Extractive fallback: characters kept per answer
+EXTRACT_CHARS = 160
+
+
+@dataclass
+class Turn:
+    """One question and answer"""
+    query: str
+    response: str
+    created_at: datetime = field(default_factory=datetime.now)
+    tokens: int = 0
+
+
+@dataclass
+class SessionMemory:
+    """Hot state of one session"""
+    turns: List[Turn] = field(default_factory=list)
+    summary: str = ""
+    summary_tokens: int = 0
+    last_access: float = field(default_factory=time.monotonic)
+    summarizing: Optional[asyncio.Task] = None
+
+
+def _extractive_summary(previous: str, turns: List[Turn]) -> str:
+    """Summary without an LLM: the questions asked and the start of each answer"""
+    lines = [previous] if previous else []
+    for turn in turns:
+        answer = turn.response.strip().replace("\n", " ")
+        if len(answer) > EXTRACT_CHARS:
+            answer = answer[:EXTRACT_CHARS].rsplit(" ", 1)[0] + "..."
+        lines.append(f"- Asked: {turn.query.strip()} / Answered: {answer}")
+    return "\n".join(lines)
+
+
+async def llm_summarize(previous: str, turns: List[Turn], words: int) -> str:
+    """Fold turns into the previous summary with one LLM call"""
+    exchanges = "\n\n".join(f"User: {turn.query}\nAssistant: {turn.response}" for turn in turns)
+    response = await get_async_llm_service().chat(
+        user_message=f"Previous summary:\n{previous or '(none)'}\n\nNew exchanges:\n{exchanges}",
+        system_prompt=SUMMARY_PROMPT.format(words=words),
+        use_cache=False
+    )
+    if not response.success or not response.content.strip():
+        raise RuntimeError(response.error or "Empty summary")
+    return response.content.strip()
+
+
+def _session_uuid(session_id: str) -> Optional[uuid.UUID]:
+    try:
+        return uuid.UUID(str(session_id))
+    except ValueError:
+        return None
+
+
+class ConversationMemory:
+    """
+    Per-session ring buffers with progressive summarization and
+    write-behind persistence to conversation_history.
+    """
+
+    def __init__(
+        self,
+        max_turns: int = 10,
+        token_budget: int = 1500,
+        max_sessions: int = 10_000,
+        session_ttl: float = 3600,
+        flush_interval: float = 1.0,
+        max_batch: int = 500,
+        max_queue: int = 10_000,
+        write_retries: int = 5,
+        summarize: Optional[Callable[[str, List[Turn], int], Awaitable[str]]] = None,
+        model: str = ""
+    ):
+        """
+        Args:
+            max_turns: Turns kept verbatim per session
+            token_budget: Tokens of summary + turns sent as history (at least 2,
+                half of it bounds the summary)
+            max_sessions: Sessions kept in memory (least recently used leave first)
+            session_ttl: Seconds of inactivity before a session leaves memory
+            flush_interval: Seconds between conversation_history writes
+            max_batch: Rows per write at most
+            max_queue: Rows waiting to be written at most (oldest dropped beyond)
+            write_retries: Attempts per write on transient database errors
+            summarize: Coroutine (previous summary, turns, max words) -> summary
+            model: Model name for token counting
+        """
+        self.max_turns = max_turns
+        self.token_budget = max(token_budget, 2)
+        self.max_sessions = max_sessions
+        self.session_ttl = session_ttl
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self.write_retries = write_retries
+        self.summarize = summarize or llm_summarize
+        self.model = model
+        self._sessions: "OrderedDict[str, SessionMemory]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Task] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._stats = {
+            "turns": 0,
+            "summaries": 0,
+            "summary_fallbacks": 0,
+            "reloads": 0,
+            "written": 0,
+            "write_retries": 0,
+            "write_failures": 0,
+            "dropped": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Sessions
+    # ------------------------------------------------------------------
+
+    def new_session(self) -> str:
+        """Start a session (nothing to reload from the database)"""
+        session_id = str(uuid.uuid4())
+        self._store(session_id, SessionMemory())
+        return session_id
+
+    def _store(self, session_id: str, session: SessionMemory):
+        self._sessions[session_id] = session
+        self._sessions.move_to_end(session_id)
+        self._evict()
+
+    def _evict(self):
+        cutoff = time.monotonic() - self.session_ttl
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if len(self._sessions) <= self.max_sessions and oldest.last_access >= cutoff:
+                break
+            self._sessions.popitem(last=False)
+
+    async def _session(self, session_id: str) -> SessionMemory:
+        """Hot session state, reloading its latest turns on a miss"""
+        session = self._sessions.get(session_id)
+        if session is None:
+            task = self._loading.get(session_id)
+            if task is None:
+                task = asyncio.ensure_future(self._load(session_id))
+                self._loading[session_id] = task
+                task.add_done_callback(lambda _: self._loading.pop(session_id, None))
+            session = self._sessions.get(session_id) or await task
+        session.last_access = time.monotonic()
+        self._sessions.move_to_end(session_id)
+        return session
+
+    async def _load(self, session_id: str) -> SessionMemory:
+        session = SessionMemory()
+        session_uuid = _session_uuid(session_id)
+        if session_uuid is not None:
+            try:
+                async with get_async_db_session() as db:
+                    result = await db.execute(
+                        text(LOAD_HISTORY_SQL), {"session_id": str(session_uuid), "limit": self.max_turns}
+                    )
+                    rows = result.fetchall()
+                session.turns = [self._turn(row[0], row[1], row[2]) for row in reversed(rows)]
+                self._stats["reloads"] += 1
+            except Exception as e:
+                logger.warning(f"Could not reload conversation {session_id}: {e}")
+        self._store(session_id, session)
+        return session
+
+    def _turn(self, query: str, response: str, created_at: Optional[datetime] = None) -> Turn:
+        turn = Turn(query, response, created_at or datetime.now())
+        turn.tokens = count_tokens(query, self.model) + count_tokens(response, self.model)
+        return turn
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    async def history(self, session_id: Optional[str]) -> List[Dict[str, str]]:
+        """
+        Chat messages for a follow-up in this session, within the token budget
+
+        Returns:
+            [summary exchange] + recent turns as {"role", "content"} dicts,
+            oldest first (empty for a new session)
+        """
+        if not session_id:
+            return []
+        session = await self._session(session_id)
+
+        budget = self.token_budget - session.summary_tokens
+        recent: List[Turn] = []
+        for turn in reversed(session.turns):
+            if turn.tokens > budget:
+                break
+            recent.append(turn)
+            budget -= turn.tokens
+
+        messages = []
+        if session.summary:
+            messages.append({"role": "user", "content": f"Summary of our conversation so far:\n{session.summary}"})
+            messages.append({"role": "assistant", "content": "Understood."})
+        for turn in reversed(recent):
+            messages.append({"role": "user", "content": turn.query})
+            messages.append({"role": "assistant", "content": turn.response})
+        return messages
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    async def add_turn(
+        self,
+        session_id: str,
+        query: str,
+        response: str,
+        user_id: Optional[int] = None,
+        intent: Optional[str] = None,
+        agents_used: Optional[List[str]] = None,
+        response_time_ms: Optional[int] = None
+    ):
+        """
+        Record an exchange: appended in memory, persisted in the background
+
+        Never waits on a database write (only on reloading a session not
+        in memory).
+        """
+        session = await self._session(session_id)
+        turn = self._turn(query, response)
+        session.turns.append(turn)
+        self._stats["turns"] += 1
+        self._maybe_summarize(session)
+
+        session_uuid = _session_uuid(session_id)
+        self._enqueue({
+            "user_id": user_id,
+            "session_id": session_uuid,
+            "query": query,
+            "response": response,
+            "intent": intent,
+            "agents_used": ",".join(agents_used)[:255] if agents_used else None,
+            "response_time_ms": response_time_ms,
+            "created_at": turn.created_at,
+        })
+
+    def _maybe_summarize(self, session: SessionMemory):
+        if session.summarizing is not None and not session.summarizing.done():
+            return
+        total = session.summary_tokens + sum(turn.tokens for turn in session.turns)
+        if len(session.turns) <= self.max_turns and total <= self.token_budget:
+            return
+
+        # Keep the newest turns that fit in half the budget (at least one)
+        keep, used = 0, 0
+        for turn in reversed(session.turns):
+            if keep and (keep >= self.max_turns or used + turn.tokens > self.token_budget // 2):
+                break
+            keep += 1
+            used += turn.tokens
+        folded = session.turns[:len(session.turns) - keep]
+        if folded:
+            session.summarizing = asyncio.ensure_future(self._fold(session, folded))
+
+    async def _fold(self, session: SessionMemory, folded: List[Turn]):
+        """Replace the folded turns with an updated summary"""
+        words = max(50, self.token_budget // 4)
+        try:
+            summary = await self.summarize(session.summary, folded, words)
+            self._stats["summaries"] += 1
+        except Exception as e:
+            logger.warning(f"Conversation summary failed, using extractive summary: {e}")
+            summary = _extractive_summary(session.summary, folded)
+            self._stats["summary_fallbacks"] += 1
+
+        summary_tokens = count_tokens(summary, self.model)
+        if summary_tokens > self.token_budget // 2:
+            # Keep the summary itself within bounds (newest lines win)
+            keep = len(summary) * (self.token_budget // 2) // summary_tokens
+            summary = summary[len(summary) - keep:]
+            summary_tokens = count_tokens(summary, self.model)
+        session.summary, session.summary_tokens = summary, summary_tokens
+        session.turns = session.turns[len(folded):]
+        session.summarizing = None
+        self._maybe_summarize(session)
+
+    def _enqueue(self, row: Dict[str, Any]):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.ensure_future(self._write_forever())
+        if self._queue.full():
+            # The database is not keeping up: drop the oldest row
+            self._stats["dropped"] += 1
+            if self._queue.get_nowait() is None:
+                # ...unless it is stop()'s sentinel, then drop this one
+                self._queue.put_nowait(None)
+                return
+        self._queue.put_nowait(row)
+
+    async def _write_forever(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self._queue.get()
+            if first is None:
+                return
+            rows = [first]
+            deadline = loop.time() + self.flush_interval
+            stopping = False
+            while len(rows) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is None:
+                    stopping = True
+                    break
+                rows.append(row)
+            await self._write(rows)
+            if stopping:
+                return
+
+    async def _insert(self, rows: List[Dict[str, Any]]):
+        async with get_async_db_session() as db:
+            await insert_rows(db, "conversation_history", rows)
+            await db.commit()
+
+    def _count_write_retry(self, error: Exception):
+        self._stats["write_retries"] += 1
+        logger.warning(f"Conversation history write failed, retrying: {error}")
+
+    async def _write(self, rows: List[Dict[str, Any]]):
+        try:
+            await retry_with_jitter(
+                lambda: self._insert(rows), self.write_retries,
+                on_retry=self._count_write_retry, retry_if=is_transient_db_error
+            )
+            self._stats["written"] += len(rows)
+        except Exception as e:
+            self._stats["write_failures"] += len(rows)
+            logger.error(f"Error writing {len(rows)} conversation history rows: {e}")
+
+    async def stop(self):
+        """Write what is queued and stop the writer"""
+        if self._writer is not None and not self._writer.done():
+            await self._queue.put(None)
+            await self._writer
+        self._writer = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "queued_writes": self._queue.qsize() if self._queue is not None else 0,
+            **self._stats
+        }
+
+
+# Global conversation memory
+conversation_memory = ConversationMemory(
+    max_turns=config.MAX_CONVERSATION_HISTORY,
+    token_budget=config.CONVERSATION_TOKEN_BUDGET,
+    max_sessions=config.CONVERSATION_MAX_SESSIONS,
+    session_ttl=config.CONVERSATION_SESSION_TTL,
+    flush_interval=config.CONVERSATION_FLUSH_SECONDS,
+    max_queue=config.CONVERSATION_WRITE_QUEUE_SIZE
+)
@@ -0,0 +1,374 @@
+"""
+Bulk Loader
+Streams large CSV / Parquet files into Postgres with COPY FROM STDIN
+
+Built for seed and historical backfill files that are too big for INSERTs:
+- The file is read and copied in batches (DEFAULT_BATCH_ROWS rows); memory
+  stays flat regardless of file size.
+- Each batch commits together with its progress row in bulk_load_jobs, so
+  an interrupted load resumes after the last committed batch instead of
+  starting over (or loading rows twice).
+- Secondary indexes on the target table are dropped for the load and
+  rebuilt once at the end (definitions are saved in the job row, so they
+  are rebuilt even if the load had to be resumed).
+- User triggers (dashboard rollups, NOTIFY) are disabled during the load;
+  rollups are rebuilt once afterwards.
+
+Dropping indexes and disabling triggers affects every writer of the
+table, so run large loads in a maintenance window.
+
+Parquet requires pyarrow (optional).
+"""
+
+import csv
+import io
+import json
+import logging
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from psycopg2 import sql
+
+try:
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa_csv = None
+    pq = None
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_ROWS = 100_000
+
+# Tables whose triggers maintain the dashboard rollups
+ROLLUP_TABLES = {"orders", "pipeline", "customers"}
+
+CREATE_JOBS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS bulk_load_jobs (
+        job VARCHAR(255) PRIMARY KEY,
+        table_name VARCHAR(100) NOT NULL,
+        source TEXT NOT NULL,
+        source_size BIGINT NOT NULL,
+        rows_loaded BIGINT NOT NULL DEFAULT 0,
+        byte_offset BIGINT NOT NULL DEFAULT 0, -- CSV: next unread byte
+        dropped_indexes JSONB NOT NULL DEFAULT '[]',
+        status VARCHAR(20) NOT NULL, -- 'loading', 'indexing', 'done'
+        started_at TIMESTAMP DEFAULT NOW(),
+        updated_at TIMESTAMP DEFAULT NOW()
+    )
+"""
+
+# Secondary indexes only: constraint indexes (PK, UNIQUE) stay, since
+# foreign keys and ON CONFLICT depend on them
+SECONDARY_INDEXES_SQL = """
+    SELECT i.relname, pg_get_indexdef(ix.indexrelid)
+    FROM pg_index ix
+    JOIN pg_class i ON i.oid = ix.indexrelid
+    WHERE ix.indrelid = to_regclass(%s)
+      AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = ix.indexrelid)
+"""
+
+
+@dataclass
+class LoadResult:
+    """Outcome of one file load"""
+    job: str
+    table: str
+    rows_loaded: int
+    resumed: bool
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_loaded / self.seconds if self.seconds else 0.0
+
+
+# ============================================
+# File readers (yield COPY-ready CSV batches)
+# ============================================
+
+def _read_record(f) -> bytes:
+    """One CSV record; quoted fields may span lines (quote parity)"""
+    record = f.readline()
+    while record.count(b'"') % 2:
+        more = f.readline()
+        if not more:
+            break
+        record += more
+    return record
+
+
+def csv_header(path: Path) -> List[str]:
+    with open(path, "rb") as f:
+        return next(csv.reader([_read_record(f).decode("utf-8-sig")]))
+
+
+def csv_batches(path: Path, byte_offset: int, batch_rows: int) -> Iterator[Tuple[bytes, int, int]]:
+    """(csv bytes, row count, next byte offset) per batch, after the header"""
+    with open(path, "rb") as f:
+        _read_record(f)  # header
+        if byte_offset:
+            f.seek(byte_offset)
+        while True:
+            buffer = io.BytesIO()
+            rows = 0
+            while rows < batch_rows:
+                record = _read_record(f)
+                if not record:
+                    break
+                if record.strip():
+                    buffer.write(record if record.endswith(b"\n") else record + b"\n")
+                    rows += 1
+            if not rows:
+                return
+            yield buffer.getvalue(), rows, f.tell()
+
+
+def parquet_columns(path: Path) -> List[str]:
+    return pq.ParquetFile(path).schema_arrow.names
+
+
+def parquet_batches(
+    path: Path,
+    columns: List[str],
+    skip_rows: int,
+    batch_rows: int
+) -> Iterator[Tuple[bytes, int, int]]:
+    """(csv bytes, row count, 0) per batch, skipping rows already loaded"""
+    options = pa_csv.WriteOptions(include_header=False)
+    seen = 0
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_rows, columns=columns):
+        if seen + batch.num_rows <= skip_rows:
+            seen += batch.num_rows
+            continue
+        if seen < skip_rows:
+            batch = batch.slice(skip_rows - seen)
+        seen += batch.num_rows
+        buffer = io.BytesIO()
+        pa_csv.write_csv(batch, buffer, write_options=options)
+        yield buffer.getvalue(), batch.num_rows, 0
+
+
+# ============================================
+# Loader
+# ============================================
+
+class BulkLoader:
+    """
+    Resumable COPY loader.
+
+    Usage:
+        conn = psycopg2.connect(url)
+        result = BulkLoader(conn).load("orders", Path("backfill/orders_2023.csv"))
+    """
+
+    def __init__(
+        self,
+        conn,
+        batch_rows: int = DEFAULT_BATCH_ROWS,
+        drop_indexes: bool = True,
+        disable_triggers: bool = True
+    ):
+        """
+        Args:
+            conn: psycopg2 connection (autocommit off)
+            batch_rows: Rows per COPY batch / commit
+            drop_indexes: Drop secondary indexes during the load
+            disable_triggers: Disable user triggers during the load
+        """
+        self.conn = conn
+        self.batch_rows = batch_rows
+        self.drop_indexes = drop_indexes
+        self.disable_triggers = disable_triggers
+
+    def load(
+        self,
+        table: str,
+        path: Path,
+        job: Optional[str] = None,
+        columns: Optional[List[str]] = None
+    ) -> LoadResult:
+        """
+        Load a .csv (with header row) or .parquet file into a table
+
+        Args:
+            table: Target table
+            path: Source file
+            job: Job name for resume tracking (default "<table>:<file name>")
+            columns: Target columns (default: CSV header / Parquet schema)
+
+        Raises:
+            ValueError: Unsupported file type, or the file changed since an
+                interrupted load of the same job
+        """
+        path = Path(path)
+        parquet = path.suffix.lower() == ".parquet"
+        if parquet and not PYARROW_AVAILABLE:
+            raise ValueError("Loading Parquet requires pyarrow (pip install pyarrow)")
+        if not parquet and path.suffix.lower() != ".csv":
+            raise ValueError(f"Unsupported file type: {path.name} (expected .csv or .parquet)")
+
+        job = job or f"{table}:{path.name}"
+        columns = columns or (parquet_columns(path) if parquet else csv_header(path))
+        started = time.monotonic()
+
+        with self.conn.cursor() as cursor:
+            cursor.execute(CREATE_JOBS_TABLE_SQL)
+            # Each batch is committed with its progress row, so a crash
+            # can only lose whole batches that are then reloaded
+            cursor.execute("SET synchronous_commit TO off")
+        self.conn.commit()
+
+        state = self._job_state(job)
+        size = path.stat().st_size
+        if state is not None and state["source_size"] != size:
+            raise ValueError(f"{path.name} changed since job '{job}' started; use a new job name")
+        if state is not None and state["status"] == "done":
+            logger.info(f"Job '{job}' already completed ({state['rows_loaded']:,} rows), skipping")
+            return LoadResult(job, table, 0, False, 0.0)
+
+        resumed = state is not None
+        if state is None:
+            state = self._start_job(job, table, path, size)
+        else:
+            logger.info(f"Resuming job '{job}' after {state['rows_loaded']:,} rows")
+
+        rows_before = state["rows_loaded"]
+        if self.disable_triggers:
+            self._set_triggers(table, enabled=False)
+        try:
+            if state["status"] == "loading":
+                self._copy(table, path, parquet, columns, job, state)
+            self._finish(table, job, state, columns)
+        finally:
+            self.conn.rollback()
+            if self.disable_triggers:
+                self._set_triggers(table, enabled=True)
+
+        result = LoadResult(job, table, state["rows_loaded"] - rows_before, resumed, time.monotonic() - started)
+        logger.info(f"Loaded {result.rows_loaded:,} rows into {table} in {result.seconds:,.1f}s "
+                    f"({result.rows_per_second:,.0f} rows/s)")
+        return result
+
+    # ------------------------------------------------------------------
+    # Job state
+    # ------------------------------------------------------------------
+
+    def _job_state(self, job: str) -> Optional[dict]:
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT source_size, rows_loaded, byte_offset, dropped_indexes, status "
+                "FROM bulk_load_jobs WHERE job = %s",
+                (job,)
+            )
+            row = cursor.fetchone()
+        self.conn.commit()
+        if row is None:
+            return None
+        indexes = row[3] if isinstance(row[3], list) else json.loads(row[3])
+        return {"source_size": row[0], "rows_loaded": row[1], "byte_offset": row[2],
+                "dropped_indexes": indexes, "status": row[4]}
+
+    def _start_job(self, job: str, table: str, path: Path, size: int) -> dict:
+        """Record the job and drop secondary indexes in one transaction"""
+        indexes = []
+        with self.conn.cursor() as cursor:
+            if self.drop_indexes:
+                cursor.execute(SECONDARY_INDEXES_SQL, (table,))
+                indexes = [definition for _, definition in cursor.fetchall()]
+            cursor.execute(
+                """
+                INSERT INTO bulk_load_jobs (job, table_name, source, source_size, dropped_indexes, status)
+                VALUES (%s, %s, %s, %s, %s, 'loading')
+                """,
+                (job, table, str(path.resolve()), size, json.dumps(indexes))
+            )
+            for definition in indexes:
+                name = re.match(r"CREATE (?:UNIQUE )?INDEX (\S+)", definition).group(1)
+                cursor.execute(f"DROP INDEX IF EXISTS {name}")
+        self.conn.commit()
+        if indexes:
+            logger.info(f"Dropped {len(indexes)} indexes on {table} for the load")
+        return {"source_size": size, "rows_loaded": 0, "byte_offset": 0,
+                "dropped_indexes": indexes, "status": "loading"}
+
+    def _set_triggers(self, table: str, enabled: bool):
+        action = "ENABLE" if enabled else "DISABLE"
+        with self.conn.cursor() as cursor:
+            cursor.execute(sql.SQL(f"ALTER TABLE {{}} {action} TRIGGER USER").format(sql.Identifier(table)))
+        self.conn.commit()
+
+    # ------------------------------------------------------------------
+    # Load phases
+    # ------------------------------------------------------------------
+
+    def _copy(self, table: str, path: Path, parquet: bool, columns: List[str], job: str, state: dict):
+        copy_sql = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(
+            sql.Identifier(table),
+            sql.SQL(", ").join(sql.Identifier(c) for c in columns)
+        ).as_string(self.conn)
+
+        if parquet:
+            batches = parquet_batches(path, columns, state["rows_loaded"], self.batch_rows)
+        else:
+            batches = csv_batches(path, state["byte_offset"], self.batch_rows)
+
+        started = time.monotonic()
+        loaded = 0
+        for data, rows, offset in batches:
+            with self.conn.cursor() as cursor:
+                cursor.copy_expert(copy_sql, io.BytesIO(data))
+                cursor.execute(
+                    "UPDATE bulk_load_jobs SET rows_loaded = rows_loaded + %s, byte_offset = %s, "
+                    "updated_at = NOW() WHERE job = %s",
+                    (rows, offset, job)
+                )
+            self.conn.commit()
+            state["rows_loaded"] += rows
+            state["byte_offset"] = offset
+            loaded += rows
+            rate = loaded / max(time.monotonic() - started, 1e-6)
+            logger.info(f"  {table}: {state['rows_loaded']:,} rows ({rate:,.0f} rows/s)")
+
+        with self.conn.cursor() as cursor:
+            cursor.execute("UPDATE bulk_load_jobs SET status = 'indexing', updated_at = NOW() WHERE job = %s", (job,))
+        self.conn.commit()
+        state["status"] = "indexing"
+
+    def _finish(self, table: str, job: str, state: dict, columns: List[str]):
+        """Rebuild indexes, fix the id sequence, refresh stats and rollups"""
+        for definition in state["dropped_indexes"]:
+            definition = re.sub(r"^CREATE (UNIQUE )?INDEX ", r"CREATE \1INDEX IF NOT EXISTS ", definition)
+            logger.info(f"  rebuilding: {definition}")
+            with self.conn.cursor() as cursor:
+                cursor.execute(definition)
+            self.conn.commit()
+
+        with self.conn.cursor() as cursor:
+            if "id" in columns:
+                cursor.execute(
+                    sql.SQL(
+                        "SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {}"
+                    ).format(sql.Identifier(table)),
+                    (table,)
+                )
+            if self.disable_triggers and table in ROLLUP_TABLES:
+                cursor.execute("SELECT to_regproc('rebuild_dashboard_rollups') IS NOT NULL")
+                if cursor.fetchone()[0]:
+                    logger.info("  rebuilding dashboard rollups")
+                    cursor.execute("SELECT rebuild_dashboard_rollups()")
+            cursor.execute("UPDATE bulk_load_jobs SET status = 'done', updated_at = NOW() WHERE job = %s", (job,))
+        self.conn.commit()
+        state["status"] = "done"
+
+        self.conn.autocommit = True
+        try:
+            with self.conn.cursor() as cursor:
+                cursor.execute(sql.SQL("ANALYZE {}").format(sql.Identifier(table)))
+        finally:
+            self.conn.autocommit = False
@@ -0,0 +1,280 @@
+"""
+Dashboard Cache Layer
+TTL/LRU cache in front of the dashboard repository queries.
+
+- In-process TTL/LRU cache (always on)
+- Optional shared Redis backend (CACHE_REDIS_ENABLED + REDIS_URL) so that
+  several uvicorn workers share results
+- Request coalescing: concurrent misses for the same key wait on a single
+  in-flight load, so N polling browser tabs cost one query per TTL window
+- Encoded payloads (JSON body, ETag, gzip/brotli) stored next to each
+  value, so HTTP handlers and 304 checks never re-serialize or query
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..config import config
+from ..http_cache import EncodedPayload, encode_payload
+from ..llm_cache import invalidate_llm_cache
+
+try:
+    import redis.asyncio as redis_asyncio
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis_asyncio = None
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """In-process LRU cache with per-entry TTL"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look up a key
+
+        Returns:
+            (found, value)
+        """
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return False, None
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key: str, value: Any, ttl: float):
+        """Store a value for ttl seconds"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_prefix(self, prefix: str):
+        """Remove all keys starting with prefix"""
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """Shared cache backend on Redis (values stored as JSON)"""
+
+    def __init__(self, url: str, namespace: str = "scc:dashboard:"):
+        self.namespace = namespace
+        self._client = redis_asyncio.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0)
+
+    async def get(self, key: str) -> Tuple[bool, Any]:
+        raw = await self._client.get(self.namespace + key)
+        if raw is None:
+            return False, None
+        return True, json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: float):
+        await self._client.set(self.namespace + key, json.dumps(value, default=str), ex=max(1, int(ttl)))
+
+    async def delete_prefix(self, prefix: str):
+        async for key in self._client.scan_iter(match=f"{self.namespace}{prefix}*"):
+            await self._client.delete(key)
+
+    async def close(self):
+        await self._client.aclose()
+
+
+class DashboardCache:
+    """
+    Two-level cache with request coalescing.
+
+    Usage:
+        data = await dashboard_cache.get_or_load(
+            "dashboard:metrics", config.CACHE_TTL_DASHBOARD, load_metrics
+        )
+    """
+
+    def __init__(self, local: TTLCache, remote: Optional[RedisCacheBackend] = None):
+        self.local = local
+        self.remote = remote
+        self.payloads = TTLCache(max_entries=local.max_entries)  # key -> EncodedPayload
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._generation = 0  # bumped on invalidation
+        self._hits = 0
+        self._remote_hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._invalidations = 0
+
+    async def get_or_load(
+        self,
+        key: str,
+        ttl: float,
+        loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Get a cached value or load it once for all concurrent callers
+
+        Args:
+            key: Cache key
+            ttl: Time-to-live in seconds
+            loader: Coroutine function producing the value on a miss
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        found, value = self.local.get(key)
+        if found:
+            self._hits += 1
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._coalesced += 1
+            return await asyncio.shield(inflight)
+
+        # The load runs as its own task so a cancelled caller (e.g. a closed
+        # browser tab) does not cancel it for everyone else waiting on it
+        task = asyncio.ensure_future(self._load(key, ttl, loader))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._load_finished(key, t))
+        return await asyncio.shield(task)
+
+    async def get_or_load_payload(
+        self,
+        key: str,
+        ttl: float,
+        loader: Callable[[], Awaitable[Any]]
+    ) -> EncodedPayload:
+        """
+        Like get_or_load, but returns the encoded HTTP payload for the value
+
+        The payload is built once when the value is cached, so serving it
+        (or answering If-None-Match with 304) costs no query and no
+        serialization while the entry is fresh.
+        """
+        found, payload = self.payloads.get(key)
+        if found:
+            self._hits += 1
+            return payload
+
+        value = await self.get_or_load(key, ttl, loader)
+        found, payload = self.payloads.get(key)
+        return payload if found else encode_payload(value)
+
+    def _store(self, key: str, value: Any, ttl: float):
+        """Store a value and its encoded payload locally"""
+        self.local.set(key, value, ttl)
+        self.payloads.set(key, encode_payload(value), ttl)
+
+    def _load_finished(self, key: str, task: asyncio.Task):
+        """Forget a finished in-flight load"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Dashboard cache load failed for {key}: {task.exception()}")
+
+    async def _load(self, key: str, ttl: float, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Load from Redis or the loader, then populate both levels"""
+        generation = self._generation
+        if self.remote is not None:
+            try:
+                found, value = await self.remote.get(key)
+                if found:
+                    self._remote_hits += 1
+                    self._store(key, value, ttl)
+                    return value
+            except Exception as e:
+                logger.warning(f"Redis cache read failed for {key}: {e}")
+
+        self._misses += 1
+        value = await loader()
+        if generation != self._generation:
+            # Data changed while loading - serve the value but don't cache it
+            return value
+        self._store(key, value, ttl)
+
+        if self.remote is not None:
+            try:
+                await self.remote.set(key, value, ttl)
+            except Exception as e:
+                logger.warning(f"Redis cache write failed for {key}: {e}")
+
+        return value
+
+    async def invalidate(self, prefix: str = ""):
+        """
+        Drop cached entries (all, or those under a key prefix) after the
+        underlying data changed. Cached LLM answers are dropped as well,
+        since they may quote the old numbers.
+        """
+        self._invalidations += 1
+        self._generation += 1
+        for key in [k for k in self._inflight if k.startswith(prefix)]:
+            del self._inflight[key]
+        self.local.delete_prefix(prefix)
+        self.payloads.delete_prefix(prefix)
+        if self.remote is not None:
+            try:
+                await self.remote.delete_prefix(prefix)
+            except Exception as e:
+                logger.warning(f"Redis cache invalidation failed for {prefix!r}: {e}")
+
+        invalidate_llm_cache()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache statistics for monitoring"""
+        lookups = self._hits + self._remote_hits + self._misses + self._coalesced
+        return {
+            "entries": len(self.local),
+            "backend": "memory+redis" if self.remote is not None else "memory",
+            "hits": self._hits,
+            "remote_hits": self._remote_hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "hit_rate": round((lookups - self._misses) / lookups, 3) if lookups else 0.0,
+            "invalidations": self._invalidations
+        }
+
+    async def close(self):
+        """Close the remote backend"""
+        if self.remote is not None:
+            await self.remote.close()
+
+
+def _create_dashboard_cache() -> DashboardCache:
+    """Build the dashboard cache from configuration"""
+    remote = None
+    if config.CACHE_REDIS_ENABLED:
+        if REDIS_AVAILABLE:
+            remote = RedisCacheBackend(config.get_redis_url())
+            logger.info("Dashboard cache using Redis backend")
+        else:
+            logger.warning("CACHE_REDIS_ENABLED is set but the redis package is not installed")
+    return DashboardCache(TTLCache(max_entries=config.CACHE_MAX_ENTRIES), remote)
+
+
+# Global dashboard cache
+dashboard_cache = _create_dashboard_cache()
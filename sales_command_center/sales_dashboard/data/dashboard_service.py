@@ -0,0 +1,183 @@
+"""
+Dashboard Service
+Builds the dashboard API payloads from DashboardRepository through the
+dashboard cache layer.
+
+Each public loader returns the exact JSON shape the frontend expects and
+is cached under its own key, so every metric hits Postgres at most once
+per TTL window no matter how many clients are polling.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import logging
+
+from ..config import config
+from ..http_cache import EncodedPayload
+from .cache import dashboard_cache
+from .database import get_async_db_session
+from .repositories.dashboard_repository import AsyncDashboardRepository
+
+logger = logging.getLogger(__name__)
+
+# Canonical funnel order for pipeline stages
+FUNNEL_STAGES = ["lead", "qualified", "proposal", "negotiation", "closed_won"]
+
+
+def _millions(value: float) -> float:
+    """Convert a dollar amount to millions for chart data"""
+    return round(value / 1_000_000, 2)
+
+
+async def _query(fn: Callable[[AsyncDashboardRepository], Awaitable[Any]]) -> Any:
+    """Run a repository call on its own pooled async session"""
+    async with get_async_db_session() as db:
+        return await fn(AsyncDashboardRepository(db))
+
+
+# ============================================
+# Loaders (cache misses only)
+# ============================================
+
+async def _load_metrics() -> Dict[str, Any]:
+    metrics = await _query(lambda repo: repo.get_overview_metrics())
+    return {
+        "orders_fulfilled_today": metrics["orders_fulfilled"],
+        "orders_fulfilled_change": metrics["orders_fulfilled_change"],
+        "orders_pending": metrics["orders_pending"],
+        "orders_pending_value": metrics["orders_pending_value"],
+        "orders_received_today": metrics["orders_received"],
+        "orders_received_value": metrics["orders_received_value"],
+        "pipeline_value": metrics["pipeline_value"],
+        "pipeline_deals": metrics["pipeline_deals"],
+        "win_rate": metrics["win_rate"],
+        "win_rate_change": metrics["win_rate_change"],
+        "today_revenue": metrics["today_revenue"],
+        "quarter_progress": metrics["quarter_progress"]
+    }
+
+
+async def _load_revenue_trend(days: int = 7) -> Dict[str, Any]:
+    trend = await _query(lambda repo: repo.get_revenue_trend(days))
+    by_date = {row["date"]: row["revenue"] for row in trend}
+
+    # Fill days without fulfilled orders so the chart always has N points
+    start = datetime.now().date() - timedelta(days=days - 1)
+    dates = [start + timedelta(days=i) for i in range(days)]
+    return {
+        "labels": [d.strftime("%a") for d in dates],
+        "data": [_millions(by_date.get(str(d), 0.0)) for d in dates]
+    }
+
+
+async def _load_regional_performance() -> Dict[str, Any]:
+    regions = await _query(lambda repo: repo.get_regional_performance())
+    return {
+        "labels": [row["region"] for row in regions],
+        "data": [_millions(row["revenue"]) for row in regions]
+    }
+
+
+async def _load_pipeline_funnel() -> Dict[str, Any]:
+    summary = await _query(lambda repo: repo.get_pipeline_summary())
+    by_stage = {row["stage"]: row for row in summary["stages"]}
+    stages = [s for s in FUNNEL_STAGES if s in by_stage]
+    return {
+        "stages": [s.replace("_", " ").title() for s in stages],
+        "deal_counts": [by_stage[s]["count"] for s in stages],
+        "values": [_millions(by_stage[s]["total_value"]) for s in stages]
+    }
+
+
+async def _load_product_performance() -> Dict[str, Any]:
+    products = await _query(lambda repo: repo.get_product_performance())
+    return {
+        "products": [row["product"] for row in products],
+        "revenue": [_millions(row["revenue"]) for row in products],
+        "units": [row["units"] for row in products]
+    }
+
+
+async def _load_recent_orders() -> Dict[str, Any]:
+    orders = await _query(lambda repo: repo.get_recent_orders())
+    return {"orders": orders}
+
+
+async def _load_top_performers() -> Dict[str, Any]:
+    performers = await _query(lambda repo: repo.get_top_performers())
+    return {"performers": performers}
+
+
+async def _load_critical_alerts() -> Dict[str, Any]:
+    alerts = await _query(lambda repo: repo.get_critical_alerts())
+    return {"alerts": alerts}
+
+
+# ============================================
+# Cached sections
+# ============================================
+
+# Section name -> (cache key, TTL seconds, loader)
+SECTIONS: Dict[str, Tuple[str, int, Callable[[], Awaitable[Dict[str, Any]]]]] = {
+    "metrics": ("dashboard:metrics", config.CACHE_TTL_DASHBOARD, _load_metrics),
+    "revenue_trend": ("dashboard:revenue-trend", config.CACHE_TTL_DASHBOARD, _load_revenue_trend),
+    "regional_performance": ("dashboard:regional-performance", config.CACHE_TTL_DASHBOARD, _load_regional_performance),
+    "top_performers": ("dashboard:top-performers", config.CACHE_TTL_DASHBOARD, _load_top_performers),
+    "alerts": ("dashboard:alerts", config.CACHE_TTL_DASHBOARD, _load_critical_alerts),
+    "pipeline_funnel": ("pipeline:funnel", config.CACHE_TTL_PIPELINE, _load_pipeline_funnel),
+    "products": ("products:performance", config.CACHE_TTL_DASHBOARD, _load_product_performance),
+    "orders": ("orders:recent", config.CACHE_TTL_ORDERS, _load_recent_orders)
+}
+
+
+async def get_section(name: str) -> Dict[str, Any]:
+    """Cached data for one dashboard section"""
+    key, ttl, loader = SECTIONS[name]
+    return await dashboard_cache.get_or_load(key, ttl, loader)
+
+
+async def get_section_payload(name: str) -> EncodedPayload:
+    """Cached, pre-encoded HTTP payload (JSON + ETag) for one dashboard section"""
+    key, ttl, loader = SECTIONS[name]
+    return await dashboard_cache.get_or_load_payload(key, ttl, loader)
+
+
+# ============================================
+# Snapshot (all sections in one response)
+# ============================================
+
+async def _snapshot_section(name: str, timeout: float):
+    """Load one snapshot section, turning failures into an error string"""
+    try:
+        return name, await asyncio.wait_for(get_section(name), timeout), None
+    except asyncio.TimeoutError:
+        # The cache load itself is shielded and keeps running, so the next
+        # snapshot picks up the result
+        logger.warning(f"Snapshot section {name} timed out after {timeout}s")
+        return name, None, "timeout"
+    except Exception as e:
+        logger.error(f"Snapshot section {name} failed: {e}")
+        return name, None, "unavailable"
+
+
+async def get_snapshot(timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Every dashboard section in one payload for /api/dashboard/snapshot
+
+    Sections load concurrently, each through its usual cache key and (on a
+    miss) its own pooled connection, so wall time is the slowest section
+    rather than the sum. A section that fails or exceeds the timeout is
+    returned as null with an entry in "errors"; the rest are still served.
+
+    Args:
+        timeout: Per-section timeout in seconds (default SNAPSHOT_SECTION_TIMEOUT)
+    """
+    timeout = timeout or config.SNAPSHOT_SECTION_TIMEOUT
+    results = await asyncio.gather(*(_snapshot_section(name, timeout) for name in SECTIONS))
+
+    # No timestamp in the payload, so an unchanged snapshot keeps its ETag
+    return {
+        "sections": {name: data for name, data, _ in results},
+        "errors": {name: error for name, _, error in results if error}
+    }
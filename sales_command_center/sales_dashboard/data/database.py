@@ -1,20 +1,52 @@
 """
 Database Connection and Session Management
+
+Two engines share the same database and pool settings:
+- engine / SessionLocal (psycopg2): scripts, agents and other sync code
+- async_engine / AsyncSessionLocal (asyncpg): FastAPI handlers, so queries
+  never block the event loop
 """
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 import logging
 
 from ..config import config
 
 logger = logging.getLogger(__name__)
 
+
+def _database_url(driver: str) -> str:
+    """
+    Database URL for a specific driver.
+
+    Render provides postgres:// URLs, and newer SQLAlchemy versions map a
+    bare postgresql:// to psycopg 3, so the driver is set explicitly.
+    """
+    url = config.get_database_url()
+    if url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
+    if url.startswith("postgresql://"):
+        url = url.replace("postgresql://", f"postgresql+{driver}://", 1)
+    return url
+
+
+def _sync_database_url() -> str:
+    """Database URL for the psycopg2 driver"""
+    return _database_url("psycopg2")
+
+
+def _async_database_url() -> str:
+    """Database URL for the asyncpg driver"""
+    return _database_url("asyncpg")
+
+
 # Create SQLAlchemy engine
 engine = create_engine(
-    config.DATABASE_URL,
+    _sync_database_url(),
     pool_size=config.DATABASE_POOL_SIZE,
     max_overflow=config.DATABASE_MAX_OVERFLOW,
     pool_pre_ping=True,  # Verify connections before using
@@ -24,6 +56,19 @@ engine = create_engine(
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for the FastAPI app. Each in-flight query holds one pooled
+# connection, so pool_size + max_overflow bounds concurrency per worker.
+async_engine = create_async_engine(
+    _async_database_url(),
+    pool_size=config.DATABASE_POOL_SIZE,
+    max_overflow=config.DATABASE_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    echo=config.DEBUG
+)
+
+# Async session factory (expire_on_commit=False so results stay usable after commit)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Base class for models
 Base = declarative_base()
 
@@ -64,6 +109,37 @@ def get_db_session():
         db.close()
 
 
+async def get_async_db():
+    """
+    Dependency for FastAPI to get an async database session
+
+    Usage:
+        @app.get("/endpoint")
+        async def endpoint(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(...)
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+@asynccontextmanager
+async def get_async_db_session():
+    """
+    Async context manager for database sessions
+
+    Usage:
+        async with get_async_db_session() as db:
+            result = await db.execute(text("SELECT 1"))
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Database error: {str(e)}")
+            raise
+
+
 def init_db():
     """Initialize database (create tables if they don't exist)"""
     Base.metadata.create_all(bind=engine)
@@ -74,3 +150,9 @@ def close_db():
     """Close all database connections"""
     engine.dispose()
     logger.info("Database connections closed")
+
+
+async def close_async_db():
+    """Close all async database connections"""
+    await async_engine.dispose()
+    logger.info("Async database connections closed")
@@ -0,0 +1,342 @@
+"""
+Schema Migrations
+Versioned, idempotent schema setup on top of schema.sql
+
+schema.sql is the baseline (version 000) and always describes the current
+schema. Changes to an existing database go in database/migrations/NNN_name.sql
+(and are mirrored in schema.sql). Applied versions are recorded in the
+schema_migrations table, so running the migrator again only applies what
+is new:
+
+- Fresh database: run schema.sql, record it and every migration file it
+  already contains, then load seed_data.sql.
+- Database created before migrations were tracked (tables exist, no
+  schema_migrations): record the baseline without running it (schema.sql
+  drops tables) and apply every migration file.
+- Tracked database: apply pending migration files in version order.
+
+Each migration runs in its own transaction together with its
+schema_migrations row. Files using CREATE/DROP INDEX CONCURRENTLY cannot
+run in a transaction; they run statement by statement and must be safe to
+re-run (IF [NOT] EXISTS), since a failure leaves them partly applied.
+
+A Postgres advisory lock keeps two deploys from migrating at once.
+"""
+
+import hashlib
+import logging
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DATABASE_DIR = Path(__file__).resolve().parent.parent / "database"
+SCHEMA_PATH = DATABASE_DIR / "schema.sql"
+SEED_PATH = DATABASE_DIR / "seed_data.sql"
+MIGRATIONS_DIR = DATABASE_DIR / "migrations"
+
+BASELINE_VERSION = "000"
+
+# Arbitrary constant shared by every migrator process
+MIGRATION_LOCK_ID = 72_510_001
+
+_MIGRATION_FILE_RE = re.compile(r"^(\d+)_(\w+)\.sql$")
+_NON_TRANSACTIONAL_RE = re.compile(r"\bCONCURRENTLY\b", re.IGNORECASE)
+
+CREATE_MIGRATIONS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version VARCHAR(20) PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        checksum VARCHAR(64) NOT NULL,
+        execution_ms INT, -- NULL = included in the baseline, not run separately
+        applied_at TIMESTAMP DEFAULT NOW()
+    )
+"""
+
+
+@dataclass(frozen=True)
+class Migration:
+    """A migration SQL file"""
+    version: str
+    name: str
+    path: Path
+
+    @property
+    def sql(self) -> str:
+        return self.path.read_text(encoding="utf-8")
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.path.read_bytes()).hexdigest()
+
+    @property
+    def transactional(self) -> bool:
+        return not _NON_TRANSACTIONAL_RE.search(_strip_comments(self.sql))
+
+
+def discover_migrations(directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+    """Migration files in version order"""
+    migrations = []
+    for path in sorted(directory.glob("*.sql")):
+        match = _MIGRATION_FILE_RE.match(path.name)
+        if not match:
+            logger.warning(f"Ignoring {path.name}: expected NNN_name.sql")
+            continue
+        migrations.append(Migration(version=match.group(1), name=match.group(2), path=path))
+
+    versions = [m.version for m in migrations]
+    duplicates = {v for v in versions if versions.count(v) > 1}
+    if duplicates:
+        raise ValueError(f"Duplicate migration versions: {sorted(duplicates)}")
+    return sorted(migrations, key=lambda m: int(m.version))
+
+
+# ============================================
+# SQL splitting (non-transactional migrations)
+# ============================================
+
+def _strip_comments(sql: str) -> str:
+    return "\n".join(line for line in sql.splitlines() if not line.lstrip().startswith("--"))
+
+
+def split_sql(sql: str) -> List[str]:
+    """
+    Split a SQL script into statements
+
+    Handles -- and /* */ comments, quoted strings/identifiers and
+    dollar-quoted bodies ($$ ... $$, $fn$ ... $fn$).
+    """
+    statements, current = [], []
+    i, n = 0, len(sql)
+    while i < n:
+        ch = sql[i]
+        if sql.startswith("--", i):
+            end = sql.find("\n", i)
+            i = n if end == -1 else end + 1
+            continue
+        if sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        if ch in ("'", '"'):
+            end = i + 1
+            while end < n:
+                if sql[end] == ch:
+                    if end + 1 < n and sql[end + 1] == ch:  # escaped quote
+                        end += 2
+                        continue
+                    break
+                end += 1
+            current.append(sql[i:end + 1])
+            i = end + 1
+            continue
+        if ch == "$":
+            tag = re.match(r"\$[A-Za-z_]*\$", sql[i:])
+            if tag:
+                close = sql.find(tag.group(0), i + len(tag.group(0)))
+                end = n if close == -1 else close + len(tag.group(0))
+                current.append(sql[i:end])
+                i = end
+                continue
+        if ch == ";":
+            statement = "".join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+        else:
+            current.append(ch)
+        i += 1
+
+    statement = "".join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+# ============================================
+# Runner
+# ============================================
+
+class MigrationRunner:
+    """
+    Applies schema.sql and migration files to a database.
+
+    Usage:
+        conn = psycopg2.connect(url)
+        applied = MigrationRunner(conn).migrate()
+    """
+
+    def __init__(self, conn, migrations_dir: Path = MIGRATIONS_DIR):
+        """
+        Args:
+            conn: psycopg2 connection (autocommit off)
+            migrations_dir: Directory of NNN_name.sql files
+        """
+        self.conn = conn
+        self.migrations = discover_migrations(migrations_dir)
+
+    def _table_exists(self, name: str) -> bool:
+        with self.conn.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (f"public.{name}",))
+            return cursor.fetchone()[0]
+
+    def applied(self) -> Dict[str, Dict]:
+        """Applied versions -> {name, checksum, execution_ms, applied_at}"""
+        if not self._table_exists("schema_migrations"):
+            return {}
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT version, name, checksum, execution_ms, applied_at FROM schema_migrations ORDER BY version"
+            )
+            rows = cursor.fetchall()
+        self.conn.rollback()
+        return {
+            row[0]: {"name": row[1], "checksum": row[2], "execution_ms": row[3], "applied_at": row[4]}
+            for row in rows
+        }
+
+    def pending(self) -> List[Migration]:
+        """Migration files not yet applied"""
+        applied = self.applied()
+        return [m for m in self.migrations if m.version not in applied]
+
+    def status(self) -> List[Dict]:
+        """Every known version with its state, for display"""
+        applied = self.applied()
+        rows = []
+        if BASELINE_VERSION in applied:
+            rows.append({"version": BASELINE_VERSION, "name": "schema", "state": "applied",
+                         "applied_at": applied[BASELINE_VERSION]["applied_at"]})
+        for migration in self.migrations:
+            record = applied.get(migration.version)
+            if record is None:
+                state = "pending"
+            elif record["checksum"] != migration.checksum:
+                state = "changed since applied"
+            else:
+                state = "applied"
+            rows.append({"version": migration.version, "name": migration.name, "state": state,
+                         "applied_at": record["applied_at"] if record else None})
+        return rows
+
+    def migrate(self, seed: bool = True) -> List[str]:
+        """
+        Bring the database up to date
+
+        Args:
+            seed: Load seed_data.sql when creating a fresh database
+
+        Returns:
+            Versions applied in this run
+        """
+        with self.conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+        try:
+            return self._migrate(seed)
+        finally:
+            self.conn.rollback()
+            with self.conn.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+            self.conn.commit()
+
+    def _migrate(self, seed: bool) -> List[str]:
+        tracked = self._table_exists("schema_migrations")
+        legacy = not tracked and self._table_exists("regions")
+
+        with self.conn.cursor() as cursor:
+            cursor.execute(CREATE_MIGRATIONS_TABLE_SQL)
+        self.conn.commit()
+
+        applied_now = []
+        if not tracked and not legacy:
+            logger.info("Creating database schema (baseline)")
+            self._run_baseline()
+            applied_now.append(BASELINE_VERSION)
+            if seed and SEED_PATH.exists():
+                self._run_seed()
+            return applied_now
+
+        if legacy:
+            logger.info("Existing schema without migration history: recording baseline")
+            self._record(BASELINE_VERSION, "schema", _file_checksum(SCHEMA_PATH), None)
+            self.conn.commit()
+
+        applied = self.applied()
+        for migration in self.migrations:
+            record = applied.get(migration.version)
+            if record is not None:
+                if record["checksum"] != migration.checksum:
+                    logger.warning(f"Migration {migration.path.name} changed after it was applied")
+                continue
+            self._apply(migration)
+            applied_now.append(migration.version)
+
+        if not applied_now:
+            logger.info("Database schema is up to date")
+        return applied_now
+
+    def _run_baseline(self):
+        """schema.sql already contains every migration file present"""
+        started = time.monotonic()
+        with self.conn.cursor() as cursor:
+            cursor.execute(SCHEMA_PATH.read_text(encoding="utf-8"))
+            cursor.execute(CREATE_MIGRATIONS_TABLE_SQL)  # schema.sql may drop/recreate objects
+        self._record(BASELINE_VERSION, "schema", _file_checksum(SCHEMA_PATH), _elapsed_ms(started))
+        for migration in self.migrations:
+            self._record(migration.version, migration.name, migration.checksum, None)
+        self.conn.commit()
+
+    def _run_seed(self):
+        logger.info("Loading seed data")
+        try:
+            with self.conn.cursor() as cursor:
+                cursor.execute(SEED_PATH.read_text(encoding="utf-8"))
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            logger.warning(f"Failed to load seed data (non-critical): {e}")
+
+    def _apply(self, migration: Migration):
+        logger.info(f"Applying migration {migration.path.name}")
+        started = time.monotonic()
+        try:
+            if migration.transactional:
+                with self.conn.cursor() as cursor:
+                    cursor.execute(migration.sql)
+            else:
+                self.conn.commit()
+                self.conn.autocommit = True
+                try:
+                    with self.conn.cursor() as cursor:
+                        for statement in split_sql(migration.sql):
+                            cursor.execute(statement)
+                finally:
+                    self.conn.autocommit = False
+            self._record(migration.version, migration.name, migration.checksum, _elapsed_ms(started))
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            logger.error(f"Migration {migration.path.name} failed")
+            raise
+
+    def _record(self, version: str, name: str, checksum: str, execution_ms: Optional[int]):
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO schema_migrations (version, name, checksum, execution_ms)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (version) DO NOTHING
+                """,
+                (version, name, checksum, execution_ms)
+            )
+
+
+def _file_checksum(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _elapsed_ms(started: float) -> int:
+    return int((time.monotonic() - started) * 1000)
@@ -1,104 +1,462 @@
 """
 Dashboard Repository
 Handles all dashboard data queries
+
+DashboardRepository runs on a sync Session (agents, scripts) and
+AsyncDashboardRepository on an AsyncSession (FastAPI handlers). Both share
+the SQL and row mapping below, so they always return the same shapes.
 """
 
-from typing import Dict, Any, List
-from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+from datetime import date, datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, desc, and_, or_, text
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Headline metrics in one statement. Order and pipeline totals come from
+# the trigger-maintained rollups (see database/migrations/001_dashboard_rollups.sql),
+# so their cost does not grow with the orders table:
+# - day_orders: today vs yesterday
+# - quarter: fulfilled revenue since the start of the quarter
+# - wins: deals closed in the last 60 days (last 30 vs previous 30)
+# - quota: monthly quota of active reps, scaled to a quarter
+OVERVIEW_METRICS_SQL = """
+    WITH day_orders AS (
+        SELECT
+            SUM(order_count) FILTER (WHERE day = :today AND status = 'fulfilled') as orders_fulfilled,
+            SUM(order_count) FILTER (WHERE day = :today AND status = 'pending') as orders_pending,
+            SUM(order_count) FILTER (WHERE day = :today) as orders_received,
+            SUM(total_revenue) FILTER (WHERE day = :today AND status = 'fulfilled') as revenue_fulfilled,
+            SUM(total_revenue) FILTER (WHERE day = :today AND status = 'pending') as revenue_pending,
+            SUM(total_revenue) FILTER (WHERE day = :today) as total_revenue,
+            SUM(order_count) FILTER (WHERE day = :yesterday) as yesterday_orders
+        FROM daily_order_rollup
+        WHERE day >= :yesterday
+          AND day <= :today
+    ),
+    quarter_orders AS (
+        SELECT SUM(total_revenue) as revenue
+        FROM daily_order_rollup
+        WHERE day >= :quarter_start
+          AND day <= :today
+          AND status = 'fulfilled'
+    ),
+    open_pipeline AS (
+        SELECT
+            SUM(deal_count) as total_deals,
+            SUM(total_value) as total_value
+        FROM pipeline_stage_rollup
+        WHERE outcome IN ('open', 'won')
+    ),
+    wins AS (
+        SELECT
+            COUNT(*) FILTER (WHERE actual_close_date >= :thirty_days_ago AND is_won = TRUE) as won,
+            COUNT(*) FILTER (WHERE actual_close_date >= :thirty_days_ago AND is_won IS NOT NULL) as closed,
+            COUNT(*) FILTER (WHERE actual_close_date < :thirty_days_ago AND is_won = TRUE) as prev_won,
+            COUNT(*) FILTER (WHERE actual_close_date < :thirty_days_ago AND is_won IS NOT NULL) as prev_closed
+        FROM pipeline
+        WHERE actual_close_date >= :sixty_days_ago
+    ),
+    quota AS (
+        SELECT SUM(quota_monthly) * 3 as quarter_quota
+        FROM users
+        WHERE is_active = TRUE
+          AND quota_monthly IS NOT NULL
+    )
+    SELECT
+        d.orders_fulfilled,
+        d.orders_pending,
+        d.orders_received,
+        d.revenue_fulfilled,
+        d.revenue_pending,
+        d.total_revenue,
+        d.yesterday_orders,
+        p.total_deals,
+        p.total_value,
+        w.won,
+        w.closed,
+        w.prev_won,
+        w.prev_closed,
+        q.revenue as quarter_revenue,
+        qt.quarter_quota
+    FROM day_orders d, open_pipeline p, wins w, quarter_orders q, quota qt
+"""
+
+
+def overview_params(now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Range boundaries for OVERVIEW_METRICS_SQL"""
+    today = (now or datetime.now()).date()
+    quarter_month = 3 * ((today.month - 1) // 3) + 1
+    return {
+        "today": today,
+        "yesterday": today - timedelta(days=1),
+        "quarter_start": date(today.year, quarter_month, 1),
+        "thirty_days_ago": today - timedelta(days=30),
+        "sixty_days_ago": today - timedelta(days=60)
+    }
+
+
+def _percent(part, whole) -> float:
+    """Percentage rounded to 2 places (0 when whole is empty)"""
+    return round(100.0 * part / whole, 2) if whole else 0.0
+
+
+def overview_metrics_from_row(row) -> Dict[str, Any]:
+    """Map an OVERVIEW_METRICS_SQL row to the overview metrics dict"""
+    (orders_fulfilled, orders_pending, orders_received, revenue_fulfilled, revenue_pending,
+     total_revenue, yesterday_orders, total_deals, total_value, won, closed,
+     prev_won, prev_closed, quarter_revenue, quarter_quota) = row
+
+    # Rollup sums come back as NUMERIC
+    orders_received = int(orders_received or 0)
+    yesterday_orders = int(yesterday_orders or 0)
+
+    # Calculate percentage changes
+    orders_change = 0
+    if yesterday_orders:
+        orders_change = round(((orders_received - yesterday_orders) / yesterday_orders) * 100, 1)
+
+    win_rate = _percent(won, closed)
+    win_rate_change = round(win_rate - _percent(prev_won, prev_closed), 2) if prev_closed else 0
+
+    return {
+        "orders_fulfilled": int(orders_fulfilled or 0),
+        "orders_fulfilled_change": orders_change,
+        "orders_pending": int(orders_pending or 0),
+        "orders_pending_value": float(revenue_pending or 0),
+        "orders_received": orders_received,
+        "orders_received_value": float(total_revenue or 0),
+        "pipeline_value": float(total_value or 0),
+        "pipeline_deals": int(total_deals or 0),
+        "win_rate": win_rate,
+        "win_rate_change": win_rate_change,
+        "today_revenue": float(revenue_fulfilled or 0),
+        "quarter_progress": round(_percent(float(quarter_revenue or 0), float(quarter_quota or 0)), 1)
+    }
+
+
+# ============================================
+# Shared SQL
+# ============================================
+
+REVENUE_TREND_SQL = """
+    SELECT
+        day as date,
+        SUM(total_revenue) as revenue,
+        SUM(order_count) as order_count
+    FROM daily_order_rollup
+    WHERE day >= :start_date
+      AND status = 'fulfilled'
+    GROUP BY day
+    HAVING SUM(order_count) > 0
+    ORDER BY date
+"""
+
+REGIONAL_PERFORMANCE_SQL = """
+    SELECT
+        r.name as region,
+        SUM(d.order_count) as order_count,
+        SUM(d.total_revenue) as total_revenue,
+        SUM(d.total_revenue) / NULLIF(SUM(d.order_count), 0) as avg_order_value
+    FROM daily_order_rollup d
+    JOIN regions r ON d.region_id = r.id
+    WHERE d.day >= :thirty_days_ago
+    GROUP BY r.id, r.name
+    HAVING SUM(d.order_count) > 0
+    ORDER BY total_revenue DESC
+"""
+
+TOP_PERFORMERS_SQL = """
+    SELECT
+        u.id,
+        u.first_name || ' ' || u.last_name as name,
+        SUM(d.order_count) as deals_closed,
+        SUM(d.total_revenue) as total_revenue
+    FROM daily_order_rollup d
+    JOIN users u ON d.sales_rep_id = u.id
+    WHERE d.day >= :thirty_days_ago
+      AND d.status = 'fulfilled'
+    GROUP BY u.id, u.first_name, u.last_name
+    HAVING SUM(d.order_count) > 0
+    ORDER BY total_revenue DESC
+    LIMIT :limit
+"""
+
+# Large pending orders (> 3 days). The order_date bound is written so it can
+# use an index (same rows as CURRENT_DATE - DATE(order_date) > 3), and the
+# status/amount predicate matches idx_orders_pending_large exactly.
+PENDING_ORDER_ALERTS_SQL = """
+    SELECT
+        o.order_number,
+        c.company_name,
+        o.total_amount,
+        CURRENT_DATE - DATE(o.order_date) as days_pending
+    FROM orders o
+    JOIN customers c ON o.customer_id = c.id
+    WHERE o.status = 'pending'
+      AND o.order_date < CURRENT_DATE - 3
+      AND o.total_amount > 100000
+    ORDER BY o.total_amount DESC
+    LIMIT 3
+"""
+
+# Stalled pipeline deals (> 45 days in stage)
+STALLED_DEAL_ALERTS_SQL = """
+    SELECT
+        p.opportunity_name,
+        c.company_name,
+        p.amount,
+        p.days_in_stage
+    FROM pipeline p
+    JOIN customers c ON p.customer_id = c.id
+    WHERE p.days_in_stage > 45
+      AND (p.is_won IS NULL)
+    ORDER BY p.amount DESC
+    LIMIT 2
+"""
+
+PIPELINE_SUMMARY_SQL = """
+    SELECT * FROM pipeline_by_stage
+"""
+
+AT_RISK_DEALS_SQL = """
+    SELECT
+        p.id,
+        p.opportunity_name,
+        c.company_name,
+        p.stage,
+        p.amount,
+        p.probability,
+        p.days_in_stage,
+        u.first_name || ' ' || u.last_name as owner
+    FROM pipeline p
+    JOIN customers c ON p.customer_id = c.id
+    LEFT JOIN users u ON p.owner_id = u.id
+    WHERE p.days_in_stage > :threshold
+      AND (p.is_won IS NULL)
+    ORDER BY p.amount DESC
+"""
+
+PRODUCT_PERFORMANCE_SQL = """
+    SELECT
+        p.name,
+        SUM(oi.line_total) as revenue,
+        SUM(oi.quantity) as units
+    FROM order_items oi
+    JOIN orders o ON oi.order_id = o.id
+    JOIN products p ON oi.product_id = p.id
+    WHERE o.order_date >= :start_date
+      AND o.status <> 'cancelled'
+    GROUP BY p.id, p.name
+    ORDER BY revenue DESC
+    LIMIT :limit
+"""
+
+TOP_CUSTOMERS_SQL = """
+    SELECT
+        c.company_name,
+        c.industry,
+        r.name as region,
+        COUNT(o.id) as order_count,
+        SUM(o.total_amount) as revenue,
+        MAX(o.order_date) as last_order_date
+    FROM orders o
+    JOIN customers c ON o.customer_id = c.id
+    LEFT JOIN regions r ON c.region_id = r.id
+    WHERE o.order_date >= :start_date
+      AND o.status <> 'cancelled'
+    GROUP BY c.id, c.company_name, c.industry, r.name
+    ORDER BY revenue DESC
+    LIMIT :limit
+"""
+
+RECENT_ORDERS_SQL = """
+    SELECT
+        o.order_number,
+        c.company_name,
+        o.total_amount,
+        o.status,
+        o.order_date
+    FROM orders o
+    JOIN customers c ON o.customer_id = c.id
+    ORDER BY o.order_date DESC, o.id DESC
+    LIMIT :limit
+"""
+
+
+# ============================================
+# Shared row mapping
+# ============================================
+
+def _days_ago(days: int) -> date:
+    return datetime.now().date() - timedelta(days=days)
+
+
+def _day_start(day: date) -> datetime:
+    """Midnight of a date, for TIMESTAMP comparisons (asyncpg won't coerce a date)"""
+    return datetime.combine(day, datetime.min.time())
+
+
+def _revenue_trend_rows(results) -> List[Dict[str, Any]]:
+    return [
+        {
+            "date": str(row[0]),
+            "revenue": float(row[1]),
+            "orders": int(row[2])
+        }
+        for row in results
+    ]
+
+
+def _regional_rows(results) -> List[Dict[str, Any]]:
+    return [
+        {
+            "region": row[0],
+            "orders": int(row[1]),
+            "revenue": float(row[2]),
+            "avg_value": float(row[3])
+        }
+        for row in results
+    ]
+
+
+def _top_performer_rows(results) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": row[0],
+            "name": row[1],
+            "deals": int(row[2]),
+            "revenue": float(row[3])
+        }
+        for row in results
+    ]
+
+
+def _critical_alerts(pending_orders, stalled_deals) -> List[Dict[str, Any]]:
+    alerts = []
+
+    for order in pending_orders:
+        alerts.append({
+            "type": "order_at_risk",
+            "priority": "high",
+            "title": "Large Deal at Risk",
+            "description": f"{order[1]} order (${order[2]:,.0f}) pending for {order[3]} days",
+            "amount": float(order[2]),
+            "days": order[3]
+        })
+
+    for deal in stalled_deals:
+        alerts.append({
+            "type": "deal_stalled",
+            "priority": "medium",
+            "title": "Pipeline Deal Stalled",
+            "description": f"{deal[1]} - {deal[0]} (${deal[2]:,.0f}) stalled for {deal[3]} days",
+            "amount": float(deal[2]),
+            "days": deal[3]
+        })
+
+    return alerts
+
+
+def _pipeline_summary(results) -> Dict[str, Any]:
+    return {
+        "stages": [
+            {
+                "stage": row[0],
+                "count": int(row[1]),
+                "total_value": float(row[2]),
+                "avg_deal_size": float(row[3]),
+                "avg_days": float(row[4])
+            }
+            for row in results
+        ]
+    }
+
+
+def _at_risk_rows(results) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": row[0],
+            "name": row[1],
+            "customer": row[2],
+            "stage": row[3],
+            "amount": float(row[4]),
+            "probability": row[5],
+            "days_in_stage": row[6],
+            "owner": row[7]
+        }
+        for row in results
+    ]
+
+
+def _product_rows(results) -> List[Dict[str, Any]]:
+    return [
+        {
+            "product": row[0],
+            "revenue": float(row[1]),
+            "units": int(row[2])
+        }
+        for row in results
+    ]
+
+
+def _customer_rows(results) -> List[Dict[str, Any]]:
+    return [
+        {
+            "customer": row[0],
+            "industry": row[1],
+            "region": row[2],
+            "orders": int(row[3]),
+            "revenue": float(row[4]),
+            "last_order": row[5].strftime("%Y-%m-%d")
+        }
+        for row in results
+    ]
+
+
+def _recent_order_rows(results) -> List[Dict[str, Any]]:
+    return [
+        {
+            "order_number": row[0],
+            "customer": row[1],
+            "amount": float(row[2]),
+            "status": row[3],
+            "date": row[4].strftime("%Y-%m-%d")
+        }
+        for row in results
+    ]
+
+
 class DashboardRepository:
     """Repository for dashboard metrics and data"""
 
     def __init__(self, db: Session):
         self.db = db
 
+    def _fetch(self, what: str, sql: str, params: Optional[Dict[str, Any]] = None):
+        """Run a query and return all rows, logging failures"""
+        try:
+            return self.db.execute(text(sql), params or {}).fetchall()
+        except Exception as e:
+            logger.error(f"Error getting {what}: {str(e)}")
+            raise
+
     def get_overview_metrics(self) -> Dict[str, Any]:
         """
         Get key metrics for dashboard overview
 
+        All headline metrics come from a single statement (one round trip)
+        over the rollup tables and a bounded range of closed deals.
+
         Returns:
             Dict containing all overview metrics
         """
-        try:
-            today = datetime.now().date()
-            yesterday = today - timedelta(days=1)
-
-            # Raw SQL queries for performance
-            today_metrics = self.db.execute("""
-                SELECT
-                    COUNT(*) FILTER (WHERE status = 'fulfilled') as orders_fulfilled,
-                    COUNT(*) FILTER (WHERE status = 'pending') as orders_pending,
-                    COUNT(*) as orders_received,
-                    SUM(total_amount) FILTER (WHERE status = 'fulfilled') as revenue_fulfilled,
-                    SUM(total_amount) FILTER (WHERE status = 'pending') as revenue_pending,
-                    SUM(total_amount) as total_revenue,
-                    AVG(total_amount) as avg_order_value
-                FROM orders
-                WHERE DATE(order_date) = :today
-            """, {"today": today}).fetchone()
-
-            yesterday_metrics = self.db.execute("""
-                SELECT
-                    COUNT(*) as orders_received,
-                    SUM(total_amount) as total_revenue
-                FROM orders
-                WHERE DATE(order_date) = :yesterday
-            """, {"yesterday": yesterday}).fetchone()
-
-            # Pipeline metrics
-            pipeline_metrics = self.db.execute("""
-                SELECT
-                    COUNT(*) as total_deals,
-                    SUM(amount) as total_value,
-                    AVG(probability) as avg_probability
-                FROM pipeline
-                WHERE is_won IS NULL OR is_won = TRUE
-            """).fetchone()
-
-            # Win rate (last 30 days)
-            win_rate = self.db.execute("""
-                SELECT
-                    COUNT(*) FILTER (WHERE is_won = TRUE) as won,
-                    COUNT(*) FILTER (WHERE is_won = FALSE) as lost,
-                    CASE
-                        WHEN COUNT(*) FILTER (WHERE is_won IS NOT NULL) > 0
-                        THEN ROUND(100.0 * COUNT(*) FILTER (WHERE is_won = TRUE) /
-                             COUNT(*) FILTER (WHERE is_won IS NOT NULL), 2)
-                        ELSE 0
-                    END as win_rate
-                FROM pipeline
-                WHERE actual_close_date >= :thirty_days_ago
-            """, {"thirty_days_ago": today - timedelta(days=30)}).fetchone()
-
-            # Calculate percentage changes
-            orders_change = 0
-            if yesterday_metrics and yesterday_metrics[0] > 0:
-                orders_change = round(((today_metrics[2] - yesterday_metrics[0]) / yesterday_metrics[0]) * 100, 1)
-
-            return {
-                "orders_fulfilled": today_metrics[0] or 0,
-                "orders_fulfilled_change": orders_change,
-                "orders_pending": today_metrics[1] or 0,
-                "orders_pending_value": float(today_metrics[4] or 0),
-                "orders_received": today_metrics[2] or 0,
-                "orders_received_value": float(today_metrics[5] or 0),
-                "pipeline_value": float(pipeline_metrics[1] or 0),
-                "pipeline_deals": pipeline_metrics[0] or 0,
-                "win_rate": float(win_rate[2] or 0),
-                "win_rate_change": 0,  # Calculate vs previous month
-                "today_revenue": float(today_metrics[3] or 0),
-                "quarter_progress": 87  # Calculate from quarterly data
-            }
-
-        except Exception as e:
-            logger.error(f"Error getting overview metrics: {str(e)}")
-            raise
+        rows = self._fetch("overview metrics", OVERVIEW_METRICS_SQL, overview_params())
+        return overview_metrics_from_row(rows[0])
 
     def get_revenue_trend(self, days: int = 7) -> List[Dict[str, Any]]:
         """
@@ -110,221 +468,124 @@ class DashboardRepository:
         Returns:
             List of daily revenue data
         """
-        try:
-            start_date = datetime.now().date() - timedelta(days=days-1)
-
-            results = self.db.execute("""
-                SELECT
-                    DATE(order_date) as date,
-                    SUM(total_amount) as revenue,
-                    COUNT(*) as order_count
-                FROM orders
-                WHERE DATE(order_date) >= :start_date
-                  AND status = 'fulfilled'
-                GROUP BY DATE(order_date)
-                ORDER BY date
-            """, {"start_date": start_date}).fetchall()
-
-            return [
-                {
-                    "date": str(row[0]),
-                    "revenue": float(row[1]),
-                    "orders": row[2]
-                }
-                for row in results
-            ]
-
-        except Exception as e:
-            logger.error(f"Error getting revenue trend: {str(e)}")
-            raise
+        rows = self._fetch("revenue trend", REVENUE_TREND_SQL, {"start_date": _days_ago(days - 1)})
+        return _revenue_trend_rows(rows)
 
     def get_regional_performance(self) -> List[Dict[str, Any]]:
         """Get sales performance by region"""
-        try:
-            results = self.db.execute("""
-                SELECT
-                    r.name as region,
-                    COUNT(DISTINCT o.id) as order_count,
-                    SUM(o.total_amount) as total_revenue,
-                    AVG(o.total_amount) as avg_order_value
-                FROM orders o
-                JOIN customers c ON o.customer_id = c.id
-                JOIN regions r ON c.region_id = r.id
-                WHERE DATE(o.order_date) >= :thirty_days_ago
-                GROUP BY r.id, r.name
-                ORDER BY total_revenue DESC
-            """, {"thirty_days_ago": datetime.now().date() - timedelta(days=30)}).fetchall()
-
-            return [
-                {
-                    "region": row[0],
-                    "orders": row[1],
-                    "revenue": float(row[2]),
-                    "avg_value": float(row[3])
-                }
-                for row in results
-            ]
-
-        except Exception as e:
-            logger.error(f"Error getting regional performance: {str(e)}")
-            raise
+        rows = self._fetch("regional performance", REGIONAL_PERFORMANCE_SQL, {"thirty_days_ago": _days_ago(30)})
+        return _regional_rows(rows)
 
     def get_top_performers(self, limit: int = 5) -> List[Dict[str, Any]]:
         """Get top performing sales reps"""
-        try:
-            results = self.db.execute("""
-                SELECT
-                    u.id,
-                    u.first_name || ' ' || u.last_name as name,
-                    COUNT(DISTINCT o.id) as deals_closed,
-                    SUM(o.total_amount) as total_revenue
-                FROM users u
-                LEFT JOIN orders o ON u.id = o.sales_rep_id
-                WHERE o.order_date >= :thirty_days_ago
-                  AND o.status = 'fulfilled'
-                GROUP BY u.id, u.first_name, u.last_name
-                ORDER BY total_revenue DESC
-                LIMIT :limit
-            """, {
-                "thirty_days_ago": datetime.now().date() - timedelta(days=30),
-                "limit": limit
-            }).fetchall()
-
-            return [
-                {
-                    "id": row[0],
-                    "name": row[1],
-                    "deals": row[2],
-                    "revenue": float(row[3])
-                }
-                for row in results
-            ]
-
-        except Exception as e:
-            logger.error(f"Error getting top performers: {str(e)}")
-            raise
+        rows = self._fetch("top performers", TOP_PERFORMERS_SQL, {"thirty_days_ago": _days_ago(30), "limit": limit})
+        return _top_performer_rows(rows)
 
     def get_critical_alerts(self) -> List[Dict[str, Any]]:
         """Get critical alerts and issues"""
-        try:
-            alerts = []
-
-            # Large pending orders (> 3 days)
-            pending_orders = self.db.execute("""
-                SELECT
-                    o.order_number,
-                    c.company_name,
-                    o.total_amount,
-                    CURRENT_DATE - DATE(o.order_date) as days_pending
-                FROM orders o
-                JOIN customers c ON o.customer_id = c.id
-                WHERE o.status = 'pending'
-                  AND CURRENT_DATE - DATE(o.order_date) > 3
-                  AND o.total_amount > 100000
-                ORDER BY o.total_amount DESC
-                LIMIT 3
-            """).fetchall()
-
-            for order in pending_orders:
-                alerts.append({
-                    "type": "order_at_risk",
-                    "priority": "high",
-                    "title": "Large Deal at Risk",
-                    "description": f"{order[1]} order (${order[2]:,.0f}) pending for {order[3]} days",
-                    "amount": float(order[2]),
-                    "days": order[3]
-                })
-
-            # Stalled pipeline deals (> 45 days in stage)
-            stalled_deals = self.db.execute("""
-                SELECT
-                    p.opportunity_name,
-                    c.company_name,
-                    p.amount,
-                    p.days_in_stage
-                FROM pipeline p
-                JOIN customers c ON p.customer_id = c.id
-                WHERE p.days_in_stage > 45
-                  AND (p.is_won IS NULL)
-                ORDER BY p.amount DESC
-                LIMIT 2
-            """).fetchall()
-
-            for deal in stalled_deals:
-                alerts.append({
-                    "type": "deal_stalled",
-                    "priority": "medium",
-                    "title": "Pipeline Deal Stalled",
-                    "description": f"{deal[1]} - {deal[0]} (${deal[2]:,.0f}) stalled for {deal[3]} days",
-                    "amount": float(deal[2]),
-                    "days": deal[3]
-                })
-
-            return alerts
-
-        except Exception as e:
-            logger.error(f"Error getting critical alerts: {str(e)}")
-            raise
+        pending_orders = self._fetch("critical alerts", PENDING_ORDER_ALERTS_SQL)
+        stalled_deals = self._fetch("critical alerts", STALLED_DEAL_ALERTS_SQL)
+        return _critical_alerts(pending_orders, stalled_deals)
 
     def get_pipeline_summary(self) -> Dict[str, Any]:
         """Get pipeline summary by stage"""
-        try:
-            results = self.db.execute("""
-                SELECT * FROM pipeline_by_stage
-            """).fetchall()
-
-            return {
-                "stages": [
-                    {
-                        "stage": row[0],
-                        "count": row[1],
-                        "total_value": float(row[2]),
-                        "avg_deal_size": float(row[3]),
-                        "avg_days": float(row[4])
-                    }
-                    for row in results
-                ]
-            }
-
-        except Exception as e:
-            logger.error(f"Error getting pipeline summary: {str(e)}")
-            raise
+        return _pipeline_summary(self._fetch("pipeline summary", PIPELINE_SUMMARY_SQL))
 
     def get_at_risk_deals(self, threshold_days: int = 30) -> List[Dict[str, Any]]:
         """Get deals at risk (stalled too long)"""
-        try:
-            results = self.db.execute("""
-                SELECT
-                    p.id,
-                    p.opportunity_name,
-                    c.company_name,
-                    p.stage,
-                    p.amount,
-                    p.probability,
-                    p.days_in_stage,
-                    u.first_name || ' ' || u.last_name as owner
-                FROM pipeline p
-                JOIN customers c ON p.customer_id = c.id
-                LEFT JOIN users u ON p.owner_id = u.id
-                WHERE p.days_in_stage > :threshold
-                  AND (p.is_won IS NULL)
-                ORDER BY p.amount DESC
-            """, {"threshold": threshold_days}).fetchall()
-
-            return [
-                {
-                    "id": row[0],
-                    "name": row[1],
-                    "customer": row[2],
-                    "stage": row[3],
-                    "amount": float(row[4]),
-                    "probability": row[5],
-                    "days_in_stage": row[6],
-                    "owner": row[7]
-                }
-                for row in results
-            ]
+        rows = self._fetch("at-risk deals", AT_RISK_DEALS_SQL, {"threshold": threshold_days})
+        return _at_risk_rows(rows)
+
+    def get_product_performance(self, limit: int = 8, days: int = 30) -> List[Dict[str, Any]]:
+        """Get top products by revenue over the last N days"""
+        rows = self._fetch(
+            "product performance", PRODUCT_PERFORMANCE_SQL, {"start_date": _day_start(_days_ago(days)), "limit": limit}
+        )
+        return _product_rows(rows)
 
+    def get_top_customers(self, limit: int = 10, days: int = 90) -> List[Dict[str, Any]]:
+        """Get top customers by order value over the last N days"""
+        rows = self._fetch(
+            "top customers", TOP_CUSTOMERS_SQL, {"start_date": _day_start(_days_ago(days)), "limit": limit}
+        )
+        return _customer_rows(rows)
+
+    def get_recent_orders(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Get the most recent orders"""
+        return _recent_order_rows(self._fetch("recent orders", RECENT_ORDERS_SQL, {"limit": limit}))
+
+
+class AsyncDashboardRepository:
+    """
+    Async repository for dashboard metrics and data.
+
+    Same queries and result shapes as DashboardRepository, but awaits an
+    AsyncSession so handlers never block the event loop on Postgres.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _fetch(self, what: str, sql: str, params: Optional[Dict[str, Any]] = None):
+        """Run a query and return all rows, logging failures"""
+        try:
+            result = await self.db.execute(text(sql), params or {})
+            return result.fetchall()
         except Exception as e:
-            logger.error(f"Error getting at-risk deals: {str(e)}")
+            logger.error(f"Error getting {what}: {str(e)}")
             raise
+
+    async def get_overview_metrics(self) -> Dict[str, Any]:
+        """Get key metrics for dashboard overview (single round trip)"""
+        rows = await self._fetch("overview metrics", OVERVIEW_METRICS_SQL, overview_params())
+        return overview_metrics_from_row(rows[0])
+
+    async def get_revenue_trend(self, days: int = 7) -> List[Dict[str, Any]]:
+        """Get revenue trend for the last N days"""
+        rows = await self._fetch("revenue trend", REVENUE_TREND_SQL, {"start_date": _days_ago(days - 1)})
+        return _revenue_trend_rows(rows)
+
+    async def get_regional_performance(self) -> List[Dict[str, Any]]:
+        """Get sales performance by region"""
+        rows = await self._fetch("regional performance", REGIONAL_PERFORMANCE_SQL, {"thirty_days_ago": _days_ago(30)})
+        return _regional_rows(rows)
+
+    async def get_top_performers(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """Get top performing sales reps"""
+        rows = await self._fetch(
+            "top performers", TOP_PERFORMERS_SQL, {"thirty_days_ago": _days_ago(30), "limit": limit}
+        )
+        return _top_performer_rows(rows)
+
+    async def get_critical_alerts(self) -> List[Dict[str, Any]]:
+        """Get critical alerts and issues"""
+        pending_orders = await self._fetch("critical alerts", PENDING_ORDER_ALERTS_SQL)
+        stalled_deals = await self._fetch("critical alerts", STALLED_DEAL_ALERTS_SQL)
+        return _critical_alerts(pending_orders, stalled_deals)
+
+    async def get_pipeline_summary(self) -> Dict[str, Any]:
+        """Get pipeline summary by stage"""
+        return _pipeline_summary(await self._fetch("pipeline summary", PIPELINE_SUMMARY_SQL))
+
+    async def get_at_risk_deals(self, threshold_days: int = 30) -> List[Dict[str, Any]]:
+        """Get deals at risk (stalled too long)"""
+        rows = await self._fetch("at-risk deals", AT_RISK_DEALS_SQL, {"threshold": threshold_days})
+        return _at_risk_rows(rows)
+
+    async def get_product_performance(self, limit: int = 8, days: int = 30) -> List[Dict[str, Any]]:
+        """Get top products by revenue over the last N days"""
+        rows = await self._fetch(
+            "product performance", PRODUCT_PERFORMANCE_SQL, {"start_date": _day_start(_days_ago(days)), "limit": limit}
+        )
+        return _product_rows(rows)
+
+    async def get_top_customers(self, limit: int = 10, days: int = 90) -> List[Dict[str, Any]]:
+        """Get top customers by order value over the last N days"""
+        rows = await self._fetch(
+            "top customers", TOP_CUSTOMERS_SQL, {"start_date": _day_start(_days_ago(days)), "limit": limit}
+        )
+        return _customer_rows(rows)
+
+    async def get_recent_orders(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Get the most recent orders"""
+        return _recent_order_rows(await self._fetch("recent orders", RECENT_ORDERS_SQL, {"limit": limit}))
@@ -0,0 +1,279 @@
+"""
+Order Repository
+Filtered, keyset-paginated access to the orders table
+
+Orders are listed newest first on (order_date, id). A page ends with an
+opaque cursor encoding the last row's (order_date, id); the next page
+continues strictly after it, so deep pages cost the same as the first and
+rows inserted meanwhile never shift or duplicate results (unlike OFFSET).
+
+Exports walk the same keyset in fixed-size batches, so memory stays flat
+however many orders match.
+"""
+
+import base64
+import json
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+EXPORT_BATCH_SIZE = 1000
+
+ORDER_COLUMNS_SQL = """
+    SELECT
+        o.id,
+        o.order_number,
+        o.customer_id,
+        c.company_name,
+        o.sales_rep_id,
+        u.first_name || ' ' || u.last_name as sales_rep,
+        o.status,
+        o.total_amount,
+        o.order_date
+    FROM orders o
+    JOIN customers c ON o.customer_id = c.id
+    LEFT JOIN users u ON o.sales_rep_id = u.id
+"""
+
+
+@dataclass
+class OrderFilters:
+    """
+    Filters for listing orders (all optional, combined with AND)
+
+    start_date / end_date accept a date (whole day, end inclusive) or a
+    datetime (exact bound, end inclusive).
+    """
+    status: Optional[str] = None
+    customer_id: Optional[int] = None
+    sales_rep_id: Optional[int] = None
+    start_date: Optional[Union[date, datetime]] = None
+    end_date: Optional[Union[date, datetime]] = None
+    min_amount: Optional[float] = None
+
+    def where(self) -> Tuple[List[str], Dict[str, Any]]:
+        """SQL conditions and bind parameters for these filters"""
+        conditions, params = [], {}
+        if self.status:
+            conditions.append("o.status = :status")
+            params["status"] = self.status
+        if self.customer_id is not None:
+            conditions.append("o.customer_id = :customer_id")
+            params["customer_id"] = self.customer_id
+        if self.sales_rep_id is not None:
+            conditions.append("o.sales_rep_id = :sales_rep_id")
+            params["sales_rep_id"] = self.sales_rep_id
+        if self.start_date is not None:
+            conditions.append("o.order_date >= :start_date")
+            params["start_date"] = _as_datetime(self.start_date)
+        if self.end_date is not None:
+            if isinstance(self.end_date, datetime):
+                conditions.append("o.order_date <= :end_date")
+                params["end_date"] = self.end_date
+            else:
+                conditions.append("o.order_date < :end_date")
+                params["end_date"] = _as_datetime(self.end_date + timedelta(days=1))
+        if self.min_amount is not None:
+            conditions.append("o.total_amount >= :min_amount")
+            params["min_amount"] = self.min_amount
+        return conditions, params
+
+
+def _as_datetime(value: Union[date, datetime]) -> datetime:
+    """TIMESTAMP bind value (asyncpg won't coerce a date)"""
+    if isinstance(value, datetime):
+        return value
+    return datetime.combine(value, datetime.min.time())
+
+
+# ============================================
+# Cursors
+# ============================================
+
+def encode_cursor(order_date: datetime, order_id: int) -> str:
+    """Opaque cursor for the position after (order_date, id)"""
+    raw = json.dumps([order_date.isoformat(), order_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor from encode_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        order_date, order_id = json.loads(raw)
+        return datetime.fromisoformat(order_date), int(order_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _page_query(
+    filters: OrderFilters,
+    limit: int,
+    after: Optional[Tuple[datetime, int]] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """Build the keyset query for one page (newest first)"""
+    conditions, params = filters.where()
+    if after is not None:
+        conditions.append("(o.order_date, o.id) < (:after_date, :after_id)")
+        params["after_date"], params["after_id"] = after
+    params["limit"] = limit
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = f"""{ORDER_COLUMNS_SQL}
+    {where}
+    ORDER BY o.order_date DESC, o.id DESC
+    LIMIT :limit
+"""
+    return sql, params
+
+
+def _order_row(row) -> Dict[str, Any]:
+    return {
+        "id": row[0],
+        "order_number": row[1],
+        "customer_id": row[2],
+        "customer": row[3],
+        "sales_rep_id": row[4],
+        "sales_rep": row[5],
+        "status": row[6],
+        "amount": float(row[7]),
+        "order_date": row[8].isoformat()
+    }
+
+
+def _page(rows, limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Map a limit+1 result to (orders, next cursor or None)"""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1][8], rows[-1][0]) if has_more else None
+    return [_order_row(row) for row in rows], next_cursor
+
+
+def _clamp_limit(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+class OrderRepository:
+    """Repository for order listings (sync Session: agents, scripts)"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _fetch(self, sql: str, params: Dict[str, Any]):
+        try:
+            return self.db.execute(text(sql), params).fetchall()
+        except Exception as e:
+            logger.error(f"Error listing orders: {str(e)}")
+            raise
+
+    def list_orders(
+        self,
+        filters: Optional[OrderFilters] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of orders, newest first
+
+        Args:
+            filters: Optional filters
+            limit: Page size (capped at MAX_PAGE_SIZE)
+            cursor: next_cursor from the previous page
+
+        Returns:
+            (orders, next_cursor) - next_cursor is None on the last page
+        """
+        limit = _clamp_limit(limit)
+        after = decode_cursor(cursor) if cursor else None
+        sql, params = _page_query(filters or OrderFilters(), limit + 1, after)
+        return _page(self._fetch(sql, params), limit)
+
+    def iter_orders(
+        self,
+        filters: Optional[OrderFilters] = None,
+        batch_size: int = EXPORT_BATCH_SIZE
+    ) -> Iterator[Dict[str, Any]]:
+        """Every matching order, fetched in keyset batches"""
+        filters = filters or OrderFilters()
+        after = None
+        while True:
+            sql, params = _page_query(filters, batch_size, after)
+            rows = self._fetch(sql, params)
+            for row in rows:
+                yield _order_row(row)
+            if len(rows) < batch_size:
+                return
+            after = (rows[-1][8], rows[-1][0])
+
+
+class AsyncOrderRepository:
+    """Async repository for order listings (AsyncSession: FastAPI handlers)"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _fetch(self, sql: str, params: Dict[str, Any]):
+        try:
+            result = await self.db.execute(text(sql), params)
+            return result.fetchall()
+        except Exception as e:
+            logger.error(f"Error listing orders: {str(e)}")
+            raise
+
+    async def list_orders(
+        self,
+        filters: Optional[OrderFilters] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One page of orders, newest first (see OrderRepository.list_orders)"""
+        limit = _clamp_limit(limit)
+        after = decode_cursor(cursor) if cursor else None
+        sql, params = _page_query(filters or OrderFilters(), limit + 1, after)
+        return _page(await self._fetch(sql, params), limit)
+
+    async def export_batch(
+        self,
+        filters: Optional[OrderFilters] = None,
+        after: Optional[Tuple[Any, int]] = None,
+        batch_size: int = EXPORT_BATCH_SIZE
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[Any, int]]]:
+        """
+        One keyset batch of an export
+
+        Returns:
+            (orders, position to pass as `after` for the next batch, or
+            None after the last batch)
+        """
+        sql, params = _page_query(filters or OrderFilters(), batch_size, after)
+        rows = await self._fetch(sql, params)
+        after = (rows[-1][8], rows[-1][0]) if len(rows) == batch_size else None
+        return [_order_row(row) for row in rows], after
+
+    async def iter_orders(
+        self,
+        filters: Optional[OrderFilters] = None,
+        batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Every matching order, fetched in keyset batches"""
+        after = None
+        while True:
+            orders, after = await self.export_batch(filters, after, batch_size)
+            for order in orders:
+                yield order
+            if after is None:
+                return
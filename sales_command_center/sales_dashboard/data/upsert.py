@@ -0,0 +1,138 @@
+"""
+Bulk Upsert
+Multi-row INSERT ... ON CONFLICT DO UPDATE for integration syncs
+
+One statement writes a whole batch instead of a round trip per record.
+Rows are de-duplicated on the conflict key first (the last version of a
+record wins), since Postgres rejects a statement that would update the
+same row twice, and batches are split to stay under the driver's bind
+parameter limit.
+
+Rows are written in conflict-key order, so concurrent writers (sync
+workers, the webhook consumer) lock existing rows in the same order and
+do not deadlock on each other.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import column, table, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+# asyncpg allows 32767 bind parameters per statement
+MAX_BIND_PARAMS = 30_000
+
+
+def dedupe_rows(rows: Iterable[Dict[str, Any]], key: str) -> List[Dict[str, Any]]:
+    """Keep the last row for each key value, sorted by key"""
+    latest: Dict[Any, Dict[str, Any]] = {}
+    for row in rows:
+        latest[row[key]] = row
+    return [latest[value] for value in sorted(latest)]
+
+
+def _batches(rows: List[Dict[str, Any]]) -> Iterable[List[Dict[str, Any]]]:
+    batch_size = max(1, MAX_BIND_PARAMS // len(rows[0]))
+    for start in range(0, len(rows), batch_size):
+        yield rows[start:start + batch_size]
+
+
+def _upsert_statement(
+    table_name: str,
+    rows: List[Dict[str, Any]],
+    conflict_column: str,
+    update_columns: Sequence[str],
+    update_expressions: Dict[str, str],
+    where: Optional[str],
+    returning: Sequence[str]
+):
+    names = dict.fromkeys([*rows[0].keys(), *update_expressions, *returning])
+    target = table(table_name, *[column(c) for c in names])
+    stmt = insert(target).values(rows)
+    set_ = {c: stmt.excluded[c] for c in update_columns}
+    set_.update({c: text(expression) for c, expression in update_expressions.items()})
+    if set_:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[conflict_column],
+            set_=set_,
+            where=text(where) if where else None
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[conflict_column])
+    if returning:
+        stmt = stmt.returning(*[target.c[c] for c in returning])
+    return stmt
+
+
+async def upsert_rows(
+    db: AsyncSession,
+    table_name: str,
+    rows: Iterable[Dict[str, Any]],
+    conflict_column: str,
+    update_columns: Optional[Sequence[str]] = None,
+    update_expressions: Optional[Dict[str, str]] = None,
+    where: Optional[str] = None,
+    returning: Sequence[str] = ()
+) -> List[Any]:
+    """
+    Insert rows, updating existing ones that collide on conflict_column
+
+    Does not commit; the caller owns the transaction.
+
+    Args:
+        db: Async session
+        table_name: Target table
+        rows: Dicts with the same keys (column names)
+        conflict_column: Column with a unique constraint (e.g. salesforce_id)
+        update_columns: Columns overwritten from the incoming row on conflict
+            (default: every column except conflict_column; [] with no
+            update_expressions only inserts new rows)
+        update_expressions: Column -> SQL expression on conflict, e.g.
+            {"updated_at": "NOW()"}; may reference the existing row by
+            table name and the incoming row as "excluded"
+        where: Optional condition for the update, e.g. skip unchanged rows
+        returning: Columns to return for inserted/updated rows (rows
+            skipped by where or an insert-only conflict are not returned)
+
+    Returns:
+        Returned rows (empty unless returning is set)
+    """
+    rows = dedupe_rows(rows, conflict_column)
+    if not rows:
+        return []
+
+    update_expressions = update_expressions or {}
+    if update_columns is None:
+        update_columns = [c for c in rows[0] if c != conflict_column and c not in update_expressions]
+
+    returned = []
+    for batch in _batches(rows):
+        stmt = _upsert_statement(
+            table_name, batch, conflict_column,
+            update_columns, update_expressions, where, returning
+        )
+        result = await db.execute(stmt)
+        if returning:
+            returned.extend(result.fetchall())
+    return returned
+
+
+async def insert_rows(db: AsyncSession, table_name: str, rows: List[Dict[str, Any]]) -> int:
+    """
+    Multi-row INSERT for tables without a natural key (e.g. order_items
+    replaced wholesale under their parent)
+
+    Does not commit; the caller owns the transaction.
+
+    Returns:
+        Number of rows inserted
+    """
+    if not rows:
+        return 0
+    target = table(table_name, *[column(c) for c in rows[0]])
+    for batch in _batches(rows):
+        await db.execute(insert(target).values(batch))
+    return len(rows)
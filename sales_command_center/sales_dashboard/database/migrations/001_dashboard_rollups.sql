@@ -0,0 +1,289 @@
+-- Migration 001: Dashboard rollup tables
+-- PostgreSQL 15+
+--
+-- Adds incrementally maintained aggregate tables for the dashboard and
+-- redefines the summary views on top of them, so dashboard queries no
+-- longer rescan orders/pipeline as those tables grow.
+--
+--   daily_order_rollup     day x region x sales rep x status
+--   pipeline_stage_rollup  stage x owner x outcome
+--
+-- Row-level triggers apply +/- deltas on INSERT/UPDATE/DELETE.
+-- rebuild_dashboard_rollups() recomputes both tables from scratch (used
+-- for the backfill below, and after bulk loads with triggers disabled).
+--
+-- Safe to run more than once.
+
+-- ============================================
+-- Rollup tables
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS daily_order_rollup (
+    day DATE NOT NULL,
+    region_id INT NOT NULL DEFAULT 0, -- customer's region, 0 = none
+    sales_rep_id INT NOT NULL DEFAULT 0, -- 0 = unassigned
+    status VARCHAR(20) NOT NULL,
+    order_count BIGINT NOT NULL DEFAULT 0,
+    total_revenue DECIMAL(16, 2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (day, region_id, sales_rep_id, status)
+);
+
+CREATE TABLE IF NOT EXISTS pipeline_stage_rollup (
+    stage VARCHAR(50) NOT NULL,
+    owner_id INT NOT NULL DEFAULT 0, -- 0 = unassigned
+    outcome VARCHAR(10) NOT NULL, -- 'open', 'won', 'lost' (from is_won)
+    deal_count BIGINT NOT NULL DEFAULT 0,
+    total_value DECIMAL(16, 2) NOT NULL DEFAULT 0,
+    total_days_in_stage BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (stage, owner_id, outcome)
+);
+
+CREATE INDEX IF NOT EXISTS idx_daily_order_rollup_sales_rep_id ON daily_order_rollup(sales_rep_id);
+
+-- ============================================
+-- Delta maintenance
+-- ============================================
+
+CREATE OR REPLACE FUNCTION apply_order_rollup_delta(
+    p_order_date TIMESTAMP,
+    p_region_id INT,
+    p_sales_rep_id INT,
+    p_status VARCHAR,
+    p_order_count BIGINT,
+    p_revenue DECIMAL
+) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO daily_order_rollup AS r (day, region_id, sales_rep_id, status, order_count, total_revenue)
+    VALUES (p_order_date::date, COALESCE(p_region_id, 0), COALESCE(p_sales_rep_id, 0), p_status, p_order_count, p_revenue)
+    ON CONFLICT (day, region_id, sales_rep_id, status) DO UPDATE
+        SET order_count = r.order_count + EXCLUDED.order_count,
+            total_revenue = r.total_revenue + EXCLUDED.total_revenue,
+            updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION orders_rollup_trigger() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM apply_order_rollup_delta(
+            OLD.order_date,
+            (SELECT region_id FROM customers WHERE id = OLD.customer_id),
+            OLD.sales_rep_id, OLD.status, -1, -OLD.total_amount
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM apply_order_rollup_delta(
+            NEW.order_date,
+            (SELECT region_id FROM customers WHERE id = NEW.customer_id),
+            NEW.sales_rep_id, NEW.status, 1, NEW.total_amount
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- A customer moving region moves all of its orders between region buckets
+CREATE OR REPLACE FUNCTION customers_region_rollup_trigger() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM apply_order_rollup_delta(o.day, OLD.region_id, o.sales_rep_id, o.status, -o.cnt, -o.revenue)
+    FROM (
+        SELECT order_date::date::timestamp as day, sales_rep_id, status,
+               COUNT(*) as cnt, SUM(total_amount) as revenue
+        FROM orders
+        WHERE customer_id = NEW.id
+        GROUP BY 1, 2, 3
+    ) o;
+    PERFORM apply_order_rollup_delta(o.day, NEW.region_id, o.sales_rep_id, o.status, o.cnt, o.revenue)
+    FROM (
+        SELECT order_date::date::timestamp as day, sales_rep_id, status,
+               COUNT(*) as cnt, SUM(total_amount) as revenue
+        FROM orders
+        WHERE customer_id = NEW.id
+        GROUP BY 1, 2, 3
+    ) o;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION apply_pipeline_rollup_delta(
+    p_stage VARCHAR,
+    p_owner_id INT,
+    p_is_won BOOLEAN,
+    p_deal_count BIGINT,
+    p_value DECIMAL,
+    p_days_in_stage BIGINT
+) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO pipeline_stage_rollup AS r (stage, owner_id, outcome, deal_count, total_value, total_days_in_stage)
+    VALUES (
+        p_stage,
+        COALESCE(p_owner_id, 0),
+        CASE WHEN p_is_won IS NULL THEN 'open' WHEN p_is_won THEN 'won' ELSE 'lost' END,
+        p_deal_count, p_value, COALESCE(p_days_in_stage, 0)
+    )
+    ON CONFLICT (stage, owner_id, outcome) DO UPDATE
+        SET deal_count = r.deal_count + EXCLUDED.deal_count,
+            total_value = r.total_value + EXCLUDED.total_value,
+            total_days_in_stage = r.total_days_in_stage + EXCLUDED.total_days_in_stage,
+            updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION pipeline_rollup_trigger() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM apply_pipeline_rollup_delta(
+            OLD.stage, OLD.owner_id, OLD.is_won, -1, -OLD.amount, -COALESCE(OLD.days_in_stage, 0)
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM apply_pipeline_rollup_delta(
+            NEW.stage, NEW.owner_id, NEW.is_won, 1, NEW.amount, COALESCE(NEW.days_in_stage, 0)
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_orders_rollup_insert_delete ON orders;
+CREATE TRIGGER trg_orders_rollup_insert_delete
+    AFTER INSERT OR DELETE ON orders
+    FOR EACH ROW EXECUTE FUNCTION orders_rollup_trigger();
+
+DROP TRIGGER IF EXISTS trg_orders_rollup_update ON orders;
+CREATE TRIGGER trg_orders_rollup_update
+    AFTER UPDATE OF order_date, customer_id, sales_rep_id, status, total_amount ON orders
+    FOR EACH ROW
+    WHEN ((OLD.order_date::date, OLD.customer_id, OLD.sales_rep_id, OLD.status, OLD.total_amount)
+          IS DISTINCT FROM
+          (NEW.order_date::date, NEW.customer_id, NEW.sales_rep_id, NEW.status, NEW.total_amount))
+    EXECUTE FUNCTION orders_rollup_trigger();
+
+DROP TRIGGER IF EXISTS trg_customers_region_rollup ON customers;
+CREATE TRIGGER trg_customers_region_rollup
+    AFTER UPDATE OF region_id ON customers
+    FOR EACH ROW
+    WHEN (OLD.region_id IS DISTINCT FROM NEW.region_id)
+    EXECUTE FUNCTION customers_region_rollup_trigger();
+
+DROP TRIGGER IF EXISTS trg_pipeline_rollup_insert_delete ON pipeline;
+CREATE TRIGGER trg_pipeline_rollup_insert_delete
+    AFTER INSERT OR DELETE ON pipeline
+    FOR EACH ROW EXECUTE FUNCTION pipeline_rollup_trigger();
+
+DROP TRIGGER IF EXISTS trg_pipeline_rollup_update ON pipeline;
+CREATE TRIGGER trg_pipeline_rollup_update
+    AFTER UPDATE OF stage, owner_id, is_won, amount, days_in_stage ON pipeline
+    FOR EACH ROW
+    WHEN ((OLD.stage, OLD.owner_id, OLD.is_won, OLD.amount, OLD.days_in_stage)
+          IS DISTINCT FROM
+          (NEW.stage, NEW.owner_id, NEW.is_won, NEW.amount, NEW.days_in_stage))
+    EXECUTE FUNCTION pipeline_rollup_trigger();
+
+-- Recompute both rollups from the base tables
+CREATE OR REPLACE FUNCTION rebuild_dashboard_rollups() RETURNS VOID AS $$
+BEGIN
+    LOCK TABLE daily_order_rollup, pipeline_stage_rollup IN EXCLUSIVE MODE;
+    DELETE FROM daily_order_rollup;
+    DELETE FROM pipeline_stage_rollup;
+
+    INSERT INTO daily_order_rollup (day, region_id, sales_rep_id, status, order_count, total_revenue)
+    SELECT
+        o.order_date::date,
+        COALESCE(c.region_id, 0),
+        COALESCE(o.sales_rep_id, 0),
+        o.status,
+        COUNT(*),
+        SUM(o.total_amount)
+    FROM orders o
+    LEFT JOIN customers c ON o.customer_id = c.id
+    GROUP BY 1, 2, 3, 4;
+
+    INSERT INTO pipeline_stage_rollup (stage, owner_id, outcome, deal_count, total_value, total_days_in_stage)
+    SELECT
+        stage,
+        COALESCE(owner_id, 0),
+        CASE WHEN is_won IS NULL THEN 'open' WHEN is_won THEN 'won' ELSE 'lost' END,
+        COUNT(*),
+        SUM(amount),
+        SUM(COALESCE(days_in_stage, 0))
+    FROM pipeline
+    GROUP BY 1, 2, 3;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT rebuild_dashboard_rollups();
+
+-- ============================================
+-- Views over the rollups
+-- ============================================
+
+DROP VIEW IF EXISTS daily_orders_summary;
+CREATE VIEW daily_orders_summary AS
+SELECT
+    day as order_date,
+    SUM(order_count) as total_orders,
+    COALESCE(SUM(order_count) FILTER (WHERE status = 'fulfilled'), 0) as fulfilled_orders,
+    COALESCE(SUM(order_count) FILTER (WHERE status = 'pending'), 0) as pending_orders,
+    COALESCE(SUM(order_count) FILTER (WHERE status = 'partial'), 0) as partial_orders,
+    SUM(total_revenue) as total_revenue,
+    SUM(total_revenue) / NULLIF(SUM(order_count), 0) as avg_order_value
+FROM daily_order_rollup
+GROUP BY day
+HAVING SUM(order_count) > 0
+ORDER BY order_date DESC;
+
+DROP VIEW IF EXISTS pipeline_by_stage;
+CREATE VIEW pipeline_by_stage AS
+SELECT
+    stage,
+    SUM(deal_count) as deal_count,
+    SUM(total_value) as total_value,
+    SUM(total_value) / NULLIF(SUM(deal_count), 0) as avg_deal_size,
+    SUM(total_days_in_stage)::DECIMAL / NULLIF(SUM(deal_count), 0) as avg_days_in_stage
+FROM pipeline_stage_rollup
+WHERE outcome IN ('open', 'won')
+GROUP BY stage
+HAVING SUM(deal_count) > 0;
+
+DROP VIEW IF EXISTS sales_rep_performance;
+CREATE VIEW sales_rep_performance AS
+WITH rep_orders AS (
+    SELECT
+        sales_rep_id,
+        SUM(order_count) as orders_count,
+        SUM(total_revenue) as total_revenue
+    FROM daily_order_rollup
+    GROUP BY sales_rep_id
+),
+rep_deals AS (
+    SELECT
+        owner_id,
+        COALESCE(SUM(deal_count) FILTER (WHERE outcome = 'won'), 0) as deals_won,
+        COALESCE(SUM(deal_count) FILTER (WHERE outcome = 'lost'), 0) as deals_lost
+    FROM pipeline_stage_rollup
+    GROUP BY owner_id
+)
+SELECT
+    u.id,
+    u.first_name || ' ' || u.last_name as rep_name,
+    r.name as region,
+    COALESCE(o.orders_count, 0) as orders_count,
+    o.total_revenue,
+    COALESCE(d.deals_won, 0) as deals_won,
+    COALESCE(d.deals_lost, 0) as deals_lost,
+    CASE
+        WHEN COALESCE(d.deals_won, 0) + COALESCE(d.deals_lost, 0) > 0
+        THEN ROUND(100.0 * d.deals_won / (d.deals_won + d.deals_lost), 2)
+        ELSE 0
+    END as win_rate
+FROM users u
+LEFT JOIN rep_orders o ON u.id = o.sales_rep_id
+LEFT JOIN rep_deals d ON u.id = d.owner_id
+LEFT JOIN regions r ON u.region_id = r.id
+WHERE u.role IN ('sales_rep', 'sales_manager');
+
+COMMENT ON TABLE daily_order_rollup IS 'Order counts and revenue by day, region, rep and status (trigger-maintained)';
+COMMENT ON TABLE pipeline_stage_rollup IS 'Pipeline deal counts and value by stage, owner and outcome (trigger-maintained)';
@@ -0,0 +1,29 @@
+-- Migration 002: Dashboard change notifications
+-- PostgreSQL 15+
+--
+-- Statement-level triggers send NOTIFY dashboard_changes when orders or
+-- pipeline change. The app's live dashboard broadcaster LISTENs on this
+-- channel and recomputes the dashboard once per burst of changes instead
+-- of every browser polling every endpoint.
+--
+-- Postgres folds identical notifications within a transaction, so a bulk
+-- load sends one notification per table, not one per row.
+--
+-- Safe to run more than once.
+
+CREATE OR REPLACE FUNCTION notify_dashboard_change() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('dashboard_changes', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_orders_notify_dashboard ON orders;
+CREATE TRIGGER trg_orders_notify_dashboard
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON orders
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_dashboard_change();
+
+DROP TRIGGER IF EXISTS trg_pipeline_notify_dashboard ON pipeline;
+CREATE TRIGGER trg_pipeline_notify_dashboard
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON pipeline
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_dashboard_change();
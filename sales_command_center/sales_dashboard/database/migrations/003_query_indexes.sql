@@ -0,0 +1,88 @@
+-- Migration 003: Composite, partial and covering indexes
+-- PostgreSQL 15+
+--
+-- Indexes shaped to the queries the app actually runs against the base
+-- tables (the headline aggregates read the rollups from migration 001):
+--
+--   orders listing / export    ORDER BY order_date DESC, id DESC (keyset),
+--                              optionally filtered by status, customer or rep
+--   pending order alerts       status = 'pending' AND total_amount > 100000
+--                              ORDER BY total_amount DESC
+--   stalled / at-risk deals    is_won IS NULL AND days_in_stage > N
+--                              ORDER BY amount DESC
+--   win rate                   actual_close_date >= :since, reading is_won
+--   product performance        order_items joined to orders by order_id
+--
+-- The composite (x, order_date, id) indexes replace the single-column
+-- indexes on the same leading column, which they fully cover.
+--
+-- Indexes are built CONCURRENTLY so writes to orders/pipeline are not
+-- blocked; run this file with psql (autocommit), not inside a transaction.
+-- If a concurrent build fails it leaves an INVALID index behind: drop it
+-- and run the file again.
+--
+-- Safe to run more than once.
+
+-- ============================================
+-- orders
+-- ============================================
+
+-- Keyset pagination over all orders; also serves order_date range scans
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_orders_order_date_id
+    ON orders (order_date, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_orders_status_order_date_id
+    ON orders (status, order_date, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_orders_customer_order_date_id
+    ON orders (customer_id, order_date, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_orders_sales_rep_order_date_id
+    ON orders (sales_rep_id, order_date, id);
+
+-- Large pending orders: a handful of rows, already in alert order
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_orders_pending_large
+    ON orders (total_amount DESC)
+    INCLUDE (order_date, customer_id, order_number)
+    WHERE status = 'pending' AND total_amount > 100000;
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_orders_order_date;
+DROP INDEX CONCURRENTLY IF EXISTS idx_orders_status;
+DROP INDEX CONCURRENTLY IF EXISTS idx_orders_customer_id;
+
+-- ============================================
+-- pipeline
+-- ============================================
+
+-- Open deals by value: stalled-deal alerts stop after the first matches
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_pipeline_open_amount
+    ON pipeline (amount DESC)
+    INCLUDE (days_in_stage)
+    WHERE is_won IS NULL;
+
+-- Open deals by age: at-risk listing with a high threshold
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_pipeline_open_days_in_stage
+    ON pipeline (days_in_stage)
+    INCLUDE (amount)
+    WHERE is_won IS NULL;
+
+-- Recently closed deals, index-only for the win rate
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_pipeline_closed_date
+    ON pipeline (actual_close_date)
+    INCLUDE (is_won)
+    WHERE actual_close_date IS NOT NULL;
+
+-- ============================================
+-- order_items
+-- ============================================
+
+-- Product performance reads line items per order without heap lookups
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_order_items_order_id_covering
+    ON order_items (order_id)
+    INCLUDE (product_id, quantity, line_total);
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_order_items_order_id;
+
+ANALYZE orders;
+ANALYZE pipeline;
+ANALYZE order_items;
@@ -0,0 +1,19 @@
+-- Migration 004: Integration sync state
+-- PostgreSQL 15+
+--
+-- One row per external source with the watermark of the newest change
+-- applied, so incremental syncs only request records modified since the
+-- last successful run and survive restarts.
+--
+-- Safe to run more than once.
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    source VARCHAR(50) PRIMARY KEY, -- e.g. 'salesforce_opportunities'
+    watermark TIMESTAMPTZ, -- newest source modification time applied
+    last_run_at TIMESTAMP,
+    last_status VARCHAR(20), -- 'ok', 'error'
+    last_error TEXT,
+    records_synced BIGINT NOT NULL DEFAULT 0
+);
+
+COMMENT ON TABLE sync_state IS 'Incremental sync watermarks for external integrations';
@@ -2,6 +2,9 @@
 -- PostgreSQL 15+
 
 -- Drop existing tables if they exist (for clean setup)
+DROP TABLE IF EXISTS daily_order_rollup CASCADE;
+DROP TABLE IF EXISTS pipeline_stage_rollup CASCADE;
+DROP TABLE IF EXISTS sync_state CASCADE;
 DROP TABLE IF EXISTS conversation_history CASCADE;
 DROP TABLE IF EXISTS transactions CASCADE;
 DROP TABLE IF EXISTS order_items CASCADE;
@@ -176,49 +179,280 @@ CREATE TABLE conversation_history (
     created_at TIMESTAMP DEFAULT NOW()
 );
 
--- Indexes for Performance
-CREATE INDEX idx_orders_customer_id ON orders(customer_id);
-CREATE INDEX idx_orders_order_date ON orders(order_date);
-CREATE INDEX idx_orders_status ON orders(status);
+-- Integration sync state (see migrations/004_sync_state.sql)
+CREATE TABLE sync_state (
+    source VARCHAR(50) PRIMARY KEY, -- e.g. 'salesforce_opportunities'
+    watermark TIMESTAMPTZ, -- newest source modification time applied
+    last_run_at TIMESTAMP,
+    last_status VARCHAR(20), -- 'ok', 'error'
+    last_error TEXT,
+    records_synced BIGINT NOT NULL DEFAULT 0
+);
+
+-- Indexes for Performance (query-shaped indexes: see migrations/003_query_indexes.sql)
+CREATE INDEX idx_orders_order_date_id ON orders(order_date, id);
+CREATE INDEX idx_orders_status_order_date_id ON orders(status, order_date, id);
+CREATE INDEX idx_orders_customer_order_date_id ON orders(customer_id, order_date, id);
+CREATE INDEX idx_orders_sales_rep_order_date_id ON orders(sales_rep_id, order_date, id);
+CREATE INDEX idx_orders_pending_large ON orders(total_amount DESC)
+    INCLUDE (order_date, customer_id, order_number)
+    WHERE status = 'pending' AND total_amount > 100000;
 CREATE INDEX idx_pipeline_customer_id ON pipeline(customer_id);
 CREATE INDEX idx_pipeline_stage ON pipeline(stage);
 CREATE INDEX idx_pipeline_owner_id ON pipeline(owner_id);
+CREATE INDEX idx_pipeline_open_amount ON pipeline(amount DESC) INCLUDE (days_in_stage) WHERE is_won IS NULL;
+CREATE INDEX idx_pipeline_open_days_in_stage ON pipeline(days_in_stage) INCLUDE (amount) WHERE is_won IS NULL;
+CREATE INDEX idx_pipeline_closed_date ON pipeline(actual_close_date) INCLUDE (is_won) WHERE actual_close_date IS NOT NULL;
 CREATE INDEX idx_customers_region_id ON customers(region_id);
 CREATE INDEX idx_customers_account_manager_id ON customers(account_manager_id);
 CREATE INDEX idx_users_role ON users(role);
 CREATE INDEX idx_users_region_id ON users(region_id);
-CREATE INDEX idx_order_items_order_id ON order_items(order_id);
+CREATE INDEX idx_order_items_order_id_covering ON order_items(order_id) INCLUDE (product_id, quantity, line_total);
 CREATE INDEX idx_order_items_product_id ON order_items(product_id);
 CREATE INDEX idx_conversation_history_user_id ON conversation_history(user_id);
 CREATE INDEX idx_conversation_history_session_id ON conversation_history(session_id);
 
+-- ============================================
+-- Dashboard rollup tables (see migrations/001_dashboard_rollups.sql)
+-- ============================================
+
+CREATE TABLE daily_order_rollup (
+    day DATE NOT NULL,
+    region_id INT NOT NULL DEFAULT 0, -- customer's region, 0 = none
+    sales_rep_id INT NOT NULL DEFAULT 0, -- 0 = unassigned
+    status VARCHAR(20) NOT NULL,
+    order_count BIGINT NOT NULL DEFAULT 0,
+    total_revenue DECIMAL(16, 2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (day, region_id, sales_rep_id, status)
+);
+
+CREATE TABLE pipeline_stage_rollup (
+    stage VARCHAR(50) NOT NULL,
+    owner_id INT NOT NULL DEFAULT 0, -- 0 = unassigned
+    outcome VARCHAR(10) NOT NULL, -- 'open', 'won', 'lost' (from is_won)
+    deal_count BIGINT NOT NULL DEFAULT 0,
+    total_value DECIMAL(16, 2) NOT NULL DEFAULT 0,
+    total_days_in_stage BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (stage, owner_id, outcome)
+);
+
+CREATE INDEX idx_daily_order_rollup_sales_rep_id ON daily_order_rollup(sales_rep_id);
+
+-- ============================================
+-- Delta maintenance
+-- ============================================
+
+CREATE OR REPLACE FUNCTION apply_order_rollup_delta(
+    p_order_date TIMESTAMP,
+    p_region_id INT,
+    p_sales_rep_id INT,
+    p_status VARCHAR,
+    p_order_count BIGINT,
+    p_revenue DECIMAL
+) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO daily_order_rollup AS r (day, region_id, sales_rep_id, status, order_count, total_revenue)
+    VALUES (p_order_date::date, COALESCE(p_region_id, 0), COALESCE(p_sales_rep_id, 0), p_status, p_order_count, p_revenue)
+    ON CONFLICT (day, region_id, sales_rep_id, status) DO UPDATE
+        SET order_count = r.order_count + EXCLUDED.order_count,
+            total_revenue = r.total_revenue + EXCLUDED.total_revenue,
+            updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION orders_rollup_trigger() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM apply_order_rollup_delta(
+            OLD.order_date,
+            (SELECT region_id FROM customers WHERE id = OLD.customer_id),
+            OLD.sales_rep_id, OLD.status, -1, -OLD.total_amount
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM apply_order_rollup_delta(
+            NEW.order_date,
+            (SELECT region_id FROM customers WHERE id = NEW.customer_id),
+            NEW.sales_rep_id, NEW.status, 1, NEW.total_amount
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- A customer moving region moves all of its orders between region buckets
+CREATE OR REPLACE FUNCTION customers_region_rollup_trigger() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM apply_order_rollup_delta(o.day, OLD.region_id, o.sales_rep_id, o.status, -o.cnt, -o.revenue)
+    FROM (
+        SELECT order_date::date::timestamp as day, sales_rep_id, status,
+               COUNT(*) as cnt, SUM(total_amount) as revenue
+        FROM orders
+        WHERE customer_id = NEW.id
+        GROUP BY 1, 2, 3
+    ) o;
+    PERFORM apply_order_rollup_delta(o.day, NEW.region_id, o.sales_rep_id, o.status, o.cnt, o.revenue)
+    FROM (
+        SELECT order_date::date::timestamp as day, sales_rep_id, status,
+               COUNT(*) as cnt, SUM(total_amount) as revenue
+        FROM orders
+        WHERE customer_id = NEW.id
+        GROUP BY 1, 2, 3
+    ) o;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION apply_pipeline_rollup_delta(
+    p_stage VARCHAR,
+    p_owner_id INT,
+    p_is_won BOOLEAN,
+    p_deal_count BIGINT,
+    p_value DECIMAL,
+    p_days_in_stage BIGINT
+) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO pipeline_stage_rollup AS r (stage, owner_id, outcome, deal_count, total_value, total_days_in_stage)
+    VALUES (
+        p_stage,
+        COALESCE(p_owner_id, 0),
+        CASE WHEN p_is_won IS NULL THEN 'open' WHEN p_is_won THEN 'won' ELSE 'lost' END,
+        p_deal_count, p_value, COALESCE(p_days_in_stage, 0)
+    )
+    ON CONFLICT (stage, owner_id, outcome) DO UPDATE
+        SET deal_count = r.deal_count + EXCLUDED.deal_count,
+            total_value = r.total_value + EXCLUDED.total_value,
+            total_days_in_stage = r.total_days_in_stage + EXCLUDED.total_days_in_stage,
+            updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION pipeline_rollup_trigger() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM apply_pipeline_rollup_delta(
+            OLD.stage, OLD.owner_id, OLD.is_won, -1, -OLD.amount, -COALESCE(OLD.days_in_stage, 0)
+        );
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM apply_pipeline_rollup_delta(
+            NEW.stage, NEW.owner_id, NEW.is_won, 1, NEW.amount, COALESCE(NEW.days_in_stage, 0)
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_orders_rollup_insert_delete
+    AFTER INSERT OR DELETE ON orders
+    FOR EACH ROW EXECUTE FUNCTION orders_rollup_trigger();
+
+CREATE TRIGGER trg_orders_rollup_update
+    AFTER UPDATE OF order_date, customer_id, sales_rep_id, status, total_amount ON orders
+    FOR EACH ROW
+    WHEN ((OLD.order_date::date, OLD.customer_id, OLD.sales_rep_id, OLD.status, OLD.total_amount)
+          IS DISTINCT FROM
+          (NEW.order_date::date, NEW.customer_id, NEW.sales_rep_id, NEW.status, NEW.total_amount))
+    EXECUTE FUNCTION orders_rollup_trigger();
+
+CREATE TRIGGER trg_customers_region_rollup
+    AFTER UPDATE OF region_id ON customers
+    FOR EACH ROW
+    WHEN (OLD.region_id IS DISTINCT FROM NEW.region_id)
+    EXECUTE FUNCTION customers_region_rollup_trigger();
+
+CREATE TRIGGER trg_pipeline_rollup_insert_delete
+    AFTER INSERT OR DELETE ON pipeline
+    FOR EACH ROW EXECUTE FUNCTION pipeline_rollup_trigger();
+
+CREATE TRIGGER trg_pipeline_rollup_update
+    AFTER UPDATE OF stage, owner_id, is_won, amount, days_in_stage ON pipeline
+    FOR EACH ROW
+    WHEN ((OLD.stage, OLD.owner_id, OLD.is_won, OLD.amount, OLD.days_in_stage)
+          IS DISTINCT FROM
+          (NEW.stage, NEW.owner_id, NEW.is_won, NEW.amount, NEW.days_in_stage))
+    EXECUTE FUNCTION pipeline_rollup_trigger();
+
+-- Change notifications for the live dashboard (see migrations/002_dashboard_notify.sql)
+CREATE OR REPLACE FUNCTION notify_dashboard_change() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('dashboard_changes', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_orders_notify_dashboard
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON orders
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_dashboard_change();
+
+CREATE TRIGGER trg_pipeline_notify_dashboard
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON pipeline
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_dashboard_change();
+
+-- Recompute both rollups from the base tables
+CREATE OR REPLACE FUNCTION rebuild_dashboard_rollups() RETURNS VOID AS $$
+BEGIN
+    LOCK TABLE daily_order_rollup, pipeline_stage_rollup IN EXCLUSIVE MODE;
+    DELETE FROM daily_order_rollup;
+    DELETE FROM pipeline_stage_rollup;
+
+    INSERT INTO daily_order_rollup (day, region_id, sales_rep_id, status, order_count, total_revenue)
+    SELECT
+        o.order_date::date,
+        COALESCE(c.region_id, 0),
+        COALESCE(o.sales_rep_id, 0),
+        o.status,
+        COUNT(*),
+        SUM(o.total_amount)
+    FROM orders o
+    LEFT JOIN customers c ON o.customer_id = c.id
+    GROUP BY 1, 2, 3, 4;
+
+    INSERT INTO pipeline_stage_rollup (stage, owner_id, outcome, deal_count, total_value, total_days_in_stage)
+    SELECT
+        stage,
+        COALESCE(owner_id, 0),
+        CASE WHEN is_won IS NULL THEN 'open' WHEN is_won THEN 'won' ELSE 'lost' END,
+        COUNT(*),
+        SUM(amount),
+        SUM(COALESCE(days_in_stage, 0))
+    FROM pipeline
+    GROUP BY 1, 2, 3;
+END;
+$$ LANGUAGE plpgsql;
+
 -- Views for Common Queries
+-- (order/pipeline summaries read the rollups, not the base tables)
 
 -- Daily Orders Summary View
 CREATE OR REPLACE VIEW daily_orders_summary AS
 SELECT
-    DATE(order_date) as order_date,
-    COUNT(*) as total_orders,
-    COUNT(*) FILTER (WHERE status = 'fulfilled') as fulfilled_orders,
-    COUNT(*) FILTER (WHERE status = 'pending') as pending_orders,
-    COUNT(*) FILTER (WHERE status = 'partial') as partial_orders,
-    SUM(total_amount) as total_revenue,
-    AVG(total_amount) as avg_order_value
-FROM orders
-GROUP BY DATE(order_date)
+    day as order_date,
+    SUM(order_count) as total_orders,
+    COALESCE(SUM(order_count) FILTER (WHERE status = 'fulfilled'), 0) as fulfilled_orders,
+    COALESCE(SUM(order_count) FILTER (WHERE status = 'pending'), 0) as pending_orders,
+    COALESCE(SUM(order_count) FILTER (WHERE status = 'partial'), 0) as partial_orders,
+    SUM(total_revenue) as total_revenue,
+    SUM(total_revenue) / NULLIF(SUM(order_count), 0) as avg_order_value
+FROM daily_order_rollup
+GROUP BY day
+HAVING SUM(order_count) > 0
 ORDER BY order_date DESC;
 
 -- Pipeline Summary by Stage View
 CREATE OR REPLACE VIEW pipeline_by_stage AS
 SELECT
     stage,
-    COUNT(*) as deal_count,
-    SUM(amount) as total_value,
-    AVG(amount) as avg_deal_size,
-    AVG(days_in_stage) as avg_days_in_stage
-FROM pipeline
-WHERE is_won IS NULL OR is_won = TRUE
-GROUP BY stage;
+    SUM(deal_count) as deal_count,
+    SUM(total_value) as total_value,
+    SUM(total_value) / NULLIF(SUM(deal_count), 0) as avg_deal_size,
+    SUM(total_days_in_stage)::DECIMAL / NULLIF(SUM(deal_count), 0) as avg_days_in_stage
+FROM pipeline_stage_rollup
+WHERE outcome IN ('open', 'won')
+GROUP BY stage
+HAVING SUM(deal_count) > 0;
 
 -- Top Customers by Revenue View
 CREATE OR REPLACE VIEW top_customers_revenue AS
@@ -238,26 +472,40 @@ ORDER BY total_revenue DESC;
 
 -- Sales Rep Performance View
 CREATE OR REPLACE VIEW sales_rep_performance AS
+WITH rep_orders AS (
+    SELECT
+        sales_rep_id,
+        SUM(order_count) as orders_count,
+        SUM(total_revenue) as total_revenue
+    FROM daily_order_rollup
+    GROUP BY sales_rep_id
+),
+rep_deals AS (
+    SELECT
+        owner_id,
+        COALESCE(SUM(deal_count) FILTER (WHERE outcome = 'won'), 0) as deals_won,
+        COALESCE(SUM(deal_count) FILTER (WHERE outcome = 'lost'), 0) as deals_lost
+    FROM pipeline_stage_rollup
+    GROUP BY owner_id
+)
 SELECT
     u.id,
     u.first_name || ' ' || u.last_name as rep_name,
     r.name as region,
-    COUNT(DISTINCT o.id) as orders_count,
-    SUM(o.total_amount) as total_revenue,
-    COUNT(DISTINCT p.id) FILTER (WHERE p.is_won = TRUE) as deals_won,
-    COUNT(DISTINCT p.id) FILTER (WHERE p.is_won = FALSE) as deals_lost,
+    COALESCE(o.orders_count, 0) as orders_count,
+    o.total_revenue,
+    COALESCE(d.deals_won, 0) as deals_won,
+    COALESCE(d.deals_lost, 0) as deals_lost,
     CASE
-        WHEN COUNT(DISTINCT p.id) FILTER (WHERE p.is_won IS NOT NULL) > 0
-        THEN ROUND(100.0 * COUNT(DISTINCT p.id) FILTER (WHERE p.is_won = TRUE) /
-             COUNT(DISTINCT p.id) FILTER (WHERE p.is_won IS NOT NULL), 2)
+        WHEN COALESCE(d.deals_won, 0) + COALESCE(d.deals_lost, 0) > 0
+        THEN ROUND(100.0 * d.deals_won / (d.deals_won + d.deals_lost), 2)
         ELSE 0
     END as win_rate
 FROM users u
-LEFT JOIN orders o ON u.id = o.sales_rep_id
-LEFT JOIN pipeline p ON u.id = p.owner_id
+LEFT JOIN rep_orders o ON u.id = o.sales_rep_id
+LEFT JOIN rep_deals d ON u.id = d.owner_id
 LEFT JOIN regions r ON u.region_id = r.id
-WHERE u.role IN ('sales_rep', 'sales_manager')
-GROUP BY u.id, u.first_name, u.last_name, r.name;
+WHERE u.role IN ('sales_rep', 'sales_manager');
 
 -- Comments for documentation
 COMMENT ON TABLE orders IS 'Sales orders from customers';
@@ -267,3 +515,6 @@ COMMENT ON TABLE products IS 'Product catalog';
 COMMENT ON TABLE users IS 'Sales representatives and managers';
 COMMENT ON TABLE transactions IS 'AI-generated transactions from voice commands';
 COMMENT ON TABLE conversation_history IS 'AI assistant conversation logs';
+COMMENT ON TABLE sync_state IS 'Incremental sync watermarks for external integrations';
+COMMENT ON TABLE daily_order_rollup IS 'Order counts and revenue by day, region, rep and status (trigger-maintained)';
+COMMENT ON TABLE pipeline_stage_rollup IS 'Pipeline deal counts and value by stage, owner and outcome (trigger-maintained)';
@@ -0,0 +1,166 @@
+"""
+HTTP Response Caching
+ETag / conditional GET and pre-compressed bodies for cacheable responses.
+
+A payload is encoded once (JSON body, strong ETag from a content hash,
+gzip and optional brotli variants) and then served to every client:
+- If-None-Match matching the ETag -> 304 with an empty body
+- Accept-Encoding br / gzip -> the pre-compressed variant
+- otherwise the identity body
+
+Responses carrying Content-Encoding pass straight through GZipMiddleware,
+so nothing is compressed twice.
+"""
+
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 1000
+
+# Suffixes distinguishing the ETag of each encoding (strong ETags must
+# differ between representations)
+_ENCODING_SUFFIX = {"identity": "", "gzip": "-gz", "br": "-br"}
+
+
+@dataclass(frozen=True)
+class EncodedPayload:
+    """A response body encoded once, with its ETag and compressed variants"""
+    body: bytes
+    etag: str  # hash only, without quotes or encoding suffix
+    media_type: str
+    gzip_body: Optional[bytes] = None
+    br_body: Optional[bytes] = None
+
+    def variant(self, encoding: str) -> Optional[bytes]:
+        if encoding == "br":
+            return self.br_body
+        if encoding == "gzip":
+            return self.gzip_body
+        return self.body
+
+    def etag_header(self, encoding: str = "identity") -> str:
+        return f'"{self.etag}{_ENCODING_SUFFIX[encoding]}"'
+
+
+def encode_bytes(body: bytes, media_type: str) -> EncodedPayload:
+    """Hash and pre-compress a response body"""
+    gzip_body = br_body = None
+    if len(body) >= MIN_COMPRESS_BYTES:
+        gzip_body = gzip.compress(body, compresslevel=6, mtime=0)
+        if BROTLI_AVAILABLE:
+            br_body = brotli.compress(body, quality=5)
+
+    return EncodedPayload(
+        body=body,
+        etag=hashlib.blake2b(body, digest_size=12).hexdigest(),
+        media_type=media_type,
+        gzip_body=gzip_body,
+        br_body=br_body
+    )
+
+
+def encode_payload(data: Any) -> EncodedPayload:
+    """Encode a JSON-serializable value as a cacheable payload"""
+    body = json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
+    return encode_bytes(body, "application/json")
+
+
+def _if_none_match(request: Request, payload: EncodedPayload) -> bool:
+    """True if the client already has this payload (any encoding)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        for suffix in _ENCODING_SUFFIX.values():
+            if suffix and tag.endswith(suffix):
+                tag = tag[:-len(suffix)]
+                break
+        if tag == payload.etag:
+            return True
+    return False
+
+
+def _accepted_encodings(request: Request) -> set:
+    """Encodings listed in Accept-Encoding with a non-zero q value"""
+    accepted = set()
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name.strip() and quality > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def _negotiate(request: Request, payload: EncodedPayload) -> str:
+    """Pick the best available encoding the client accepts"""
+    accepted = _accepted_encodings(request)
+    if "br" in accepted and payload.br_body is not None:
+        return "br"
+    if "gzip" in accepted and payload.gzip_body is not None:
+        return "gzip"
+    return "identity"
+
+
+def payload_response(
+    request: Request,
+    payload: EncodedPayload,
+    cache_control: str = "private, no-cache",
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Serve an encoded payload, answering conditional requests with 304
+
+    Args:
+        request: Incoming request (If-None-Match, Accept-Encoding)
+        payload: Payload from encode_payload / encode_bytes
+        cache_control: Cache-Control header value
+        status_code: Status for a full response
+        headers: Extra response headers
+    """
+    encoding = _negotiate(request, payload)
+    response_headers = {
+        "ETag": payload.etag_header(encoding),
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+        **(headers or {})
+    }
+
+    if status_code == 200 and _if_none_match(request, payload):
+        return Response(status_code=304, headers=response_headers)
+
+    if encoding != "identity":
+        response_headers["Content-Encoding"] = encoding
+
+    return Response(
+        content=payload.variant(encoding),
+        status_code=status_code,
+        media_type=payload.media_type,
+        headers=response_headers
+    )
@@ -0,0 +1,656 @@
+"""
+NetSuite Order Ingestion
+Incrementally mirrors NetSuite sales orders into orders / order_items
+
+Pipeline:
+    SuiteQL pages -> group lines into orders -> batches -> bounded queue -> writers
+
+- A producer reads SuiteQL result pages (one page fetched ahead) for sales
+  orders modified since the watermark, one row per order line, groups the
+  lines into orders and puts batches of NETSUITE_SYNC_BATCH_SIZE orders on
+  a queue of NETSUITE_SYNC_QUEUE_SIZE batches. When the writers fall
+  behind, the full queue blocks the producer (backpressure) instead of
+  buffering the whole result in memory.
+- NETSUITE_SYNC_WRITERS consumers write one batch per transaction: a
+  multi-row INSERT ... ON CONFLICT (netsuite_id) DO UPDATE ... RETURNING id
+  for the orders, then their order_items are replaced. Missing customers
+  and products are created. Order numbers are the NetSuite tranid with an
+  "NS-" prefix, so they cannot collide with order numbers entered locally
+  (orders.order_number is UNIQUE, and the upsert only resolves
+  netsuite_id conflicts).
+- Checkpointing: batches finish out of order, so the watermark in
+  sync_state advances to the newest lastmodifieddate of the contiguous
+  prefix of written batches, as it grows. A failed run resumes from there.
+- HTTP calls and batch writes are retried with exponential backoff and
+  full jitter.
+
+SuiteQL timestamps are read as UTC; run the integration user with its
+timezone preference set to GMT so the watermark and lag are exact.
+
+Usage:
+    python -m sales_dashboard.integrations.netsuite_sync          # incremental
+    python -m sales_dashboard.integrations.netsuite_sync --full   # full resync
+
+benchmarks/netsuite_standin.py serves a fake SuiteQL endpoint for local runs.
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import logging
+import random
+import secrets
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Type, TypeVar
+from urllib.parse import parse_qsl, quote, urlsplit
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+
+from ..config import config
+from ..data.cache import dashboard_cache
+from ..data.database import async_engine, get_async_db_session
+from ..data.upsert import insert_rows, upsert_rows
+from .sync_state import put_or_raise, read_watermark, record_run
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+SYNC_SOURCE = "netsuite_orders"
+SYNC_LOCK_ID = 72_510_102
+
+# Re-read this much before the watermark on incremental runs
+WATERMARK_OVERLAP = timedelta(minutes=2)
+
+# SuiteQL returns at most 1000 rows per page and refuses offsets past 100k;
+# longer results are read in windows, each restarting from the last timestamp
+PAGE_SIZE = 1000
+MAX_OFFSET = 100_000
+
+# deadlock_detected, serialization_failure: rerunning the transaction succeeds.
+# asyncpg surfaces them as a plain DBAPIError, so they are matched by SQLSTATE.
+TRANSIENT_SQLSTATES = {"40P01", "40001"}
+
+# orders.order_number namespace for NetSuite orders
+ORDER_NUMBER_PREFIX = "NS-"
+
+# NetSuite sales order status codes -> orders.status
+STATUS_MAP = {
+    "A": "pending",      # Pending Approval
+    "B": "processing",   # Pending Fulfillment
+    "C": "cancelled",
+    "D": "partial",      # Partially Fulfilled
+    "E": "partial",      # Pending Billing / Partially Fulfilled
+    "F": "fulfilled",    # Pending Billing
+    "G": "fulfilled",    # Billed
+    "H": "fulfilled",    # Closed
+}
+
+ORDER_LINES_SUITEQL = """
+    SELECT
+        t.id, t.tranid, t.status,
+        TO_CHAR(t.trandate, 'YYYY-MM-DD') AS trandate,
+        TO_CHAR(t.lastmodifieddate, 'YYYY-MM-DD HH24:MI:SS') AS lastmodified,
+        t.entity, BUILTIN.DF(t.entity) AS entity_name, e.email AS rep_email,
+        t.foreigntotal AS total, t.taxtotal AS tax,
+        tl.linesequencenumber AS line, i.itemid AS sku, BUILTIN.DF(tl.item) AS item_name,
+        ABS(tl.quantity) AS quantity, tl.rate, ABS(tl.netamount) AS amount
+    FROM transaction t
+    JOIN transactionline tl ON tl.transaction = t.id AND tl.mainline = 'F' AND tl.taxline = 'F'
+    JOIN item i ON i.id = tl.item
+    LEFT JOIN employee e ON e.id = t.employee
+    WHERE t.type = 'SalesOrd'{since}
+    ORDER BY t.lastmodifieddate, t.id, tl.linesequencenumber
+"""
+
+
+class RetryableError(Exception):
+    """Transient failure (throttling, 5xx, connection reset)"""
+
+
+def is_transient_db_error(error: BaseException) -> bool:
+    """Connection drops, deadlocks and serialization failures (worth retrying)"""
+    if isinstance(error, (OperationalError, InterfaceError)) or getattr(error, "connection_invalidated", False):
+        return True
+    if not isinstance(error, DBAPIError):
+        return False
+    orig = error.orig
+    return (getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)) in TRANSIENT_SQLSTATES
+
+
+async def retry_with_jitter(
+    operation: Callable[[], Awaitable[T]],
+    attempts: int,
+    base_delay: float = 0.5,
+    max_delay: float = 30.0,
+    on_retry: Optional[Callable[[Exception], None]] = None,
+    retry_on: Tuple[Type[Exception], ...] = (RetryableError, httpx.TransportError),
+    retry_if: Optional[Callable[[Exception], bool]] = None
+) -> T:
+    """
+    Run operation, retrying failures with exponential backoff and full
+    jitter (sleep uniform(0, min(max_delay, base_delay * 2**attempt)))
+    so that workers failing together don't retry together
+
+    Failures are retried when retry_if(error) is true, or, without
+    retry_if, when they are instances of retry_on.
+    """
+    for attempt in range(attempts):
+        try:
+            return await operation()
+        except Exception as e:
+            retryable = retry_if(e) if retry_if is not None else isinstance(e, retry_on)
+            if not retryable or attempt == attempts - 1:
+                raise
+            if on_retry:
+                on_retry(e)
+            await asyncio.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
+
+
+def _percent(value: str) -> str:
+    return quote(str(value), safe="~")
+
+
+def oauth1_header(
+    method: str,
+    url: str,
+    settings: Dict[str, Any],
+    nonce: Optional[str] = None,
+    timestamp: Optional[int] = None
+) -> str:
+    """
+    OAuth 1.0a Authorization header for NetSuite token-based auth
+    (HMAC-SHA256, realm = account ID)
+    """
+    oauth = {
+        "oauth_consumer_key": settings["consumer_key"],
+        "oauth_token": settings["token_id"],
+        "oauth_signature_method": "HMAC-SHA256",
+        "oauth_timestamp": str(timestamp or int(time.time())),
+        "oauth_nonce": nonce or secrets.token_hex(16),
+        "oauth_version": "1.0",
+    }
+    parts = urlsplit(url)
+    params = sorted((_percent(k), _percent(v)) for k, v in [*parse_qsl(parts.query), *oauth.items()])
+    base_string = "&".join([
+        method.upper(),
+        _percent(f"{parts.scheme}://{parts.netloc}{parts.path}"),
+        _percent("&".join(f"{k}={v}" for k, v in params)),
+    ])
+    key = f"{_percent(settings['consumer_secret'])}&{_percent(settings['token_secret'])}"
+    oauth["oauth_signature"] = base64.b64encode(
+        hmac.new(key.encode(), base_string.encode(), hashlib.sha256).digest()
+    ).decode()
+
+    realm = (settings.get("account_id") or "").upper().replace("-", "_")
+    return "OAuth " + ", ".join(
+        [f'realm="{realm}"'] + [f'{k}="{_percent(v)}"' for k, v in oauth.items()]
+    )
+
+
+def parse_timestamp(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+
+
+def _suiteql_since(watermark: Optional[datetime]) -> str:
+    if watermark is None:
+        return ""
+    value = watermark.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    return f"\n      AND t.lastmodifieddate >= TO_TIMESTAMP('{value}', 'YYYY-MM-DD HH24:MI:SS')"
+
+
+class NetSuiteClient:
+    """Async SuiteQL client with OAuth 1.0a signing and jittered retries"""
+
+    def __init__(self, settings: Dict[str, Any], max_retries: int = 5, timeout: float = 60.0):
+        self.settings = settings
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.retries = 0
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def configured(self) -> bool:
+        return all(self.settings.get(k) for k in
+                   ("api_url", "consumer_key", "consumer_secret", "token_id", "token_secret"))
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        return self._client
+
+    def _count_retry(self, error: Exception):
+        self.retries += 1
+        logger.warning(f"NetSuite request failed, retrying: {error}")
+
+    async def suiteql_page(self, query: str, offset: int, limit: int = PAGE_SIZE) -> Dict[str, Any]:
+        """One page of SuiteQL results ({items, hasMore, totalResults, ...})"""
+        url = f"{self.settings['api_url'].rstrip('/')}/services/rest/query/v1/suiteql?limit={limit}&offset={offset}"
+
+        async def request():
+            response = await self._http().post(
+                url,
+                json={"q": query},
+                headers={"Authorization": oauth1_header("POST", url, self.settings), "Prefer": "transient"}
+            )
+            if response.status_code == 429 or response.status_code >= 500:
+                raise RetryableError(f"HTTP {response.status_code}")
+            response.raise_for_status()
+            return response.json()
+
+        return await retry_with_jitter(request, self.max_retries, on_retry=self._count_retry)
+
+    async def orders(self, watermark: Optional[datetime]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield sales orders ({header fields..., lines: [...]}) modified at or
+        after watermark, in (lastmodified, id) order
+
+        A window that reaches MAX_OFFSET drops its last, possibly
+        incomplete order; the next window restarts at that order's
+        timestamp, skipping orders with that timestamp already yielded.
+        """
+        since = watermark
+        skip_stamp, skip_ids = None, set()
+        while True:
+            query = ORDER_LINES_SUITEQL.format(since=_suiteql_since(since))
+            offset, current, yielded = 0, None, 0
+            seen_stamp, seen_ids = None, set()
+            next_page = asyncio.ensure_future(self.suiteql_page(query, offset))
+            try:
+                while True:
+                    page = await next_page
+                    items = page.get("items", [])
+                    offset += len(items)
+                    more = bool(page.get("hasMore") and items)
+                    window_full = more and offset >= MAX_OFFSET
+                    if more and not window_full:
+                        # Fetch ahead while this page is processed
+                        next_page = asyncio.ensure_future(self.suiteql_page(query, offset))
+
+                    for row in items:
+                        if row["lastmodified"] == skip_stamp and row["id"] in skip_ids:
+                            continue
+                        if current is not None and row["id"] != current["id"]:
+                            yield current
+                            yielded += 1
+                            if current["lastmodified"] != seen_stamp:
+                                seen_stamp, seen_ids = current["lastmodified"], set()
+                            seen_ids.add(current["id"])
+                            current = None
+                        if current is None:
+                            current = {**row, "lines": []}
+                        current["lines"].append(row)
+
+                    if not more or window_full:
+                        break
+            finally:
+                if not next_page.done():
+                    next_page.cancel()
+
+            if not window_full:
+                if current is not None:
+                    yield current
+                return
+            if not yielded or current is None:
+                raise RuntimeError(f"A window of {MAX_OFFSET:,} SuiteQL rows yielded no complete order")
+
+            restart = current["lastmodified"]
+            skip_ids = (skip_ids if skip_stamp == restart else set()) | (seen_ids if seen_stamp == restart else set())
+            skip_stamp = restart
+            since = parse_timestamp(restart)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def order_number(order: Dict[str, Any]) -> str:
+    """orders.order_number for a NetSuite order: NS-<tranid>, or NS-#<internal id> without one"""
+    tranid = order.get("tranid")
+    return f"{ORDER_NUMBER_PREFIX}{tranid if tranid else '#' + str(order['id'])}"[:50]
+
+
+class _Checkpoint:
+    """Contiguous-prefix watermark over batches completing out of order"""
+
+    def __init__(self):
+        self.next_seq = 0
+        self.done: Dict[int, Optional[datetime]] = {}
+        self.watermark: Optional[datetime] = None
+
+    def complete(self, seq: int, newest: Optional[datetime]) -> bool:
+        """Mark a batch written; True if the watermark advanced"""
+        self.done[seq] = newest
+        advanced = False
+        while self.next_seq in self.done:
+            stamp = self.done.pop(self.next_seq)
+            if stamp is not None and (self.watermark is None or stamp > self.watermark):
+                self.watermark = stamp
+                advanced = True
+            self.next_seq += 1
+        return advanced
+
+
+class NetSuiteOrderSync:
+    """
+    NetSuite sales order -> orders/order_items ingestion.
+
+    Usage:
+        stats = await netsuite_sync.run()            # incremental
+        stats = await netsuite_sync.run(full=True)   # full resync
+        netsuite_sync.start(config.SYNC_INTERVAL_NETSUITE)  # background loop
+    """
+
+    def __init__(
+        self,
+        client: NetSuiteClient,
+        batch_size: int = 500,
+        queue_size: int = 8,
+        writers: int = 2,
+        max_retries: int = 5
+    ):
+        self.client = client
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.writers = writers
+        self.max_retries = max_retries
+        self._task: Optional[asyncio.Task] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._runs = 0
+        self._last_run: Optional[Dict[str, Any]] = None
+        self._run_started: Optional[float] = None
+        self._metrics = self._empty_metrics()
+
+    @staticmethod
+    def _empty_metrics() -> Dict[str, Any]:
+        return {
+            "rows_fetched": 0,
+            "orders_fetched": 0,
+            "orders_written": 0,
+            "items_written": 0,
+            "batches_written": 0,
+            "write_retries": 0,
+            "max_queue_depth": 0,
+            "watermark": None,
+        }
+
+    # ------------------------------------------------------------------
+    # Transform + write
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def order_row(order: Dict[str, Any], customer_id: int, sales_rep_id: Optional[int]) -> Dict[str, Any]:
+        """Map a grouped NetSuite order to an orders row"""
+        total = float(order.get("total") or 0)
+        tax = float(order.get("tax") or 0)
+        return {
+            "netsuite_id": str(order["id"]),
+            "order_number": order_number(order),
+            "customer_id": customer_id,
+            "sales_rep_id": sales_rep_id,
+            "order_date": datetime.strptime(order["trandate"], "%Y-%m-%d"),
+            "status": STATUS_MAP.get(order.get("status"), "pending"),
+            "subtotal": total - tax,
+            "tax": tax,
+            "total_amount": total,
+        }
+
+    async def write_orders(self, orders: List[Dict[str, Any]]) -> int:
+        """
+        Upsert orders (grouped as yielded by NetSuiteClient.orders) and
+        replace their items in one transaction
+
+        Returns:
+            Order items written
+        """
+        async with get_async_db_session() as db:
+            accounts = {str(o["entity"]): (o.get("entity_name") or str(o["entity"]))[:255] for o in orders}
+            await upsert_rows(
+                db, "customers",
+                [{"netsuite_id": ns_id, "company_name": name} for ns_id, name in accounts.items()],
+                conflict_column="netsuite_id",
+                update_expressions={"updated_at": "NOW()"},
+                where="customers.company_name IS DISTINCT FROM excluded.company_name"
+            )
+            customers = dict((await db.execute(
+                text("SELECT netsuite_id, id FROM customers WHERE netsuite_id = ANY(:ids)"),
+                {"ids": list(accounts)}
+            )).fetchall())
+
+            items = {line["sku"]: line for o in orders for line in o["lines"]}
+            await upsert_rows(
+                db, "products",
+                [{"sku": sku[:100], "name": (line.get("item_name") or sku)[:255],
+                  "unit_price": float(line.get("rate") or 0)} for sku, line in items.items()],
+                conflict_column="sku",
+                update_columns=[]
+            )
+            products = dict((await db.execute(
+                text("SELECT sku, id FROM products WHERE sku = ANY(:skus)"), {"skus": list(items)}
+            )).fetchall())
+
+            emails = list({(o.get("rep_email") or "").lower() for o in orders} - {""})
+            reps = dict((await db.execute(
+                text("SELECT lower(email), id FROM users WHERE lower(email) = ANY(:emails)"),
+                {"emails": emails}
+            )).fetchall()) if emails else {}
+
+            returned = await upsert_rows(
+                db, "orders",
+                [self.order_row(o, customers[str(o["entity"])], reps.get((o.get("rep_email") or "").lower()))
+                 for o in orders],
+                conflict_column="netsuite_id",
+                update_expressions={"updated_at": "NOW()"},
+                returning=("id", "netsuite_id")
+            )
+            order_ids = {netsuite_id: order_id for order_id, netsuite_id in returned}
+
+            await db.execute(
+                text("DELETE FROM order_items WHERE order_id = ANY(:ids)"), {"ids": sorted(order_ids.values())}
+            )
+            item_rows = [
+                {
+                    "order_id": order_ids[str(o["id"])],
+                    "product_id": products[line["sku"]],
+                    "quantity": int(float(line.get("quantity") or 0)),
+                    "unit_price": float(line.get("rate") or 0),
+                    "line_total": float(line.get("amount") or 0),
+                }
+                for o in orders for line in o["lines"]
+            ]
+            item_rows.sort(key=lambda row: (row["order_id"], row["product_id"]))
+            await insert_rows(db, "order_items", item_rows)
+            await db.commit()
+            return len(item_rows)
+
+    # ------------------------------------------------------------------
+    # Runs
+    # ------------------------------------------------------------------
+
+    async def run(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Ingest once
+
+        Returns:
+            Run statistics (status 'ok', 'skipped' or 'error')
+        """
+        if not self.client.configured:
+            return {"status": "skipped", "reason": "NetSuite credentials not configured"}
+
+        async with async_engine.connect() as lock_conn:
+            locked = (await lock_conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": SYNC_LOCK_ID})).scalar()
+            if not locked:
+                return {"status": "skipped", "reason": "another sync is running"}
+            try:
+                stats = await self._run(full)
+            finally:
+                await lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": SYNC_LOCK_ID})
+                await lock_conn.commit()
+
+        self._runs += 1
+        self._last_run = stats
+        return stats
+
+    async def _run(self, full: bool) -> Dict[str, Any]:
+        self._metrics = self._empty_metrics()
+        self._run_started = time.monotonic()
+        metrics = self._metrics
+        stored = await read_watermark(SYNC_SOURCE)
+        metrics["watermark"] = stored
+        since = None if full or stored is None else stored - WATERMARK_OVERLAP
+
+        checkpoint = _Checkpoint()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._queue = queue
+
+        def count_write_retry(error: Exception):
+            metrics["write_retries"] += 1
+            logger.warning(f"NetSuite batch write failed, retrying: {error}")
+
+        async def writer():
+            while True:
+                item = await queue.get()
+                try:
+                    if item is None:
+                        return
+                    seq, orders, newest = item
+                    items = await retry_with_jitter(
+                        lambda: self.write_orders(orders), self.max_retries,
+                        on_retry=count_write_retry, retry_if=is_transient_db_error
+                    )
+                    metrics["orders_written"] += len(orders)
+                    metrics["items_written"] += items
+                    metrics["batches_written"] += 1
+                    if checkpoint.complete(seq, newest):
+                        metrics["watermark"] = checkpoint.watermark
+                        await record_run(SYNC_SOURCE, "running", len(orders), checkpoint.watermark)
+                    else:
+                        await record_run(SYNC_SOURCE, "running", len(orders))
+                finally:
+                    queue.task_done()
+
+        writers = [asyncio.ensure_future(writer()) for _ in range(self.writers)]
+        try:
+            seq, batch = 0, []
+            async for order in self.client.orders(since):
+                metrics["orders_fetched"] += 1
+                metrics["rows_fetched"] += len(order["lines"])
+                batch.append(order)
+                if len(batch) >= self.batch_size:
+                    await self._put(queue, writers, (seq, batch, parse_timestamp(batch[-1]["lastmodified"])))
+                    seq, batch = seq + 1, []
+            if batch:
+                await self._put(queue, writers, (seq, batch, parse_timestamp(batch[-1]["lastmodified"])))
+            for _ in writers:
+                await put_or_raise(queue, None, writers)
+            await asyncio.gather(*writers)
+        except Exception as e:
+            for task in writers:
+                task.cancel()
+            logger.error(f"NetSuite ingestion failed after {metrics['orders_written']:,} orders "
+                         f"(checkpoint {checkpoint.watermark}): {e}")
+            await record_run(SYNC_SOURCE, "error", 0, error=str(e))
+            return {"status": "error", "error": str(e), **self._summary()}
+        finally:
+            self._queue = None
+
+        await record_run(SYNC_SOURCE, "ok", 0, checkpoint.watermark)
+        if metrics["orders_written"]:
+            await dashboard_cache.invalidate()
+
+        summary = {"status": "ok", "full": full, **self._summary()}
+        logger.info(f"NetSuite ingestion: {metrics['orders_written']:,} orders, "
+                    f"{metrics['items_written']:,} items in {summary['seconds']:.1f}s")
+        return summary
+
+    async def _put(self, queue: asyncio.Queue, writers: List[asyncio.Task], item):
+        """Enqueue a batch; blocks while the queue is full (backpressure) until a writer fails"""
+        await put_or_raise(queue, item, writers)
+        self._metrics["max_queue_depth"] = max(self._metrics["max_queue_depth"], queue.qsize())
+
+    def _summary(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self._run_started if self._run_started else 0.0
+        metrics = dict(self._metrics)
+        watermark = metrics.pop("watermark")
+        return {
+            **metrics,
+            "seconds": round(elapsed, 2),
+            "orders_per_second": round(metrics["orders_written"] / elapsed, 1) if elapsed else 0.0,
+            "watermark": watermark.isoformat() if watermark else None,
+        }
+
+    def start(self, interval: float):
+        """Run incremental ingestion every interval seconds in the background"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run_forever(interval))
+
+    async def _run_forever(self, interval: float):
+        while True:
+            try:
+                await self.run()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"NetSuite ingestion loop error: {e}")
+            await asyncio.sleep(interval)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.client.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Metrics: throughput (orders/s of the current or last run), queue
+        depth, and lag (seconds between now and the watermark)
+        """
+        watermark = self._metrics["watermark"]
+        return {
+            "configured": self.client.configured,
+            "running": self._task is not None and not self._task.done(),
+            "runs": self._runs,
+            "in_progress": self._queue is not None,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "http_retries": self.client.retries,
+            "lag_seconds": round((datetime.now(timezone.utc) - watermark).total_seconds(), 1) if watermark else None,
+            "current": self._summary() if self._run_started else None,
+            "last_run": self._last_run
+        }
+
+
+# Global ingestion pipeline
+netsuite_sync = NetSuiteOrderSync(
+    NetSuiteClient(config.get_netsuite_config(), max_retries=config.NETSUITE_SYNC_MAX_RETRIES),
+    batch_size=config.NETSUITE_SYNC_BATCH_SIZE,
+    queue_size=config.NETSUITE_SYNC_QUEUE_SIZE,
+    writers=config.NETSUITE_SYNC_WRITERS,
+    max_retries=config.NETSUITE_SYNC_MAX_RETRIES
+)
+
+
+async def _main(full: bool):
+    try:
+        stats = await netsuite_sync.run(full=full)
+        print(stats)
+    finally:
+        await netsuite_sync.stop()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Ingest NetSuite sales orders into orders / order_items")
+    parser.add_argument("--full", action="store_true", help="ignore the watermark and re-ingest everything")
+    asyncio.run(_main(parser.parse_args().full))
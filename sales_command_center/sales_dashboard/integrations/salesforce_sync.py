@@ -0,0 +1,458 @@
+"""
+Salesforce Pipeline Sync
+Incrementally mirrors Salesforce Opportunities into the pipeline table
+
+Each run:
+1. Reads the SystemModstamp watermark from sync_state and queries only
+   Opportunities modified since then (minus WATERMARK_OVERLAP, since
+   upserts are idempotent and a record committed late with an older
+   timestamp must not be missed). A full resync ignores the watermark.
+2. Fetches result pages concurrently: after the first page, the remaining
+   pages are addressed directly by query locator offset
+   (.../query/<locator>-<offset>) instead of following nextRecordsUrl one
+   by one.
+3. Applies each page with one multi-row INSERT ... ON CONFLICT
+   (salesforce_id) DO UPDATE, creating missing accounts in customers.
+   Rows are written in key order and a page that hits a deadlock or
+   serialization failure (two writers, rollup triggers) is retried with
+   backoff.
+4. Advances the watermark only after every page is written, then
+   invalidates the dashboard cache (rollups are maintained by triggers).
+
+A Postgres advisory lock makes concurrent runs (several app workers, a
+manual run) skip instead of syncing twice.
+
+Usage:
+    python -m sales_dashboard.integrations.salesforce_sync          # incremental
+    python -m sales_dashboard.integrations.salesforce_sync --full   # full resync
+
+SALESFORCE_LOGIN_URL points the client at another endpoint, e.g. the local
+stand-in in benchmarks/salesforce_standin.py.
+"""
+
+import argparse
+import asyncio
+import logging
+import re
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+from sqlalchemy import text
+
+from ..config import config
+from ..data.cache import dashboard_cache
+from ..data.database import async_engine, get_async_db_session
+from ..data.upsert import upsert_rows
+from .netsuite_sync import is_transient_db_error, retry_with_jitter
+from .sync_state import put_or_raise, read_watermark, record_run
+
+logger = logging.getLogger(__name__)
+
+SYNC_SOURCE = "salesforce_opportunities"
+SYNC_LOCK_ID = 72_510_101
+
+# Re-read this much before the watermark on incremental runs
+WATERMARK_OVERLAP = timedelta(minutes=2)
+
+OPPORTUNITY_FIELDS = [
+    "Id", "Name", "AccountId", "Account.Name", "Owner.Email", "StageName", "Amount",
+    "Probability", "CloseDate", "LeadSource", "NextStep", "IsClosed", "IsWon", "SystemModstamp"
+]
+
+# Salesforce default stage names -> pipeline.stage
+STAGE_MAP = {
+    "prospecting": "lead",
+    "qualification": "qualified",
+    "needs analysis": "qualified",
+    "value proposition": "qualified",
+    "id. decision makers": "qualified",
+    "perception analysis": "proposal",
+    "proposal/price quote": "proposal",
+    "negotiation/review": "negotiation",
+}
+
+_LOCATOR_RE = re.compile(r"^(?P<base>.+/query/[^/]+)-(?P<offset>\d+)$")
+
+
+def _soql_datetime(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def parse_datetime(value: str) -> datetime:
+    # Salesforce sends e.g. 2025-11-04T17:03:21.000+0000
+    return datetime.fromisoformat(re.sub(r"([+-]\d{2})(\d{2})$", r"\1:\2", value.replace("Z", "+00:00")))
+
+
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    return date.fromisoformat(value) if value else None
+
+
+def pipeline_stage(record: Dict[str, Any]) -> str:
+    if record.get("IsClosed"):
+        return "closed_won" if record.get("IsWon") else "closed_lost"
+    stage = (record.get("StageName") or "").lower()
+    return STAGE_MAP.get(stage, "lead")
+
+
+def opportunity_row(record: Dict[str, Any], customer_id: int, owner_id: Optional[int]) -> Dict[str, Any]:
+    """Map an Opportunity record to a pipeline row"""
+    closed = bool(record.get("IsClosed"))
+    close_date = _parse_date(record.get("CloseDate"))
+    return {
+        "salesforce_id": record["Id"],
+        "opportunity_name": (record.get("Name") or record["Id"])[:255],
+        "customer_id": customer_id,
+        "owner_id": owner_id,
+        "stage": pipeline_stage(record),
+        "amount": record.get("Amount") or 0,
+        "probability": int(record.get("Probability") or 0),
+        "expected_close_date": close_date,
+        "actual_close_date": close_date if closed else None,
+        "lead_source": record.get("LeadSource"),
+        "next_step": record.get("NextStep"),
+        "is_won": bool(record.get("IsWon")) if closed else None,
+    }
+
+
+class SalesforceClient:
+    """
+    Minimal async Salesforce REST client (OAuth username-password flow,
+    SOQL query with concurrent page fetches)
+    """
+
+    def __init__(
+        self,
+        settings: Dict[str, Any],
+        login_url: Optional[str] = None,
+        concurrency: int = 4,
+        timeout: float = 60.0
+    ):
+        self.settings = settings
+        self.login_url = login_url or f"https://{settings.get('domain') or 'login'}.salesforce.com"
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._token: Optional[str] = None
+        self._instance_url: Optional[str] = None
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.settings.get("client_id") and self.settings.get("username"))
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.concurrency * 2)
+            )
+        return self._client
+
+    async def authenticate(self):
+        response = await self._http().post(
+            f"{self.login_url}/services/oauth2/token",
+            data={
+                "grant_type": "password",
+                "client_id": self.settings.get("client_id"),
+                "client_secret": self.settings.get("client_secret"),
+                "username": self.settings.get("username"),
+                "password": (self.settings.get("password") or "") + (self.settings.get("security_token") or ""),
+            }
+        )
+        response.raise_for_status()
+        body = response.json()
+        self._token = body["access_token"]
+        self._instance_url = body["instance_url"].rstrip("/")
+
+    async def _get(self, path: str, params: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """GET an API path, re-authenticating once on 401 and retrying 429/5xx"""
+        if self._token is None:
+            await self.authenticate()
+        for attempt in range(4):
+            response = await self._http().get(
+                f"{self._instance_url}{path}",
+                params=params,
+                headers={"Authorization": f"Bearer {self._token}"}
+            )
+            if response.status_code == 401 and attempt == 0:
+                await self.authenticate()
+                continue
+            if (response.status_code == 429 or response.status_code >= 500) and attempt < 3:
+                await asyncio.sleep(2 ** attempt)
+                continue
+            response.raise_for_status()
+            return response.json()
+        response.raise_for_status()
+
+    async def query_pages(self, soql: str) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield pages of query records (not in order once fetched concurrently)
+        """
+        version = self.settings.get("api_version") or "v58.0"
+        first = await self._get(f"/services/data/{version}/query", {"q": soql})
+        yield first.get("records", [])
+
+        next_url = first.get("nextRecordsUrl")
+        if not next_url:
+            return
+
+        match = _LOCATOR_RE.match(next_url)
+        total = first.get("totalSize", 0)
+        if match is None:
+            # Unknown locator format: follow the chain sequentially
+            while next_url:
+                page = await self._get(next_url)
+                yield page.get("records", [])
+                next_url = page.get("nextRecordsUrl")
+            return
+
+        page_size = int(match.group("offset"))
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(offset: int) -> List[Dict[str, Any]]:
+            async with semaphore:
+                page = await self._get(f"{match.group('base')}-{offset}")
+                return page.get("records", [])
+
+        tasks = [asyncio.ensure_future(fetch(offset)) for offset in range(page_size, total, page_size)]
+        try:
+            for next_page in asyncio.as_completed(tasks):
+                yield await next_page
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class SalesforceSync:
+    """
+    Opportunity -> pipeline sync with a persistent watermark.
+
+    Usage:
+        stats = await salesforce_sync.run()            # incremental
+        stats = await salesforce_sync.run(full=True)   # full resync
+        salesforce_sync.start(config.SYNC_INTERVAL_SALESFORCE)  # background loop
+    """
+
+    def __init__(self, client: SalesforceClient, writers: int = 2, max_retries: int = 5):
+        self.client = client
+        self.writers = writers
+        self.max_retries = max_retries
+        self._task: Optional[asyncio.Task] = None
+        self._last_run: Optional[Dict[str, Any]] = None
+        self._runs = 0
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    async def apply_records(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Upsert Opportunity records (a query page or webhook batch) and their
+        Accounts in one transaction
+
+        Returns:
+            Pipeline rows written
+        """
+        async with get_async_db_session() as db:
+            # upsert_rows writes accounts and opportunities sorted by
+            # salesforce_id, so concurrent writers lock rows in one order
+            accounts = {
+                r["AccountId"]: ((r.get("Account") or {}).get("Name") or r["AccountId"])[:255]
+                for r in records if r.get("AccountId")
+            }
+            if accounts:
+                await upsert_rows(
+                    db, "customers",
+                    [{"salesforce_id": sf_id, "company_name": name} for sf_id, name in accounts.items()],
+                    conflict_column="salesforce_id",
+                    update_expressions={"updated_at": "NOW()"},
+                    where="customers.company_name IS DISTINCT FROM excluded.company_name"
+                )
+            customers = dict((await db.execute(
+                text("SELECT salesforce_id, id FROM customers WHERE salesforce_id = ANY(:ids)"),
+                {"ids": list(accounts)}
+            )).fetchall())
+
+            emails = list({(r.get("Owner") or {}).get("Email", "").lower() for r in records} - {""})
+            owners = dict((await db.execute(
+                text("SELECT lower(email), id FROM users WHERE lower(email) = ANY(:emails)"),
+                {"emails": emails}
+            )).fetchall()) if emails else {}
+
+            rows = [
+                opportunity_row(r, customers[r["AccountId"]], owners.get((r.get("Owner") or {}).get("Email", "").lower()))
+                for r in records if r.get("AccountId") in customers
+            ]
+            await upsert_rows(
+                db, "pipeline", rows,
+                conflict_column="salesforce_id",
+                update_expressions={
+                    # Days in stage restart when the stage moves
+                    "days_in_stage": "CASE WHEN pipeline.stage = excluded.stage THEN pipeline.days_in_stage ELSE 0 END",
+                    "updated_at": "NOW()",
+                }
+            )
+            await db.commit()
+            return len(rows)
+
+    # ------------------------------------------------------------------
+    # Runs
+    # ------------------------------------------------------------------
+
+    async def run(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Sync once
+
+        Returns:
+            Run statistics (status 'ok', 'skipped' or 'error')
+        """
+        if not self.client.configured:
+            return {"status": "skipped", "reason": "Salesforce credentials not configured"}
+
+        async with async_engine.connect() as lock_conn:
+            locked = (await lock_conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": SYNC_LOCK_ID})).scalar()
+            if not locked:
+                return {"status": "skipped", "reason": "another sync is running"}
+            try:
+                stats = await self._run(full)
+            finally:
+                await lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": SYNC_LOCK_ID})
+                await lock_conn.commit()
+
+        self._runs += 1
+        self._last_run = stats
+        return stats
+
+    async def _run(self, full: bool) -> Dict[str, Any]:
+        started = time.monotonic()
+        watermark = None if full else await read_watermark(SYNC_SOURCE)
+        soql = f"SELECT {', '.join(OPPORTUNITY_FIELDS)} FROM Opportunity"
+        if watermark is not None:
+            soql += f" WHERE SystemModstamp > {_soql_datetime(watermark - WATERMARK_OVERLAP)}"
+        soql += " ORDER BY SystemModstamp"
+
+        fetched = written = retries = 0
+        newest: Optional[datetime] = None
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.writers * 2)
+
+        def count_write_retry(error: Exception):
+            nonlocal retries
+            retries += 1
+            logger.warning(f"Salesforce page write failed, retrying: {error}")
+
+        async def writer():
+            nonlocal written
+            while True:
+                page = await queue.get()
+                try:
+                    if page is None:
+                        return
+                    count = await retry_with_jitter(
+                        lambda: self.apply_records(page), self.max_retries,
+                        on_retry=count_write_retry, retry_if=is_transient_db_error
+                    )
+                    written += count
+                finally:
+                    queue.task_done()
+
+        writers = [asyncio.ensure_future(writer()) for _ in range(self.writers)]
+        try:
+            async for page in self.client.query_pages(soql):
+                fetched += len(page)
+                for record in page:
+                    stamp = parse_datetime(record["SystemModstamp"])
+                    newest = stamp if newest is None or stamp > newest else newest
+                # A failed writer stops the run instead of blocking on a full queue
+                await put_or_raise(queue, page, writers)
+            for _ in writers:
+                await put_or_raise(queue, None, writers)
+            await asyncio.gather(*writers)
+        except Exception as e:
+            for task in writers:
+                task.cancel()
+            logger.error(f"Salesforce sync failed after {fetched:,} records: {e}")
+            await record_run(SYNC_SOURCE, "error", written, error=str(e))
+            return {"status": "error", "error": str(e), "fetched": fetched, "written": written}
+
+        await record_run(SYNC_SOURCE, "ok", written, newest)
+        if written:
+            await dashboard_cache.invalidate()
+
+        elapsed = time.monotonic() - started
+        logger.info(f"Salesforce sync: {fetched:,} fetched, {written:,} upserted in {elapsed:.1f}s"
+                    f"{' (full)' if full else ''}")
+        return {
+            "status": "ok",
+            "full": full,
+            "fetched": fetched,
+            "written": written,
+            "skipped": fetched - written,
+            "write_retries": retries,
+            "watermark": newest.isoformat() if newest else None,
+            "seconds": round(elapsed, 2)
+        }
+
+    def start(self, interval: float):
+        """Run incremental syncs every interval seconds in the background"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run_forever(interval))
+
+    async def _run_forever(self, interval: float):
+        while True:
+            try:
+                await self.run()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Salesforce sync loop error: {e}")
+            await asyncio.sleep(interval)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.client.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "configured": self.client.configured,
+            "running": self._task is not None and not self._task.done(),
+            "runs": self._runs,
+            "last_run": self._last_run
+        }
+
+
+# Global sync engine
+salesforce_sync = SalesforceSync(
+    SalesforceClient(
+        config.get_salesforce_config(),
+        login_url=config.SALESFORCE_LOGIN_URL,
+        concurrency=config.SALESFORCE_SYNC_CONCURRENCY
+    )
+)
+
+
+async def _main(full: bool):
+    try:
+        stats = await salesforce_sync.run(full=full)
+        print(stats)
+    finally:
+        await salesforce_sync.stop()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Sync Salesforce Opportunities into the pipeline table")
+    parser.add_argument("--full", action="store_true", help="ignore the watermark and resync everything")
+    asyncio.run(_main(parser.parse_args().full))
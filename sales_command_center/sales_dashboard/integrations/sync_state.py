@@ -0,0 +1,86 @@
+"""
+Sync State
+Watermarks and run status for integration syncs (sync_state table), and
+the bounded-queue hand-off between a sync's producer and its writers
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Any, List, Optional
+
+from sqlalchemy import text
+
+from ..data.database import get_async_db_session
+
+RECORD_RUN_SQL = text("""
+    INSERT INTO sync_state (source, watermark, last_run_at, last_status, last_error, records_synced)
+    VALUES (:source, :watermark, NOW(), :status, :error, :records)
+    ON CONFLICT (source) DO UPDATE SET
+        watermark = COALESCE(EXCLUDED.watermark, sync_state.watermark),
+        last_run_at = NOW(),
+        last_status = EXCLUDED.last_status,
+        last_error = EXCLUDED.last_error,
+        records_synced = sync_state.records_synced + EXCLUDED.records_synced
+""")
+
+
+async def read_watermark(source: str) -> Optional[datetime]:
+    """Newest change applied for source, or None before the first sync"""
+    async with get_async_db_session() as db:
+        result = await db.execute(
+            text("SELECT watermark FROM sync_state WHERE source = :source"), {"source": source}
+        )
+        return result.scalar()
+
+
+async def record_run(
+    source: str,
+    status: str,
+    records: int,
+    watermark: Optional[datetime] = None,
+    error: Optional[str] = None
+):
+    """
+    Record a run (or a checkpoint within one)
+
+    Args:
+        source: Sync source name
+        status: 'ok', 'running' or 'error'
+        records: Records written since the last call (added to the total)
+        watermark: New watermark; None keeps the stored one
+        error: Error message for failed runs
+    """
+    async with get_async_db_session() as db:
+        await db.execute(
+            RECORD_RUN_SQL,
+            {"source": source, "watermark": watermark, "status": status,
+             "error": error[:500] if error else None, "records": records}
+        )
+        await db.commit()
+
+
+async def put_or_raise(queue: asyncio.Queue, item: Any, writers: List[asyncio.Task]):
+    """
+    Put item on a bounded queue while its writers are alive
+
+    Blocks while the queue is full (backpressure), but a writer that fails
+    meanwhile stops consuming, so the put is raced against the writers:
+    the first writer error is raised instead of waiting forever.
+
+    Raises:
+        The failed writer's exception, or RuntimeError if every writer
+        stopped without one
+    """
+    put = asyncio.ensure_future(queue.put(item))
+    try:
+        while not put.done():
+            for task in writers:
+                if task.done() and not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+            running = {task for task in writers if not task.done()}
+            if not running:
+                raise RuntimeError("every queue writer stopped")
+            await asyncio.wait({put, *running}, return_when=asyncio.FIRST_COMPLETED)
+        put.result()
+    finally:
+        put.cancel()
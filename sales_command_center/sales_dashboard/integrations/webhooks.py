@@ -0,0 +1,387 @@
+"""
+Webhook Ingestion
+Change events from Salesforce and NetSuite, coalesced into batched upserts
+
+POST /api/webhooks/salesforce and /api/webhooks/netsuite validate the
+shared secret header, parse the body into events and put them on an
+in-process queue, answering 202 straight away (503 when the queue is full,
+so the sender retries later).
+
+A single consumer drains the queue in windows of WEBHOOK_COALESCE_SECONDS
+(or WEBHOOK_MAX_BATCH events). Within a window only the newest version of
+each record is kept. Events already applied at the same or a newer version
+(redeliveries, out-of-order retries) are dropped. What remains is written
+with the sync engines' multi-row upserts, one transaction per record type
+per window. A month-end burst of 10k events becomes a handful of
+statements.
+
+Payloads:
+    salesforce: {"records": [<Opportunity>...]} or one Opportunity, with the
+        fields the pipeline sync queries (Id and SystemModstamp required),
+        e.g. from a record-triggered Flow HTTP callout
+    netsuite: {"orders": [<order>...]} or one order, shaped like
+        NetSuiteClient.orders yields them (id, lastmodified, entity,
+        trandate and lines, each with a sku, required), e.g. from a User
+        Event script
+
+Every field the writers read is checked when the payload is parsed, so a
+malformed event gets a 400 rather than failing its window's write later.
+Opportunities without an AccountId are accepted but not written (the
+pipeline needs a customer), and counted as skipped.
+
+If a window's write still fails with a non-transient error, the batch is
+split in halves and each half retried, down to single records, so one bad
+record does not discard the rest of the window.
+
+The queue lives in memory: events accepted but not yet written are lost if
+the process dies; the scheduled syncs pick those changes up again.
+"""
+
+import asyncio
+import hmac
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..config import config
+from ..data.cache import dashboard_cache
+from .netsuite_sync import NetSuiteOrderSync, is_transient_db_error, netsuite_sync, parse_timestamp, retry_with_jitter
+from .salesforce_sync import opportunity_row, parse_datetime, salesforce_sync
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_SECRET_HEADER = "X-Webhook-Secret"
+
+# (kind, external_id) -> newest version applied, for dropping redeliveries
+APPLIED_VERSIONS_MAX = 200_000
+
+
+@dataclass
+class WebhookEvent:
+    """One changed record"""
+    kind: str  # 'opportunity' or 'order'
+    external_id: str
+    version: datetime
+    record: Dict[str, Any]
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.kind, self.external_id
+
+
+class WebhookQueueFull(Exception):
+    """The ingestion queue has no room for the events"""
+
+
+def webhook_authorized(secret: Optional[str]) -> bool:
+    """Constant-time check of the shared secret header (always False if unset)"""
+    if not config.WEBHOOK_SECRET or not secret:
+        return False
+    return hmac.compare_digest(secret.encode(), config.WEBHOOK_SECRET.encode())
+
+
+def _records(body: Any, key: str) -> List[Dict[str, Any]]:
+    if isinstance(body, dict) and key in body:
+        body = body[key]
+    records = body if isinstance(body, list) else [body]
+    if not all(isinstance(record, dict) for record in records):
+        raise ValueError(f"Expected an object or a list of objects under '{key}'")
+    return records
+
+
+def _check_fields(label: str, record: Dict[str, Any], strings: Tuple[str, ...] = (), numbers: Tuple[str, ...] = ()):
+    """Optional fields must be strings / numbers when present"""
+    for name in strings:
+        if record.get(name) is not None and not isinstance(record[name], str):
+            raise ValueError(f"{label} {name} must be a string")
+    for name in numbers:
+        value = record.get(name)
+        if value in (None, ""):
+            continue
+        try:
+            float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{label} {name} must be a number, got {value!r}")
+
+
+def _check_mapping(label: str, build: Callable[[], Any]):
+    """Run the writer's row mapping so the fields it converts fail here"""
+    try:
+        build()
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"{label} has an invalid field: {e}")
+
+
+def _version(label: str, value: Any, parse: Callable[[str], datetime]) -> datetime:
+    """
+    Event version from a change timestamp, always timezone-aware UTC
+
+    A timestamp without an offset is read as UTC, so events for one record
+    stay comparable whichever form the sender used.
+    """
+    if not isinstance(value, str):
+        raise ValueError(f"{label} timestamp must be a string, got {value!r}")
+    try:
+        stamp = parse(value)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"{label} has an invalid timestamp {value!r}: {e}")
+    return stamp.replace(tzinfo=timezone.utc) if stamp.tzinfo is None else stamp.astimezone(timezone.utc)
+
+
+def _check_opportunity(record: Dict[str, Any]):
+    """Fields SalesforceSync.apply_records reads"""
+    if not isinstance(record.get("Id"), str) or not record["Id"] or not record.get("SystemModstamp"):
+        raise ValueError("Opportunity events need Id and SystemModstamp")
+    label = f"Opportunity {record['Id']}"
+    _check_fields(label, record, strings=("Name", "AccountId", "StageName"), numbers=("Amount",))
+    for relation in ("Account", "Owner"):
+        if not isinstance(record.get(relation) or {}, dict):
+            raise ValueError(f"{label} {relation} must be an object")
+    _check_fields(f"{label} Account", record.get("Account") or {}, strings=("Name",))
+    _check_fields(f"{label} Owner", record.get("Owner") or {}, strings=("Email",))
+    _check_mapping(label, lambda: opportunity_row(record, 0, None))
+
+
+def _check_order(order: Dict[str, Any]):
+    """Fields NetSuiteOrderSync.write_orders reads"""
+    if not order.get("id") or not order.get("lastmodified") or not isinstance(order.get("lines"), list):
+        raise ValueError("Order events need id, lastmodified and lines")
+    label = f"Order {order['id']}"
+    if order.get("entity") in (None, "") or not order.get("trandate"):
+        raise ValueError(f"{label} needs entity and trandate")
+    _check_fields(label, order, strings=("entity_name", "rep_email"), numbers=("total", "tax"))
+    _check_mapping(label, lambda: NetSuiteOrderSync.order_row(order, 0, None))
+    for line in order["lines"]:
+        if not isinstance(line, dict) or not isinstance(line.get("sku"), str) or not line["sku"]:
+            raise ValueError(f"{label} lines need a sku")
+        _check_fields(f"{label} line {line['sku']}", line, strings=("item_name",),
+                      numbers=("quantity", "rate", "amount"))
+
+
+def salesforce_events(body: Any) -> List[WebhookEvent]:
+    """Parse a Salesforce Opportunity change payload"""
+    events = []
+    for record in _records(body, "records"):
+        _check_opportunity(record)
+        version = _version(f"Opportunity {record['Id']}", record["SystemModstamp"], parse_datetime)
+        events.append(WebhookEvent("opportunity", record["Id"], version, record))
+    return events
+
+
+def netsuite_events(body: Any) -> List[WebhookEvent]:
+    """Parse a NetSuite sales order change payload"""
+    events = []
+    for order in _records(body, "orders"):
+        _check_order(order)
+        version = _version(f"Order {order['id']}", order["lastmodified"], parse_timestamp)
+        events.append(WebhookEvent("order", str(order["id"]), version, order))
+    return events
+
+
+def _writable(event: WebhookEvent) -> bool:
+    """Opportunities without an account have no customer to hang off"""
+    return event.kind != "opportunity" or bool(event.record.get("AccountId"))
+
+
+WEBHOOK_PARSERS: Dict[str, Callable[[Any], List[WebhookEvent]]] = {
+    "salesforce": salesforce_events,
+    "netsuite": netsuite_events,
+}
+
+
+class WebhookIngestor:
+    """
+    Queue + coalescing consumer for webhook events.
+
+    Usage:
+        accepted = webhook_ingestor.submit(events)   # raises WebhookQueueFull
+        await webhook_ingestor.stop()                # flushes what is queued
+    """
+
+    def __init__(
+        self,
+        writers: Dict[str, Callable[[List[Dict[str, Any]]], Awaitable[int]]],
+        queue_size: int = 50_000,
+        window: float = 1.0,
+        max_batch: int = 5_000,
+        write_retries: int = 3
+    ):
+        """
+        Args:
+            writers: Event kind -> coroutine writing a list of records in one transaction
+            queue_size: Events buffered before submit() refuses more
+            window: Seconds to collect events before writing
+            max_batch: Events per window at most
+            write_retries: Attempts per write on transient database errors
+        """
+        self.writers = writers
+        self.queue_size = queue_size
+        self.window = window
+        self.max_batch = max_batch
+        self.write_retries = write_retries
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._applied: "OrderedDict[Tuple[str, str], datetime]" = OrderedDict()
+        self._stats = {
+            "received": 0,
+            "duplicates": 0,
+            "coalesced": 0,
+            "stale": 0,
+            "skipped": 0,
+            "written": 0,
+            "failed": 0,
+            "splits": 0,
+            "flushes": 0,
+        }
+
+    def submit(self, events: List[WebhookEvent]) -> int:
+        """
+        Queue events without waiting
+
+        Returns:
+            Number of events accepted
+
+        Raises:
+            WebhookQueueFull: Not enough room for all of them (none are queued)
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._consume())
+        if self.queue_size - self._queue.qsize() < len(events):
+            raise WebhookQueueFull()
+        for event in events:
+            self._queue.put_nowait(event)
+        self._stats["received"] += len(events)
+        return len(events)
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self._queue.get()
+            if first is None:
+                return
+            pending: Dict[Tuple[str, str], WebhookEvent] = {}
+            stopping = False
+            try:
+                self._coalesce(pending, first)
+                received = 1
+                deadline = loop.time() + self.window
+                while received < self.max_batch:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        event = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    if event is None:
+                        stopping = True
+                        break
+                    self._coalesce(pending, event)
+                    received += 1
+                await self._flush(list(pending.values()))
+            except Exception as e:
+                # One bad window must not stop the consumer for the ones after it
+                self._stats["failed"] += len(pending)
+                logger.error(f"Webhook window of {len(pending)} events failed: {e}")
+            if stopping:
+                return
+
+    def _coalesce(self, pending: Dict[Tuple[str, str], WebhookEvent], event: WebhookEvent):
+        """Keep the newest version of each record in this window"""
+        current = pending.get(event.key)
+        if current is None:
+            pending[event.key] = event
+        elif event.version == current.version:
+            self._stats["duplicates"] += 1
+        elif event.version > current.version:
+            pending[event.key] = event
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["coalesced"] += 1
+
+    async def _flush(self, events: List[WebhookEvent]):
+        fresh: Dict[str, List[WebhookEvent]] = {}
+        for event in events:
+            applied = self._applied.get(event.key)
+            if applied is not None and event.version <= applied:
+                self._stats["duplicates" if event.version == applied else "stale"] += 1
+                continue
+            if not _writable(event):
+                self._stats["skipped"] += 1
+                continue
+            fresh.setdefault(event.kind, []).append(event)
+
+        written = 0
+        for kind, batch in fresh.items():
+            for event in await self._write(kind, batch):
+                self._applied[event.key] = event.version
+                self._applied.move_to_end(event.key)
+                written += 1
+            while len(self._applied) > APPLIED_VERSIONS_MAX:
+                self._applied.popitem(last=False)
+
+        self._stats["flushes"] += 1
+        self._stats["written"] += written
+        if written:
+            await dashboard_cache.invalidate()
+            logger.info(f"Webhooks: wrote {written} records from {len(events)} coalesced events")
+
+    async def _write(self, kind: str, batch: List[WebhookEvent]) -> List[WebhookEvent]:
+        """
+        Write a batch of one kind, retrying transient errors
+
+        A non-transient failure (a constraint violation, a bad value) is
+        bisected: each half is written on its own, down to single records,
+        so only the records that fail are dropped.
+
+        Returns:
+            The events written
+        """
+        writer = self.writers[kind]
+        records = [event.record for event in batch]
+        try:
+            await retry_with_jitter(lambda: writer(records), self.write_retries, retry_if=is_transient_db_error)
+            return batch
+        except Exception as e:
+            if is_transient_db_error(e):
+                # Still failing after the retries: splitting would not help
+                self._stats["failed"] += len(batch)
+                logger.error(f"Webhook write of {len(batch)} {kind} events failed: {e}")
+                return []
+            if len(batch) == 1:
+                self._stats["failed"] += 1
+                logger.error(f"Webhook write of {kind} {batch[0].external_id} failed: {e}")
+                return []
+            self._stats["splits"] += 1
+            logger.warning(f"Webhook write of {len(batch)} {kind} events failed, splitting the batch: {e}")
+            middle = len(batch) // 2
+            return await self._write(kind, batch[:middle]) + await self._write(kind, batch[middle:])
+
+    async def stop(self):
+        """Write what is queued and stop the consumer"""
+        if self._task is not None and not self._task.done():
+            await self._queue.put(None)
+            await self._task
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": config.ENABLE_WEBHOOKS,
+            "secret_configured": bool(config.WEBHOOK_SECRET),
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            **self._stats
+        }
+
+
+# Global webhook ingestor
+webhook_ingestor = WebhookIngestor(
+    {"opportunity": salesforce_sync.apply_records, "order": netsuite_sync.write_orders},
+    queue_size=config.WEBHOOK_QUEUE_SIZE,
+    window=config.WEBHOOK_COALESCE_SECONDS,
+    max_batch=config.WEBHOOK_MAX_BATCH
+)
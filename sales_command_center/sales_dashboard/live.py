@@ -0,0 +1,294 @@
+"""
+Live Dashboard Push
+Computes the dashboard once per change and fans it out to every open
+dashboard over WebSocket or SSE.
+
+Change detection:
+1. Postgres LISTEN/NOTIFY: statement-level triggers on orders and pipeline
+   call pg_notify('dashboard_changes', ...) (see
+   database/migrations/002_dashboard_notify.sql). A burst of changes is
+   debounced, the dashboard cache is invalidated, and the snapshot is
+   recomputed once.
+2. Polling fallback: when the listener cannot connect (asyncpg missing,
+   database unreachable, NOTIFY not installed), the snapshot is refreshed
+   every LIVE_POLL_INTERVAL through the dashboard cache.
+
+Subscribers first receive the full snapshot, then only the sections that
+changed ("diff" messages).
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, Optional, Set
+
+from .config import config
+from .data import dashboard_service
+from .data.cache import dashboard_cache
+
+try:
+    import asyncpg
+    ASYNCPG_AVAILABLE = True
+except ImportError:
+    asyncpg = None
+    ASYNCPG_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "dashboard_changes"
+
+# Seconds between attempts to (re)open the LISTEN connection while polling
+LISTEN_RETRY_SECONDS = 60.0
+
+
+def _listener_dsn() -> str:
+    """Plain postgresql:// DSN for a raw asyncpg connection"""
+    url = config.get_database_url()
+    scheme, sep, rest = url.partition("://")
+    return f"postgresql://{rest}" if sep else url
+
+
+class DashboardSubscription:
+    """A single subscriber's message queue"""
+
+    def __init__(self, broadcaster: "DashboardBroadcaster", max_pending: int = 16):
+        self._broadcaster = broadcaster
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+
+    def push(self, message: Dict[str, Any]):
+        """Queue a message; a subscriber that falls behind is resynced with a full snapshot"""
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(self._broadcaster.snapshot_message())
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Next message, or None if nothing arrived within timeout"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self._broadcaster.unsubscribe(self)
+
+
+class DashboardBroadcaster:
+    """
+    Single producer of live dashboard updates for all subscribers.
+
+    Usage:
+        subscription = await live_broadcaster.subscribe()
+        try:
+            message = await subscription.get(timeout=25)
+        finally:
+            subscription.close()
+    """
+
+    def __init__(
+        self,
+        poll_interval: float = 30.0,
+        resync_interval: float = 300.0,
+        debounce_seconds: float = 1.0
+    ):
+        self.poll_interval = poll_interval
+        self.resync_interval = resync_interval
+        self.debounce_seconds = debounce_seconds
+
+        self._subscribers: Set[DashboardSubscription] = set()
+        self._sections: Dict[str, Any] = {}
+        self._version = 0
+        self._task: Optional[asyncio.Task] = None
+        self._listener = None
+        self._next_listen_attempt = 0.0
+        self._listen_warned = False
+        self._changed = asyncio.Event()
+        self._has_subscribers = asyncio.Event()
+        self._ready = asyncio.Event()
+
+        self._refreshes = 0
+        self._notifications = 0
+        self._messages_sent = 0
+        self._last_refresh: Optional[float] = None
+
+    @property
+    def mode(self) -> str:
+        """'notify' while a LISTEN connection is open, otherwise 'poll'"""
+        return "notify" if self._listener is not None else "poll"
+
+    # ------------------------------------------------------------------
+    # Subscribers
+    # ------------------------------------------------------------------
+
+    async def subscribe(self) -> DashboardSubscription:
+        """
+        Register a subscriber and queue the current snapshot for it
+
+        The subscriber is removed again if the snapshot fails or the caller
+        is cancelled while waiting for it.
+        """
+        self.start()
+        subscription = DashboardSubscription(self)
+        # Registered before the wait: the producer only runs with subscribers
+        self._subscribers.add(subscription)
+        self._has_subscribers.set()
+        try:
+            # The first subscriber waits for the initial computation; after
+            # an idle period (no subscribers, so no refreshes) catch up first
+            await self._ready.wait()
+            if self._last_refresh is None or time.time() - self._last_refresh > self.poll_interval:
+                await self._refresh()
+            subscription.push(self.snapshot_message())
+        except BaseException:
+            self.unsubscribe(subscription)
+            raise
+        return subscription
+
+    def unsubscribe(self, subscription: DashboardSubscription):
+        self._subscribers.discard(subscription)
+        if not self._subscribers:
+            self._has_subscribers.clear()
+
+    def snapshot_message(self) -> Dict[str, Any]:
+        """Full-state message for new or resynced subscribers"""
+        return {"type": "snapshot", "version": self._version, "sections": dict(self._sections)}
+
+    def _broadcast(self, message: Dict[str, Any]):
+        for subscription in list(self._subscribers):
+            subscription.push(message)
+        self._messages_sent += len(self._subscribers)
+
+    # ------------------------------------------------------------------
+    # Producer loop
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the producer loop (idempotent)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """Stop the producer loop and close the LISTEN connection"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._close_listener()
+
+    async def _run(self):
+        while True:
+            try:
+                await self._has_subscribers.wait()
+                await self._ensure_listener()
+
+                if self._ready.is_set():
+                    timeout = self.resync_interval if self._listener is not None else self.poll_interval
+                    try:
+                        await asyncio.wait_for(self._changed.wait(), timeout)
+                        # Let a burst of writes settle, then recompute once
+                        await asyncio.sleep(self.debounce_seconds)
+                        self._changed.clear()
+                        await dashboard_cache.invalidate()
+                    except asyncio.TimeoutError:
+                        pass
+
+                if self._subscribers or not self._ready.is_set():
+                    await self._refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Live dashboard refresh failed: {e}")
+                self._ready.set()  # don't leave subscribers waiting
+                await asyncio.sleep(self.poll_interval)
+
+    async def _refresh(self):
+        """Recompute the snapshot and send changed sections to subscribers"""
+        snapshot = await dashboard_service.get_snapshot()
+        self._refreshes += 1
+        self._last_refresh = time.time()
+
+        # Sections that failed this round keep their last good value
+        changed = {
+            name: data
+            for name, data in snapshot["sections"].items()
+            if data is not None and self._sections.get(name) != data
+        }
+
+        first = not self._ready.is_set()
+        self._sections.update(changed)
+        if changed:
+            self._version += 1
+        self._ready.set()
+
+        if changed and not first:
+            self._broadcast({"type": "diff", "version": self._version, "sections": changed})
+
+    # ------------------------------------------------------------------
+    # LISTEN/NOTIFY
+    # ------------------------------------------------------------------
+
+    async def _ensure_listener(self):
+        """Open the LISTEN connection if it is not open (falls back to polling)"""
+        if self._listener is not None or not ASYNCPG_AVAILABLE:
+            return
+        if time.monotonic() < self._next_listen_attempt:
+            return
+        try:
+            connection = await asyncpg.connect(_listener_dsn(), timeout=5)
+            await connection.add_listener(NOTIFY_CHANNEL, self._on_notify)
+            connection.add_termination_listener(self._on_listener_closed)
+            self._listener = connection
+            self._listen_warned = False
+            logger.info(f"Live dashboard listening on '{NOTIFY_CHANNEL}'")
+        except Exception as e:
+            self._next_listen_attempt = time.monotonic() + LISTEN_RETRY_SECONDS
+            if not self._listen_warned:
+                logger.warning(f"LISTEN unavailable, polling every {self.poll_interval}s: {e}")
+                self._listen_warned = True
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self._notifications += 1
+        self._changed.set()
+
+    def _on_listener_closed(self, connection):
+        logger.warning("Live dashboard LISTEN connection closed, falling back to polling")
+        self._listener = None
+
+    async def _close_listener(self):
+        if self._listener is not None:
+            listener, self._listener = self._listener, None
+            try:
+                await listener.close()
+            except Exception as e:
+                logger.debug(f"Error closing LISTEN connection: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Broadcaster statistics for monitoring"""
+        return {
+            "mode": self.mode,
+            "subscribers": len(self._subscribers),
+            "version": self._version,
+            "refreshes": self._refreshes,
+            "notifications": self._notifications,
+            "messages_sent": self._messages_sent,
+            "last_refresh": self._last_refresh
+        }
+
+
+def format_sse(message: Dict[str, Any]) -> str:
+    """Format a live dashboard message as a server-sent event"""
+    return f"event: {message['type']}\ndata: {json.dumps(message, default=str)}\n\n"
+
+
+# Global broadcaster
+live_broadcaster = DashboardBroadcaster(
+    poll_interval=config.LIVE_POLL_INTERVAL,
+    resync_interval=config.LIVE_RESYNC_INTERVAL,
+    debounce_seconds=config.LIVE_DEBOUNCE_SECONDS
+)
@@ -0,0 +1,329 @@
+"""
+LLM Response Cache
+Caches LLM answers in front of the fallback service.
+
+Two tiers:
+1. Exact match on a normalized (system_prompt, context, user_message,
+   model, temperature) key
+2. Optional similarity match: within the same (system_prompt, context,
+   model, temperature) partition, a question whose character n-gram
+   vector is close enough to a cached one reuses its answer
+
+Entries expire after a TTL, the cache is LRU-evicted to stay under a
+memory budget, and everything is dropped when dashboard data changes.
+"""
+
+import hashlib
+import math
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Tuple
+
+# Rough per-entry bookkeeping overhead (dicts, floats, OrderedDict node)
+ENTRY_OVERHEAD_BYTES = 400
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCT_RE = re.compile(r"[\s?.!]+$")
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
+
+@dataclass
+class CachedLLMAnswer:
+    """A cached LLM answer"""
+    content: str
+    provider: str
+    model: str
+    partition: str
+    created_at: float
+    expires_at: float
+    size_bytes: int
+    numbers: Tuple[str, ...] = ()
+    vector: Dict[int, float] = field(default_factory=dict)
+
+
+class LLMResponseCache:
+    """
+    Exact + similarity cache for LLM responses.
+
+    Thread-safe, so the sync and async fallback services can share one
+    instance.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 300.0,
+        max_bytes: int = 16 * 1024 * 1024,
+        similarity_enabled: bool = False,
+        similarity_threshold: float = 0.92,
+        ngram_size: int = 3,
+        vector_dims: int = 1024
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            ttl_seconds: Time-to-live for each entry
+            max_bytes: Approximate memory budget for all entries
+            similarity_enabled: Enable the n-gram similarity tier
+            similarity_threshold: Minimum cosine similarity for a similarity hit
+            ngram_size: Character n-gram length for similarity vectors
+            vector_dims: Number of hashed vector dimensions
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.similarity_enabled = similarity_enabled
+        self.similarity_threshold = similarity_threshold
+        self.ngram_size = ngram_size
+        self.vector_dims = vector_dims
+
+        self._entries: "OrderedDict[str, CachedLLMAnswer]" = OrderedDict()
+        self._partitions: Dict[str, Dict[str, None]] = {}  # partition -> ordered set of keys
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self._exact_hits = 0
+        self._similar_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @classmethod
+    def from_env(cls) -> "LLMResponseCache":
+        """Create a cache using LLM_CACHE_* environment settings"""
+        return cls(
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", "300")),
+            max_bytes=int(os.getenv("LLM_CACHE_MAX_MB", "16")) * 1024 * 1024,
+            similarity_enabled=os.getenv("LLM_CACHE_SIMILARITY_ENABLED", "False") == "True",
+            similarity_threshold=float(os.getenv("LLM_CACHE_SIMILARITY_THRESHOLD", "0.92"))
+        )
+
+    # ------------------------------------------------------------------
+    # Keys and vectors
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def normalize(text: Optional[str]) -> str:
+        """Normalize text for keying: lowercase, collapse whitespace, drop trailing punctuation"""
+        if not text:
+            return ""
+        text = _WHITESPACE_RE.sub(" ", text.strip().lower())
+        return _TRAILING_PUNCT_RE.sub("", text)
+
+    @staticmethod
+    def _digest(*parts: str) -> str:
+        """Stable digest of key parts"""
+        h = hashlib.sha256()
+        for part in parts:
+            h.update(part.encode("utf-8"))
+            h.update(b"\x1f")
+        return h.hexdigest()
+
+    def _keys(
+        self,
+        system_prompt: Optional[str],
+        context: Optional[str],
+        user_message: str,
+        model: str,
+        temperature: float
+    ) -> Tuple[str, str, str]:
+        """Build (exact_key, partition_key, normalized_message)"""
+        partition = self._digest(
+            self.normalize(system_prompt),
+            self.normalize(context),
+            model,
+            f"{temperature:.3f}"
+        )
+        message = self.normalize(user_message)
+        return self._digest(partition, message), partition, message
+
+    def _vectorize(self, text: str) -> Dict[int, float]:
+        """Hashed character n-gram vector (L2-normalized, sparse)"""
+        padded = f" {text} "
+        counts: Dict[int, float] = {}
+        for i in range(max(1, len(padded) - self.ngram_size + 1)):
+            gram = padded[i:i + self.ngram_size]
+            bucket = zlib.crc32(gram.encode("utf-8")) % self.vector_dims
+            counts[bucket] = counts.get(bucket, 0.0) + 1.0
+        norm = math.sqrt(sum(v * v for v in counts.values())) or 1.0
+        return {k: v / norm for k, v in counts.items()}
+
+    @staticmethod
+    def _cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+        """Cosine similarity of two normalized sparse vectors"""
+        if len(a) > len(b):
+            a, b = b, a
+        return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def get(
+        self,
+        system_prompt: Optional[str],
+        context: Optional[str],
+        user_message: str,
+        model: str,
+        temperature: float
+    ) -> Optional[Tuple[CachedLLMAnswer, str]]:
+        """
+        Look up a cached answer
+
+        Returns:
+            (entry, match_type) where match_type is "exact" or "similar",
+            or None on a miss
+        """
+        key, partition, message = self._keys(system_prompt, context, user_message, model, temperature)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._exact_hits += 1
+                    return entry, "exact"
+                self._remove(key)
+
+            if self.similarity_enabled and partition in self._partitions:
+                match = self._find_similar(partition, message, now)
+                if match is not None:
+                    self._entries.move_to_end(match)
+                    self._similar_hits += 1
+                    return self._entries[match], "similar"
+
+            self._misses += 1
+            return None
+
+    def _find_similar(self, partition: str, message: str, now: float) -> Optional[str]:
+        """Best similarity match within a partition (lock must be held)"""
+        vector = self._vectorize(message)
+        numbers = tuple(_NUMBER_RE.findall(message))
+        best_key, best_score = None, self.similarity_threshold
+
+        for key in list(self._partitions.get(partition, ())):
+            entry = self._entries[key]
+            if entry.expires_at <= now:
+                self._remove(key)
+                continue
+            # Different numbers ("top 5" vs "top 10") are never the same question
+            if entry.numbers != numbers:
+                continue
+            score = self._cosine(vector, entry.vector)
+            if score >= best_score:
+                best_key, best_score = key, score
+
+        return best_key
+
+    def put(
+        self,
+        system_prompt: Optional[str],
+        context: Optional[str],
+        user_message: str,
+        model: str,
+        temperature: float,
+        content: str,
+        provider: str,
+        response_model: str
+    ):
+        """Store a successful answer"""
+        key, partition, message = self._keys(system_prompt, context, user_message, model, temperature)
+        vector = self._vectorize(message) if self.similarity_enabled else {}
+        size = (
+            len(content.encode("utf-8"))
+            + len(message)
+            + len(key) + len(partition)
+            + len(vector) * 64
+            + ENTRY_OVERHEAD_BYTES
+        )
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        entry = CachedLLMAnswer(
+            content=content,
+            provider=provider,
+            model=response_model,
+            partition=partition,
+            created_at=now,
+            expires_at=now + self.ttl_seconds,
+            size_bytes=size,
+            numbers=tuple(_NUMBER_RE.findall(message)),
+            vector=vector
+        )
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._partitions.setdefault(partition, {})[key] = None
+            self._bytes += size
+
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+
+    def _remove(self, key: str):
+        """Remove an entry (lock must be held)"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry.size_bytes
+        keys = self._partitions.get(entry.partition)
+        if keys is not None:
+            keys.pop(key, None)
+            if not keys:
+                del self._partitions[entry.partition]
+
+    def invalidate(self):
+        """Drop every entry (call when the underlying dashboard data changes)"""
+        with self._lock:
+            self._entries.clear()
+            self._partitions.clear()
+            self._bytes = 0
+            self._invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss statistics for status reporting"""
+        with self._lock:
+            hits = self._exact_hits + self._similar_hits
+            lookups = hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "similarity_enabled": self.similarity_enabled,
+                "exact_hits": self._exact_hits,
+                "similar_hits": self._similar_hits,
+                "misses": self._misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations
+            }
+
+
+# Global instance shared by the sync and async services
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Get the global LLM response cache"""
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMResponseCache.from_env()
+        return _llm_cache
+
+
+def invalidate_llm_cache():
+    """Invalidate cached LLM answers after dashboard data changes"""
+    if _llm_cache is not None:
+        _llm_cache.invalidate()
@@ -0,0 +1,350 @@
+"""
+LLM Provider Health Tracking
+Per-provider circuit breaker with rolling error rate and latency statistics.
+
+Each provider in the fallback chain gets a ProviderCircuitBreaker:
+- CLOSED: requests flow normally while outcomes are recorded
+- OPEN: the provider is skipped until the cooldown expires
+- HALF_OPEN: a single probe request is allowed through; success closes
+  the circuit, failure re-opens it
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Dict, Any, Optional
+
+
+class CircuitState(Enum):
+    """Circuit breaker states"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class ProviderCircuitBreaker:
+    """
+    Circuit breaker and health score for a single LLM provider.
+
+    Outcomes are kept in a rolling window of the most recent calls, which
+    drives the error rate and latency percentiles used for ordering.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        cooldown_seconds: float = 30.0,
+        window_size: int = 50,
+        window_seconds: float = 300.0,
+        error_rate_threshold: float = 0.5,
+        min_requests: int = 10,
+        slow_call_ms: float = 10000.0
+    ):
+        """
+        Initialize the circuit breaker
+
+        Args:
+            name: Provider name (for status reporting)
+            failure_threshold: Consecutive failures that open the circuit
+            cooldown_seconds: Time the circuit stays open before a probe
+            window_size: Number of recent calls kept for statistics
+            window_seconds: Maximum age of calls kept for statistics
+            error_rate_threshold: Rolling error rate that opens the circuit
+            min_requests: Calls required before the error rate is trusted
+            slow_call_ms: p95 latency above which the provider is degraded
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.error_rate_threshold = error_rate_threshold
+        self.min_requests = min_requests
+        self.slow_call_ms = slow_call_ms
+        self.window_seconds = window_seconds
+
+        self._state = CircuitState.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_started_at: Optional[float] = None
+        self._outcomes: deque = deque(maxlen=window_size)  # (timestamp, success)
+        self._latencies: deque = deque(maxlen=window_size)  # (timestamp, ms), successful calls only
+        self._total_calls = 0
+        self._total_failures = 0
+        self._times_opened = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, name: str) -> "ProviderCircuitBreaker":
+        """Create a circuit breaker using LLM_BREAKER_* environment settings"""
+        return cls(
+            name=name,
+            failure_threshold=int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "3")),
+            cooldown_seconds=float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30")),
+            window_size=int(os.getenv("LLM_BREAKER_WINDOW_SIZE", "50")),
+            window_seconds=float(os.getenv("LLM_BREAKER_WINDOW_SECONDS", "300")),
+            error_rate_threshold=float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5")),
+            min_requests=int(os.getenv("LLM_BREAKER_MIN_REQUESTS", "10")),
+            slow_call_ms=float(os.getenv("LLM_SLOW_CALL_MS", "10000"))
+        )
+
+    @property
+    def state(self) -> CircuitState:
+        """Current circuit state"""
+        return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a request may be sent to this provider.
+
+        Moves an expired OPEN circuit to HALF_OPEN and lets exactly one
+        probe through. A probe that never reports back (e.g. a cancelled
+        request) is abandoned after another cooldown period.
+
+        Returns:
+            bool: True if the caller should try this provider
+        """
+        with self._lock:
+            now = time.monotonic()
+
+            if self._state == CircuitState.CLOSED:
+                return True
+
+            if self._state == CircuitState.OPEN:
+                if now - self._opened_at < self.cooldown_seconds:
+                    return False
+                self._state = CircuitState.HALF_OPEN
+                self._probe_started_at = now
+                return True
+
+            # HALF_OPEN: only one probe in flight at a time
+            if self._probe_started_at is not None and now - self._probe_started_at < self.cooldown_seconds:
+                return False
+            self._probe_started_at = now
+            return True
+
+    def record_success(self, latency_ms: float):
+        """Record a successful call"""
+        with self._lock:
+            now = time.monotonic()
+            self._total_calls += 1
+            self._outcomes.append((now, True))
+            self._latencies.append((now, latency_ms))
+            self._consecutive_failures = 0
+
+            if self._state == CircuitState.HALF_OPEN:
+                # Probe succeeded - start with a clean window
+                self._state = CircuitState.CLOSED
+                self._opened_at = None
+                self._probe_started_at = None
+                self._outcomes.clear()
+                self._outcomes.append((now, True))
+
+    def record_failure(self):
+        """Record a failed call and open the circuit if thresholds are exceeded"""
+        with self._lock:
+            self._total_calls += 1
+            self._total_failures += 1
+            self._outcomes.append((time.monotonic(), False))
+            self._consecutive_failures += 1
+
+            if self._state == CircuitState.HALF_OPEN:
+                self._open()
+                return
+
+            if self._state == CircuitState.CLOSED:
+                self._prune()
+                error_rate_exceeded = (
+                    len(self._outcomes) >= self.min_requests
+                    and self._error_rate() >= self.error_rate_threshold
+                )
+                if self._consecutive_failures >= self.failure_threshold or error_rate_exceeded:
+                    self._open()
+
+    def _open(self):
+        """Open the circuit (lock must be held)"""
+        self._state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._probe_started_at = None
+        self._times_opened += 1
+
+    def _prune(self):
+        """Drop calls older than the time window (lock must be held)"""
+        cutoff = time.monotonic() - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+        while self._latencies and self._latencies[0][0] < cutoff:
+            self._latencies.popleft()
+
+    def _error_rate(self) -> float:
+        """Rolling error rate (lock must be held)"""
+        if not self._outcomes:
+            return 0.0
+        failures = sum(1 for _, ok in self._outcomes if not ok)
+        return failures / len(self._outcomes)
+
+    def error_rate(self) -> float:
+        """Rolling error rate over the recent window (0.0 - 1.0)"""
+        with self._lock:
+            self._prune()
+            return self._error_rate()
+
+    def window_calls(self) -> int:
+        """Number of calls in the recent window"""
+        with self._lock:
+            self._prune()
+            return len(self._outcomes)
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        """
+        Latency percentile of recent successful calls
+
+        Args:
+            percentile: Percentile as a fraction (e.g. 0.95)
+
+        Returns:
+            Latency in milliseconds, or None if no data yet
+        """
+        with self._lock:
+            self._prune()
+            if not self._latencies:
+                return None
+            ordered = sorted(ms for _, ms in self._latencies)
+        index = min(len(ordered) - 1, int(round(percentile * (len(ordered) - 1))))
+        return ordered[index]
+
+    def health_rank(self) -> int:
+        """
+        Rank used to order providers by live health (lower is better).
+
+        0 = closed and healthy, or due a half-open probe (so the probe is
+        actually sent at the provider's normal priority)
+        1 = closed but degraded (elevated error rate or slow p95)
+        2 = open, or half-open with a probe already in flight
+
+        Degradation only counts once enough recent calls exist and expires
+        with the time window, so a demoted provider is eventually retried.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._state == CircuitState.OPEN:
+                return 0 if now - self._opened_at >= self.cooldown_seconds else 2
+            if self._state == CircuitState.HALF_OPEN:
+                probe_pending = (
+                    self._probe_started_at is not None
+                    and now - self._probe_started_at < self.cooldown_seconds
+                )
+                return 2 if probe_pending else 0
+
+        p95 = self.latency_percentile(0.95)
+        if (self.window_calls() >= self.failure_threshold
+                and self.error_rate() >= self.error_rate_threshold / 2):
+            return 1
+        if p95 is not None and p95 > self.slow_call_ms:
+            return 1
+        return 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get breaker state and statistics for status reporting"""
+        p50 = self.latency_percentile(0.50)
+        p95 = self.latency_percentile(0.95)
+        with self._lock:
+            self._prune()
+            retry_in = None
+            if self._state == CircuitState.OPEN:
+                retry_in = max(0.0, self.cooldown_seconds - (time.monotonic() - self._opened_at))
+
+            return {
+                "state": self._state.value,
+                "error_rate": round(self._error_rate(), 3),
+                "consecutive_failures": self._consecutive_failures,
+                "p50_latency_ms": round(p50, 1) if p50 is not None else None,
+                "p95_latency_ms": round(p95, 1) if p95 is not None else None,
+                "window_calls": len(self._outcomes),
+                "total_calls": self._total_calls,
+                "total_failures": self._total_failures,
+                "times_opened": self._times_opened,
+                "retry_in_seconds": round(retry_in, 1) if retry_in is not None else None
+            }
+
+
+class HedgeBudget:
+    """
+    Caps hedged (speculative) requests to a fraction of primary requests.
+
+    Every request sends at most one hedge, and the ratio is clamped to 1.0,
+    so hedging can never more than double provider spend. Counts are kept
+    over a sliding time window so bursts cannot borrow unlimited budget
+    from long idle periods.
+    """
+
+    def __init__(self, max_ratio: float = 0.1, window_seconds: float = 60.0):
+        """
+        Initialize the hedge budget
+
+        Args:
+            max_ratio: Maximum hedges per primary request (clamped to 0.0 - 1.0)
+            window_seconds: Sliding window used for the ratio
+        """
+        self.max_ratio = max(0.0, min(1.0, max_ratio))
+        self.window_seconds = window_seconds
+        self._primaries: deque = deque()
+        self._hedges: deque = deque()
+        self._total_primaries = 0
+        self._total_hedges = 0
+        self._total_denied = 0
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float):
+        """Drop events older than the window (lock must be held)"""
+        cutoff = now - self.window_seconds
+        while self._primaries and self._primaries[0] < cutoff:
+            self._primaries.popleft()
+        while self._hedges and self._hedges[0] < cutoff:
+            self._hedges.popleft()
+
+    def record_primary(self):
+        """Record a primary (non-speculative) request"""
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            self._primaries.append(now)
+            self._total_primaries += 1
+
+    def try_acquire(self) -> bool:
+        """
+        Reserve budget for one hedged request.
+
+        Returns:
+            bool: True if the hedge may be sent
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            if len(self._hedges) + 1 > self.max_ratio * len(self._primaries):
+                self._total_denied += 1
+                return False
+            self._hedges.append(now)
+            self._total_hedges += 1
+            return True
+
+    def release(self):
+        """Return a reservation whose hedge was never sent"""
+        with self._lock:
+            if self._hedges:
+                self._hedges.pop()
+                self._total_hedges -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get budget usage for status reporting"""
+        with self._lock:
+            self._prune(time.monotonic())
+            return {
+                "max_ratio": self.max_ratio,
+                "window_primaries": len(self._primaries),
+                "window_hedges": len(self._hedges),
+                "total_primaries": self._total_primaries,
+                "total_hedges": self._total_hedges,
+                "total_denied": self._total_denied
+            }
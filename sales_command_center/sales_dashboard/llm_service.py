@@ -9,15 +9,19 @@ If one provider fails, automatically falls back to the next available provider.
 """
 
 import os
+import asyncio
 import logging
 import time
-from typing import Dict, Any, Optional, List, Callable
+from typing import Dict, Any, Optional, List, AsyncIterator
 from dataclasses import dataclass
 from enum import Enum
 import json
 
 import httpx
 
+from .llm_health import ProviderCircuitBreaker, HedgeBudget
+from .llm_cache import get_llm_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -53,6 +57,24 @@ class LLMResponse:
     latency_ms: Optional[float] = None
     success: bool = True
     error: Optional[str] = None
+    hedged: bool = False
+    cached: bool = False
+    cache_match: Optional[str] = None  # "exact" or "similar" when cached
+
+
+def _gemini_turns(history: Optional[List[Dict[str, str]]]) -> List[Dict[str, Any]]:
+    """Conversation history as Gemini contents (assistant -> model)"""
+    return [
+        {"role": "model" if turn["role"] == "assistant" else "user", "parts": [{"text": turn["content"]}]}
+        for turn in history or []
+    ]
+
+
+def _cache_context(context: Optional[str], history: Optional[List[Dict[str, str]]]) -> Optional[str]:
+    """Response cache context: the same question in another conversation is another entry"""
+    if not history:
+        return context
+    return f"{context or ''}\n{json.dumps(history, sort_keys=True)}"
 
 
 class LLMFallbackService:
@@ -101,6 +123,8 @@ class LLMFallbackService:
         self.providers: List[LLMConfig] = []
         self._http_client = httpx.Client(timeout=60)
         self._load_providers()
+        self._init_circuit_breakers()
+        self._cache = get_llm_cache() if os.getenv("LLM_CACHE_ENABLED", "True") == "True" else None
 
         logger.info(f"LLM Fallback Service initialized with {len(self.providers)} providers")
         for p in self.providers:
@@ -172,12 +196,102 @@ class LLMFallbackService:
         if not self.providers:
             logger.warning("No LLM providers configured! Set at least one API key.")
 
+    def _init_circuit_breakers(self):
+        """Create a circuit breaker for every configured provider"""
+        self._breakers: Dict[LLMProvider, ProviderCircuitBreaker] = {
+            p.provider: ProviderCircuitBreaker.from_env(p.provider.value)
+            for p in self.providers
+        }
+
+    def _ordered_providers(self, preferred_provider: Optional[LLMProvider] = None) -> List[LLMConfig]:
+        """
+        Get enabled providers in the order they should be tried.
+
+        The preferred provider (if any) goes first, then providers are
+        ordered by live health (healthy or due a probe, degraded, open). The
+        static priority order breaks ties.
+        """
+        indexed = [(i, p) for i, p in enumerate(self.providers) if p.enabled]
+        indexed.sort(
+            key=lambda item: (
+                0 if item[1].provider == preferred_provider else 1,
+                self._breakers[item[1].provider].health_rank(),
+                item[0]
+            )
+        )
+        return [p for _, p in indexed]
+
+    def _cache_identity(self, preferred_provider: Optional[LLMProvider]) -> tuple:
+        """
+        Model and temperature used in the cache key.
+
+        Uses the preferred provider's settings when one is requested,
+        otherwise the primary provider's, so health-based reordering does
+        not fragment the cache.
+        """
+        config = self.providers[0]
+        for p in self.providers:
+            if p.provider == preferred_provider:
+                config = p
+                break
+        model = config.model if preferred_provider else f"auto:{config.model}"
+        return model, config.temperature
+
+    def _cache_lookup(
+        self,
+        user_message: str,
+        system_prompt: Optional[str],
+        context: Optional[str],
+        preferred_provider: Optional[LLMProvider]
+    ) -> Optional[LLMResponse]:
+        """Return a cached response, if any"""
+        if self._cache is None:
+            return None
+        start_time = time.time()
+        model, temperature = self._cache_identity(preferred_provider)
+        hit = self._cache.get(system_prompt, context, user_message, model, temperature)
+        if hit is None:
+            return None
+
+        entry, match_type = hit
+        logger.info(f"LLM cache {match_type} hit ({entry.provider})")
+        return LLMResponse(
+            content=entry.content,
+            provider=LLMProvider(entry.provider),
+            model=entry.model,
+            latency_ms=(time.time() - start_time) * 1000,
+            success=True,
+            cached=True,
+            cache_match=match_type
+        )
+
+    def _cache_store(
+        self,
+        user_message: str,
+        system_prompt: Optional[str],
+        context: Optional[str],
+        preferred_provider: Optional[LLMProvider],
+        response: LLMResponse
+    ):
+        """Store a successful provider response"""
+        if self._cache is None or not response.success or response.cached:
+            return
+        model, temperature = self._cache_identity(preferred_provider)
+        self._cache.put(
+            system_prompt, context, user_message, model, temperature,
+            content=response.content,
+            provider=response.provider.value,
+            response_model=response.model
+        )
+
     def chat(
         self,
         user_message: str,
         system_prompt: Optional[str] = None,
         context: Optional[str] = None,
-        preferred_provider: Optional[LLMProvider] = None
+        preferred_provider: Optional[LLMProvider] = None,
+        use_cache: bool = True,
+        history: Optional[List[Dict[str, str]]] = None
     ) -> LLMResponse:
         """
         Send a chat message with automatic fallback.
@@ -187,6 +301,9 @@ class LLMFallbackService:
             system_prompt: Optional system prompt
             context: Optional context to include
             preferred_provider: Optional preferred provider to try first
+            use_cache: Serve/store the answer from the response cache
+            history: Earlier turns of the conversation ({"role": "user" or
+                "assistant", "content": ...}), oldest first
 
         Returns:
             LLMResponse with the result
@@ -200,42 +317,51 @@ class LLMFallbackService:
                 error="No providers configured"
             )
 
+        if use_cache:
+            cached = self._cache_lookup(user_message, system_prompt, _cache_context(context, history), preferred_provider)
+            if cached is not None:
+                return cached
+
         # Build the full message
         full_message = user_message
         if context:
             full_message = f"Context:\n{context}\n\nQuery: {user_message}"
 
-        # Reorder providers if preferred provider specified
-        providers_to_try = self.providers.copy()
-        if preferred_provider:
-            providers_to_try.sort(
-                key=lambda p: 0 if p.provider == preferred_provider else 1
-            )
+        # Order providers by preference and live health
+        providers_to_try = self._ordered_providers(preferred_provider)
 
         # Try each provider in order
         errors = []
         for config in providers_to_try:
-            if not config.enabled:
+            breaker = self._breakers[config.provider]
+            if not breaker.allow_request():
+                errors.append(f"{config.provider.value}: circuit open")
+                logger.info(f"Skipping LLM provider {config.provider.value}: circuit open")
                 continue
 
             try:
                 logger.info(f"Trying LLM provider: {config.provider.value}")
                 start_time = time.time()
 
-                response = self._call_provider(config, full_message, system_prompt)
+                response = self._call_provider(config, full_message, system_prompt, history)
 
                 latency = (time.time() - start_time) * 1000
+                breaker.record_success(latency)
                 logger.info(f"Success with {config.provider.value} in {latency:.0f}ms")
 
-                return LLMResponse(
+                result = LLMResponse(
                     content=response,
                     provider=config.provider,
                     model=config.model,
                     latency_ms=latency,
                     success=True
                 )
+                if use_cache:
+                    self._cache_store(user_message, system_prompt, _cache_context(context, history), preferred_provider, result)
+                return result
 
             except Exception as e:
+                breaker.record_failure()
                 error_msg = f"{config.provider.value}: {str(e)}"
                 errors.append(error_msg)
                 logger.warning(f"Provider {config.provider.value} failed: {e}")
@@ -254,20 +380,21 @@ class LLMFallbackService:
         self,
         config: LLMConfig,
         message: str,
-        system_prompt: Optional[str]
+        system_prompt: Optional[str],
+        history: Optional[List[Dict[str, str]]] = None
     ) -> str:
         """Call a specific LLM provider"""
 
         if config.provider == LLMProvider.EURI:
-            return self._call_euri(config, message, system_prompt)
+            return self._call_euri(config, message, system_prompt, history)
         elif config.provider == LLMProvider.DEEPSEEK:
-            return self._call_deepseek(config, message, system_prompt)
+            return self._call_deepseek(config, message, system_prompt, history)
         elif config.provider == LLMProvider.GOOGLE:
-            return self._call_google(config, message, system_prompt)
+            return self._call_google(config, message, system_prompt, history)
         elif config.provider == LLMProvider.OPENAI:
-            return self._call_openai(config, message, system_prompt)
+            return self._call_openai(config, message, system_prompt, history)
         elif config.provider == LLMProvider.ANTHROPIC:
-            return self._call_anthropic(config, message, system_prompt)
+            return self._call_anthropic(config, message, system_prompt, history)
         else:
             raise ValueError(f"Unsupported provider: {config.provider}")
 
@@ -275,7 +402,8 @@ class LLMFallbackService:
         self,
         config: LLMConfig,
         message: str,
-        system_prompt: Optional[str]
+        system_prompt: Optional[str],
+        history: Optional[List[Dict[str, str]]] = None
     ) -> str:
         """Call Euri AI API (OpenAI-compatible)"""
         url = f"{config.base_url}/chat/completions"
@@ -283,6 +411,7 @@ class LLMFallbackService:
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
+        messages.extend(history or [])
         messages.append({"role": "user", "content": message})
 
         response = self._http_client.post(
@@ -308,7 +437,8 @@ class LLMFallbackService:
         self,
         config: LLMConfig,
         message: str,
-        system_prompt: Optional[str]
+        system_prompt: Optional[str],
+        history: Optional[List[Dict[str, str]]] = None
     ) -> str:
         """Call DeepSeek API (OpenAI-compatible)"""
         url = f"{config.base_url}/chat/completions"
@@ -316,6 +446,7 @@ class LLMFallbackService:
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
+        messages.extend(history or [])
         messages.append({"role": "user", "content": message})
 
         response = self._http_client.post(
@@ -341,7 +472,8 @@ class LLMFallbackService:
         self,
         config: LLMConfig,
         message: str,
-        system_prompt: Optional[str]
+        system_prompt: Optional[str],
+        history: Optional[List[Dict[str, str]]] = None
     ) -> str:
         """Call Google Gemini API"""
         url = f"{config.base_url}/models/{config.model}:generateContent"
@@ -358,6 +490,8 @@ class LLMFallbackService:
                 "parts": [{"text": "Understood. I will follow these instructions."}]
             })
 
+        contents.extend(_gemini_turns(history))
+
         contents.append({
             "role": "user",
             "parts": [{"text": message}]
@@ -385,7 +519,8 @@ class LLMFallbackService:
         self,
         config: LLMConfig,
         message: str,
-        system_prompt: Optional[str]
+        system_prompt: Optional[str],
+        history: Optional[List[Dict[str, str]]] = None
     ) -> str:
         """Call OpenAI API"""
         url = f"{config.base_url}/chat/completions"
@@ -393,6 +528,7 @@ class LLMFallbackService:
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
+        messages.extend(history or [])
         messages.append({"role": "user", "content": message})
 
         response = self._http_client.post(
@@ -418,7 +554,8 @@ class LLMFallbackService:
         self,
         config: LLMConfig,
         message: str,
-        system_prompt: Optional[str]
+        system_prompt: Optional[str],
+        history: Optional[List[Dict[str, str]]] = None
     ) -> str:
         """Call Anthropic Claude API"""
         url = f"{config.base_url}/messages"
@@ -426,7 +563,7 @@ class LLMFallbackService:
         payload = {
             "model": config.model,
             "max_tokens": config.max_tokens,
-            "messages": [{"role": "user", "content": message}]
+            "messages": [*(history or []), {"role": "user", "content": message}]
         }
 
         if system_prompt:
@@ -452,18 +589,21 @@ class LLMFallbackService:
         return [p.provider.value for p in self.providers if p.enabled]
 
     def get_provider_status(self) -> Dict[str, Any]:
-        """Get status of all providers"""
+        """Get status of all providers, including circuit breaker state"""
         return {
             "providers": [
                 {
                     "name": p.provider.value,
                     "model": p.model,
-                    "enabled": p.enabled
+                    "enabled": p.enabled,
+                    "circuit": self._breakers[p.provider].snapshot()
                 }
                 for p in self.providers
             ],
             "total_configured": len(self.providers),
-            "fallback_order": [p.provider.value for p in self.providers]
+            "fallback_order": [p.provider.value for p in self.providers],
+            "live_order": [p.provider.value for p in self._ordered_providers()],
+            "cache": self._cache.stats() if self._cache is not None else {"enabled": False}
         }
 
     def __del__(self):
@@ -472,8 +612,748 @@ class LLMFallbackService:
             self._http_client.close()
 
 
+class AsyncLLMFallbackService(LLMFallbackService):
+    """
+    Async variant of the LLM Fallback Service for use inside FastAPI handlers.
+
+    Uses the same provider configuration and fallback order as
+    LLMFallbackService, but every provider call goes through a shared
+    httpx.AsyncClient so a slow provider never blocks the event loop.
+    """
+
+    def __init__(self):
+        """Initialize the async LLM Fallback Service"""
+        self.providers: List[LLMConfig] = []
+        self._http_client = httpx.AsyncClient(
+            timeout=60,
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "200")),
+                max_keepalive_connections=int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "50"))
+            )
+        )
+        self._load_providers()
+        self._init_circuit_breakers()
+        self._cache = get_llm_cache() if os.getenv("LLM_CACHE_ENABLED", "True") == "True" else None
+
+        # Hedged requests (opt-in): after the primary has been running for its
+        # observed latency percentile, the next provider gets the same request
+        self.hedging_enabled = os.getenv("LLM_HEDGING_ENABLED", "False") == "True"
+        self.hedge_percentile = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+        self.hedge_default_delay_ms = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY_MS", "3000"))
+        self.hedge_min_delay_ms = float(os.getenv("LLM_HEDGE_MIN_DELAY_MS", "250"))
+        self._hedge_budget = HedgeBudget(
+            max_ratio=float(os.getenv("LLM_HEDGE_BUDGET_RATIO", "0.1"))
+        )
+
+        logger.info(f"Async LLM Fallback Service initialized with {len(self.providers)} providers")
+
+    async def chat(
+        self,
+        user_message: str,
+        system_prompt: Optional[str] = None,
+        context: Optional[str] = None,
+        preferred_provider: Optional[LLMProvider] = None,
+        hedge: Optional[bool] = None,
+        use_cache: bool = True,
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> LLMResponse:
+        """
+        Send a chat message with automatic fallback, without blocking the event loop.
+
+        Args:
+            user_message: The user's message
+            system_prompt: Optional system prompt
+            context: Optional context to include
+            preferred_provider: Optional preferred provider to try first
+            hedge: Send a hedged request to the next provider if the primary
+                is slow (defaults to LLM_HEDGING_ENABLED)
+            use_cache: Serve/store the answer from the response cache
+            history: Earlier turns of the conversation ({"role": "user" or
+                "assistant", "content": ...}), oldest first
+
+        Returns:
+            LLMResponse with the result
+        """
+        if not self.providers:
+            return LLMResponse(
+                content="No LLM providers configured. Please set API keys in environment.",
+                provider=LLMProvider.EURI,
+                model="none",
+                success=False,
+                error="No providers configured"
+            )
+
+        if use_cache:
+            cached = self._cache_lookup(user_message, system_prompt, _cache_context(context, history), preferred_provider)
+            if cached is not None:
+                return cached
+
+        # Build the full message
+        full_message = user_message
+        if context:
+            full_message = f"Context:\n{context}\n\nQuery: {user_message}"
+
+        # Order providers by preference and live health
+        providers_to_try = self._ordered_providers(preferred_provider)
+
+        if hedge is None:
+            hedge = self.hedging_enabled
+        if hedge:
+            response = await self._chat_hedged(providers_to_try, full_message, system_prompt, history)
+            if use_cache:
+                self._cache_store(user_message, system_prompt, _cache_context(context, history), preferred_provider, response)
+            return response
+
+        # Try each provider in order
+        errors = []
+        for config in providers_to_try:
+            if not self._breakers[config.provider].allow_request():
+                errors.append(f"{config.provider.value}: circuit open")
+                logger.info(f"Skipping LLM provider {config.provider.value}: circuit open")
+                continue
+
+            try:
+                response = await self._attempt(config, full_message, system_prompt, history)
+            except Exception as e:
+                errors.append(f"{config.provider.value}: {str(e)}")
+                logger.warning(f"Provider {config.provider.value} failed: {e}")
+                continue
+
+            if use_cache:
+                self._cache_store(user_message, system_prompt, _cache_context(context, history), preferred_provider, response)
+            return response
+
+        return self._all_failed_response(errors)
+
+    async def _attempt(
+        self,
+        config: LLMConfig,
+        message: str,
+        system_prompt: Optional[str],
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> LLMResponse:
+        """
+        Call one provider and record the outcome on its circuit breaker.
+
+        Cancellation (e.g. a losing hedged request) is not recorded as a
+        failure.
+        """
+        breaker = self._breakers[config.provider]
+        logger.info(f"Trying LLM provider: {config.provider.value}")
+        start_time = time.time()
+
+        try:
+            response = await self._call_provider(config, message, system_prompt, history)
+        except Exception:
+            breaker.record_failure()
+            raise
+
+        latency = (time.time() - start_time) * 1000
+        breaker.record_success(latency)
+        logger.info(f"Success with {config.provider.value} in {latency:.0f}ms")
+
+        return LLMResponse(
+            content=response,
+            provider=config.provider,
+            model=config.model,
+            latency_ms=latency,
+            success=True
+        )
+
+    def _hedge_delay(self, config: LLMConfig) -> float:
+        """Seconds to wait on a provider before sending a hedged request"""
+        observed = self._breakers[config.provider].latency_percentile(self.hedge_percentile)
+        delay_ms = observed if observed is not None else self.hedge_default_delay_ms
+        return max(delay_ms, self.hedge_min_delay_ms) / 1000
+
+    async def _chat_hedged(
+        self,
+        providers_to_try: List[LLMConfig],
+        message: str,
+        system_prompt: Optional[str],
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> LLMResponse:
+        """
+        Fallback chain with a single speculative request.
+
+        The primary provider runs alone until its hedge delay expires. If it
+        has not answered by then (and the hedge budget allows), the next
+        provider in the chain gets the same request; the first success wins
+        and the other request is cancelled. Failures fall through to the
+        remaining providers as in the normal chain.
+        """
+        errors = []
+        remaining = list(providers_to_try)
+        pending: Dict[asyncio.Task, LLMConfig] = {}
+        started_at: Dict[asyncio.Task, float] = {}
+        hedge_decided = False
+        hedged = False
+
+        def launch_next() -> bool:
+            while remaining:
+                config = remaining.pop(0)
+                if not self._breakers[config.provider].allow_request():
+                    errors.append(f"{config.provider.value}: circuit open")
+                    continue
+                task = asyncio.ensure_future(self._attempt(config, message, system_prompt, history))
+                pending[task] = config
+                started_at[task] = time.monotonic()
+                return True
+            return False
+
+        self._hedge_budget.record_primary()
+        launch_next()
+
+        try:
+            while pending:
+                timeout = None
+                if not hedge_decided and len(pending) == 1 and remaining:
+                    task, config = next(iter(pending.items()))
+                    elapsed = time.monotonic() - started_at[task]
+                    timeout = max(0.0, self._hedge_delay(config) - elapsed)
+
+                done, _ = await asyncio.wait(
+                    pending.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    # Primary is slower than its usual tail latency
+                    hedge_decided = True
+                    if self._hedge_budget.try_acquire():
+                        if launch_next():
+                            hedged = True
+                            logger.info(f"Hedging LLM request to {list(pending.values())[-1].provider.value}")
+                        else:
+                            # Every remaining circuit is open; nothing was sent
+                            self._hedge_budget.release()
+                    continue
+
+                for task in done:
+                    config = pending.pop(task)
+                    started_at.pop(task)
+                    if task.exception() is None:
+                        response = task.result()
+                        response.hedged = hedged
+                        return response
+                    errors.append(f"{config.provider.value}: {task.exception()}")
+                    logger.warning(f"Provider {config.provider.value} failed: {task.exception()}")
+
+                if not pending:
+                    launch_next()
+        finally:
+            # Cancel the losing request(s)
+            for task in pending:
+                task.cancel()
+
+        return self._all_failed_response(errors)
+
+    def _all_failed_response(self, errors: List[str]) -> LLMResponse:
+        """Response returned when every provider failed or was skipped"""
+        return LLMResponse(
+            content="I apologize, but I'm unable to process your request at the moment. Please try again later.",
+            provider=self.providers[0].provider if self.providers else LLMProvider.EURI,
+            model="fallback",
+            success=False,
+            error="; ".join(errors)
+        )
+
+    async def _call_provider(
+        self,
+        config: LLMConfig,
+        message: str,
+        system_prompt: Optional[str],
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> str:
+        """Call a specific LLM provider"""
+
+        if config.provider == LLMProvider.EURI:
+            return await self._call_euri(config, message, system_prompt, history)
+        elif config.provider == LLMProvider.DEEPSEEK:
+            return await self._call_deepseek(config, message, system_prompt, history)
+        elif config.provider == LLMProvider.GOOGLE:
+            return await self._call_google(config, message, system_prompt, history)
+        elif config.provider == LLMProvider.OPENAI:
+            return await self._call_openai(config, message, system_prompt, history)
+        elif config.provider == LLMProvider.ANTHROPIC:
+            return await self._call_anthropic(config, message, system_prompt, history)
+        else:
+            raise ValueError(f"Unsupported provider: {config.provider}")
+
+    async def _call_euri(
+        self,
+        config: LLMConfig,
+        message: str,
+        system_prompt: Optional[str],
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> str:
+        """Call Euri AI API (OpenAI-compatible)"""
+        url = f"{config.base_url}/chat/completions"
+
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.extend(history or [])
+        messages.append({"role": "user", "content": message})
+
+        response = await self._http_client.post(
+            url,
+            headers={
+                "Authorization": f"Bearer {config.api_key}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": config.model,
+                "messages": messages,
+                "max_tokens": config.max_tokens,
+                "temperature": config.temperature
+            },
+            timeout=config.timeout
+        )
+        response.raise_for_status()
+
+        data = response.json()
+        return data["choices"][0]["message"]["content"]
+
+    async def _call_deepseek(
+        self,
+        config: LLMConfig,
+        message: str,
+        system_prompt: Optional[str],
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> str:
+        """Call DeepSeek API (OpenAI-compatible)"""
+        url = f"{config.base_url}/chat/completions"
+
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.extend(history or [])
+        messages.append({"role": "user", "content": message})
+
+        response = await self._http_client.post(
+            url,
+            headers={
+                "Authorization": f"Bearer {config.api_key}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": config.model,
+                "messages": messages,
+                "max_tokens": config.max_tokens,
+                "temperature": config.temperature
+            },
+            timeout=config.timeout
+        )
+        response.raise_for_status()
+
+        data = response.json()
+        return data["choices"][0]["message"]["content"]
+
+    async def _call_google(
+        self,
+        config: LLMConfig,
+        message: str,
+        system_prompt: Optional[str],
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> str:
+        """Call Google Gemini API"""
+        url = f"{config.base_url}/models/{config.model}:generateContent"
+
+        # Build content parts
+        contents = []
+        if system_prompt:
+            contents.append({
+                "role": "user",
+                "parts": [{"text": f"System Instructions: {system_prompt}"}]
+            })
+            contents.append({
+                "role": "model",
+                "parts": [{"text": "Understood. I will follow these instructions."}]
+            })
+
+        contents.extend(_gemini_turns(history))
+
+        contents.append({
+            "role": "user",
+            "parts": [{"text": message}]
+        })
+
+        response = await self._http_client.post(
+            url,
+            headers={"Content-Type": "application/json"},
+            params={"key": config.api_key},
+            json={
+                "contents": contents,
+                "generationConfig": {
+                    "maxOutputTokens": config.max_tokens,
+                    "temperature": config.temperature
+                }
+            },
+            timeout=config.timeout
+        )
+        response.raise_for_status()
+
+        data = response.json()
+        return data["candidates"][0]["content"]["parts"][0]["text"]
+
+    async def _call_openai(
+        self,
+        config: LLMConfig,
+        message: str,
+        system_prompt: Optional[str],
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> str:
+        """Call OpenAI API"""
+        url = f"{config.base_url}/chat/completions"
+
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.extend(history or [])
+        messages.append({"role": "user", "content": message})
+
+        response = await self._http_client.post(
+            url,
+            headers={
+                "Authorization": f"Bearer {config.api_key}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": config.model,
+                "messages": messages,
+                "max_tokens": config.max_tokens,
+                "temperature": config.temperature
+            },
+            timeout=config.timeout
+        )
+        response.raise_for_status()
+
+        data = response.json()
+        return data["choices"][0]["message"]["content"]
+
+    async def _call_anthropic(
+        self,
+        config: LLMConfig,
+        message: str,
+        system_prompt: Optional[str],
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> str:
+        """Call Anthropic Claude API"""
+        url = f"{config.base_url}/messages"
+
+        payload = {
+            "model": config.model,
+            "max_tokens": config.max_tokens,
+            "messages": [*(history or []), {"role": "user", "content": message}]
+        }
+
+        if system_prompt:
+            payload["system"] = system_prompt
+
+        response = await self._http_client.post(
+            url,
+            headers={
+                "x-api-key": config.api_key,
+                "anthropic-version": "2023-06-01",
+                "Content-Type": "application/json"
+            },
+            json=payload,
+            timeout=config.timeout
+        )
+        response.raise_for_status()
+
+        data = response.json()
+        return data["content"][0]["text"]
+
+    async def stream_chat(
+        self,
+        user_message: str,
+        system_prompt: Optional[str] = None,
+        context: Optional[str] = None,
+        preferred_provider: Optional[LLMProvider] = None,
+        use_cache: bool = True,
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a chat response as normalized events, with automatic fallback.
+
+        history carries earlier turns of the conversation, as for chat().
+
+        Events:
+            {"type": "start", "provider": ..., "model": ..., "cached": bool}
+            {"type": "token", "content": "..."}
+            {"type": "done", "provider": ..., "model": ..., "latency_ms": ...,
+             "first_token_ms": ..., "cached": bool}
+            {"type": "error", "error": "..."}
+
+        A provider that fails before producing its first token is skipped
+        silently and the next provider is tried, so the client only ever
+        sees one "start" event. Failures after the first token end the
+        stream with an "error" event.
+        """
+        if not self.providers:
+            yield {"type": "error", "error": "No providers configured"}
+            return
+
+        if use_cache:
+            cached = self._cache_lookup(user_message, system_prompt, _cache_context(context, history), preferred_provider)
+            if cached is not None:
+                yield {"type": "start", "provider": cached.provider.value, "model": cached.model, "cached": True}
+                yield {"type": "token", "content": cached.content}
+                yield {
+                    "type": "done",
+                    "provider": cached.provider.value,
+                    "model": cached.model,
+                    "latency_ms": cached.latency_ms,
+                    "first_token_ms": cached.latency_ms,
+                    "cached": True
+                }
+                return
+
+        # Build the full message
+        full_message = user_message
+        if context:
+            full_message = f"Context:\n{context}\n\nQuery: {user_message}"
+
+        errors = []
+        for config in self._ordered_providers(preferred_provider):
+            breaker = self._breakers[config.provider]
+            if not breaker.allow_request():
+                errors.append(f"{config.provider.value}: circuit open")
+                continue
+
+            logger.info(f"Streaming from LLM provider: {config.provider.value}")
+            start_time = time.time()
+            first_token_ms = None
+            parts: List[str] = []
+            chunks = self._stream_provider(config, full_message, system_prompt, history)
+
+            try:
+                async for text in chunks:
+                    if not text:
+                        continue
+                    if first_token_ms is None:
+                        first_token_ms = (time.time() - start_time) * 1000
+                        yield {"type": "start", "provider": config.provider.value, "model": config.model, "cached": False}
+                    parts.append(text)
+                    yield {"type": "token", "content": text}
+            except Exception as e:
+                breaker.record_failure()
+                if first_token_ms is None:
+                    # Nothing sent yet - fall back transparently
+                    errors.append(f"{config.provider.value}: {str(e)}")
+                    logger.warning(f"Provider {config.provider.value} failed before first token: {e}")
+                    continue
+                logger.warning(f"Provider {config.provider.value} failed mid-stream: {e}")
+                yield {"type": "error", "error": f"{config.provider.value}: {str(e)}"}
+                return
+            finally:
+                await chunks.aclose()
+
+            if first_token_ms is None:
+                breaker.record_failure()
+                errors.append(f"{config.provider.value}: empty response")
+                continue
+
+            latency = (time.time() - start_time) * 1000
+            breaker.record_success(latency)
+            logger.info(f"Streamed from {config.provider.value} in {latency:.0f}ms (first token {first_token_ms:.0f}ms)")
+
+            if use_cache:
+                self._cache_store(
+                    user_message, system_prompt, _cache_context(context, history), preferred_provider,
+                    LLMResponse(content="".join(parts), provider=config.provider, model=config.model)
+                )
+
+            yield {
+                "type": "done",
+                "provider": config.provider.value,
+                "model": config.model,
+                "latency_ms": latency,
+                "first_token_ms": first_token_ms,
+                "cached": False
+            }
+            return
+
+        yield {"type": "error", "error": "; ".join(errors) or "No providers available"}
+
+    def _stream_provider(
+        self,
+        config: LLMConfig,
+        message: str,
+        system_prompt: Optional[str],
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[str]:
+        """Stream text chunks from a specific LLM provider"""
+
+        if config.provider in (LLMProvider.EURI, LLMProvider.DEEPSEEK, LLMProvider.OPENAI):
+            return self._stream_openai_compatible(config, message, system_prompt, history)
+        elif config.provider == LLMProvider.GOOGLE:
+            return self._stream_google(config, message, system_prompt, history)
+        elif config.provider == LLMProvider.ANTHROPIC:
+            return self._stream_anthropic(config, message, system_prompt, history)
+        else:
+            raise ValueError(f"Unsupported provider: {config.provider}")
+
+    @staticmethod
+    async def _iter_sse_data(response: httpx.Response) -> AsyncIterator[str]:
+        """Yield the data payload of each server-sent event"""
+        async for line in response.aiter_lines():
+            if line.startswith("data:"):
+                yield line[5:].strip()
+
+    async def _stream_openai_compatible(
+        self,
+        config: LLMConfig,
+        message: str,
+        system_prompt: Optional[str],
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[str]:
+        """Stream from an OpenAI-compatible API (Euri, DeepSeek, OpenAI)"""
+        url = f"{config.base_url}/chat/completions"
+
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.extend(history or [])
+        messages.append({"role": "user", "content": message})
+
+        async with self._http_client.stream(
+            "POST",
+            url,
+            headers={
+                "Authorization": f"Bearer {config.api_key}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": config.model,
+                "messages": messages,
+                "max_tokens": config.max_tokens,
+                "temperature": config.temperature,
+                "stream": True
+            },
+            timeout=config.timeout
+        ) as response:
+            response.raise_for_status()
+            async for data in self._iter_sse_data(response):
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                choices = chunk.get("choices") or []
+                if choices:
+                    yield choices[0].get("delta", {}).get("content") or ""
+
+    async def _stream_google(
+        self,
+        config: LLMConfig,
+        message: str,
+        system_prompt: Optional[str],
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[str]:
+        """Stream from Google Gemini API"""
+        url = f"{config.base_url}/models/{config.model}:streamGenerateContent"
+
+        # Build content parts
+        contents = []
+        if system_prompt:
+            contents.append({
+                "role": "user",
+                "parts": [{"text": f"System Instructions: {system_prompt}"}]
+            })
+            contents.append({
+                "role": "model",
+                "parts": [{"text": "Understood. I will follow these instructions."}]
+            })
+
+        contents.extend(_gemini_turns(history))
+
+        contents.append({
+            "role": "user",
+            "parts": [{"text": message}]
+        })
+
+        async with self._http_client.stream(
+            "POST",
+            url,
+            headers={"Content-Type": "application/json"},
+            params={"key": config.api_key, "alt": "sse"},
+            json={
+                "contents": contents,
+                "generationConfig": {
+                    "maxOutputTokens": config.max_tokens,
+                    "temperature": config.temperature
+                }
+            },
+            timeout=config.timeout
+        ) as response:
+            response.raise_for_status()
+            async for data in self._iter_sse_data(response):
+                chunk = json.loads(data)
+                for candidate in chunk.get("candidates", [])[:1]:
+                    for part in candidate.get("content", {}).get("parts", []):
+                        yield part.get("text", "")
+
+    async def _stream_anthropic(
+        self,
+        config: LLMConfig,
+        message: str,
+        system_prompt: Optional[str],
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[str]:
+        """Stream from Anthropic Claude API"""
+        url = f"{config.base_url}/messages"
+
+        payload = {
+            "model": config.model,
+            "max_tokens": config.max_tokens,
+            "messages": [*(history or []), {"role": "user", "content": message}],
+            "stream": True
+        }
+
+        if system_prompt:
+            payload["system"] = system_prompt
+
+        async with self._http_client.stream(
+            "POST",
+            url,
+            headers={
+                "x-api-key": config.api_key,
+                "anthropic-version": "2023-06-01",
+                "Content-Type": "application/json"
+            },
+            json=payload,
+            timeout=config.timeout
+        ) as response:
+            response.raise_for_status()
+            async for data in self._iter_sse_data(response):
+                event = json.loads(data)
+                if event.get("type") == "content_block_delta":
+                    yield event.get("delta", {}).get("text", "")
+                elif event.get("type") == "error":
+                    raise RuntimeError(event.get("error", {}).get("message", "stream error"))
+
+    def get_provider_status(self) -> Dict[str, Any]:
+        """Get status of all providers, including circuit breakers and hedging"""
+        status = super().get_provider_status()
+        status["hedging"] = {
+            "enabled_by_default": self.hedging_enabled,
+            "percentile": self.hedge_percentile,
+            "budget": self._hedge_budget.snapshot()
+        }
+        return status
+
+    async def aclose(self):
+        """Close the shared async HTTP client"""
+        await self._http_client.aclose()
+
+    def __del__(self):
+        """The async client must be closed with aclose() from the event loop"""
+        pass
+
+
 # Global instance for easy access
 _llm_service: Optional[LLMFallbackService] = None
+_async_llm_service: Optional[AsyncLLMFallbackService] = None
 
 
 def get_llm_service() -> LLMFallbackService:
@@ -484,6 +1364,22 @@ def get_llm_service() -> LLMFallbackService:
     return _llm_service
 
 
+def get_async_llm_service() -> AsyncLLMFallbackService:
+    """Get the global async LLM service instance"""
+    global _async_llm_service
+    if _async_llm_service is None:
+        _async_llm_service = AsyncLLMFallbackService()
+    return _async_llm_service
+
+
+async def close_async_llm_service():
+    """Close the global async LLM service (call on application shutdown)"""
+    global _async_llm_service
+    if _async_llm_service is not None:
+        await _async_llm_service.aclose()
+        _async_llm_service = None
+
+
 def chat_with_fallback(
     message: str,
     system_prompt: Optional[str] = None,
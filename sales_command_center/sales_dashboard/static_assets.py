@@ -0,0 +1,157 @@
+"""
+Static Assets
+In-memory cache for the frontend HTML pages and cache headers for /static.
+
+Pages are read once (at startup via preload) and kept as encoded
+payloads: identity/gzip/brotli bodies plus a content-hash ETag, so serving
+"/" or "/login" never touches the filesystem. With DEBUG on, a page is
+re-read when its mtime changes so frontend edits show up without a restart.
+
+Local /static references in a page (src="/static/app.js") are rewritten to
+content-hashed URLs (/static/app.js?v=<hash>) when the page is loaded, and
+CachedStaticFiles serves those versioned URLs as immutable, but only when
+v is the file's current hash; any other query is revalidated.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from urllib.parse import parse_qs
+
+from starlette.staticfiles import StaticFiles
+
+from .http_cache import EncodedPayload, encode_bytes
+
+logger = logging.getLogger(__name__)
+
+HTML_MEDIA_TYPE = "text/html; charset=utf-8"
+
+# Pages are revalidated on every load (cheap 304 via ETag)
+HTML_CACHE_CONTROL = "no-cache"
+
+# Versioned /static URLs change whenever the file changes
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_STATIC_REF_RE = re.compile(r'((?:src|href)=")/static/([^"?#]+)(")')
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    """An HTML page held in memory"""
+    payload: EncodedPayload
+    mtime: float
+
+
+class StaticAssetCache:
+    """
+    Loads frontend pages once and serves them from memory.
+
+    Usage:
+        static_assets = StaticAssetCache(frontend_path, reload=config.DEBUG)
+        payload = static_assets.page("sales_dashboard.html")
+    """
+
+    def __init__(self, root: Path, reload: bool = False):
+        """
+        Initialize the cache
+
+        Args:
+            root: Directory holding the frontend files (also served at /static)
+            reload: Re-read a page when its mtime changes (development only)
+        """
+        self.root = root
+        self.reload = reload
+        self._pages: Dict[str, CachedPage] = {}
+        self._asset_versions: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def preload(self, names: Iterable[str]):
+        """Load pages up front (call at startup)"""
+        for name in names:
+            self.page(name)
+
+    def page(self, name: str) -> Optional[EncodedPayload]:
+        """
+        Get a page's encoded payload
+
+        Returns:
+            The payload, or None if the file does not exist
+        """
+        cached = self._pages.get(name)
+        if cached is not None and not self.reload:
+            return cached.payload
+
+        path = self.root / name
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            return cached.payload if cached is not None else None
+
+        if cached is not None and cached.mtime == mtime:
+            return cached.payload
+
+        with self._lock:
+            if self.reload:
+                self._asset_versions.clear()
+            body = self._rewrite_static_refs(path.read_bytes())
+            cached = CachedPage(payload=encode_bytes(body, HTML_MEDIA_TYPE), mtime=mtime)
+            self._pages[name] = cached
+        logger.info(f"Loaded {name} ({len(body)} bytes, etag {cached.payload.etag})")
+        return cached.payload
+
+    def asset_version(self, relative_path: str) -> Optional[str]:
+        """Short content hash of a file under root, or None if missing"""
+        version = self._asset_versions.get(relative_path)
+        if version is None:
+            path = (self.root / relative_path).resolve()
+            if self.root.resolve() not in path.parents or not path.is_file():
+                return None
+            version = hashlib.blake2b(path.read_bytes(), digest_size=6).hexdigest()
+            self._asset_versions[relative_path] = version
+        return version
+
+    def asset_url(self, relative_path: str) -> str:
+        """Content-hashed /static URL for a file under root"""
+        version = self.asset_version(relative_path)
+        url = f"/static/{relative_path}"
+        return f"{url}?v={version}" if version else url
+
+    def _rewrite_static_refs(self, body: bytes) -> bytes:
+        """Point local /static references at their content-hashed URLs"""
+        html = body.decode("utf-8")
+        rewritten = _STATIC_REF_RE.sub(lambda m: f"{m.group(1)}{self.asset_url(m.group(2))}{m.group(3)}", html)
+        return rewritten.encode("utf-8")
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with long-lived caching for versioned (?v=<current hash>) URLs"""
+
+    def __init__(self, *args, assets: Optional[StaticAssetCache] = None, **kwargs):
+        """
+        Args:
+            assets: Cache whose asset_version() a ?v= must match to be immutable
+                (without one, every response is revalidated)
+        """
+        super().__init__(*args, **kwargs)
+        self.assets = assets
+
+    def is_current_version(self, scope) -> bool:
+        """True if the request's v parameter is the file's current content hash"""
+        if self.assets is None:
+            return False
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        versions = query.get("v", [])
+        if len(versions) != 1:
+            return False
+        relative_path = Path(self.get_path(scope)).as_posix()
+        return versions[0] == self.assets.asset_version(relative_path)
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        immutable = self.is_current_version(scope)
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL if immutable else HTML_CACHE_CONTROL
+        return response
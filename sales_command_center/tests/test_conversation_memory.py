@@ -0,0 +1,75 @@
+"""
+Conversation memory: bounded write-behind queue, retried writes, summary bounds
+"""
+
+import asyncio
+
+from sqlalchemy.exc import OperationalError
+
+from sales_dashboard.conversation_memory import ConversationMemory, Turn
+
+
+def _row(n: int):
+    return {"query": f"q{n}", "response": f"a{n}"}
+
+
+def test_write_queue_drops_oldest_rows_when_full(monkeypatch):
+    memory = ConversationMemory(max_queue=3, flush_interval=0)
+    written = []
+
+    async def insert(rows):
+        written.extend(row["query"] for row in rows)
+
+    monkeypatch.setattr(memory, "_insert", insert)
+
+    async def run():
+        for n in range(5):
+            memory._enqueue(_row(n))
+        await memory.stop()
+
+    asyncio.run(run())
+
+    assert written == ["q2", "q3", "q4"]
+    assert memory.stats()["dropped"] == 2
+
+
+def test_transient_write_errors_are_retried(monkeypatch):
+    memory = ConversationMemory(flush_interval=0)
+    attempts = []
+
+    async def insert(rows):
+        attempts.append(len(rows))
+        if len(attempts) < 3:
+            raise OperationalError("INSERT", {}, ConnectionError("database restarting"))
+
+    monkeypatch.setattr(memory, "_insert", insert)
+
+    async def run():
+        memory._enqueue(_row(1))
+        await memory.stop()
+
+    asyncio.run(run())
+
+    stats = memory.stats()
+    assert len(attempts) == 3
+    assert stats["written"] == 1
+    assert stats["write_retries"] == 2
+    assert stats["write_failures"] == 0
+
+
+def test_summary_is_truncated_even_with_a_tiny_budget():
+    async def summarize(previous, turns, words):
+        return "x" * 400
+
+    memory = ConversationMemory(token_budget=1, summarize=summarize)
+    assert memory.token_budget == 2
+
+    async def run():
+        session = await memory._session(memory.new_session())
+        turns = [Turn("question", "answer", tokens=5) for _ in range(3)]
+        session.turns = list(turns)
+        await memory._fold(session, turns[:2])
+        return session
+
+    session = asyncio.run(run())
+    assert len(session.summary) < 400
@@ -0,0 +1,35 @@
+"""
+Dashboard endpoints answer 503, not a NameError, when the data layer failed to import
+"""
+
+import pytest
+from starlette.testclient import TestClient
+
+import app as app_module
+
+DASHBOARD_ENDPOINTS = [
+    "/api/dashboard/metrics",
+    "/api/dashboard/revenue-trend",
+    "/api/dashboard/regional-performance",
+    "/api/pipeline/funnel",
+    "/api/products/performance",
+    "/api/orders",
+    "/api/orders?status=pending",
+    "/api/dashboard/snapshot",
+]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.delenv("APP_USERNAME", raising=False)
+    monkeypatch.delenv("APP_PASSWORD", raising=False)
+    # As after a failed `from sales_dashboard.data import ...`
+    monkeypatch.setattr(app_module, "DATABASE_AVAILABLE", False)
+    for name in ("dashboard_service", "OrderFilters", "get_async_db_session"):
+        monkeypatch.delattr(app_module, name)
+    return TestClient(app_module.app, raise_server_exceptions=False)
+
+
+@pytest.mark.parametrize("path", DASHBOARD_ENDPOINTS)
+def test_dashboard_endpoint_without_data_layer_is_503(client, path):
+    assert client.get(path).status_code == 503
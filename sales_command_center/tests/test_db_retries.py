@@ -0,0 +1,49 @@
+"""
+Transient database errors: deadlocks and serialization failures are retried
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy.exc import DBAPIError, IntegrityError, OperationalError
+
+from sales_dashboard.data.upsert import dedupe_rows
+from sales_dashboard.integrations.netsuite_sync import is_transient_db_error, retry_with_jitter
+
+
+class DriverError(Exception):
+    """Stands in for the asyncpg adapter error (carries sqlstate)"""
+
+    def __init__(self, sqlstate):
+        super().__init__(sqlstate)
+        self.sqlstate = sqlstate
+
+
+@pytest.mark.parametrize("error,transient", [
+    (DBAPIError("UPDATE", {}, DriverError("40P01")), True),   # deadlock_detected
+    (DBAPIError("UPDATE", {}, DriverError("40001")), True),   # serialization_failure
+    (OperationalError("SELECT 1", {}, DriverError(None)), True),
+    (IntegrityError("INSERT", {}, DriverError("23505")), False),  # unique_violation
+    (ValueError("bad row"), False),
+])
+def test_transient_classification(error, transient):
+    assert is_transient_db_error(error) is transient
+
+
+def test_deadlock_is_retried(monkeypatch):
+    monkeypatch.setattr("sales_dashboard.integrations.netsuite_sync.random.uniform", lambda a, b: 0)
+    attempts = []
+
+    async def write():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise DBAPIError("UPDATE", {}, DriverError("40P01"))
+        return "ok"
+
+    assert asyncio.run(retry_with_jitter(write, 3, retry_if=is_transient_db_error)) == "ok"
+    assert len(attempts) == 2
+
+
+def test_upsert_rows_are_written_in_key_order():
+    rows = [{"sku": "B", "n": 1}, {"sku": "A", "n": 2}, {"sku": "B", "n": 3}]
+    assert dedupe_rows(rows, "sku") == [{"sku": "A", "n": 2}, {"sku": "B", "n": 3}]
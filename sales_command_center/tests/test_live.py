@@ -0,0 +1,45 @@
+"""
+Live dashboard subscriptions must not outlive a failed subscribe()
+"""
+
+import asyncio
+
+import pytest
+
+from sales_dashboard import live
+from sales_dashboard.live import DashboardBroadcaster
+
+
+def _broadcaster(monkeypatch) -> DashboardBroadcaster:
+    broadcaster = DashboardBroadcaster()
+    monkeypatch.setattr(broadcaster, "start", lambda: None)
+    return broadcaster
+
+
+def test_subscriber_removed_when_snapshot_fails(monkeypatch):
+    async def get_snapshot():
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(live.dashboard_service, "get_snapshot", get_snapshot)
+    broadcaster = _broadcaster(monkeypatch)
+
+    async def subscribe():
+        broadcaster._ready.set()
+        await broadcaster.subscribe()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(subscribe())
+    assert not broadcaster._subscribers
+    assert not broadcaster._has_subscribers.is_set()
+
+
+def test_subscriber_removed_when_cancelled_waiting(monkeypatch):
+    broadcaster = _broadcaster(monkeypatch)
+
+    async def subscribe():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(broadcaster.subscribe(), 0.1)
+
+    asyncio.run(subscribe())
+    assert not broadcaster._subscribers
+    assert not broadcaster._has_subscribers.is_set()
@@ -0,0 +1,72 @@
+"""
+Streaming chat carries the conversation history to the provider
+"""
+
+import asyncio
+import json
+
+import httpx
+
+from sales_dashboard.llm_service import AsyncLLMFallbackService
+
+HISTORY = [
+    {"role": "user", "content": "How did Disney order last quarter?"},
+    {"role": "assistant", "content": "Disney placed 4 orders totalling $1.2M."},
+]
+
+
+def test_stream_chat_sends_history(monkeypatch):
+    for name in ("DEEPSEEK_API_KEY", "GOOGLE_API_KEY", "OPENAI_API_KEY", "ANTHROPIC_API_KEY"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("EURI_API_KEY", "test-key")
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "False")
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(json.loads(request.content))
+        body = 'data: {"choices": [{"delta": {"content": "Up 12%."}}]}\n\ndata: [DONE]\n\n'
+        return httpx.Response(200, text=body, headers={"Content-Type": "text/event-stream"})
+
+    async def stream():
+        service = AsyncLLMFallbackService()
+        service._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        try:
+            return [event async for event in service.stream_chat("And this quarter?", history=HISTORY)]
+        finally:
+            await service.aclose()
+
+    events = asyncio.run(stream())
+
+    assert [event["type"] for event in events] == ["start", "token", "done"]
+    assert sent[0]["messages"] == [*HISTORY, {"role": "user", "content": "And this quarter?"}]
+
+
+def test_hedge_budget_refunded_when_no_provider_can_launch(monkeypatch):
+    for name in ("DEEPSEEK_API_KEY", "GOOGLE_API_KEY", "ANTHROPIC_API_KEY"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("EURI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "False")
+
+    async def hedge():
+        service = AsyncLLMFallbackService()
+        primary, fallback = service.providers[0], service.providers[1]
+        service._hedge_budget.max_ratio = 1.0
+        service.hedge_default_delay_ms = service.hedge_min_delay_ms = 0
+        service._breakers[fallback.provider].allow_request = lambda: False
+
+        async def attempt(config, message, system_prompt, history):
+            await asyncio.sleep(0.05)
+            raise RuntimeError("slow and failing")
+
+        service._attempt = attempt
+        try:
+            await service._chat_hedged([primary, fallback], "Pipeline?", None)
+            return service._hedge_budget.snapshot()
+        finally:
+            await service.aclose()
+
+    budget = asyncio.run(hedge())
+
+    assert budget["window_hedges"] == 0
+    assert budget["total_hedges"] == 0
@@ -0,0 +1,48 @@
+"""
+The NDJSON export opens a short-lived session per keyset batch
+"""
+
+import json
+from contextlib import asynccontextmanager
+
+from starlette.testclient import TestClient
+
+import app as app_module
+
+BATCHES = [[{"id": 3}, {"id": 2}], [{"id": 1}], []]
+
+
+def test_export_uses_one_session_per_batch(monkeypatch):
+    monkeypatch.delenv("APP_USERNAME", raising=False)
+    monkeypatch.delenv("APP_PASSWORD", raising=False)
+    monkeypatch.setattr(app_module, "DATABASE_AVAILABLE", True)
+    sessions = {"opened": 0, "open": 0}
+    positions = []
+
+    @asynccontextmanager
+    async def session():
+        sessions["opened"] += 1
+        sessions["open"] += 1
+        try:
+            yield object()
+        finally:
+            sessions["open"] -= 1
+
+    class Repository:
+        def __init__(self, db):
+            pass
+
+        async def export_batch(self, filters, after=None):
+            assert sessions["open"] == 1
+            positions.append(after)
+            batch = len(positions) - 1
+            return BATCHES[batch], batch + 1 if batch + 1 < len(BATCHES) else None
+
+    monkeypatch.setattr(app_module, "get_async_db_session", session)
+    monkeypatch.setattr(app_module, "AsyncOrderRepository", Repository)
+
+    response = TestClient(app_module.app).get("/api/orders/export")
+
+    assert [json.loads(line) for line in response.text.splitlines()] == [{"id": 3}, {"id": 2}, {"id": 1}]
+    assert positions == [None, 1, 2]
+    assert sessions == {"opened": 3, "open": 0}
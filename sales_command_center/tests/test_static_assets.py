@@ -0,0 +1,36 @@
+"""
+Versioned /static URLs are immutable only for the file's current hash
+"""
+
+from typing import Tuple
+
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from sales_dashboard.static_assets import (
+    HTML_CACHE_CONTROL,
+    IMMUTABLE_CACHE_CONTROL,
+    CachedStaticFiles,
+    StaticAssetCache,
+)
+
+
+def _client(tmp_path) -> Tuple[TestClient, StaticAssetCache]:
+    (tmp_path / "app.js").write_text("console.log('dashboard');")
+    assets = StaticAssetCache(tmp_path)
+    app = Starlette(routes=[Mount("/static", CachedStaticFiles(directory=str(tmp_path), assets=assets))])
+    return TestClient(app), assets
+
+
+def test_current_version_is_immutable(tmp_path):
+    client, assets = _client(tmp_path)
+    response = client.get(assets.asset_url("app.js"))
+    assert response.headers["Cache-Control"] == IMMUTABLE_CACHE_CONTROL
+
+
+def test_other_queries_are_revalidated(tmp_path):
+    client, _ = _client(tmp_path)
+    for query in ("", "?v=stale", "?nov=1", "?x=1&v="):
+        response = client.get(f"/static/app.js{query}")
+        assert response.headers["Cache-Control"] == HTML_CACHE_CONTROL, query
@@ -0,0 +1,100 @@
+"""
+Sync producer/writer hand-off: a failing writer must end the run with an
+error instead of leaving the producer blocked on a full queue.
+"""
+
+import asyncio
+
+from sales_dashboard.integrations import netsuite_sync as ns
+from sales_dashboard.integrations import salesforce_sync as sf
+
+
+class PageClient:
+    """Stands in for SalesforceClient: many small pages, no HTTP"""
+    configured = True
+
+    async def query_pages(self, soql):
+        for page in range(50):
+            yield [{"Id": f"006{page:05d}", "SystemModstamp": "2025-11-04T17:03:21.000+0000"}]
+
+
+class OrderClient:
+    """Stands in for NetSuiteClient: a stream of one-line orders, no HTTP"""
+    configured = True
+    retries = 0
+
+    async def orders(self, watermark):
+        for order_id in range(100):
+            line = {"id": str(order_id), "lastmodified": "2025-11-04 17:03:21", "sku": "SKU-1"}
+            yield {**line, "tranid": f"SO{order_id}", "entity": "1", "trandate": "2025-11-04", "lines": [line]}
+
+
+async def _noop(*args, **kwargs):
+    return None
+
+
+def test_salesforce_failing_writer_ends_run(monkeypatch):
+    monkeypatch.setattr(sf, "record_run", _noop)
+    sync = sf.SalesforceSync(PageClient(), writers=2)
+
+    async def apply_records(records):
+        await asyncio.sleep(0.2)
+        raise ValueError("duplicate key")
+
+    monkeypatch.setattr(sync, "apply_records", apply_records)
+
+    stats = asyncio.run(asyncio.wait_for(sync._run(full=True), 5))
+
+    assert stats["status"] == "error"
+    assert "duplicate key" in stats["error"]
+    assert stats["written"] == 0
+
+
+def test_netsuite_failing_writer_ends_run(monkeypatch):
+    monkeypatch.setattr(ns, "record_run", _noop)
+    monkeypatch.setattr(ns, "read_watermark", _noop)
+    sync = ns.NetSuiteOrderSync(OrderClient(), batch_size=5, queue_size=2, writers=2)
+
+    async def write_orders(orders):
+        await asyncio.sleep(0.2)
+        raise ValueError("duplicate key")
+
+    monkeypatch.setattr(sync, "write_orders", write_orders)
+
+    stats = asyncio.run(asyncio.wait_for(sync._run(full=True), 5))
+
+    assert stats["status"] == "error"
+    assert "duplicate key" in stats["error"]
+    assert stats["orders_written"] == 0
+
+
+def test_netsuite_order_numbers_are_namespaced():
+    assert ns.order_number({"id": 7, "tranid": "SO-2025-1001"}) == "NS-SO-2025-1001"
+    assert ns.order_number({"id": 7, "tranid": None}) == "NS-#7"
+
+
+def test_salesforce_deadlocked_page_is_retried(monkeypatch):
+    from sqlalchemy.exc import DBAPIError
+
+    class Deadlock(Exception):
+        sqlstate = "40P01"
+
+    monkeypatch.setattr(sf, "record_run", _noop)
+    monkeypatch.setattr(sf.dashboard_cache, "invalidate", _noop)
+    monkeypatch.setattr("sales_dashboard.integrations.netsuite_sync.random.uniform", lambda a, b: 0)
+    sync = sf.SalesforceSync(PageClient(), writers=2)
+    attempts = []
+
+    async def apply_records(records):
+        attempts.append(records[0]["Id"])
+        if attempts.count(records[0]["Id"]) == 1 and records[0]["Id"] == "00600003":
+            raise DBAPIError("INSERT", {}, Deadlock())
+        return len(records)
+
+    monkeypatch.setattr(sync, "apply_records", apply_records)
+
+    stats = asyncio.run(asyncio.wait_for(sync._run(full=True), 5))
+
+    assert stats["status"] == "ok"
+    assert stats["written"] == 50
+    assert stats["write_retries"] == 1
@@ -0,0 +1,165 @@
+"""
+Webhook payload validation and batch isolation
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from sales_dashboard.integrations import webhooks
+from sales_dashboard.integrations.webhooks import WebhookEvent, WebhookIngestor, netsuite_events, salesforce_events
+
+ORDER = {
+    "id": "101",
+    "lastmodified": "2025-11-04 17:03:21",
+    "entity": "55",
+    "trandate": "2025-11-04",
+    "lines": [{"sku": "SKU-1", "quantity": "2", "rate": "10", "amount": "20"}],
+}
+
+OPPORTUNITY = {
+    "Id": "006000000000001",
+    "SystemModstamp": "2025-11-04T17:03:21.000+0000",
+    "AccountId": "001000000000001",
+    "Amount": 5000,
+    "Probability": 40,
+    "CloseDate": "2025-12-01",
+}
+
+
+@pytest.mark.parametrize("change", [
+    {"entity": None},
+    {"trandate": None},
+    {"trandate": "04/11/2025"},
+    {"total": "lots"},
+    {"lines": [{"quantity": "1"}]},
+    {"lines": [{"sku": "SKU-1", "rate": "n/a"}]},
+])
+def test_netsuite_events_reject_orders_the_writer_cannot_map(change):
+    with pytest.raises(ValueError):
+        netsuite_events({**ORDER, **change})
+
+
+@pytest.mark.parametrize("change", [
+    {"Probability": "high"},
+    {"CloseDate": "soon"},
+    {"Amount": "a lot"},
+    {"Owner": "someone"},
+])
+def test_salesforce_events_reject_opportunities_the_writer_cannot_map(change):
+    with pytest.raises(ValueError):
+        salesforce_events({**OPPORTUNITY, **change})
+
+
+def test_valid_payloads_parse():
+    assert [e.external_id for e in netsuite_events({"orders": [ORDER]})] == ["101"]
+    assert [e.external_id for e in salesforce_events(OPPORTUNITY)] == [OPPORTUNITY["Id"]]
+
+
+def _order_event(order_id: str) -> WebhookEvent:
+    return WebhookEvent("order", order_id, datetime(2025, 11, 4), {**ORDER, "id": order_id})
+
+
+def _opportunity_event(opportunity_id: str, account_id) -> WebhookEvent:
+    record = {**OPPORTUNITY, "Id": opportunity_id, "AccountId": account_id}
+    return WebhookEvent("opportunity", opportunity_id, datetime(2025, 11, 4), record)
+
+
+async def _noop(*args, **kwargs):
+    return None
+
+
+def test_failed_batch_is_bisected_down_to_the_bad_record(monkeypatch):
+    monkeypatch.setattr(webhooks.dashboard_cache, "invalidate", _noop)
+    written = []
+
+    async def write_orders(orders):
+        if any(order["id"] == "bad" for order in orders):
+            raise ValueError("duplicate key value violates unique constraint")
+        written.extend(order["id"] for order in orders)
+        return len(orders)
+
+    ingestor = WebhookIngestor({"order": write_orders})
+    events = [_order_event(str(i)) for i in range(7)] + [_order_event("bad")]
+    asyncio.run(ingestor._flush(events))
+
+    assert sorted(written) == sorted(str(i) for i in range(7))
+    stats = ingestor.stats()
+    assert stats["written"] == 7
+    assert stats["failed"] == 1
+
+
+def test_opportunities_without_account_are_skipped_not_written(monkeypatch):
+    monkeypatch.setattr(webhooks.dashboard_cache, "invalidate", _noop)
+    received = []
+
+    async def apply_records(records):
+        received.extend(records)
+        return len(records)
+
+    ingestor = WebhookIngestor({"opportunity": apply_records})
+    asyncio.run(ingestor._flush([_opportunity_event("006A", "001A"), _opportunity_event("006B", None)]))
+
+    assert [record["Id"] for record in received] == ["006A"]
+    stats = ingestor.stats()
+    assert stats["written"] == 1
+    assert stats["skipped"] == 1
+
+
+@pytest.mark.parametrize("body,parse", [
+    ({**OPPORTUNITY, "SystemModstamp": 12345}, salesforce_events),
+    ({**OPPORTUNITY, "SystemModstamp": "yesterday"}, salesforce_events),
+    ({**ORDER, "lastmodified": 1700000000}, netsuite_events),
+    ({**ORDER, "lastmodified": "2025-11-04T17:03"}, netsuite_events),
+])
+def test_bad_timestamps_are_rejected(body, parse):
+    with pytest.raises(ValueError):
+        parse(body)
+
+
+def test_timestamps_with_and_without_offset_coalesce(monkeypatch):
+    monkeypatch.setattr(webhooks.dashboard_cache, "invalidate", _noop)
+    received = []
+
+    async def apply_records(records):
+        received.extend(record["SystemModstamp"] for record in records)
+        return len(records)
+
+    older = salesforce_events({**OPPORTUNITY, "SystemModstamp": "2025-11-04T17:03:21"})
+    newer = salesforce_events({**OPPORTUNITY, "SystemModstamp": "2025-11-04T18:03:21.000+0100"})
+    newest = salesforce_events({**OPPORTUNITY, "SystemModstamp": "2025-11-04T17:30:00Z"})
+
+    async def run():
+        ingestor = WebhookIngestor({"opportunity": apply_records}, window=0.05)
+        ingestor.submit(older + newer + newest)
+        await ingestor.stop()
+
+    asyncio.run(run())
+    assert received == ["2025-11-04T17:30:00Z"]
+
+
+def test_failed_window_does_not_stop_the_consumer(monkeypatch):
+    calls = []
+
+    async def invalidate():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("redis unavailable")
+
+    monkeypatch.setattr(webhooks.dashboard_cache, "invalidate", invalidate)
+    written = []
+
+    async def write_orders(orders):
+        written.extend(order["id"] for order in orders)
+        return len(orders)
+
+    async def run():
+        ingestor = WebhookIngestor({"order": write_orders}, window=0.01)
+        ingestor.submit([_order_event("1")])
+        await asyncio.sleep(0.1)
+        ingestor.submit([_order_event("2")])
+        await ingestor.stop()
+
+    asyncio.run(run())
+    assert written == ["1", "2"]